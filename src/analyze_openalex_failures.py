@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 """Analyze which papers failed OpenAlex enrichment and why."""
 
-import json
 from pathlib import Path
 from collections import defaultdict
 from typing import Any
 
+from src.stage_table import StageTable
+
 
 def analyze_failures() -> None:
     """Analyze papers that failed OpenAlex enrichment."""
@@ -17,39 +18,30 @@ def analyze_failures() -> None:
     papers_with_dois: dict[str, dict[str, Any]] = {}
     papers_without_dois: list[str] = []
 
-    for paper_file in input_dir.glob("*.json"):
-        if paper_file.name == "s2_batch_report.json":
-            continue
-
-        paper_id = paper_file.stem
+    inputs = StageTable.scan(input_dir).exclude_names("s2_batch_report.json")
+    for i, paper_id in enumerate(inputs.paper_ids):
         input_papers.add(paper_id)
 
-        with open(paper_file) as f:
-            paper = json.load(f)
-            doi = paper.get("doi")
-            if doi:
-                papers_with_dois[paper_id] = {
-                    "doi": doi,
-                    "title": paper.get("title", "Unknown"),
-                    "year": paper.get("year"),
-                    "journal": paper.get("journal"),
-                }
-            else:
-                papers_without_dois.append(paper_id)
+        doi = inputs.values["doi"][i]
+        if doi:
+            papers_with_dois[paper_id] = {
+                "doi": doi,
+                "title": inputs.values["title"][i] or "Unknown",
+                "year": inputs.values["year"][i],
+                "journal": inputs.values["journal"][i],
+            }
+        else:
+            papers_without_dois.append(paper_id)
 
     # Check which papers were enriched
+    outputs = StageTable.scan(output_dir)
+    has_openalex_id = dict(zip(outputs.paper_ids, outputs.has_key("openalex_id").tolist(), strict=True))
     enriched_papers: set[str] = set()
     failed_papers: list[tuple[str, dict[str, Any]]] = []
 
     for paper_id, info in papers_with_dois.items():
-        output_file = output_dir / f"{paper_id}.json"
-        if output_file.exists():
-            with open(output_file) as f:
-                paper = json.load(f)
-                if "openalex_id" in paper:
-                    enriched_papers.add(paper_id)
-                else:
-                    failed_papers.append((paper_id, info))
+        if has_openalex_id.get(paper_id):
+            enriched_papers.add(paper_id)
         else:
             failed_papers.append((paper_id, info))
 
@@ -3,13 +3,20 @@
 
 from src import config
 
-import json
+import argparse
 from pathlib import Path
 from collections import defaultdict, Counter
 import re
 from datetime import datetime, UTC
 from typing import Any
 
+import numpy as np
+
+from src.coverage_index import CoverageIndex
+from src.stage_table import StageTable
+
+VALID_DOI_PATTERN = re.compile(r"^10\.\d{4,}/.+")
+
 
 class PipelineCompletenessAnalyzer:
     """Analyze pipeline results for data completeness and failure patterns."""
@@ -22,77 +29,62 @@ class PipelineCompletenessAnalyzer:
         self.field_coverage: defaultdict[str, int] = defaultdict(int)
         self.enrichment_tracking: defaultdict[str, dict[str, int]] = defaultdict(dict)
 
-    def analyze_paper(self, paper_data: dict[str, Any], paper_id: str) -> dict[str, Any]:
-        """Analyze a single paper for completeness."""
+    CRITICAL_FIELDS = ("title", "doi", "year", "authors", "abstract", "sections")
+    ENRICHMENT_FIELDS = (
+        "journal",
+        "publisher",
+        "keywords",
+        "references",
+        "cited_by_count",
+        "issn",
+        "volume",
+        "issue",
+        "pages",
+        "funders",
+        "licenses",
+        "oa_status",
+        "topics",
+        "mesh_terms",
+        "arxiv_id",
+        "pmid",
+        "semantic_scholar_id",
+        "openalex_id",
+    )
+
+    def analyze_paper(self, papers: StageTable, i: int) -> dict[str, Any]:
+        """Analyze row ``i`` of a stage table for completeness."""
+        critical = papers.flags(i, self.CRITICAL_FIELDS)
+        enrichment = papers.flags(i, self.ENRICHMENT_FIELDS)
         analysis: dict[str, Any] = {
-            "paper_id": paper_id,
-            "critical_fields": {},
-            "enrichment_fields": {},
-            "missing_critical": [],
-            "missing_enrichment": [],
+            "paper_id": papers.paper_ids[i],
+            "critical_fields": dict(zip(self.CRITICAL_FIELDS, critical, strict=True)),
+            "enrichment_fields": dict(zip(self.ENRICHMENT_FIELDS, enrichment, strict=True)),
+            "missing_critical": [f for f, has in zip(self.CRITICAL_FIELDS, critical, strict=True) if not has],
+            "missing_enrichment": [
+                f for f, has in zip(self.ENRICHMENT_FIELDS, enrichment, strict=True) if not has
+            ],
             "data_quality_issues": [],
         }
 
-        # Critical fields (must have)
-        critical_fields = ["title", "doi", "year", "authors", "abstract", "sections"]
-        for field in critical_fields:
-            has_field = bool(paper_data.get(field))
-            analysis["critical_fields"][field] = has_field
-            if not has_field:
-                analysis["missing_critical"].append(field)
-                self.missing_fields[field].append(paper_id)
-            else:
-                self.field_coverage[field] += 1
-
-        # Enrichment fields (nice to have)
-        enrichment_fields = [
-            "journal",
-            "publisher",
-            "keywords",
-            "references",
-            "cited_by_count",
-            "issn",
-            "volume",
-            "issue",
-            "pages",
-            "funders",
-            "licenses",
-            "oa_status",
-            "topics",
-            "mesh_terms",
-            "arxiv_id",
-            "pmid",
-            "semantic_scholar_id",
-            "openalex_id",
-        ]
-        for field in enrichment_fields:
-            has_field = bool(paper_data.get(field))
-            analysis["enrichment_fields"][field] = has_field
-            if not has_field:
-                analysis["missing_enrichment"].append(field)
-            else:
-                self.field_coverage[field] += 1
-
         # Check data quality issues
         # 1. Empty or very short content
-        if paper_data.get("abstract") and len(paper_data["abstract"]) < config.MIN_ABSTRACT_LENGTH:
+        if papers.has("abstract")[i] and papers.count("abstract_length")[i] < config.MIN_ABSTRACT_LENGTH:
             analysis["data_quality_issues"].append("Very short abstract (<config.MIN_ABSTRACT_LENGTH chars)")
 
-        sections = paper_data.get("sections", [])
-        if sections:
-            total_text = sum(len(s.get("text", "")) for s in sections)
+        if papers.has("sections")[i]:
+            total_text = int(papers.count("section_text_chars")[i])
             if total_text < config.MIN_FULL_TEXT_LENGTH_THRESHOLD:
                 analysis["data_quality_issues"].append(f"Very short full text ({total_text} chars)")
         else:
             analysis["data_quality_issues"].append("No sections/full text")
 
         # 2. Malformed DOI
-        doi = paper_data.get("doi", "")
-        if doi and not re.match(r"^10\.\d{4,}/.+", doi):
+        doi = papers.values["doi"][i]
+        if doi and not (isinstance(doi, str) and VALID_DOI_PATTERN.match(doi)):
             analysis["data_quality_issues"].append(f"Malformed DOI: {doi}")
 
         # 3. Invalid year
-        year = paper_data.get("year")
+        year = papers.values["year"][i]
         if year:
             try:
                 year_int = int(year)
@@ -101,61 +93,53 @@ class PipelineCompletenessAnalyzer:
             except (ValueError, TypeError):
                 analysis["data_quality_issues"].append(f"Non-numeric year: {year}")
 
-        # 4. Check enrichment status
-        if "crossref_enrichment" in paper_data:
-            status = paper_data["crossref_enrichment"].get("status", "unknown")
-            self.enrichment_tracking["crossref"][status] = (
-                self.enrichment_tracking["crossref"].get(status, 0) + 1
-            )
-
-        if "s2_enrichment" in paper_data:
-            self.enrichment_tracking["s2"]["enriched"] = self.enrichment_tracking["s2"].get("enriched", 0) + 1
-
-        if "openalex_enrichment" in paper_data:
-            self.enrichment_tracking["openalex"]["enriched"] = (
-                self.enrichment_tracking["openalex"].get("enriched", 0) + 1
-            )
-
-        if "unpaywall_enrichment" in paper_data:
-            self.enrichment_tracking["unpaywall"]["enriched"] = (
-                self.enrichment_tracking["unpaywall"].get("enriched", 0) + 1
-            )
-
         return analysis
 
     def analyze_directory(self, directory: Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
         """Analyze all papers in a directory."""
-        json_files = [
-            f for f in directory.glob("*.json") if "report" not in f.name and not f.name.startswith(".")
-        ]
+        table = StageTable.scan(directory).exclude_names("report", hidden=True)
+
+        print(f"Analyzing {len(table)} papers from {directory.name}...")
+
+        for row in np.flatnonzero(~table.parsed):
+            self.stats["failed_to_parse"]["count"] += 1
+            self.failure_patterns[f"Parse error: {table.parse_errors[row]}"].append(table.paper_ids[row])
+        papers = table.take(table.parsed)
+
+        # Field coverage and missing critical fields are column queries
+        for field in self.CRITICAL_FIELDS + self.ENRICHMENT_FIELDS:
+            count = int(papers.has(field).sum())
+            if count:
+                self.field_coverage[field] = count
+        for field in self.CRITICAL_FIELDS:
+            missing_ids = papers.ids(~papers.has(field))
+            if missing_ids:
+                self.missing_fields[field] = missing_ids
+
+        # Enrichment status
+        crossref = papers.has_key("crossref_enrichment")
+        for status in [papers.crossref_status[row] for row in np.flatnonzero(crossref)]:
+            self.enrichment_tracking["crossref"][status] = (
+                self.enrichment_tracking["crossref"].get(status, 0) + 1
+            )
+        for api in ("s2", "openalex", "unpaywall"):
+            enriched = int(papers.has_key(f"{api}_enrichment").sum())
+            if enriched:
+                self.enrichment_tracking[api]["enriched"] = enriched
 
         all_analyses = []
+        for i in range(len(papers)):
+            analysis = self.analyze_paper(papers, i)
+            all_analyses.append(analysis)
 
-        print(f"Analyzing {len(json_files)} papers from {directory.name}...")
-
-        for i, json_file in enumerate(json_files):
-            if (i + 1) % config.LARGE_BATCH_SIZE == 0:
-                print(f"  Processed {i + 1}/{len(json_files)} papers...")
-
-            try:
-                with open(json_file, encoding="utf-8") as f:
-                    paper_data = json.load(f)
-
-                analysis = self.analyze_paper(paper_data, json_file.stem)
-                all_analyses.append(analysis)
-
-                # Track overall stats
-                if analysis["missing_critical"]:
-                    self.stats["papers_with_missing_critical"]["count"] += 1
-
-                if analysis["data_quality_issues"]:
-                    self.stats["papers_with_quality_issues"]["count"] += 1
-                    for issue in analysis["data_quality_issues"]:
-                        self.failure_patterns[issue].append(json_file.stem)
+            # Track overall stats
+            if analysis["missing_critical"]:
+                self.stats["papers_with_missing_critical"]["count"] += 1
 
-            except Exception as e:
-                self.stats["failed_to_parse"]["count"] += 1
-                self.failure_patterns[f"Parse error: {e!s}"].append(json_file.stem)
+            if analysis["data_quality_issues"]:
+                self.stats["papers_with_quality_issues"]["count"] += 1
+                for issue in analysis["data_quality_issues"]:
+                    self.failure_patterns[issue].append(analysis["paper_id"])
 
         return self.stats, all_analyses
 
@@ -175,8 +159,7 @@ class PipelineCompletenessAnalyzer:
         # Critical fields coverage
         report.append("CRITICAL FIELDS COVERAGE")
         report.append("-" * 40)
-        critical_fields = ["title", "doi", "year", "authors", "abstract", "sections"]
-        for field in critical_fields:
+        for field in self.CRITICAL_FIELDS:
             count = self.field_coverage.get(field, 0)
             percentage = (count / total_papers * config.MIN_CONTENT_LENGTH) if total_papers > 0 else 0
             missing = total_papers - count
@@ -302,6 +285,40 @@ class PipelineCompletenessAnalyzer:
         return "\n".join(report)
 
 
+def coverage_report(directory: Path) -> str:
+    """Summarize field coverage from the stage's coverage index without reading papers."""
+    index = CoverageIndex.for_stage(directory)
+    total_papers = len(index)
+    counts = index.coverage()
+
+    def line(label: str, count: int) -> str:
+        percentage = count / total_papers * 100 if total_papers else 0
+        return f"{label:30s}: {count:5d}/{total_papers} ({percentage:6.2f}%)"
+
+    report = ["=" * 80, "PIPELINE COVERAGE (from coverage index)", "=" * 80]
+    report += [f"Directory: {directory}", f"Total papers: {total_papers}", ""]
+
+    report += ["CRITICAL FIELDS COVERAGE", "-" * 40]
+    report += [line(field, counts[field]) for field in PipelineCompletenessAnalyzer.CRITICAL_FIELDS]
+    report.append(line("all critical fields", index.count(*PipelineCompletenessAnalyzer.CRITICAL_FIELDS)))
+    report += ["", "ENRICHMENT FIELDS COVERAGE", "-" * 40]
+    report += [line(field, counts[field]) for field in PipelineCompletenessAnalyzer.ENRICHMENT_FIELDS]
+    report += ["", "API ENRICHMENT STATUS", "-" * 40]
+    report += [
+        line(api, counts[f"key:{api}_enrichment"]) for api in ("crossref", "s2", "openalex", "unpaywall")
+    ]
+
+    report += ["", "DATA QUALITY ISSUES", "-" * 40]
+    report.append(line("Very short abstract", counts["short_abstract"]))
+    report.append(line("Very short full text", index.count("sections", missing=("full_text",))))
+    report.append(line("No sections/full text", index.count(missing=("sections",))))
+    report.append(line("Malformed DOI", index.count("doi", missing=("valid_doi",))))
+    report.append(line("Invalid or non-numeric year", index.count("year", missing=("valid_year",))))
+    report.append(line("No title and no DOI", index.count(missing=("title", "doi"))))
+
+    return "\n".join(report)
+
+
 def compare_pipelines() -> list[tuple[str, dict[str, Any], list[dict[str, Any]]]]:
     """Compare original vs fixed pipeline results."""
     pipelines = [
@@ -339,4 +356,18 @@ def compare_pipelines() -> list[tuple[str, dict[str, Any], list[dict[str, Any]]]
 
 
 if __name__ == "__main__":
-    compare_pipelines()
+    parser = argparse.ArgumentParser(description="Analyze pipeline output completeness")
+    parser.add_argument(
+        "--quick",
+        nargs="+",
+        metavar="STAGE_DIR",
+        help="Report coverage for these stage directories from their coverage indexes only",
+    )
+    args = parser.parse_args()
+
+    if args.quick:
+        for stage_dir in args.quick:
+            print(coverage_report(Path(stage_dir)))
+            print()
+    else:
+        compare_pipelines()
@@ -6,45 +6,29 @@ Compares metrics across all stages: TEI extraction, Zotero recovery, CrossRef en
 
 from src import config
 
-import json
-from pathlib import Path
 from datetime import datetime, UTC
-from collections import defaultdict
 from typing import Any
 
+from src.stage_table import StageTable
 
-def load_json_files(directory: str) -> dict[str, Any]:
-    """Load all JSON files from a directory."""
-    papers: dict[str, Any] = {}
-    dir_path = Path(directory)
 
-    if not dir_path.exists():
-        return papers
+def load_stage(directory: str) -> StageTable:
+    """Load the stage table for a directory (empty if the directory is missing)."""
+    return StageTable.scan(directory)
 
-    for json_file in dir_path.glob("*.json"):
-        with open(json_file, encoding="utf-8") as f:
-            papers[json_file.stem] = json.load(f)
 
-    return papers
-
-
-def calculate_field_coverage(papers: dict[str, Any], field_name: str) -> tuple[float, int]:
+def calculate_field_coverage(papers: StageTable, field_name: str) -> tuple[float, int]:
     """Calculate coverage percentage for a specific field."""
-    total = len(papers)
-    if total == 0:
-        return 0.0, 0
-
-    count = sum(1 for p in papers.values() if p.get(field_name))
-    return (count / total) * 100, count
+    return papers.coverage(field_name)
 
 
-def analyze_stage(papers: dict[str, Any], stage_name: str) -> dict[str, dict[str, Any]]:
+def analyze_stage(papers: StageTable, stage_name: str) -> dict[str, dict[str, Any]]:
     """Analyze a single stage of the pipeline."""
     print(f"\n{'=' * 60}")
     print(f"{stage_name}")
     print(f"{'=' * 60}")
 
-    if not papers:
+    if not len(papers):
         print("No data available for this stage")
         return {}
 
@@ -64,30 +48,21 @@ def analyze_stage(papers: dict[str, Any], stage_name: str) -> dict[str, dict[str
     print("\nAdditional Metrics:")
 
     # Full text coverage
-    papers_with_sections = sum(1 for p in papers.values() if p.get("sections"))
+    papers_with_sections = int(papers.has("sections").sum())
     print(
         f"  Papers with sections: {papers_with_sections}/{len(papers)} ({papers_with_sections / len(papers) * 100:.1f}%)"
     )
 
     # Reference coverage
-    papers_with_refs = sum(1 for p in papers.values() if p.get("references") or p.get("cited_references"))
+    papers_with_refs = int((papers.has("references") | papers.has("cited_references")).sum())
     print(
         f"  Papers with references: {papers_with_refs}/{len(papers)} ({papers_with_refs / len(papers) * 100:.1f}%)"
     )
 
     # Missing critical metadata
-    missing_multiple = 0
-    missing_details: dict[str, list[str]] = defaultdict(list)
-
-    for paper_id, paper in papers.items():
-        missing = []
-        for field in critical_fields:
-            if not paper.get(field):
-                missing.append(field)
-                missing_details[field].append(paper_id)
-
-        if len(missing) >= config.MIN_MATCH_COUNT:
-            missing_multiple += 1
+    missing_counts = (~papers.filled_columns(critical_fields)).sum(axis=1)
+    missing_multiple = int((missing_counts >= config.MIN_MATCH_COUNT).sum())
+    missing_details = {field: papers.ids(~papers.has(field)) for field in critical_fields}
 
     print(f"\nPapers missing 2+ critical fields: {missing_multiple}")
 
@@ -162,16 +137,16 @@ def main() -> None:
     print(f"Analysis Date: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')}")
 
     # Stage 1: TEI Extraction
-    tei_papers = load_json_files("comprehensive_extraction_20250831_225926")
+    tei_papers = load_stage("comprehensive_extraction_20250831_225926")
     tei_coverage = analyze_stage(tei_papers, "STAGE 1: TEI EXTRACTION")
 
     # Stage 2: Zotero Recovery
-    zotero_papers = load_json_files("zotero_recovered_20250901")
+    zotero_papers = load_stage("zotero_recovered_20250901")
     zotero_coverage = analyze_stage(zotero_papers, "STAGE 2: ZOTERO RECOVERY")
 
     # Stage 3: CrossRef Enrichment (if available)
-    crossref_papers = load_json_files("crossref_batch_20250901")
-    if crossref_papers:
+    crossref_papers = load_stage("crossref_batch_20250901")
+    if len(crossref_papers):
         crossref_coverage = analyze_stage(crossref_papers, "STAGE 3: CROSSREF ENRICHMENT")
     else:
         print("\n" + "=" * 60)
@@ -193,41 +168,31 @@ def main() -> None:
     print("FINAL STATISTICS")
     print("=" * 60)
 
-    final_papers = crossref_papers if crossref_papers else zotero_papers
+    final_papers = crossref_papers if len(crossref_papers) else zotero_papers
+
+    if len(final_papers):
+        total = len(final_papers)
+        has_refs = final_papers.has("references") | final_papers.has("cited_references")
 
-    if final_papers:
         # Papers with complete metadata
-        complete = sum(
-            1
-            for p in final_papers.values()
-            if all(p.get(f) for f in ["title", "doi", "year", "authors", "journal"])
+        complete = int(
+            final_papers.filled_columns(["title", "doi", "year", "authors", "journal"]).all(axis=1).sum()
         )
 
-        print(
-            f"Papers with complete metadata: {complete}/{len(final_papers)} ({complete / len(final_papers) * 100:.1f}%)"
-        )
+        print(f"Papers with complete metadata: {complete}/{total} ({complete / total * 100:.1f}%)")
 
         # Papers with full text and references
-        full_papers = sum(
-            1
-            for p in final_papers.values()
-            if p.get("sections") and (p.get("references") or p.get("cited_references"))
-        )
+        full_papers = int((final_papers.has("sections") & has_refs).sum())
 
-        print(
-            f"Papers with full text + references: {full_papers}/{len(final_papers)} ({full_papers / len(final_papers) * 100:.1f}%)"
-        )
+        print(f"Papers with full text + references: {full_papers}/{total} ({full_papers / total * 100:.1f}%)")
 
         # Total text extracted
-        total_chars = sum(len(str(p.get("sections", ""))) for p in final_papers.values())
+        total_chars = int(final_papers.count("section_text_chars").sum())
         print(f"Total text extracted: {total_chars / 1_000_000:.1f}M characters")
 
         # Average references per paper
-        ref_counts = [
-            len(p.get("references", [])) + len(p.get("cited_references", [])) for p in final_papers.values()
-        ]
-        avg_refs = sum(ref_counts) / len(ref_counts) if ref_counts else 0
-        print(f"Average references per paper: {avg_refs:.1f}")
+        ref_counts = final_papers.count("num_references") + final_papers.count("num_cited_references")
+        print(f"Average references per paper: {ref_counts.mean():.1f}")
 
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ Usage:
 """
 
 from src import config
+from src.stage_table import StageTable
 import json
 import argparse
 from pathlib import Path
@@ -45,41 +46,34 @@ class ProblematicPaperAnalyzer:
             "by_category": defaultdict(int),
         }
 
-    def analyze_paper(self, json_file: Path) -> tuple[str, dict[str, Any]]:
-        """Analyze a single paper for quality issues.
+    def analyze_paper(self, papers: StageTable, i: int) -> tuple[str, dict[str, Any]]:
+        """Analyze row ``i`` of the stage table for quality issues.
 
         Returns:
             Tuple of (category, detailed_info)
             category: 'ok' if good, else problem category
         """
-        try:
-            with open(json_file) as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        paper_id = papers.paper_ids[i]
+        file_size = int(papers.count("file_size")[i])
+        if papers.parse_errors[i]:
             return "corrupted_data", {
-                "paper_id": json_file.stem,
-                "error": f"JSON decode error: {e!s}",
-                "file_size": json_file.stat().st_size,
+                "paper_id": paper_id,
+                "error": papers.parse_errors[i],
+                "file_size": file_size,
             }
 
-        paper_id = json_file.stem
-
         # Basic metadata extraction
-        title = data.get("title", "").strip()
-        doi = data.get("doi", "").strip()
-        abstract = data.get("abstract", "").strip()
-        authors = data.get("authors", [])
-        year = data.get("year", "")
-        journal = data.get("journal", "").strip()
-        sections = data.get("sections", [])
-        references = data.get("references", [])
-
-        # Calculate text metrics
-        total_text = sum(len(s.get("text", "")) for s in sections if isinstance(s, dict) and s.get("text"))
-
-        abstract_length = len(abstract)
-        num_sections = len([s for s in sections if isinstance(s, dict) and s.get("text")])
-        num_references = len(references) if isinstance(references, list) else 0
+        title = papers.text("title", i)
+        doi = papers.text("doi", i)
+        journal = papers.text("journal", i)
+        year = papers.values["year"][i] or ""
+        has_sections = bool(papers.has("sections")[i])
+
+        # Text metrics
+        total_text = int(papers.count("section_text_chars")[i])
+        abstract_length = int(papers.count("abstract_length")[i])
+        num_sections = int(papers.count("num_text_sections")[i])
+        num_references = int(papers.count("num_references")[i])
 
         paper_info = {
             "paper_id": paper_id,
@@ -87,20 +81,20 @@ class ProblematicPaperAnalyzer:
             "title_length": len(title),
             "doi": doi,
             "abstract_length": abstract_length,
-            "authors_count": len(authors) if isinstance(authors, list) else 0,
+            "authors_count": int(papers.count("num_authors")[i]),
             "year": str(year),
             "journal": journal[:50] if journal else "[NO JOURNAL]",
             "num_sections": num_sections,
             "total_text_chars": total_text,
             "num_references": num_references,
-            "file_size": json_file.stat().st_size,
-            "has_sections": bool(sections),
-            "section_types": [s.get("type", "unknown") for s in sections[:5] if isinstance(s, dict)],
+            "file_size": file_size,
+            "has_sections": has_sections,
+            "section_types": papers.section_types[i],
         }
 
         # Determine paper category based on issues
         category = self._categorize_paper(
-            title, doi, abstract_length, total_text, num_sections, num_references, year, sections
+            title, doi, abstract_length, total_text, num_sections, num_references, year, has_sections
         )
 
         # Add quality issues if applicable
@@ -120,12 +114,12 @@ class ProblematicPaperAnalyzer:
         num_sections: int,
         num_references: int,
         year: str,
-        sections: list[dict[str, Any]],
+        has_sections: bool,
     ) -> str:
         """Categorize paper based on various checks."""
         # Check for GROBID failures - papers that couldn't be extracted at all
         if (
-            not sections
+            not has_sections
             or (num_sections == 0 and total_text < config.MIN_CONTENT_LENGTH)
             or (
                 total_text < config.LARGE_BATCH_SIZE
@@ -242,19 +236,17 @@ class ProblematicPaperAnalyzer:
 
     def analyze_all_papers(self) -> None:
         """Analyze all papers in the data directory."""
-        json_files = [
-            f
-            for f in self.data_dir.glob("*.json")
-            if not any(keyword in f.name.lower() for keyword in ["report", "summary", "log", "excluded"])
-        ]
+        papers = StageTable.scan(self.data_dir).exclude_names(
+            "report", "summary", "log", "excluded", ignore_case=True
+        )
 
-        self.stats["total_papers"] = len(json_files)
+        self.stats["total_papers"] = len(papers)
 
-        print(f"Analyzing {len(json_files)} papers for quality issues...")
+        print(f"Analyzing {len(papers)} papers for quality issues...")
         print("=" * 70)
 
-        for json_file in json_files:
-            category, paper_info = self.analyze_paper(json_file)
+        for i in range(len(papers)):
+            category, paper_info = self.analyze_paper(papers, i)
 
             if category != "ok":
                 self.problems[category].append(paper_info)
@@ -35,6 +35,12 @@ from src.config import (
     ARXIV_TITLE_MATCH_THRESHOLD,
     HTTP_NOT_FOUND,
 )
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus
+from src.response_cache import ResponseCache
+from src.title_index import title_similarity
+
+RAW_ENTRY_KEY = "raw_entry"  # Result key carrying the entry XML until it is cached
 
 
 def create_session() -> requests.Session:
@@ -115,27 +121,17 @@ def extract_last_name(author: str) -> str | None:
 
 
 def find_best_match(entries: list[ET.Element], title: str, authors: list[str] | None) -> ET.Element | None:
-    """Find best matching entry from search results using Jaccard similarity."""
+    """Find best matching entry from search results using title shingle similarity."""
     best_entry = None
     best_score = 0.0
 
-    title_lower = title.lower()
-    title_words = set(title_lower.split())
-
     for entry in entries:
         # Get entry title
         entry_title = entry.findtext("{http://www.w3.org/2005/Atom}title", "")
         entry_title = re.sub(r"\s+", " ", entry_title).strip()
-        entry_title_lower = entry_title.lower()
-        entry_words = set(entry_title_lower.split())
 
-        # Calculate title similarity (Jaccard index)
-        if title_words and entry_words:
-            intersection = len(title_words & entry_words)
-            union = len(title_words | entry_words)
-            title_score = intersection / union if union > 0 else 0
-        else:
-            title_score = 0
+        # Calculate title similarity (shared shingle Jaccard)
+        title_score = title_similarity(title, entry_title)
 
         # Boost score if authors match
         author_boost = 0.0
@@ -258,6 +254,13 @@ def parse_arxiv_entry(entry: ET.Element) -> dict[str, Any]:
     return enriched
 
 
+def parse_entry_with_raw(entry: ET.Element) -> dict[str, Any]:
+    """Parse an entry and keep its XML under RAW_ENTRY_KEY for offline re-derivation."""
+    result = parse_arxiv_entry(entry)
+    result[RAW_ENTRY_KEY] = ET.tostring(entry, encoding="unicode")
+    return result
+
+
 def search_by_title_author(
     session: requests.Session,
     title: str,
@@ -321,7 +324,7 @@ def search_by_title_author(
         best_match = find_best_match(entries, clean_title_str, authors)
 
         if best_match is not None:
-            result = parse_arxiv_entry(best_match)
+            result = parse_entry_with_raw(best_match)
             stats["enriched"] += 1
 
             # Track domain distribution
@@ -387,7 +390,7 @@ def search_by_arxiv_ids_batch(
         entries = root.findall("{http://www.w3.org/2005/Atom}entry")
 
         for entry in entries:
-            result = parse_arxiv_entry(entry)
+            result = parse_entry_with_raw(entry)
             if result and result.get("arxiv_id"):
                 # Map back to original ID format
                 clean_id = result["arxiv_id"]
@@ -449,7 +452,7 @@ def search_by_arxiv_id(
         entry = root.find("{http://www.w3.org/2005/Atom}entry")
 
         if entry is not None:
-            result = parse_arxiv_entry(entry)
+            result = parse_entry_with_raw(entry)
             stats["enriched"] += 1
 
             # Track domains
@@ -635,6 +638,8 @@ def main() -> None:
 
     # Create output directory
     output_path.mkdir(parents=True, exist_ok=True)
+    status = PaperStatus.open("arxiv", output_path)
+    response_cache = ResponseCache("arxiv", output_path)
 
     # Reset checkpoint if requested
     if args.reset and checkpoint_file.exists():
@@ -675,6 +680,7 @@ def main() -> None:
     # Prepare papers for enrichment
     papers_to_process: list[dict[str, Any]] = []
     papers_by_id = {}
+    rederived_count = 0
 
     for paper_file in paper_files:
         # Skip report and checkpoint files
@@ -683,9 +689,12 @@ def main() -> None:
 
         paper_id = paper_file.stem
 
-        # Skip if already processed
-        if paper_id in processed_papers:
+        # Skip if already processed; outdated versions override the checkpoint and the checked markers
+        reason = status.needs(paper_id)
+        outdated = reason in ("stale", "rederive")
+        if paper_id in processed_papers and not outdated:
             continue
+        processed_papers.discard(paper_id)
 
         # Apply max papers limit if specified
         if args.max_papers and len(papers_to_process) >= args.max_papers:
@@ -694,15 +703,25 @@ def main() -> None:
         with open(paper_file) as f:
             paper = json.load(f)
 
+            # Re-derive from the cached entry if parse_arxiv_entry changed since it was fetched
+            if reason == "rederive":
+                raw_entry = response_cache.get(paper_id)
+                if raw_entry is not None:
+                    all_results[paper_id] = parse_entry_with_raw(ElementTree.fromstring(raw_entry))
+                    papers_by_id[paper_id] = paper
+                    processed_papers.add(paper_id)
+                    rederived_count += 1
+                    continue
+
             # Skip if already checked in a previous run (either found or not found)
-            if paper.get("arxiv_checked"):
+            if not outdated and paper.get("arxiv_checked"):
                 # Still need to keep it for final output
                 papers_by_id[paper_id] = paper
                 processed_papers.add(paper_id)
                 continue
 
             # Skip if already has arXiv enrichment data
-            if paper.get("arxiv_url") or paper.get("arxiv_categories"):
+            if not outdated and (paper.get("arxiv_url") or paper.get("arxiv_categories")):
                 papers_by_id[paper_id] = paper
                 processed_papers.add(paper_id)
                 continue
@@ -737,8 +756,10 @@ def main() -> None:
                 papers_by_id[paper_id] = json.load(f)
 
     print(f"Papers to process: {len(papers_to_process)}")
+    if rederived_count:
+        print(f"Re-derived from cached entries: {rederived_count}")
 
-    if not papers_to_process:
+    if not papers_to_process and not rederived_count:
         print("\nAll papers already processed!")
         if papers_by_id:
             elapsed_time = checkpoint_data.get("elapsed_time", 0)
@@ -863,9 +884,14 @@ def main() -> None:
 
     # Save enriched papers
     print("\nSaving enriched papers...")
+    coverage = CoverageIndex.open(output_path, checkpoint_file)
     for paper_id, original_paper in papers_by_id.items():
+        cached = False
         if paper_id in all_results:
             enrichment = all_results[paper_id]
+            raw_entry = enrichment.pop(RAW_ENTRY_KEY, None)
+            if raw_entry is not None:
+                cached = response_cache.put(paper_id, raw_entry)
 
             # Check if this is a "checked but not found" marker
             if enrichment.get("checked") and not enrichment.get("found"):
@@ -887,6 +913,15 @@ def main() -> None:
         output_file = output_path / f"{paper_id}.json"
         with open(output_file, "w") as f:
             json.dump(original_paper, f, indent=2)
+        coverage.record(paper_id, original_paper)
+        if paper_id in all_results or paper_id not in status.papers:
+            status.record(
+                paper_id,
+                success=bool(original_paper.get("arxiv_url") or original_paper.get("arxiv_categories")),
+                cached=cached,
+            )
+    coverage.save()
+    status.save()
 
     elapsed_time = time.time() - start_time
 
@@ -897,6 +932,7 @@ def main() -> None:
     if checkpoint_file.exists():
         checkpoint_file.unlink()
         print("Checkpoint removed after successful completion")
+    coverage.finish(dict(stats))
 
     # Analyze results
     if stats.get("enriched", 0) > 0:
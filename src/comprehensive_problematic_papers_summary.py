@@ -16,12 +16,31 @@ Total papers removed: 73 problematic papers out of 2,221 original PDFs
 """
 
 from src import config
+from src.coverage_index import CoverageIndex
+import argparse
 import json
 from pathlib import Path
 from datetime import datetime, UTC
 import sys
 from typing import Any
 
+# Exclusion criteria as coverage-index queries: (required fields, missing fields)
+EXCLUSION_QUERIES: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "abstract_only": (("abstract",), ("sections",)),
+    "no_content": ((), ("abstract", "sections")),
+    "insufficient_text": (("sections",), ("full_text",)),
+    "no_doi_or_title": ((), ("doi", "title")),
+}
+
+
+def current_exclusions(kb_dir: Path) -> dict[str, list[str]]:
+    """Paper IDs in a stage directory that still match each exclusion criterion."""
+    index = CoverageIndex.for_stage(kb_dir)
+    return {
+        name: index.ids(index.mask(*fields, missing=missing))
+        for name, (fields, missing) in EXCLUSION_QUERIES.items()
+    }
+
 
 class ComprehensiveProblematicPapersSummary:
     """Comprehensive summary of all problematic papers from V5 pipeline."""
@@ -429,6 +448,14 @@ class ComprehensiveProblematicPapersSummary:
 
 def main() -> int:
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Summarize problematic papers removed by the V5 pipeline")
+    parser.add_argument(
+        "--kb-dir",
+        type=Path,
+        help="Also check a stage directory for papers still matching the exclusion criteria",
+    )
+    args = parser.parse_args()
+
     print("=" * 70)
     print("COMPREHENSIVE PROBLEMATIC PAPERS SUMMARY")
     print("=" * 70)
@@ -452,6 +479,13 @@ def main() -> int:
         print("   The current knowledge base is clean and production-ready.")
         print("   All problematic papers were already systematically identified")
         print("   and removed during the comprehensive V5 extraction pipeline.")
+
+        if args.kb_dir:
+            print(f"\n🔎 LIVE CHECK: {args.kb_dir}")
+            for name, paper_ids in current_exclusions(args.kb_dir).items():
+                shown = paper_ids[: config.MAX_DISPLAY_EXAMPLES]
+                preview = ", ".join(shown) + (" ..." if len(paper_ids) > len(shown) else "")
+                print(f"  {name}: {len(paper_ids)}" + (f" ({preview})" if paper_ids else ""))
         return 0
 
     except Exception as e:
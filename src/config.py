@@ -31,6 +31,8 @@ KB_VERSION = "4.0"  # Knowledge base format version (increment on breaking chang
 EMBEDDING_MODEL = "sentence-transformers/multi-qa-mpnet-base-dot-v1"
 EMBEDDING_DIMENSIONS = 768  # Multi-QA MPNet also produces 768-dimensional vectors
 EMBEDDING_BATCH_SIZE = 64  # Default batch size for embedding generation
+EMBEDDING_STORAGE_DTYPE = "float16"  # On-disk embedding precision ("float16" halves size, or "float32")
+EMBEDDING_COMPACT_RATIO = 0.5  # Rewrite the matrix when superseded rows exceed this share of live rows
 
 # Batch size ranges based on available hardware resources
 # Larger batches = faster processing but more memory usage
@@ -42,6 +44,38 @@ BATCH_SIZE_CPU_MEDIUM = 128  # System with 8-16GB RAM
 BATCH_SIZE_CPU_LOW = 64  # System with <8GB RAM
 BATCH_SIZE_FALLBACK = 128  # Used when hardware detection fails
 
+# Embedding autotuner: a short calibration run measures throughput on this machine
+# and replaces the tiers above and the TIME_PER_PAPER_* estimates once it has run
+AUTOTUNE_BATCH_SIZES = (16, 32, 64, 128, 256)  # Candidate batch sizes
+AUTOTUNE_SAMPLE_SIZE = 256  # Papers encoded per candidate configuration
+
+# Multi-process CPU embedding: one model per worker process, each pinned to a few threads
+EMBEDDING_WORKER_THREADS = 2  # Torch threads per worker (workers = physical cores / this)
+EMBEDDING_PREFETCH_BUCKETS = 2  # Length buckets in flight and tokenized ahead, per worker
+EMBEDDING_MIN_PARALLEL_TEXTS = 512  # Fewer texts are encoded in-process (worker startup dominates)
+
+# Inference backend: "torch" (fp32), "onnx" (ONNX Runtime, fp32) or "onnx-int8" (dynamic int8 quantization)
+# ONNX backends need `pip install .[onnx]` and an export (python -m src.embedding_backend --export onnx-int8)
+EMBEDDING_BACKEND = "torch"
+EMBEDDING_ONNX_QUANTIZATION = "avx2"  # Int8 kernel target: "avx2" runs anywhere, "avx512_vnni" is faster
+EMBEDDING_BACKEND_MIN_COSINE = 0.99  # Mean cosine to the fp32 query vectors an export must reach
+EMBEDDING_BACKEND_MIN_RECALL = 0.9  # Overlap with the fp32 top-k over the accuracy corpus
+EMBEDDING_ACCURACY_CORPUS_SIZE = 500  # Papers searched by the accuracy check
+EMBEDDING_ACCURACY_QUERIES = (  # Fixed query set, so accuracy reports are comparable across exports
+    "effect of telehealth on hospital readmissions",
+    "machine learning for sepsis prediction in intensive care",
+    "barriers to electronic health record adoption in primary care",
+    "randomized controlled trial of diabetes self-management education",
+    "cost-effectiveness of community health worker programs",
+    "natural language processing of clinical notes",
+    "nurse staffing levels and patient mortality",
+    "mobile health interventions for medication adherence",
+    "bias and fairness in clinical risk prediction models",
+    "interoperability standards for health information exchange",
+    "systematic review of depression screening in adolescents",
+    "deep learning for medical image segmentation",
+)
+
 # ============================================================================
 # SEARCH CONFIGURATION
 # ============================================================================
@@ -56,6 +90,26 @@ DEFAULT_MAX_TOKENS = 10000  # Token limit for LLM context (~40k characters)
 # Search result caching to improve performance
 SEARCH_CACHE_EXPIRY_DAYS = 7  # Cache expires after 7 days
 SEARCH_CACHE_MAX_SIZE = 100  # Maximum number of cached queries (LRU eviction)
+QUERY_EMBEDDING_CACHE_MAX_SIZE = 1000  # Cached query embeddings (a few KB each, reused across k/filters)
+
+# Vector index type chosen by corpus size (exhaustive -> graph -> inverted lists -> compressed)
+INDEX_FLAT_MAX_VECTORS = 10_000  # Exact search is fast enough below this
+INDEX_HNSW_MAX_VECTORS = 200_000  # HNSW graph while full vectors fit comfortably in memory
+INDEX_IVF_FLAT_MAX_VECTORS = 1_000_000  # Above this, IVF-PQ compresses vectors
+INDEX_IVF_NPROBE = 16  # Inverted lists scanned per query
+INDEX_IVF_MIN_POINTS_PER_LIST = 39  # FAISS needs this many training vectors per list
+INDEX_HNSW_M = 32  # Graph neighbours per node
+INDEX_HNSW_EF_CONSTRUCTION = 200  # Build-time search depth
+INDEX_HNSW_EF_SEARCH = 64  # Query-time search depth
+INDEX_PQ_SUBQUANTIZERS = 64  # 768 dimensions / 64 = 12 dimensions per code
+INDEX_PQ_BITS = 8  # Bits per sub-quantizer code
+INDEX_TOMBSTONE_REBUILD_RATIO = 0.2  # Rebuild HNSW once this share of its vectors is deleted
+INDEX_BENCHMARK_QUERIES = 200  # Sampled queries for the recall/latency benchmark
+INDEX_FILTER_EXACT_RATIO = 0.05  # Filters keeping at most this share of papers are searched exhaustively
+
+# Section-level retrieval: aggregated sections are split into separately embedded chunks
+SECTION_CHUNK_MAX_CHARS = 2000  # About 512 tokens, the embedding model's input limit
+SECTION_CHUNK_MIN_CHARS = 100  # Shorter sections carry too little text to retrieve on
 
 # ============================================================================
 # QUALITY SCORING CONFIGURATION
@@ -256,7 +310,8 @@ MIN_FULL_TEXT_LENGTH = 5000  # PDFs with less text are flagged as incomplete
 MIN_TEXT_FOR_CONCLUSION = 2000  # Minimum text needed to extract conclusion section
 
 # PDF processing settings
-PDF_TIMEOUT_SECONDS = 30  # Timeout for PDF text extraction (prevents hanging)
+PDF_TIMEOUT_SECONDS = 30  # Timeout for PDF text extraction (the worker is killed, prevents hanging)
+PDF_EXTRACTION_WORKERS = 0  # Extraction processes (0 = one per CPU core)
 
 # Section extraction configuration (PragmaticSectionExtractor)
 FUZZY_THRESHOLD = 75  # Minimum fuzzy match score (0-100) - balanced for typos without false positives
@@ -264,6 +319,8 @@ TIER1_EXIT_THRESHOLD = 5  # Exit Tier 1 if ≥5 sections found (typical paper st
 TIER2_EXIT_THRESHOLD = 4  # Exit Tier 2 if ≥4 sections found
 SECTION_EXTRACTION_TIMEOUT = 1.0  # Max time per paper (seconds)
 SECTION_EXTRACTION_N_WORKERS = 4  # Number of parallel workers for batch processing
+POST_PROCESSING_BATCH_SIZE = 50  # Papers per worker task in batch post-processing
+HEADER_CLASSIFIER_CACHE_SIZE = 50000  # Distinct section headers kept in memory (LRU)
 
 # Minimum section lengths - optimized for real papers
 MIN_SECTION_LENGTH = {
@@ -320,12 +377,23 @@ LONG_OPERATION_THRESHOLD = 300  # Prompt user if operation > 5 minutes (300s)
 KB_DATA_PATH = Path("kb_data")
 PAPERS_DIR = KB_DATA_PATH / "papers"
 INDEX_FILE = KB_DATA_PATH / "index.faiss"
+INDEX_IDS_FILE = KB_DATA_PATH / ".index_ids.npz"  # FAISS int64 ID -> paper_id, index type, deleted IDs
 METADATA_FILE = KB_DATA_PATH / "metadata.json"
-SECTIONS_INDEX_FILE = KB_DATA_PATH / "sections_index.json"
-SEARCH_CACHE_FILE = KB_DATA_PATH / ".search_cache.json"
-PDF_CACHE_FILE = KB_DATA_PATH / ".pdf_text_cache.json"
-EMBEDDING_CACHE_FILE = KB_DATA_PATH / ".embedding_cache.json"
-EMBEDDING_DATA_FILE = KB_DATA_PATH / ".embedding_data.npy"
+SECTIONS_INDEX_FILE = KB_DATA_PATH / "sections_index.faiss"  # One vector per section chunk
+SECTIONS_IDS_FILE = KB_DATA_PATH / ".sections_index_ids.npz"
+SECTIONS_METADATA_FILE = KB_DATA_PATH / ".sections_metadata.npy"  # Memory-mapped chunk -> paper/section table
+SECTION_EMBEDDING_DATA_FILE = KB_DATA_PATH / ".section_embedding_data.bin"
+SECTION_EMBEDDING_CACHE_FILE = KB_DATA_PATH / ".section_embedding_rows.bin"
+SEARCH_CACHE_FILE = KB_DATA_PATH / ".search_cache.npz"  # Query embeddings and ranked results, in LRU order
+FILTER_METADATA_FILE = KB_DATA_PATH / ".filter_metadata.npz"  # Year/quality/study type bitmaps by FAISS ID
+PDF_CACHE_DIR = KB_DATA_PATH / "pdf_text_cache"  # Extracted text per PDF SHA-256, sharded by hash prefix
+EMBEDDING_CACHE_FILE = KB_DATA_PATH / ".embedding_rows.bin"  # (paper_id, content hash) of each matrix row
+EMBEDDING_DATA_FILE = KB_DATA_PATH / ".embedding_data.bin"  # Append-only memory-mapped embedding matrix
+QUALITY_SCORE_CACHE_FILE = KB_DATA_PATH / ".quality_score_cache.json"  # Per-paper input fingerprints + scores
+HEADER_VOCABULARY_FILE = KB_DATA_PATH / ".header_vocabulary.json"  # Section header -> type memo
+EMBEDDING_TUNING_FILE = KB_DATA_PATH / ".embedding_tuning.json"  # Tuned batch size/threads per machine
+EMBEDDING_ONNX_PATH = KB_DATA_PATH / "onnx_models"  # Exported ONNX / int8 embedding models
+EMBEDDING_BACKEND_FILE = KB_DATA_PATH / ".embedding_backend.json"  # Accuracy reports of exported backends
 
 # ============================================================================
 # VALIDATION PATTERNS
@@ -514,6 +582,11 @@ ZOTERO_CHECKPOINT_INTERVAL = 100  # Save checkpoint every 100 Zotero files
 FAST_API_CHECKPOINT_INTERVAL = 500  # For CrossRef, S2, OpenAlex (fast APIs)
 MEDIUM_API_CHECKPOINT_INTERVAL = 200  # For Unpaywall, PubMed
 SLOW_API_CHECKPOINT_INTERVAL = 10  # For arXiv (rate-limited)
+STAGE_TABLE_FILENAME = ".stage_table"  # Columnar analytics table kept beside each stage's papers
+COVERAGE_INDEX_FILENAME = ".coverage_index"  # Per-field paper bitsets, updated as each stage writes papers
+STAGE_MANIFEST_FILENAME = ".stage_manifest"  # Paper count, ID hash and completion marker per stage
+PAPER_STATUS_DIRNAME = ".paper_status"  # Per-paper stage status table in the pipeline directory
+RESPONSE_CACHE_DIRNAME = ".api_responses"  # Raw API responses for offline re-derivation
 
 # API response codes
 HTTP_OK = 200  # HTTP 200 OK
@@ -669,7 +742,7 @@ GAP_ANALYSIS_ADAPTIVE_DELAY = 2.0  # Increased delay when rate limiting detected
 # ============================================================================
 ARXIV_MAX_TITLE_LENGTH = 250  # Maximum title length for arXiv search
 ARXIV_MIN_TITLE_LENGTH = 5  # Minimum title length for valid match
-ARXIV_TITLE_MATCH_THRESHOLD = 0.7  # Minimum title match score for acceptance
+ARXIV_TITLE_MATCH_THRESHOLD = 0.7  # Minimum title shingle Jaccard; the best title+author score wins
 
 # ============================================================================
 # CROSSREF ENRICHER CONFIGURATION
@@ -679,6 +752,7 @@ CROSSREF_MIN_TITLE_LENGTH = 20  # Minimum title length for similarity check
 # ============================================================================
 # OPENALEX ENRICHER CONFIGURATION
 # ============================================================================
+OPENALEX_BATCH_SIZE = 50  # DOIs per API call (one OR filter; a checkpoint batch spans several calls)
 OPENALEX_MIN_DOI_LENGTH = 7  # Minimum DOI length
 OPENALEX_MAX_DOI_LENGTH = 100  # Maximum DOI length
 
@@ -697,3 +771,26 @@ LOGGER_TIME_HOUR = 3600  # Seconds in an hour
 # ============================================================================
 UTILS_MIN_DOI_LENGTH = 7  # Minimum DOI length for validation
 UTILS_MAX_DOI_LENGTH = 200  # Maximum DOI length for validation
+
+# ============================================================================
+# TITLE INDEX CONFIGURATION
+# ============================================================================
+# Shared fuzzy title matching (src/title_index.py): character shingles + MinHash + LSH
+TITLE_SHINGLE_SIZE = 3  # Characters per shingle over the normalized title
+TITLE_MINHASH_PERMUTATIONS = 128  # MinHash signature length
+TITLE_LSH_BANDS = 32  # LSH bands (rows per band = permutations / bands, ~0.42 Jaccard cutoff)
+# Title thresholds are shingle Jaccard. They were re-calibrated on title pairs scored with both the
+# new metric and the word-overlap / SequenceMatcher scores they replaced: same-paper variants (case,
+# punctuation, hyphenation, British spelling, an added or dropped subtitle) mostly score 0.75-1.0,
+# while different papers that differ by one topic word score 0.55-0.8 (0.89 at most, e.g.
+# "older women" vs "older men").
+TITLE_MATCH_THRESHOLD = 0.8  # Default: copies metadata or a DOI (Zotero fallback, DOI recovery, snapshot)
+CROSSREF_TITLE_MATCH_THRESHOLD = 0.8  # The first search result above it is accepted, so kept strict
+CORE_TITLE_MATCH_THRESHOLD = 0.9  # Was 0.85 word Jaccard; 0.9 keeps CORE free of one-word mismatches
+
+# ============================================================================
+# METADATA SNAPSHOT CONFIGURATION
+# ============================================================================
+# Local CrossRef/OpenAlex snapshot (src/metadata_snapshot.py) for offline DOI and title resolution
+METADATA_SNAPSHOT_FILE = KB_DATA_PATH / "metadata_snapshot.sqlite"  # SQLite index built from a JSONL dump
+METADATA_SNAPSHOT_IMPORT_BATCH = 5000  # Rows per insert transaction during import
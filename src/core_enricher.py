@@ -24,6 +24,7 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from collections import defaultdict
+from src.title_index import titles_match
 
 # Set up module logger
 logger = logging.getLogger(__name__)
@@ -287,57 +288,20 @@ class COREEnricher:
 
         return clean if len(clean) > config.DEFAULT_TIMEOUT else None
 
-    def _fuzzy_title_match(self, title1: str, title2: str, threshold: float = 0.85) -> bool:
+    def _fuzzy_title_match(
+        self, title1: str, title2: str, threshold: float = config.CORE_TITLE_MATCH_THRESHOLD
+    ) -> bool:
         """Check if two titles are similar enough.
 
         Args:
-            title1: First title (lowercase)
-            title2: Second title (lowercase)
+            title1: First title
+            title2: Second title
             threshold: Similarity threshold (0-1)
 
         Returns:
             True if titles match
         """
-        # Simple approach: check word overlap
-        words1 = set(title1.split())
-        words2 = set(title2.split())
-
-        if not words1 or not words2:
-            return False
-
-        # Remove common words
-        stopwords = {
-            "the",
-            "a",
-            "an",
-            "of",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "and",
-            "or",
-            "but",
-            "with",
-            "by",
-            "from",
-            "as",
-            "is",
-            "was",
-        }
-        words1 = words1 - stopwords
-        words2 = words2 - stopwords
-
-        if not words1 or not words2:
-            return title1 == title2  # Fall back to exact match
-
-        # Calculate Jaccard similarity
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
-        similarity = intersection / union if union > 0 else 0
-
-        return similarity >= threshold
+        return titles_match(title1, title2, threshold)
 
     def _process_core_work(self, work: dict[str, Any]) -> dict[str, Any]:
         """Process CORE work into enriched metadata.
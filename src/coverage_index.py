@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Persistent per-stage field-coverage index kept as one bitset per field.
+
+Each stage output directory gets a small ``config.COVERAGE_INDEX_FILENAME`` file
+holding, for every tracked field, a bitset over paper ordinals (bit ``i`` set
+when the paper with ordinal ``i`` has the field). Enrichment stages call
+``record()`` as they write each paper and ``save()`` at checkpoints, so
+questions such as "how many papers have abstract, DOI and oa_status after
+stage 06?" are a few popcounts instead of a directory re-read. Every save also
+refreshes the stage manifest; ``finish()`` marks the stage complete.
+
+Tracked fields are the stage table's FLAG_FIELDS (truthy values), KEY_FIELDS
+(key present, stored as ``key:<field>``) and DERIVED_FIELDS (quality checks).
+
+Usage:
+    index = CoverageIndex.open(output_dir, checkpoint_file)
+    index.record(paper_id, paper)
+    index.save()
+    index.finish(stats)
+
+    CoverageIndex.for_stage(stage_dir).count("abstract", "doi", "oa_status")
+"""
+
+import re
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.pipeline_utils import load_checkpoint, save_checkpoint_atomic
+from src.stage_manifest import StageManifest, write_manifest
+from src.stage_table import FLAG_FIELDS, KEY_FIELDS, paper_row, scan_paper
+
+INDEX_VERSION = "1"
+
+VALID_DOI_PATTERN = re.compile(r"^10\.\d{4,}/.+")
+
+DERIVED_FIELDS = ("full_text", "short_abstract", "valid_doi", "valid_year")
+
+INDEX_FIELDS = FLAG_FIELDS + tuple(f"key:{field}" for field in KEY_FIELDS) + DERIVED_FIELDS
+
+
+def _valid_year(year: Any) -> bool:
+    try:
+        year_int = int(year)
+    except (ValueError, TypeError):
+        return False
+    return config.MIN_YEAR_VALID <= year_int <= datetime.now(UTC).year + 1
+
+
+def row_fields(row: dict[str, Any]) -> list[str]:
+    """Return the index fields set for a stage table row."""
+    fields = [field for field, filled in zip(FLAG_FIELDS, row["filled"], strict=True) if filled]
+    fields += [f"key:{field}" for field, present in zip(KEY_FIELDS, row["present"], strict=True) if present]
+
+    doi = row["values"]["doi"]
+    derived = {
+        "full_text": row["section_text_chars"] >= config.MIN_FULL_TEXT_LENGTH_THRESHOLD,
+        "short_abstract": 0 < row["abstract_length"] < config.MIN_ABSTRACT_LENGTH,
+        "valid_doi": isinstance(doi, str) and bool(VALID_DOI_PATTERN.match(doi)),
+        "valid_year": _valid_year(row["values"]["year"]),
+    }
+    return fields + [field for field, value in derived.items() if value]
+
+
+def _pack(column: bytearray) -> int:
+    """Pack a 0/1 byte column into an int bitset (bit ``i`` = ``column[i]``)."""
+    packed = np.packbits(np.frombuffer(column, dtype=np.uint8), bitorder="little")
+    return int.from_bytes(packed.tobytes(), "little")
+
+
+def _unpack(bitset: int, size: int) -> bytearray:
+    """Expand an int bitset into a 0/1 byte column of ``size`` entries."""
+    packed = np.frombuffer(bitset.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return bytearray(np.unpackbits(packed, count=size, bitorder="little").tobytes())
+
+
+class CoverageIndex:
+    """Bitset field coverage for the papers written to one stage directory.
+
+    Updates write one byte per field into per-field 0/1 columns; the columns
+    are packed into int bitsets only when queried or saved, so recording a
+    paper costs the same however many papers the stage already holds.
+    """
+
+    def __init__(self, path: Path, checkpoint_file: Path | None = None):
+        """Create an empty index stored at ``path``."""
+        self.path = path
+        self.checkpoint_file = checkpoint_file
+        self.paper_ids: list[str] = []
+        self.ordinals: dict[str, int] = {}
+        self.live_column = bytearray()
+        self.columns: dict[str, bytearray] = {field: bytearray() for field in INDEX_FIELDS}
+        self._packed: tuple[int, dict[str, int]] | None = None
+        self.dirty = False
+
+    @property
+    def live(self) -> int:
+        """Bitset of the papers currently in the stage."""
+        return self._pack()[0]
+
+    @property
+    def bits(self) -> dict[str, int]:
+        """Per-field bitsets of the papers having the field."""
+        return self._pack()[1]
+
+    def _pack(self) -> tuple[int, dict[str, int]]:
+        if self._packed is None:
+            self._packed = (
+                _pack(self.live_column),
+                {field: _pack(column) for field, column in self.columns.items()},
+            )
+        return self._packed
+
+    # ------------------------------------------------------------------
+    # Loading and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, stage_dir: Path, checkpoint_file: Path | None = None) -> "CoverageIndex | None":
+        """Read a stage's index, or None if it is missing or from another version."""
+        index = cls(Path(stage_dir) / config.COVERAGE_INDEX_FILENAME, checkpoint_file)
+        data = load_checkpoint(index.path)
+        if data.get("version") != INDEX_VERSION or data.get("fields") != list(INDEX_FIELDS):
+            return None
+
+        index.paper_ids = data["paper_ids"]
+        index.ordinals = {paper_id: i for i, paper_id in enumerate(index.paper_ids)}
+        size = len(index.paper_ids)
+        index.live_column = _unpack(int(data["live"], 16), size)
+        index.columns = {field: _unpack(int(value, 16), size) for field, value in data["bits"].items()}
+        return index
+
+    @classmethod
+    def open(cls, stage_dir: Path, checkpoint_file: Path | None = None) -> "CoverageIndex":
+        """Load a stage's index and reconcile it with the papers on disk.
+
+        Papers written without the index (older runs, or after a crash before
+        the last save) are parsed and added; deleted papers are dropped. Stages
+        call this once at startup, so only the file listing is read when the
+        index is current. Reconciling keeps the stage's completion state: an
+        existing manifest is refreshed with its ``complete`` flag and stats, and
+        a directory without one is left to the directory-listing fallback.
+        """
+        stage_dir = Path(stage_dir)
+        index = cls.load(stage_dir, checkpoint_file) or cls(
+            stage_dir / config.COVERAGE_INDEX_FILENAME, checkpoint_file
+        )
+        if not stage_dir.exists():
+            return index
+
+        on_disk = {
+            f.stem: f
+            for f in stage_dir.glob("*.json")
+            if "report" not in f.name and not f.name.startswith(".")
+        }
+        for paper_id in index.ids(index.live):
+            if paper_id not in on_disk:
+                index.remove(paper_id)
+        for paper_id, json_file in on_disk.items():
+            ordinal = index.ordinals.get(paper_id)
+            if ordinal is not None and index.live_column[ordinal]:
+                continue
+            row = scan_paper(json_file)
+            if not row["parse_error"]:
+                index.record_fields(paper_id, row_fields(row))
+        if index.dirty:
+            manifest = StageManifest.load(stage_dir)
+            saved = index._save_index() and (
+                manifest is None
+                or write_manifest(
+                    stage_dir,
+                    index.ids(index.live),
+                    complete=manifest.complete,
+                    checkpoint_file=checkpoint_file,
+                    stats=manifest.stats,
+                )
+            )
+            index.dirty = not saved
+        return index
+
+    @classmethod
+    def for_stage(cls, stage_dir: Path) -> "CoverageIndex":
+        """Return the stage's saved index for queries, building it only if missing."""
+        return cls.load(stage_dir) or cls.open(stage_dir)
+
+    def save(self) -> bool:
+        """Persist the index and an in-progress manifest if anything changed since the last save."""
+        if not self.dirty:
+            return True
+        saved = self._save_index() and write_manifest(
+            self.path.parent, self.ids(self.live), checkpoint_file=self.checkpoint_file
+        )
+        self.dirty = not saved
+        return saved
+
+    def finish(self, stats: dict[str, Any] | None = None) -> bool:
+        """Persist the index and mark the stage complete in its manifest.
+
+        Without ``stats`` (a run that found nothing left to do) the manifest
+        keeps the statistics of the run that did the work.
+        """
+        if stats is None:
+            manifest = StageManifest.load(self.path.parent)
+            stats = manifest.stats if manifest else None
+        saved = (not self.dirty or self._save_index()) and write_manifest(
+            self.path.parent,
+            self.ids(self.live),
+            complete=True,
+            checkpoint_file=self.checkpoint_file,
+            stats=stats,
+        )
+        self.dirty = not saved
+        return saved
+
+    def _save_index(self) -> bool:
+        return save_checkpoint_atomic(
+            self.path,
+            {
+                "version": INDEX_VERSION,
+                "updated": datetime.now(UTC).isoformat(),
+                "fields": list(INDEX_FIELDS),
+                "paper_ids": self.paper_ids,
+                "live": format(self.live, "x"),
+                "bits": {field: format(value, "x") for field, value in self.bits.items()},
+            },
+            indent=None,
+        )
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _ordinal(self, paper_id: str) -> int:
+        ordinal = self.ordinals.get(paper_id)
+        if ordinal is None:
+            ordinal = len(self.paper_ids)
+            self.ordinals[paper_id] = ordinal
+            self.paper_ids.append(paper_id)
+            self.live_column.append(0)
+            for column in self.columns.values():
+                column.append(0)
+        return ordinal
+
+    def record_fields(self, paper_id: str, fields: list[str]) -> None:
+        """Set the paper's bits to exactly ``fields``."""
+        ordinal = self._ordinal(paper_id)
+        present = set(fields)
+        for field, column in self.columns.items():
+            column[ordinal] = field in present
+        self.live_column[ordinal] = 1
+        self._packed = None
+        self.dirty = True
+
+    def record(self, paper_id: str, paper: dict[str, Any]) -> None:
+        """Update the index for a paper the stage has just written."""
+        self.record_fields(paper_id, row_fields(paper_row(paper_id, paper)))
+
+    def remove(self, paper_id: str) -> None:
+        """Drop a paper that the stage deleted or excluded."""
+        ordinal = self.ordinals.get(paper_id)
+        if ordinal is None:
+            return
+        self.live_column[ordinal] = 0
+        for column in self.columns.values():
+            column[ordinal] = 0
+        self._packed = None
+        self.dirty = True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Return the number of papers in the stage."""
+        return self.live_column.count(1)
+
+    def mask(self, *fields: str, missing: tuple[str, ...] = ()) -> int:
+        """Bitset of papers having every field in ``fields`` and none in ``missing``."""
+        result = self.live
+        for field in fields:
+            result &= self.bits[field]
+        for field in missing:
+            result &= ~self.bits[field]
+        return result
+
+    def count(self, *fields: str, missing: tuple[str, ...] = ()) -> int:
+        """Number of papers having every field in ``fields`` and none in ``missing``."""
+        return self.mask(*fields, missing=missing).bit_count()
+
+    def coverage(self, fields: tuple[str, ...] | list[str] = INDEX_FIELDS) -> dict[str, int]:
+        """Per-field count of papers having the field."""
+        return {field: (self.bits[field] & self.live).bit_count() for field in fields}
+
+    def ids(self, mask: int) -> list[str]:
+        """Paper IDs for the set bits of a mask, in ordinal order."""
+        column = _unpack(mask, len(self.paper_ids))
+        return [paper_id for paper_id, bit in zip(self.paper_ids, column, strict=True) if bit]
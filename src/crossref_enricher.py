@@ -22,7 +22,12 @@ from typing import Any
 from collections import defaultdict
 from src import config
 from src.config import CROSSREF_MIN_TITLE_LENGTH
+from src.coverage_index import CoverageIndex
 from src.pipeline_utils import clean_doi
+from src.title_index import titles_match
+from src.metadata_snapshot import MetadataSnapshot
+from src.paper_status import PaperStatus
+from src.response_cache import ResponseCache
 import sys
 
 
@@ -41,8 +46,19 @@ logger = logging.getLogger(__name__)
 class CrossRefV5Enricher:
     """V5 Unified CrossRef enricher with all features."""
 
-    def __init__(self, email: str = "research.assistant@university.edu", force: bool = False):
-        """Initialize with polite pool settings."""
+    def __init__(
+        self,
+        email: str = "research.assistant@university.edu",
+        force: bool = False,
+        snapshot: MetadataSnapshot | None = None,
+    ):
+        """Initialize with polite pool settings.
+
+        Args:
+            email: Email for CrossRef polite pool
+            force: Re-enrich papers that already have CrossRef data
+            snapshot: Optional local metadata snapshot consulted before the API
+        """
         self.cr = Crossref(mailto=email)
         self.email = email
         self.batch_size = config.FAST_API_CHECKPOINT_INTERVAL  # 500 papers
@@ -51,6 +67,8 @@ class CrossRefV5Enricher:
         self.stats: dict[str, int] = defaultdict(int)
         self.comprehensive_fields_extracted: dict[str, int] = defaultdict(int)
         self.force = force  # Force re-enrichment even if already has data
+        self.snapshot = snapshot
+        self.response_cache: ResponseCache | None = None
 
     def load_checkpoint(self, output_dir: Path) -> int:
         """Load checkpoint to resume processing."""
@@ -269,11 +287,59 @@ class CrossRefV5Enricher:
 
         return extracted
 
+    def lookup_snapshot(self, doi: str | None = None, title: str | None = None, year: Any = None) -> Any:
+        """Resolve a paper in the local snapshot.
+
+        Returns:
+            The stored CrossRef record when the snapshot kept raw CrossRef works,
+            otherwise the resolved DOI (str), or None on a miss
+        """
+        if self.snapshot is None:
+            return None
+
+        record = self.snapshot.lookup_doi(doi) if doi else None
+        if record is None and title:
+            record = self.snapshot.lookup_title(title, year)
+        if record is None:
+            return None
+
+        if record.get("source") == "crossref" and record.get("raw"):
+            self.stats["found_in_snapshot"] += 1
+            return record["raw"]
+        return record["doi"]
+
+    def fetch_by_doi(self, doi: str) -> dict[str, Any] | None:
+        """Fetch a CrossRef work by DOI from the API."""
+        try:
+            response = self.cr.works(ids=doi)
+            if response and "message" in response:
+                message: dict[str, Any] = response["message"]
+                return message
+        except Exception as e:
+            logger.debug("DOI lookup failed for %s: %s", doi, e)
+            self.stats["doi_lookup_failed"] += 1
+        return None
+
     def search_by_title(self, title: str, year: str | None = None) -> dict[str, Any] | None:
         """Search for paper by title when DOI is missing."""
         if not title:
             return None
 
+        # Local snapshot first: resolves the title without a search query. Short
+        # generic titles ("Editorial", "Reply") are not matched, as for the API search.
+        local = None
+        if len(title) > CROSSREF_MIN_TITLE_LENGTH:
+            local = self.lookup_snapshot(title=title, year=year)
+        if isinstance(local, dict):
+            self.stats["found_by_title"] += 1
+            return local
+        if isinstance(local, str):
+            crossref_data = self.fetch_by_doi(local)
+            if crossref_data:
+                self.stats["found_by_title"] += 1
+                self.stats["resolved_by_snapshot"] += 1
+                return crossref_data
+
         try:
             query = title
             if year:
@@ -284,21 +350,20 @@ class CrossRefV5Enricher:
             if results and "message" in results and "items" in results["message"]:
                 items = results["message"]["items"]
 
-                # Find best match using fuzzy matching
+                # Accept the first result whose title matches
                 for item in items:
                     item_titles = item.get("title", [])
                     if not item_titles:
                         continue
 
                     item_title = item_titles[0]
-                    # Simple similarity check - could use difflib for better matching
-                    if len(title) > CROSSREF_MIN_TITLE_LENGTH:  # Only for reasonable length titles
-                        title_lower = title.lower()[:50]
-                        item_title_lower = item_title.lower()[:50]
-                        if title_lower in item_title_lower or item_title_lower in title_lower:
-                            self.stats["found_by_title"] += 1
-                            result: dict[str, Any] = item
-                            return result
+                    # Shared shingle similarity, only for reasonable length titles
+                    if len(title) > CROSSREF_MIN_TITLE_LENGTH and titles_match(
+                        title, item_title, config.CROSSREF_TITLE_MATCH_THRESHOLD
+                    ):
+                        self.stats["found_by_title"] += 1
+                        result: dict[str, Any] = item
+                        return result
 
         except Exception as e:
             logger.debug("Title search failed: %s", e)
@@ -315,16 +380,12 @@ class CrossRefV5Enricher:
 
         crossref_data = None
 
-        # Try DOI lookup first
+        # Try DOI lookup first (local snapshot, then API)
         if clean_doi_value:
-            try:
-                response = self.cr.works(ids=clean_doi_value)
-                if response and "message" in response:
-                    crossref_data = response["message"]
-                    self.stats["found_by_doi"] += 1
-            except Exception as e:
-                logger.debug("DOI lookup failed for %s: %s", clean_doi_value, e)
-                self.stats["doi_lookup_failed"] += 1
+            local = self.lookup_snapshot(doi=clean_doi_value)
+            crossref_data = local if isinstance(local, dict) else self.fetch_by_doi(clean_doi_value)
+            if crossref_data:
+                self.stats["found_by_doi"] += 1
 
         # Try title search if no DOI or DOI lookup failed
         title = paper_data.get("title")
@@ -333,44 +394,59 @@ class CrossRefV5Enricher:
 
         # Extract comprehensive fields if we found data
         if crossref_data:
-            comprehensive_fields = self.extract_comprehensive_fields(crossref_data)
+            if self.response_cache is not None and paper_data.get("paper_id"):
+                self.response_cache.put(paper_data["paper_id"], crossref_data)
+            return self.apply_crossref_data(paper_data, crossref_data, clean_doi_value)
 
-            # Add CrossRef metadata to paper
-            paper_data["crossref"] = comprehensive_fields
-            paper_data["crossref_enrichment"] = {
-                "timestamp": datetime.now(UTC).isoformat(),
-                "doi_cleaned": clean_doi_value != original_doi,
-                "found_by": "doi" if clean_doi_value and "DOI" in comprehensive_fields else "title",
-                "fields_extracted": len(comprehensive_fields),
-            }
+        self.stats["not_found"] += 1
+        return paper_data
 
-            # Update basic fields if missing
-            if not paper_data.get("title") and comprehensive_fields.get("title"):
-                paper_data["title"] = comprehensive_fields["title"]
-                self.stats["titles_recovered"] += 1
+    def rederive_paper(self, paper_data: dict[str, Any], crossref_data: dict[str, Any]) -> dict[str, Any]:
+        """Rebuild a paper's CrossRef fields from a cached response without network I/O."""
+        original_doi = paper_data.get("doi")
+        clean_doi_value = clean_doi(original_doi) if original_doi else None
+        self.stats["rederived"] += 1
+        return self.apply_crossref_data(paper_data, crossref_data, clean_doi_value)
+
+    def apply_crossref_data(
+        self, paper_data: dict[str, Any], crossref_data: dict[str, Any], clean_doi_value: str | None
+    ) -> dict[str, Any]:
+        """Merge the fields extracted from a CrossRef work into a paper."""
+        comprehensive_fields = self.extract_comprehensive_fields(crossref_data)
+
+        # Add CrossRef metadata to paper
+        paper_data["crossref"] = comprehensive_fields
+        paper_data["crossref_enrichment"] = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "doi_cleaned": clean_doi_value != paper_data.get("doi"),
+            "found_by": "doi" if clean_doi_value and "DOI" in comprehensive_fields else "title",
+            "fields_extracted": len(comprehensive_fields),
+        }
 
-            if not paper_data.get("year") and comprehensive_fields.get("issued"):
-                year_match = re.search(r"(\d{4})", comprehensive_fields["issued"])
-                if year_match:
-                    paper_data["year"] = year_match.group(1)
-                    self.stats["years_recovered"] += 1
+        # Update basic fields if missing
+        if not paper_data.get("title") and comprehensive_fields.get("title"):
+            paper_data["title"] = comprehensive_fields["title"]
+            self.stats["titles_recovered"] += 1
 
-            if not paper_data.get("journal") and comprehensive_fields.get("container-title"):
-                paper_data["journal"] = comprehensive_fields["container-title"]
-                self.stats["journals_recovered"] += 1
+        if not paper_data.get("year") and comprehensive_fields.get("issued"):
+            year_match = re.search(r"(\d{4})", comprehensive_fields["issued"])
+            if year_match:
+                paper_data["year"] = year_match.group(1)
+                self.stats["years_recovered"] += 1
 
-            if not paper_data.get("authors") and comprehensive_fields.get("authors"):
-                paper_data["authors"] = comprehensive_fields["authors"]
-                self.stats["authors_recovered"] += 1
+        if not paper_data.get("journal") and comprehensive_fields.get("container-title"):
+            paper_data["journal"] = comprehensive_fields["container-title"]
+            self.stats["journals_recovered"] += 1
 
-            if not paper_data.get("abstract") and comprehensive_fields.get("abstract"):
-                paper_data["abstract"] = comprehensive_fields["abstract"]
-                self.stats["abstracts_recovered"] += 1
+        if not paper_data.get("authors") and comprehensive_fields.get("authors"):
+            paper_data["authors"] = comprehensive_fields["authors"]
+            self.stats["authors_recovered"] += 1
 
-            self.stats["papers_enriched"] += 1
-        else:
-            self.stats["not_found"] += 1
+        if not paper_data.get("abstract") and comprehensive_fields.get("abstract"):
+            paper_data["abstract"] = comprehensive_fields["abstract"]
+            self.stats["abstracts_recovered"] += 1
 
+        self.stats["papers_enriched"] += 1
         return paper_data
 
     def has_crossref_data(self, paper: dict[str, Any]) -> bool:
@@ -387,6 +463,8 @@ class CrossRefV5Enricher:
 
         # Load checkpoint
         self.load_checkpoint(output_dir)
+        status = PaperStatus.open("crossref", output_dir, self.has_crossref_data)
+        self.response_cache = ResponseCache("crossref", output_dir)
 
         # Get all JSON files
         json_files = list(input_dir.glob("*.json"))
@@ -395,27 +473,26 @@ class CrossRefV5Enricher:
 
         # Filter already processed
         remaining_files = []
+        rederive: set[str] = set()
         skipped_already_enriched = 0
 
         for json_file in json_files:
             paper_id = json_file.stem
-            output_file = output_dir / json_file.name
 
             # Skip checkpoint and report files
             if "checkpoint" in json_file.name or "report" in json_file.name:
                 continue
 
-            if paper_id in self.processed_papers:
+            # Check if already enriched (unless force mode); outdated versions override the checkpoint
+            reason = "forced" if self.force else status.needs(paper_id)
+            if paper_id in self.processed_papers and reason not in ("stale", "rederive"):
                 continue
-
-            # Check if already enriched (unless force mode)
-            if not self.force and output_file.exists():
-                with open(output_file) as f:
-                    existing_paper = json.load(f)
-                    if self.has_crossref_data(existing_paper):
-                        skipped_already_enriched += 1
-                        self.processed_papers.add(paper_id)
-                        continue
+            if reason is None:
+                skipped_already_enriched += 1
+                self.processed_papers.add(paper_id)
+                continue
+            if reason == "rederive":
+                rederive.add(paper_id)
 
             remaining_files.append(json_file)
 
@@ -423,7 +500,7 @@ class CrossRefV5Enricher:
         logger.info("Already processed: %d", len(self.processed_papers))
         if skipped_already_enriched > 0:
             logger.info("Skipped (already enriched): %d", skipped_already_enriched)
-        logger.info("To process: %d", len(remaining_files))
+        logger.info("To process: %d (%d re-derived from cache)", len(remaining_files), len(rederive))
 
         if self.force:
             logger.info("Force mode: Re-enriching all papers")
@@ -434,6 +511,7 @@ class CrossRefV5Enricher:
 
         # Process remaining papers
         checkpoint_counter = 0
+        coverage = CoverageIndex.open(output_dir, self.checkpoint_file)
 
         for i, json_file in enumerate(remaining_files, 1):
             if i % 100 == 0:
@@ -448,8 +526,13 @@ class CrossRefV5Enricher:
                 if "paper_id" not in paper_data:
                     paper_data["paper_id"] = json_file.stem
 
-                # Enrich with CrossRef
-                enriched_paper = self.enrich_paper(paper_data)
+                # Enrich with CrossRef, or re-derive from the cached response
+                enriched_before = self.stats["papers_enriched"]
+                cached = self.response_cache.get(json_file.stem) if json_file.stem in rederive else None
+                if cached is not None:
+                    enriched_paper = self.rederive_paper(paper_data, cached)
+                else:
+                    enriched_paper = self.enrich_paper(paper_data)
 
                 # Add enrichment marker
                 enriched_paper["crossref_enriched"] = True
@@ -459,6 +542,9 @@ class CrossRefV5Enricher:
                 output_file = output_dir / json_file.name
                 with open(output_file, "w") as f:
                     json.dump(enriched_paper, f, indent=2)
+                coverage.record(json_file.stem, enriched_paper)
+                found = self.stats["papers_enriched"] > enriched_before
+                status.record(json_file.stem, success=found, cached=found)
 
                 # Track progress
                 self.processed_papers.add(json_file.stem)
@@ -468,6 +554,8 @@ class CrossRefV5Enricher:
                 # Save checkpoint periodically
                 if checkpoint_counter >= self.batch_size:
                     self.save_checkpoint()
+                    coverage.save()
+                    status.save()
                     checkpoint_counter = 0
 
                 # Rate limiting
@@ -479,6 +567,8 @@ class CrossRefV5Enricher:
 
         # Final checkpoint save
         self.save_checkpoint()
+        coverage.finish(dict(self.stats))
+        status.save()
 
         # Print statistics
         self.print_statistics(output_dir)
@@ -497,6 +587,9 @@ class CrossRefV5Enricher:
         print(f"  Found by DOI: {self.stats['found_by_doi']}")
         print(f"  Found by title search: {self.stats['found_by_title']}")
         print(f"  DOI lookup failures: {self.stats['doi_lookup_failed']}")
+        if self.snapshot is not None:
+            print(f"  Served from local snapshot: {self.stats['found_in_snapshot']}")
+            print(f"  DOIs resolved via snapshot: {self.stats['resolved_by_snapshot']}")
 
         print("\nData Quality:")
         print(f"  Funding DOIs removed: {self.stats['funding_dois_removed']}")
@@ -547,6 +640,11 @@ def main() -> None:
     parser.add_argument("--max-papers", type=int, help="Maximum number of papers to process")
     parser.add_argument("--reset", action="store_true", help="Reset checkpoint and start fresh")
     parser.add_argument("--force", action="store_true", help="Force re-enrichment even if already processed")
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help=f"Local metadata snapshot index (default: {config.METADATA_SNAPSHOT_FILE} if present)",
+    )
 
     args = parser.parse_args()
 
@@ -564,8 +662,13 @@ def main() -> None:
             checkpoint_file.unlink()
             print("Checkpoint reset")
 
+    # Open local snapshot if available (misses fall through to the API)
+    snapshot = MetadataSnapshot.open_default(Path(args.snapshot) if args.snapshot else None)
+    if snapshot is not None:
+        print(f"Using local metadata snapshot: {snapshot.db_path} ({len(snapshot)} works)")
+
     # Initialize enricher
-    enricher = CrossRefV5Enricher(email=args.email, force=args.force)
+    enricher = CrossRefV5Enricher(email=args.email, force=args.force, snapshot=snapshot)
 
     # Process papers
     enricher.process_batch(input_dir, output_dir, args.max_papers)
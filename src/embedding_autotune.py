@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Embedding batch size and thread autotuner.
+
+The best batch size and thread count for encoding depend on the machine (CPU
+cores, GPU memory, memory bandwidth) far more than on the BATCH_SIZE_* tiers
+in config. A short calibration run encodes a sample of the KB's papers with
+every candidate configuration, measures papers per second, and stores the
+fastest one per machine and model in ``config.EMBEDDING_TUNING_FILE``.
+``embedding_builder.load_encoder`` then uses it, and time estimates use the
+measured throughput instead of the ``config.TIME_PER_PAPER_*`` guesses.
+
+Texts are sorted by length before encoding so each batch holds texts of
+similar token counts and padding to the longest text in a batch is minimal.
+
+Usage:
+    python -m src.embedding_autotune --papers-dir DIR/10_final_output
+"""
+
+import argparse
+import os
+import platform
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.embedding_backend import load_model, model_key
+from src.pipeline_utils import format_time_estimate, load_checkpoint, save_checkpoint_atomic
+
+# Encodes texts with a given batch size
+BatchEncoder = Callable[[list[str], int], np.ndarray]
+
+
+@dataclass
+class TuneResult:
+    """Fastest configuration found by a calibration run."""
+
+    batch_size: int
+    threads: int
+    papers_per_second: float
+    measurements: list[tuple[int, int, float]] = field(default_factory=list)
+
+
+def machine_fingerprint() -> str:
+    """Identifier of this machine's hardware: host, CPU, core count and GPU if any."""
+    parts = [platform.node(), platform.machine(), platform.processor(), str(os.cpu_count() or 1)]
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            parts.append(torch.cuda.get_device_name(0))
+    except ImportError:
+        pass
+    return "|".join(parts)
+
+
+def sort_by_length(texts: list[str]) -> np.ndarray:
+    """Order of ``texts`` by word count, a cheap proxy for token length."""
+    return np.argsort([len(text.split()) for text in texts], kind="stable")
+
+
+def thread_candidates(cpu_count: int | None = None) -> list[int]:
+    """Thread counts worth trying: powers of two up to the core count, and the core count."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    candidates = {cpu_count}
+    threads = 1
+    while threads < cpu_count:
+        candidates.add(threads)
+        threads *= 2
+    return sorted(candidates)
+
+
+def set_threads(threads: int) -> None:
+    """Set the number of threads torch uses for CPU inference."""
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def measure(texts: list[str], encode: BatchEncoder, batch_size: int) -> float:
+    """Papers per second for encoding ``texts`` with one batch size."""
+    start = time.perf_counter()
+    encode(texts, batch_size)
+    return len(texts) / max(time.perf_counter() - start, 1e-9)
+
+
+def autotune(
+    texts: list[str],
+    encode: BatchEncoder,
+    set_thread_count: Callable[[int], None] | None = None,
+    batch_sizes: tuple[int, ...] = config.AUTOTUNE_BATCH_SIZES,
+    thread_counts: list[int] | None = None,
+    sample_size: int = config.AUTOTUNE_SAMPLE_SIZE,
+    seed: int = 0,
+) -> TuneResult:
+    """Measure throughput for every batch size and thread count and return the fastest.
+
+    Args:
+        texts: Texts to sample the calibration run from
+        encode: Function encoding texts with a given batch size
+        set_thread_count: Function setting the inference thread count (None: threads are not tuned)
+        batch_sizes: Candidate batch sizes
+        thread_counts: Candidate thread counts (default: ``thread_candidates()``)
+        sample_size: Number of texts encoded per configuration
+        seed: Seed for drawing the sample
+
+    Returns:
+        Fastest configuration, with every measurement as (batch_size, threads, papers/sec)
+    """
+    if not texts:
+        raise ValueError("No texts to calibrate on")
+    picked = np.random.default_rng(seed).choice(len(texts), min(sample_size, len(texts)), replace=False)
+    sample = [texts[position] for position in picked]
+    sample = [sample[position] for position in sort_by_length(sample)]
+    if set_thread_count is None:
+        thread_counts = [os.cpu_count() or 1]
+    elif thread_counts is None:
+        thread_counts = thread_candidates()
+
+    measurements = []
+    for threads in thread_counts:
+        if set_thread_count is not None:
+            set_thread_count(threads)
+        encode(sample[: min(batch_sizes)], min(batch_sizes))  # Warm-up outside the timing
+        for batch_size in batch_sizes:
+            measurements.append((batch_size, threads, measure(sample, encode, batch_size)))
+
+    batch_size, threads, papers_per_second = max(measurements, key=lambda m: m[2])
+    return TuneResult(batch_size, threads, papers_per_second, measurements)
+
+
+def load_tuning(
+    model_name: str = config.EMBEDDING_MODEL, tuning_file: Path = config.EMBEDDING_TUNING_FILE
+) -> dict[str, Any] | None:
+    """Tuned configuration of a model on this machine, or None if it was never calibrated."""
+    tuning: dict[str, Any] | None = (
+        load_checkpoint(tuning_file).get(machine_fingerprint(), {}).get(model_name)
+    )
+    return tuning
+
+
+def save_tuning(
+    result: TuneResult,
+    model_name: str = config.EMBEDDING_MODEL,
+    tuning_file: Path = config.EMBEDDING_TUNING_FILE,
+) -> None:
+    """Record the tuned configuration of a model on this machine."""
+    data = load_checkpoint(tuning_file)
+    data.setdefault(machine_fingerprint(), {})[model_name] = {
+        "batch_size": result.batch_size,
+        "threads": result.threads,
+        "papers_per_second": round(result.papers_per_second, 2),
+        "tuned_at": datetime.now(UTC).isoformat(),
+    }
+    save_checkpoint_atomic(tuning_file, data)
+
+
+def estimate_seconds(
+    paper_count: int,
+    model_name: str = config.EMBEDDING_MODEL,
+    backend: str = config.EMBEDDING_BACKEND,
+    tuning_file: Path = config.EMBEDDING_TUNING_FILE,
+) -> float:
+    """Expected time to embed ``paper_count`` papers: measured if tuned, else the CPU worst case."""
+    tuning = load_tuning(model_key(model_name, backend), tuning_file)
+    if tuning:
+        return float(paper_count / tuning["papers_per_second"])
+    return paper_count * config.TIME_PER_PAPER_CPU_MAX
+
+
+def main() -> None:
+    """Calibrate embedding throughput on a sample of the KB's papers."""
+    # Imported here: embedding_builder uses this module's tuning when loading encoders
+    from src.embedding_builder import embedding_text, load_papers
+
+    parser = argparse.ArgumentParser(description="Tune embedding batch size and threads for this machine")
+    parser.add_argument("--papers-dir", required=True, help="Directory of paper JSON files")
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL, help="Embedding model name")
+    parser.add_argument(
+        "--sample-size", type=int, default=config.AUTOTUNE_SAMPLE_SIZE, help="Papers per configuration"
+    )
+    args = parser.parse_args()
+
+    texts = [text for text in map(embedding_text, load_papers(Path(args.papers_dir))) if text]
+    model = load_model(args.model)
+
+    def encode(batch: list[str], batch_size: int) -> np.ndarray:
+        return np.asarray(model.encode(batch, batch_size=batch_size, show_progress_bar=False))
+
+    on_gpu = str(model.device).startswith("cuda")
+    result = autotune(
+        texts, encode, set_thread_count=None if on_gpu else set_threads, sample_size=args.sample_size
+    )
+    save_tuning(result, model_key(args.model))
+
+    print(f"{'Batch':>6} {'Threads':>8} {'Papers/sec':>11}")
+    for batch_size, threads, papers_per_second in result.measurements:
+        print(f"{batch_size:>6} {threads:>8} {papers_per_second:>11.1f}")
+    print(
+        f"Best: batch size {result.batch_size}, {result.threads} threads, "
+        f"{result.papers_per_second:.1f} papers/sec "
+        f"(full KB of {len(texts)} papers: {format_time_estimate(len(texts) / result.papers_per_second)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
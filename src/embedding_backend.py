@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""ONNX and int8-quantized embedding backends for CPU inference.
+
+``config.EMBEDDING_BACKEND`` selects how the embedding model runs:
+
+- ``torch``: the sentence-transformers model in fp32 (default)
+- ``onnx``: the model exported to ONNX and run by ONNX Runtime, still fp32
+- ``onnx-int8``: the ONNX export with dynamic int8 quantization of its weights
+
+ONNX backends need the ``onnx`` extra and a one-off export, which also runs
+an accuracy check against the fp32 model: the cosine between fp32 and
+exported vectors for a fixed query set (``config.EMBEDDING_ACCURACY_QUERIES``)
+and the overlap of their top-k papers over a sample of the KB. The report is
+kept in ``config.EMBEDDING_BACKEND_FILE`` so the recall traded for speed is
+known before the backend is switched on.
+
+Vectors from different backends are not interchangeable, so the backend is
+part of every embedding's content hash and switching it re-embeds the KB.
+
+Usage:
+    python -m src.embedding_backend --export onnx-int8 --papers-dir DIR/10_final_output
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.pipeline_utils import load_checkpoint, save_checkpoint_atomic
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+# Model file of each ONNX backend inside its export directory
+ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    "onnx-int8": f"onnx/model_qint8_{config.EMBEDDING_ONNX_QUANTIZATION}.onnx",
+}
+
+
+def model_key(model_name: str, backend: str = config.EMBEDDING_BACKEND) -> str:
+    """Name identifying the vectors a model produces on a backend."""
+    return model_name if backend == "torch" else f"{model_name}#{backend}"
+
+
+def backend_dir(model_name: str, backend: str) -> Path:
+    """Directory holding the export of a model for an ONNX backend."""
+    return config.EMBEDDING_ONNX_PATH / f"{model_name.replace('/', '--')}-{backend}"
+
+
+def load_model(
+    model_name: str = config.EMBEDDING_MODEL,
+    backend: str = config.EMBEDDING_BACKEND,
+    device: str | None = None,
+) -> Any:
+    """Load a sentence-transformers model on a backend."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+
+    path = backend_dir(model_name, backend)
+    if not (path / ONNX_FILES[backend]).exists():
+        raise FileNotFoundError(
+            f"No {backend} export of {model_name}; run: python -m src.embedding_backend --export {backend}"
+        )
+    return SentenceTransformer(
+        str(path), backend="onnx", device=device, model_kwargs={"file_name": ONNX_FILES[backend]}
+    )
+
+
+def export_backend(model_name: str, backend: str) -> Path:
+    """Export a model to ONNX, quantized to int8 for ``onnx-int8``, and return its directory."""
+    if backend not in ONNX_FILES:
+        raise ValueError(f"Backend {backend} has no export")
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    path = backend_dir(model_name, backend)
+    model = SentenceTransformer(model_name, backend="onnx", device="cpu")  # Exported to ONNX on load
+    model.save(str(path))
+    if backend == "onnx-int8":
+        export_dynamic_quantized_onnx_model(model, config.EMBEDDING_ONNX_QUANTIZATION, str(path))
+    return path
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` highest-scoring corpus vectors per query, by inner product."""
+    k = min(k, len(corpus))
+    scores = queries @ corpus.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def accuracy_check(
+    reference: Callable[[list[str]], np.ndarray],
+    candidate: Callable[[list[str]], np.ndarray],
+    queries: list[str],
+    corpus: list[str],
+    k: int = config.DEFAULT_K,
+) -> dict[str, float]:
+    """Compare a candidate encoder with the fp32 reference on queries and a corpus.
+
+    Returns:
+        Dict with mean and minimum query cosine, top-k recall against the
+        reference ranking, and the candidate's corpus encoding speedup
+    """
+    reference_queries = np.asarray(reference(queries), dtype=np.float32)
+    candidate_queries = np.asarray(candidate(queries), dtype=np.float32)
+    cosine = np.sum(reference_queries * candidate_queries, axis=1) / (
+        np.linalg.norm(reference_queries, axis=1) * np.linalg.norm(candidate_queries, axis=1)
+    )
+
+    start = time.perf_counter()
+    reference_corpus = np.asarray(reference(corpus), dtype=np.float32)
+    reference_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    candidate_corpus = np.asarray(candidate(corpus), dtype=np.float32)
+    candidate_seconds = time.perf_counter() - start
+
+    expected = top_k(reference_queries, reference_corpus, k)
+    found = top_k(candidate_queries, candidate_corpus, k)
+    recall = np.mean(
+        [len(set(e.tolist()) & set(f.tolist())) / len(e) for e, f in zip(expected, found, strict=True)]
+    )
+    return {
+        "mean_cosine": float(np.mean(cosine)),
+        "min_cosine": float(np.min(cosine)),
+        "recall_at_k": float(recall),
+        "speedup": reference_seconds / max(candidate_seconds, 1e-9),
+    }
+
+
+def passes(report: dict[str, float]) -> bool:
+    """Whether an accuracy report is within the configured loss budget."""
+    return (
+        report["mean_cosine"] >= config.EMBEDDING_BACKEND_MIN_COSINE
+        and report["recall_at_k"] >= config.EMBEDDING_BACKEND_MIN_RECALL
+    )
+
+
+def save_report(
+    model_name: str,
+    backend: str,
+    report: dict[str, float],
+    report_file: Path = config.EMBEDDING_BACKEND_FILE,
+) -> None:
+    """Record the accuracy report of a backend export."""
+    data = load_checkpoint(report_file)
+    data.setdefault(model_name, {})[backend] = {
+        **report,
+        "passed": passes(report),
+        "checked_at": datetime.now(UTC).isoformat(),
+    }
+    save_checkpoint_atomic(report_file, data)
+
+
+def main() -> None:
+    """Export the embedding model to an ONNX backend and check it against fp32."""
+    # Imported here: embedding_builder loads its encoders through this module
+    from src.embedding_builder import embedding_text, load_encoder, load_papers
+
+    parser = argparse.ArgumentParser(description="Export and check an ONNX embedding backend")
+    parser.add_argument("--export", required=True, choices=sorted(ONNX_FILES), help="Backend to export")
+    parser.add_argument("--papers-dir", required=True, help="Directory of paper JSON files for the check")
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL, help="Embedding model name")
+    parser.add_argument("--k", type=int, default=config.DEFAULT_K, help="Top-k compared by the check")
+    args = parser.parse_args()
+
+    path = export_backend(args.model, args.export)
+    print(f"Exported {args.model} ({args.export}) to {path}")
+
+    papers = load_papers(Path(args.papers_dir))[: config.EMBEDDING_ACCURACY_CORPUS_SIZE]
+    corpus = [text for text in map(embedding_text, papers) if text]
+    report = accuracy_check(
+        load_encoder(args.model, "torch"),
+        load_encoder(args.model, args.export),
+        list(config.EMBEDDING_ACCURACY_QUERIES),
+        corpus,
+        args.k,
+    )
+    save_report(args.model, args.export, report)
+
+    print(f"Query cosine to fp32: mean {report['mean_cosine']:.4f}, min {report['min_cosine']:.4f}")
+    print(f"Recall@{args.k} against fp32 over {len(corpus)} papers: {report['recall_at_k']:.3f}")
+    print(f"Corpus encoding speedup: {report['speedup']:.1f}x")
+    if not passes(report):
+        print(
+            f"Accuracy below the configured minimum (cosine {config.EMBEDDING_BACKEND_MIN_COSINE}, "
+            f"recall {config.EMBEDDING_BACKEND_MIN_RECALL}); keep EMBEDDING_BACKEND = 'torch'"
+        )
+        sys.exit(1)
+    print(f"Set EMBEDDING_BACKEND = '{args.export}' in config.py to use it")
+
+
+if __name__ == "__main__":
+    main()
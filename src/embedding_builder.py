@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Incremental paper embeddings keyed by content hash and model name.
+
+Each paper's embedding is stored under a hash of the text that was embedded
+plus the embedding model's name, so a KB rebuild reuses every cached vector
+whose text and model are unchanged and only encodes new or edited papers.
+Adding a handful of Zotero papers then costs seconds instead of a full
+re-embed. Encoders use the batch size and thread count that
+``embedding_autotune`` measured as fastest on this machine, if it has run.
+Large CPU builds run on ``embedding_pipeline`` worker processes instead, and
+each finished length bucket is appended to the matrix as soon as it arrives.
+
+Vectors are kept in the memory-mapped ``EmbeddingMatrix``, whose sidecar
+records each row's paper and content hash. New vectors are appended; the
+matrix is compacted once superseded rows (edited or removed papers) pile up.
+
+Usage:
+    python -m src.embedding_builder --papers-dir DIR/10_final_output [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.embedding_backend import load_model, model_key
+from src.embedding_autotune import estimate_seconds, load_tuning, set_threads, sort_by_length
+from src.embedding_matrix import EmbeddingMatrix
+from src.embedding_pipeline import EncodedBucket, default_workers, encode_parallel
+from src.pipeline_utils import format_time_estimate
+
+Encoder = Callable[[list[str]], np.ndarray]
+
+
+def embedding_text(paper: dict[str, Any]) -> str:
+    """Text embedded for a paper: title followed by abstract."""
+    return f"{paper.get('title') or ''} {paper.get('abstract') or ''}".strip()
+
+
+def content_hash(text: str, model_name: str, backend: str = config.EMBEDDING_BACKEND) -> str:
+    """Key of an embedding: SHA-256 of the model name (with its backend) and the embedded text."""
+    return hashlib.sha256(f"{model_key(model_name, backend)}\0{text}".encode()).hexdigest()
+
+
+def load_encoder(
+    model_name: str = config.EMBEDDING_MODEL, backend: str = config.EMBEDDING_BACKEND
+) -> Encoder:
+    """Load a sentence-transformers model on a backend as a function from texts to vectors.
+
+    Texts are encoded shortest first, so batches need little padding, and the
+    vectors are returned in the original order.
+    """
+    model = load_model(model_name, backend)
+    tuning = load_tuning(model_key(model_name, backend))
+    batch_size = tuning["batch_size"] if tuning else config.EMBEDDING_BATCH_SIZE
+    if tuning and not str(model.device).startswith("cuda"):
+        set_threads(tuning["threads"])
+
+    def encode(texts: list[str]) -> np.ndarray:
+        order = sort_by_length(texts)
+        vectors = np.asarray(
+            model.encode([texts[i] for i in order], batch_size=batch_size, show_progress_bar=False),
+            dtype=np.float32,
+        )
+        unsorted = np.empty_like(vectors)
+        unsorted[order] = vectors
+        return unsorted
+
+    return encode
+
+
+def encode_buckets(
+    texts: list[str], encoder: Encoder | None, model_name: str, workers: int
+) -> Iterator[EncodedBucket]:
+    """Vectors for ``texts`` as (positions, vectors) pieces, from worker processes if worthwhile."""
+    if encoder is None and workers > 1 and len(texts) >= config.EMBEDDING_MIN_PARALLEL_TEXTS:
+        yield from encode_parallel(texts, model_name, workers)
+        return
+    encoder = encoder or load_encoder(model_name)
+    yield np.arange(len(texts)), encoder(texts)
+
+
+def embed_texts(
+    item_ids: list[str],
+    texts: list[str],
+    encoder: Encoder | None = None,
+    model_name: str = config.EMBEDDING_MODEL,
+    matrix: EmbeddingMatrix | None = None,
+    workers: int = 1,
+) -> tuple[np.ndarray, dict[str, int]]:
+    """Embed texts stored under ``item_ids``, encoding only those whose text or model changed.
+
+    An item whose current row already holds its content hash is left alone;
+    a vector cached under another row (an item edited back, or a duplicate
+    text) is copied to a new row; everything else is encoded and appended,
+    by ``workers`` processes when no ``encoder`` is given.
+
+    Returns:
+        Tuple of (matrix row of each item, statistics)
+    """
+    if matrix is None:
+        matrix = EmbeddingMatrix.open()
+    keys = [content_hash(text, model_name) for text in texts]
+
+    rows = np.full(len(item_ids), -1, dtype=np.int64)
+    copied: list[int] = []
+    to_encode: list[int] = []
+    for position, (item_id, key) in enumerate(zip(item_ids, keys, strict=True)):
+        row = matrix.row_of(item_id)
+        if row is not None and matrix.key_at(row) == key:
+            rows[position] = row
+        elif matrix.row_for_key(key) is not None:
+            copied.append(position)
+        else:
+            to_encode.append(position)
+
+    if copied:
+        source_rows = [matrix.row_for_key(keys[position]) for position in copied]
+        vectors = matrix.get([row for row in source_rows if row is not None])
+        rows[copied] = matrix.append([item_ids[p] for p in copied], [keys[p] for p in copied], vectors)
+    pending = np.asarray(to_encode, dtype=np.int64)
+    for positions, vectors in encode_buckets([texts[p] for p in to_encode], encoder, model_name, workers):
+        bucket = pending[positions].tolist()
+        rows[bucket] = matrix.append([item_ids[p] for p in bucket], [keys[p] for p in bucket], vectors)
+
+    superseded = len(matrix) - len(item_ids)
+    if superseded > len(item_ids) * config.EMBEDDING_COMPACT_RATIO:
+        rows = matrix.compact(rows)
+
+    stats = {"papers": len(item_ids), "reused": len(item_ids) - len(to_encode), "encoded": len(to_encode)}
+    return rows, stats
+
+
+def build_embeddings(
+    papers: list[dict[str, Any]],
+    encoder: Encoder | None = None,
+    model_name: str = config.EMBEDDING_MODEL,
+    matrix: EmbeddingMatrix | None = None,
+    workers: int = 1,
+) -> tuple[np.ndarray, dict[str, int]]:
+    """Embed papers, encoding only those whose text or model changed.
+
+    Args:
+        papers: Paper dicts with ``paper_id``, in the order the KB index uses
+        encoder: Function from texts to vectors; loaded for ``model_name`` only if needed
+        model_name: Embedding model, part of every cache key
+        matrix: Embedding matrix (default: the KB's embedding files)
+        workers: Encoding processes used when no ``encoder`` is given
+
+    Returns:
+        Tuple of (matrix row of each paper, statistics)
+    """
+    return embed_texts(
+        [str(paper["paper_id"]) for paper in papers],
+        [embedding_text(paper) for paper in papers],
+        encoder,
+        model_name,
+        matrix,
+        workers,
+    )
+
+
+def count_uncached(
+    texts: list[str], model_name: str = config.EMBEDDING_MODEL, matrix: EmbeddingMatrix | None = None
+) -> int:
+    """Number of texts with no cached vector for ``model_name``, i.e. that a build would encode."""
+    if matrix is None:
+        matrix = EmbeddingMatrix.open()
+    return sum(matrix.row_for_key(content_hash(text, model_name)) is None for text in texts)
+
+
+def load_papers(papers_dir: Path) -> list[dict[str, Any]]:
+    """Read paper JSON files in a stable order, adding ``paper_id`` from the file name."""
+    papers = []
+    for json_file in sorted(Path(papers_dir).glob("*.json")):
+        if "report" in json_file.name or json_file.name.startswith("."):
+            continue
+        with open(json_file) as f:
+            paper = json.load(f)
+        paper.setdefault("paper_id", json_file.stem)
+        papers.append(paper)
+    return papers
+
+
+def main() -> None:
+    """Embed the papers in a directory, reusing cached vectors."""
+    parser = argparse.ArgumentParser(description="Build paper embeddings incrementally")
+    parser.add_argument("--papers-dir", required=True, help="Directory of paper JSON files")
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL, help="Embedding model name")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Encoding processes (default: enough to fill the physical cores)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only estimate how long encoding would take")
+    args = parser.parse_args()
+
+    papers = load_papers(Path(args.papers_dir))
+    uncached = count_uncached([embedding_text(paper) for paper in papers], args.model)
+    estimate = format_time_estimate(estimate_seconds(uncached, args.model))
+    print(f"{uncached} of {len(papers)} papers need encoding (estimated {estimate})")
+    if args.dry_run:
+        return
+
+    start = time.perf_counter()
+    _, stats = build_embeddings(papers, model_name=args.model, workers=args.workers or default_workers())
+    elapsed = time.perf_counter() - start
+    print(f"Embedded {stats['papers']} papers: {stats['reused']} reused, {stats['encoded']} encoded")
+    if stats["encoded"]:
+        print(f"Throughput: {stats['encoded'] / elapsed:.1f} papers/sec")
+
+
+if __name__ == "__main__":
+    main()
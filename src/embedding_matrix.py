@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Memory-mapped embedding matrix with a fixed-width paper_id -> row sidecar.
+
+Vectors live in one contiguous binary file (``config.EMBEDDING_DATA_FILE``)
+behind a small header giving the storage dtype and dimensions, by default
+float16 to halve the size. The matrix is opened with ``np.memmap``, so
+opening costs nothing and memory grows only with the rows a query touches.
+
+Each row's owner is recorded in ``config.EMBEDDING_CACHE_FILE`` as a
+fixed-width ``(paper_id, content hash)`` record. Both files are append-only:
+adding vectors writes to their ends, and a row written later supersedes an
+earlier row for the same paper. ``compact`` rewrites both files once enough
+rows are superseded.
+
+Usage:
+    matrix = EmbeddingMatrix.open()
+    row = matrix.row_of(paper_id)
+    vector = matrix.get([row])[0]
+"""
+
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from src import config
+
+MAGIC = b"RAEMB001"
+HEADER = struct.Struct("<8s8sI")
+HEADER_SIZE = 64  # Header is padded so rows start at an aligned offset
+ROW_DTYPE = np.dtype([("paper_id", "S64"), ("key", "S64")])
+
+
+class EmbeddingMatrix:
+    """Append-only embedding rows on disk, read through a memory map."""
+
+    def __init__(
+        self,
+        data_file: Path,
+        rows_file: Path,
+        dimensions: int = config.EMBEDDING_DIMENSIONS,
+        dtype: str = config.EMBEDDING_STORAGE_DTYPE,
+    ):
+        """Describe a matrix stored in ``data_file`` with its sidecar ``rows_file``."""
+        self.data_file = Path(data_file)
+        self.rows_file = Path(rows_file)
+        self.dimensions = dimensions
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self._vectors: np.ndarray | None = None
+        self._records: np.ndarray | None = None
+        self._by_paper: dict[str, int] | None = None
+        self._by_key: dict[str, int] | None = None
+
+    @classmethod
+    def open(
+        cls,
+        data_file: Path = config.EMBEDDING_DATA_FILE,
+        rows_file: Path = config.EMBEDDING_CACHE_FILE,
+        dimensions: int = config.EMBEDDING_DIMENSIONS,
+        dtype: str = config.EMBEDDING_STORAGE_DTYPE,
+    ) -> "EmbeddingMatrix":
+        """Open a matrix, starting empty if it is missing or stored with another dtype or size.
+
+        Rows left half-written by an interrupted append are dropped.
+        """
+        matrix = cls(data_file, rows_file, dimensions, dtype)
+        if matrix._read_header() != matrix._header():
+            matrix._write_empty()
+            return matrix
+
+        data_rows = (matrix.data_file.stat().st_size - HEADER_SIZE) // matrix.row_bytes
+        sidecar_rows = (
+            matrix.rows_file.stat().st_size // ROW_DTYPE.itemsize if matrix.rows_file.exists() else 0
+        )
+        matrix.count = min(data_rows, sidecar_rows)
+        os.truncate(matrix.data_file, HEADER_SIZE + matrix.count * matrix.row_bytes)
+        if matrix.rows_file.exists():
+            os.truncate(matrix.rows_file, matrix.count * ROW_DTYPE.itemsize)
+        return matrix
+
+    @property
+    def row_bytes(self) -> int:
+        """Bytes per stored vector."""
+        return self.dimensions * self.dtype.itemsize
+
+    def _header(self) -> bytes:
+        return HEADER.pack(MAGIC, self.dtype.str.encode(), self.dimensions).ljust(HEADER_SIZE, b"\0")
+
+    def _read_header(self) -> bytes | None:
+        try:
+            with open(self.data_file, "rb") as f:
+                return f.read(HEADER_SIZE)
+        except OSError:
+            return None
+
+    def _write_empty(self) -> None:
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        self.data_file.write_bytes(self._header())
+        self.rows_file.write_bytes(b"")
+        self.count = 0
+        self._reset_views()
+
+    def _reset_views(self) -> None:
+        self._vectors = self._records = None
+        self._by_paper = self._by_key = None
+
+    def __len__(self) -> int:
+        """Number of stored rows, including superseded ones."""
+        return self.count
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only memory map of all rows, in the storage dtype."""
+        if self._vectors is None:
+            if self.count == 0:
+                return np.zeros((0, self.dimensions), dtype=self.dtype)
+            self._vectors = np.memmap(
+                self.data_file,
+                dtype=self.dtype,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=(self.count, self.dimensions),
+            )
+        return self._vectors
+
+    @property
+    def records(self) -> np.ndarray:
+        """Read-only memory map of the ``(paper_id, key)`` record of every row."""
+        if self._records is None:
+            if self.count == 0:
+                return np.zeros(0, dtype=ROW_DTYPE)
+            self._records = np.memmap(self.rows_file, dtype=ROW_DTYPE, mode="r", shape=(self.count,))
+        return self._records
+
+    def row_of(self, paper_id: str) -> int | None:
+        """Current row of a paper (its most recently written one), or None."""
+        if self._by_paper is None:
+            ids = self.records["paper_id"].tolist()
+            self._by_paper = {paper.decode(): row for row, paper in enumerate(ids)}
+        return self._by_paper.get(paper_id)
+
+    def row_for_key(self, key: str) -> int | None:
+        """Most recent row holding the vector for a content hash, or None."""
+        if self._by_key is None:
+            keys = self.records["key"].tolist()
+            self._by_key = {k.decode(): row for row, k in enumerate(keys)}
+        return self._by_key.get(key)
+
+    def key_at(self, row: int) -> str:
+        """Content hash of the vector in a row."""
+        return bytes(self.records["key"][row]).decode()
+
+    def get(self, rows: list[int] | np.ndarray) -> np.ndarray:
+        """Vectors for the given rows as float32."""
+        return np.asarray(self.vectors[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+    def append(self, paper_ids: list[str], keys: list[str], vectors: np.ndarray) -> np.ndarray:
+        """Write vectors at the end of the matrix and return their rows."""
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype).reshape(-1, self.dimensions)
+        records = np.array(list(zip(paper_ids, keys, strict=True)), dtype=ROW_DTYPE)
+        with open(self.data_file, "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self.rows_file, "ab") as f:
+            f.write(records.tobytes())
+
+        rows = np.arange(self.count, self.count + len(vectors), dtype=np.int64)
+        self.count += len(vectors)
+        self._vectors = self._records = None
+        if self._by_paper is not None:
+            self._by_paper.update(zip(paper_ids, rows.tolist(), strict=True))
+        if self._by_key is not None:
+            self._by_key.update(zip(keys, rows.tolist(), strict=True))
+        return rows
+
+    def compact(self, rows: list[int] | np.ndarray) -> np.ndarray:
+        """Rewrite the matrix keeping only ``rows``, in that order, and return their new rows."""
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.array(self.vectors[rows])
+        records = np.array(self.records[rows])
+        self._reset_views()
+
+        for path, payload in (
+            (self.data_file, self._header() + vectors.tobytes()),
+            (self.rows_file, records.tobytes()),
+        ):
+            temp_file = path.with_suffix(".tmp")
+            temp_file.write_bytes(payload)
+            temp_file.replace(path)
+        self.count = len(rows)
+        return np.arange(len(rows), dtype=np.int64)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Multi-process CPU embedding pipeline with length buckets and tokenization overlap.
+
+A single interpreter encodes with one model whose intra-op threads stop
+scaling long before the cores run out. This pipeline instead runs one model
+per worker process, each pinned to ``config.EMBEDDING_WORKER_THREADS`` torch
+threads, so throughput grows with physical cores.
+
+Texts are sorted by length and cut into buckets of one batch each, so every
+forward pass pads to nearly the same length. A tokenizer thread in the parent
+turns buckets into model inputs ahead of the workers (at most
+``config.EMBEDDING_PREFETCH_BUCKETS`` per worker), overlapping tokenization
+with encoding. Encoded buckets are yielded as they finish so the caller can
+write them straight into the embedding matrix.
+
+Usage:
+    for positions, vectors in encode_parallel(texts, config.EMBEDDING_MODEL):
+        rows[positions] = matrix.append(...)
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.embedding_autotune import load_tuning, sort_by_length
+from src.embedding_backend import load_model, model_key
+
+# Encoded bucket: positions of its texts in the input and their vectors
+EncodedBucket = tuple[np.ndarray, np.ndarray]
+
+# Model loaded by each worker process
+_worker: dict[str, Any] = {}
+
+
+def physical_cores() -> int:
+    """Number of physical CPU cores (logical CPUs where the topology is unknown)."""
+    try:
+        cores = set()
+        physical_id = ""
+        for line in Path("/proc/cpuinfo").read_text().splitlines():
+            name, _, value = line.partition(":")
+            if name.strip() == "physical id":
+                physical_id = value.strip()
+            elif name.strip() == "core id":
+                cores.add((physical_id, value.strip()))
+        if cores:
+            return len(cores)
+    except OSError:
+        pass
+    return os.cpu_count() or 1
+
+
+def default_workers(threads_per_worker: int = config.EMBEDDING_WORKER_THREADS) -> int:
+    """Worker processes that fill the physical cores, or 1 when encoding on a GPU."""
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return 1
+    except ImportError:
+        pass
+    return max(1, physical_cores() // threads_per_worker)
+
+
+def length_buckets(texts: list[str], bucket_size: int) -> list[np.ndarray]:
+    """Positions of ``texts`` sorted by length and cut into buckets of ``bucket_size``."""
+    order = sort_by_length(texts)
+    return [order[start : start + bucket_size] for start in range(0, len(order), bucket_size)]
+
+
+def run_buckets(
+    texts: list[str],
+    buckets: list[np.ndarray],
+    tokenize: Callable[[list[str]], Any],
+    encode_features: Callable[[Any], np.ndarray],
+    executor: Executor,
+    max_in_flight: int,
+) -> Iterator[EncodedBucket]:
+    """Tokenize buckets in a background thread and encode them on ``executor``.
+
+    At most ``max_in_flight`` buckets are submitted at once and as many more
+    wait tokenized, so memory stays bounded. Buckets are yielded in
+    completion order. An exception raised by ``tokenize`` is re-raised here.
+    """
+    tokenized: queue.Queue[tuple[np.ndarray, Any] | BaseException | None] = queue.Queue(maxsize=max_in_flight)
+    stop = threading.Event()
+
+    def tokenize_all() -> None:
+        try:
+            for bucket in buckets:
+                if stop.is_set():
+                    break
+                tokenized.put((bucket, tokenize([texts[position] for position in bucket])))
+        except Exception as e:  # Handed to the consumer, which would otherwise wait forever
+            tokenized.put(e)
+            return
+        tokenized.put(None)
+
+    tokenizer = threading.Thread(target=tokenize_all, name="embedding-tokenizer", daemon=True)
+    tokenizer.start()
+    pending: dict[Future[np.ndarray], np.ndarray] = {}
+    try:
+        while (item := tokenized.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            bucket, features = item
+            pending[executor.submit(encode_features, features)] = bucket
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        for future in as_completed(list(pending)):
+            yield pending.pop(future), future.result()
+    finally:
+        stop.set()
+        while tokenizer.is_alive():
+            try:
+                tokenized.get_nowait()
+            except queue.Empty:
+                tokenizer.join(0.1)
+
+
+def _init_worker(model_name: str, backend: str, threads: int) -> None:
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _worker["model"] = load_model(model_name, backend, device="cpu")
+
+
+def _encode_features(features: dict[str, Any]) -> np.ndarray:
+    import torch
+
+    with torch.inference_mode():
+        embeddings = _worker["model"](features)["sentence_embedding"]
+    return np.asarray(embeddings.float().numpy(), dtype=np.float32)
+
+
+def encode_parallel(
+    texts: list[str],
+    model_name: str = config.EMBEDDING_MODEL,
+    workers: int | None = None,
+    threads_per_worker: int = config.EMBEDDING_WORKER_THREADS,
+    bucket_size: int | None = None,
+    backend: str = config.EMBEDDING_BACKEND,
+) -> Iterator[EncodedBucket]:
+    """Encode texts on CPU worker processes, yielding each length bucket as it finishes.
+
+    Args:
+        texts: Texts to encode
+        model_name: Sentence-transformers model, loaded once per worker
+        workers: Worker processes (default: ``default_workers()``)
+        threads_per_worker: Torch threads pinned in each worker
+        bucket_size: Texts per bucket (default: the tuned batch size, else ``config.EMBEDDING_BATCH_SIZE``)
+        backend: Inference backend of the workers (see ``embedding_backend``)
+
+    Yields:
+        Tuples of (positions in ``texts``, float32 vectors)
+    """
+    if bucket_size is None:
+        tuning = load_tuning(model_key(model_name, backend))
+        bucket_size = tuning["batch_size"] if tuning else config.EMBEDDING_BATCH_SIZE
+    workers = workers or default_workers(threads_per_worker)
+    tokenizer_model = load_model(model_name, backend, device="cpu")
+
+    # Spawned, not forked: forking a process that has started torch threads can deadlock
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_name, backend, threads_per_worker),
+    ) as executor:
+        yield from run_buckets(
+            texts,
+            length_buckets(texts, bucket_size),
+            tokenizer_model.tokenize,
+            _encode_features,
+            executor,
+            workers * config.EMBEDDING_PREFETCH_BUCKETS,
+        )
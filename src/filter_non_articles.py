@@ -14,6 +14,7 @@ from pathlib import Path
 from typing import Any
 
 from src import config
+from src.stage_table import StageTable
 
 
 class NonArticleFilter:
@@ -38,10 +39,11 @@ class NonArticleFilter:
             "datasets": [],
             "malformed_doi": [],
             "other_non_articles": [],
+            "unreadable": [],
         }
 
         self.included: list[dict[str, Any]] = []
-        self.stats = {"total_processed": 0, "articles_kept": 0, "non_articles_excluded": 0}
+        self.stats = {"total_processed": 0, "articles_kept": 0, "non_articles_excluded": 0, "unreadable": 0}
 
     def is_supplemental_material(self, doi: str) -> bool:
         """Check if DOI indicates supplemental material."""
@@ -101,32 +103,25 @@ class NonArticleFilter:
 
         return any(pattern in doi for pattern in malformed_patterns)
 
-    def analyze_paper(self, json_file: Path) -> tuple[str, dict[str, Any]]:
-        """Analyze a paper to determine if it's an article or non-article content.
+    def analyze_paper(self, papers: StageTable, i: int) -> tuple[str, dict[str, Any]]:
+        """Analyze a stage table row to determine if it's an article or non-article content.
 
         Returns:
             Tuple of (category, paper_info)
             category: 'article' or exclusion reason
         """
-        with open(json_file) as f:
-            data = json.load(f)
-
-        paper_id = json_file.stem
-        title = data.get("title", "").strip() if data.get("title") else ""
-        doi = data.get("doi", "").strip() if data.get("doi") else ""
-        abstract = data.get("abstract", "").strip() if data.get("abstract") else ""
+        title = papers.text("title", i)
+        doi = papers.text("doi", i)
 
         # Create paper info
         paper_info = {
-            "paper_id": paper_id,
+            "paper_id": papers.paper_ids[i],
             "title": title[:100] if title else "[NO TITLE]",
             "doi": doi,
-            "abstract_length": len(abstract),
-            "has_sections": bool(data.get("sections", [])),
-            "num_references": data.get("num_references", 0),
-            "text_chars": sum(
-                len(s.get("text", "")) for s in data.get("sections", []) if isinstance(s, dict)
-            ),
+            "abstract_length": int(papers.count("abstract_length")[i]),
+            "has_sections": bool(papers.has("sections")[i]),
+            "num_references": papers.values["num_references"][i] or 0,
+            "text_chars": int(papers.count("section_text_chars")[i]),
         }
 
         # Check exclusion criteria
@@ -163,14 +158,24 @@ class NonArticleFilter:
 
     def process_all(self) -> None:
         """Process all papers and filter out non-articles."""
-        json_files = [f for f in self.input_dir.glob("*.json") if "report" not in f.name]
+        papers = StageTable.scan(self.input_dir).exclude_names("report")
 
-        print(f"Processing {len(json_files)} papers to filter non-article content...")
+        print(f"Processing {len(papers)} papers to filter non-article content...")
         print("=" * 70)
 
-        for json_file in json_files:
+        for i in range(len(papers)):
             self.stats["total_processed"] += 1
-            category, paper_info = self.analyze_paper(json_file)
+            if papers.parse_errors[i]:
+                # Unreadable files are reported, never copied into the KB as empty papers
+                self.excluded["unreadable"].append(
+                    {"paper_id": papers.paper_ids[i], "error": papers.parse_errors[i]}
+                )
+                self.stats["unreadable"] += 1
+                print(f"  Unreadable: {papers.file_names[i]} ({papers.parse_errors[i]})")
+                continue
+
+            category, paper_info = self.analyze_paper(papers, i)
+            json_file = self.input_dir / papers.file_names[i]
 
             if category == "article":
                 # Copy to output directory
@@ -295,6 +300,16 @@ class NonArticleFilter:
                     f.write(f"| {paper['paper_id']} | {title} | Editorial/Comment |\n")
                 f.write("\n")
 
+            # Unreadable files
+            if self.excluded["unreadable"]:
+                f.write(f"### Unreadable Files: {len(self.excluded['unreadable'])} items\n\n")
+                f.write("JSON files that could not be parsed; fix or re-extract them.\n\n")
+                f.write("| Paper ID | Error |\n")
+                f.write("|----------|-------|\n")
+                for paper in self.excluded["unreadable"]:
+                    f.write(f"| {paper['paper_id']} | {paper['error']} |\n")
+                f.write("\n")
+
             f.write("## Recommendations\n\n")
             f.write("1. **Supplemental materials** should link to their parent articles if needed\n")
             f.write("2. **Datasets** could be tracked separately as research resources\n")
@@ -332,6 +347,8 @@ class NonArticleFilter:
             f"  ✅ Articles kept: {self.stats['articles_kept']} ({self.stats['articles_kept'] / self.stats['total_processed'] * 100:.1f}%)"
         )
         print(f"  ❌ Non-articles excluded: {self.stats['non_articles_excluded']}")
+        if self.stats["unreadable"]:
+            print(f"  ⚠️  Unreadable files skipped: {self.stats['unreadable']}")
 
         print("\n📋 EXCLUSION BREAKDOWN:")
         for category, papers in self.excluded.items():
@@ -7,6 +7,7 @@ from datetime import datetime, UTC
 from pathlib import Path
 
 from src import config
+from src.stage_table import StageTable
 
 
 def main() -> None:
@@ -22,39 +23,39 @@ def main() -> None:
         return
 
     # Find article without title
+    papers = StageTable.scan(kb_dir)
+    articles = papers.exclude_names("report")
+    unreadable = [name for name, error in zip(papers.file_names, papers.parse_errors, strict=True) if error]
+    if unreadable:
+        print(f"Error: {len(unreadable)} unreadable JSON files in {kb_dir}: {', '.join(unreadable)}")
+        return
     missing_title = None
     missing_info = {}
 
-    for f in kb_dir.glob("*.json"):
-        if "report" in f.name:
-            continue
-
-        with open(f) as file:
-            data = json.load(file)
-            if not data.get("title", "").strip():
-                missing_title = f.stem  # Get filename without .json
-                missing_info = {
-                    "paper_id": f.stem,
-                    "doi": data.get("doi", ""),
-                    "authors": data.get("authors", []),
-                    "year": data.get("year", ""),
-                    "abstract_preview": data.get("abstract", "")[:200] if data.get("abstract") else "",
-                    "text_length": sum(
-                        len(s.get("text", "")) for s in data.get("sections", []) if isinstance(s, dict)
-                    ),
-                    "num_sections": len(data.get("sections", [])),
-                    "num_references": len(data.get("references", [])),
-                }
-                print(f"\nFound article without title: {missing_title}")
-                print(f"  DOI: {missing_info['doi']}")
-                print(f"  Text length: {missing_info['text_length']:,} chars")
-                print(f"  Sections: {missing_info['num_sections']}")
-                print(f"  References: {missing_info['num_references']}")
-                if missing_info["authors"]:
-                    print(f"  Authors: {', '.join(missing_info['authors'][:3])}...")
-                if missing_info["abstract_preview"]:
-                    print(f"  Abstract: {missing_info['abstract_preview']}...")
-                break
+    untitled = [i for i in range(len(articles)) if not articles.text("title", i)]
+    if untitled:
+        i = untitled[0]
+        data = articles.record(i)
+        missing_title = articles.paper_ids[i]
+        missing_info = {
+            "paper_id": missing_title,
+            "doi": data.get("doi", ""),
+            "authors": data.get("authors", []),
+            "year": data.get("year", ""),
+            "abstract_preview": data.get("abstract", "")[:200] if data.get("abstract") else "",
+            "text_length": int(articles.count("section_text_chars")[i]),
+            "num_sections": int(articles.count("num_sections")[i]),
+            "num_references": int(articles.count("num_references")[i]),
+        }
+        print(f"\nFound article without title: {missing_title}")
+        print(f"  DOI: {missing_info['doi']}")
+        print(f"  Text length: {missing_info['text_length']:,} chars")
+        print(f"  Sections: {missing_info['num_sections']}")
+        print(f"  References: {missing_info['num_references']}")
+        if missing_info["authors"]:
+            print(f"  Authors: {', '.join(missing_info['authors'][:3])}...")
+        if missing_info["abstract_preview"]:
+            print(f"  Abstract: {missing_info['abstract_preview']}...")
 
     if not missing_title:
         print("\n✅ No articles without titles found!")
@@ -70,9 +71,9 @@ def main() -> None:
     final_dir.mkdir(exist_ok=True)
     copied = 0
 
-    for f in kb_dir.glob("*.json"):
-        if f.stem != missing_title:
-            shutil.copy2(f, final_dir / f.name)
+    for file_name, paper_id in zip(papers.file_names, papers.paper_ids, strict=True):
+        if paper_id != missing_title:
+            shutil.copy2(kb_dir / file_name, final_dir / file_name)
             copied += 1
 
     print(f"✅ Copied {copied} files to final directory")
@@ -122,20 +123,10 @@ def main() -> None:
 
     total_articles = copied - 1  # Exclude the report file
 
-    # Count coverage
-    missing_dois = 0
-    total_text = 0
-
-    for f in final_dir.glob("*.json"):
-        if "report" in f.name:
-            continue
-        with open(f) as file:
-            data = json.load(file)
-            if not data.get("doi", "").strip():
-                missing_dois += 1
-            for section in data.get("sections", []):
-                if isinstance(section, dict):
-                    total_text += len(section.get("text", ""))
+    # Count coverage from the source table, minus the excluded paper
+    kept = articles.take([i for i, paper_id in enumerate(articles.paper_ids) if paper_id != missing_title])
+    missing_dois = sum(1 for i in range(len(kept)) if not kept.text("doi", i))
+    total_text = int(kept.count("section_text_chars").sum())
 
     print(f"Total articles: {total_articles}")
     print(f"Title coverage: {total_articles}/{total_articles} (100.0%)")
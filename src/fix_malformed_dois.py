@@ -6,16 +6,22 @@ import json
 import time
 import requests
 from pathlib import Path
+from src.metadata_snapshot import MetadataSnapshot
 
 
 class DOIFixer:
     """Fix malformed DOIs and retrieve titles from CrossRef."""
 
-    def __init__(self) -> None:
-        """Initialize DOI fixer with CrossRef API configuration."""
+    def __init__(self, snapshot: MetadataSnapshot | None = None) -> None:
+        """Initialize DOI fixer with CrossRef API configuration.
+
+        Args:
+            snapshot: Optional local metadata snapshot consulted before CrossRef
+        """
         self.crossref_url = "https://api.crossref.org/works"
         self.headers = {"User-Agent": "ResearchAssistant/1.0 (mailto:research@example.com)"}
         self.delay = 0.2  # Rate limiting
+        self.snapshot = snapshot
 
     def clean_doi(self, doi: str) -> str:
         """Aggressively clean malformed DOIs."""
@@ -62,7 +68,12 @@ class DOIFixer:
         return doi
 
     def get_title_from_crossref(self, doi: str) -> str | None:
-        """Fetch title from CrossRef."""
+        """Fetch title from the local snapshot, falling back to CrossRef."""
+        if self.snapshot is not None:
+            record = self.snapshot.lookup_doi(doi)
+            if record and record.get("title"):
+                return str(record["title"])
+
         try:
             time.sleep(self.delay)
             url = f"{self.crossref_url}/{doi}"
@@ -100,7 +111,7 @@ def main() -> None:
         ("BRE9DTGV", "10.1161/HYPERTENSIONAHA.120.14742."),
     ]
 
-    fixer = DOIFixer()
+    fixer = DOIFixer(snapshot=MetadataSnapshot.open_default())
     kb_dir = Path("kb_articles_only_20250831_165102")
 
     if not kb_dir.exists():
@@ -13,6 +13,7 @@ from pathlib import Path
 from datetime import datetime, UTC
 import re
 from typing import Any
+from src.metadata_snapshot import MetadataSnapshot
 
 # Set up module logger
 logger = logging.getLogger(__name__)
@@ -146,11 +147,15 @@ def main() -> None:
     stats: dict[str, Any] = {
         "total": 0,
         "years_from_tei": 0,
+        "years_from_snapshot": 0,
         "years_from_refs": 0,
         "still_missing": 0,
         "errors": [],
     }
 
+    # Local metadata snapshot (optional) resolves DOI/title -> year without network
+    snapshot = MetadataSnapshot.open_default()
+
     # Process each paper
     json_files = list(kb_dir.glob("*.json"))
 
@@ -195,6 +200,16 @@ def main() -> None:
                 data["year_source"] = "tei_xml"
                 print(f"✓ {paper_id}: Year {year} from TEI XML")
 
+        # Fallback: look the paper up in the local metadata snapshot
+        if not year and snapshot is not None:
+            record = snapshot.resolve(data)
+            if record and record.get("year"):
+                year = record["year"]
+                stats["years_from_snapshot"] += 1
+                data["year"] = year
+                data["year_source"] = "metadata_snapshot"
+                print(f"✓ {paper_id}: Year {year} from metadata snapshot")
+
         # Fallback: try to infer from references
         if not year:
             year = extract_year_from_references(data)
@@ -233,6 +248,9 @@ def main() -> None:
     print(
         f"Years from TEI XML: {stats['years_from_tei']} ({stats['years_from_tei'] / stats['total'] * 100:.1f}%)"
     )
+    print(
+        f"Years from snapshot: {stats['years_from_snapshot']} ({stats['years_from_snapshot'] / stats['total'] * 100:.1f}%)"
+    )
     print(
         f"Years from references: {stats['years_from_refs']} ({stats['years_from_refs'] / stats['total'] * 100:.1f}%)"
     )
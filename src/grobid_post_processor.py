@@ -7,12 +7,18 @@ Key improvements from v5.0 analysis:
 1. Case-insensitive section matching (fixes 1,531 missed sections!)
 2. Content aggregation from multiple subsections
 3. Smart retry detection for papers needing reprocessing
+
+Section headers repeat heavily across a corpus ("Methods", "2. METHODS"...),
+so header classification goes through HeaderClassifier: an in-memory LRU
+backed by an optional persisted header vocabulary file.
 """
 
 from src import config
+from src.pipeline_utils import load_checkpoint, save_checkpoint_atomic
 from defusedxml import ElementTree
 from pathlib import Path
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+import hashlib
 import json
 import re
 import logging
@@ -41,6 +47,118 @@ class ExtractedPaper:
     post_processing_version: str = "1.0"
 
 
+# Numbered headers (e.g., "1. Introduction", "2. Methods") for the experimental strategy
+NUMBERED_SECTION_PATTERNS = [
+    (re.compile(r"^\d+\.?\s*introduction"), "introduction"),
+    (re.compile(r"^\d+\.?\s*(method|approach|material)"), "methods"),
+    (re.compile(r"^\d+\.?\s*(result|experiment)"), "results"),
+    (re.compile(r"^\d+\.?\s*discussion"), "discussion"),
+    (re.compile(r"^\d+\.?\s*conclusion"), "conclusion"),
+]
+
+
+class HeaderClassifier:
+    """Memoized section-header classification with a persisted vocabulary.
+
+    Each distinct lowercased header is classified once, both by the keyword
+    patterns and by the numbered-header patterns. Results are kept in an
+    in-memory LRU and, if a vocabulary file is given, loaded from and saved
+    back to disk so later runs start warm. The vocabulary is tagged with a
+    fingerprint of the patterns and ignored when the patterns change.
+    """
+
+    def __init__(
+        self,
+        section_patterns: dict[str, list[str]],
+        vocabulary_file: Path | None = None,
+        maxsize: int = config.HEADER_CLASSIFIER_CACHE_SIZE,
+    ) -> None:
+        """Initialize the classifier.
+
+        Args:
+            section_patterns: Section type -> header keywords (first match wins)
+            vocabulary_file: Optional JSON vocabulary to load and save
+            maxsize: Maximum headers kept in the in-memory LRU
+        """
+        self.section_patterns = section_patterns
+        self.vocabulary_file = vocabulary_file
+        self.maxsize = maxsize
+        self.version = hashlib.sha1(
+            json.dumps(
+                [section_patterns, [(p.pattern, t) for p, t in NUMBERED_SECTION_PATTERNS]], sort_keys=True
+            ).encode(),
+            usedforsecurity=False,
+        ).hexdigest()[:12]
+
+        self._cache: OrderedDict[str, tuple[str | None, str | None]] = OrderedDict()
+        self._new_entries: dict[str, tuple[str | None, str | None]] = {}
+        self.stats = {"hits": 0, "misses": 0, "loaded": 0}
+
+        if vocabulary_file is not None:
+            self._load(vocabulary_file)
+
+    def _load(self, vocabulary_file: Path) -> None:
+        """Warm the LRU from the vocabulary file (if it matches the current patterns)."""
+        vocabulary = load_checkpoint(vocabulary_file)
+        if vocabulary.get("version") != self.version:
+            return
+        for header, (section_type, numbered_type) in list(vocabulary.get("headers", {}).items())[
+            : self.maxsize
+        ]:
+            self._cache[header] = (section_type, numbered_type)
+        self.stats["loaded"] = len(self._cache)
+
+    def lookup(self, header_lower: str) -> tuple[str | None, str | None]:
+        """Return (keyword section type, numbered section type) for a lowercased header."""
+        entry = self._cache.get(header_lower)
+        if entry is not None:
+            self._cache.move_to_end(header_lower)
+            self.stats["hits"] += 1
+            return entry
+
+        self.stats["misses"] += 1
+        entry = (self._match_keywords(header_lower), self._match_numbered(header_lower))
+        self._cache[header_lower] = entry
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        if self.vocabulary_file is not None:
+            self._new_entries[header_lower] = entry
+        return entry
+
+    def _match_keywords(self, header_lower: str) -> str | None:
+        """Classify by keyword patterns (first section type with a matching keyword)."""
+        for section_type, patterns in self.section_patterns.items():
+            for pattern in patterns:
+                if pattern in header_lower:
+                    return section_type
+        return None
+
+    def _match_numbered(self, header_lower: str) -> str | None:
+        """Classify by numbered-header patterns."""
+        for pattern, section_type in NUMBERED_SECTION_PATTERNS:
+            if pattern.match(header_lower):
+                return section_type
+        return None
+
+    def save(self) -> bool:
+        """Merge newly classified headers into the vocabulary file.
+
+        Returns:
+            True if the file was written (False if there was nothing new or no file)
+        """
+        if self.vocabulary_file is None or not self._new_entries:
+            return False
+        vocabulary = load_checkpoint(self.vocabulary_file)
+        headers = vocabulary.get("headers", {}) if vocabulary.get("version") == self.version else {}
+        headers.update({header: list(entry) for header, entry in self._new_entries.items()})
+        saved = save_checkpoint_atomic(
+            self.vocabulary_file, {"version": self.version, "headers": headers}, indent=0
+        )
+        if saved:
+            self._new_entries.clear()
+        return saved
+
+
 class GrobidPostProcessor:
     """Post-process Grobid XML with improvements from v5.0 analysis."""
 
@@ -72,10 +190,22 @@ class GrobidPostProcessor:
         "conclusion": ["conclu", "summary", "contribution", "concluding", "final"],
     }
 
-    def __init__(self, strategy: str = "v5_optimized") -> None:
-        """Initialize with specified post-processing strategy."""
+    def __init__(
+        self,
+        strategy: str = "v5_optimized",
+        header_vocabulary: Path | None = None,
+        classifier: HeaderClassifier | None = None,
+    ) -> None:
+        """Initialize with specified post-processing strategy.
+
+        Args:
+            strategy: Section extraction strategy
+            header_vocabulary: Optional persisted header vocabulary file
+            classifier: Shared header classifier (overrides header_vocabulary)
+        """
         self.strategy = strategy
         self.ns = {"tei": "http://www.tei-c.org/ns/1.0"}
+        self.classifier = classifier or HeaderClassifier(self.SECTION_PATTERNS, header_vocabulary)
         self.stats: dict[str, Any] = {
             "papers_processed": 0,
             "abstracts_extracted": 0,
@@ -88,51 +218,69 @@ class GrobidPostProcessor:
         """Process a single Grobid XML file."""
         try:
             tree = ElementTree.parse(xml_path)
-            root = tree.getroot()
-
-            paper_id = xml_path.stem
-
-            # Extract basic metadata
-            title = self._extract_title(root)
-            abstract = self._extract_abstract(root)
-
-            # Extract sections with improvements
-            if self.strategy == "v5_optimized":
-                sections, raw_sections = self._extract_sections_optimized(root)
-            elif self.strategy == "baseline":
-                sections, raw_sections = self._extract_sections_baseline(root)
-            else:
-                sections, raw_sections = self._extract_sections_experimental(root)
-
-            # Extract entities
-            entities = self._extract_entities(root)
-
-            # Extract metadata
-            metadata = self._extract_metadata(root)
-
-            # Calculate quality metrics
-            quality_metrics = self._calculate_quality_metrics(abstract, sections, entities, metadata)
-
-            # Update statistics
-            self._update_stats(abstract, sections, entities, quality_metrics)
-
-            return ExtractedPaper(
-                paper_id=paper_id,
-                title=title,
-                abstract=abstract,
-                sections=sections,
-                raw_sections=raw_sections,
-                entities=entities,
-                metadata=metadata,
-                quality_metrics=quality_metrics,
-                extraction_timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
-                post_processing_version=f"{self.strategy}_1.0",
-            )
+            return self.process_root(tree.getroot(), xml_path.stem)
 
         except Exception as e:
             logger.error("Error processing %s: %s", xml_path, e)
             return None
 
+    def extract_shared(self, root: Any) -> dict[str, Any]:
+        """Extract the strategy-independent parts of a paper (title, abstract, entities, metadata)."""
+        return {
+            "title": self._extract_title(root),
+            "abstract": self._extract_abstract(root),
+            "entities": self._extract_entities(root),
+            "metadata": self._extract_metadata(root),
+        }
+
+    def extract_sections(self, root: Any) -> tuple[dict[str, str], list[dict[str, Any]]]:
+        """Extract sections with this processor's strategy."""
+        if self.strategy == "v5_optimized":
+            return self._extract_sections_optimized(root)
+        if self.strategy == "baseline":
+            return self._extract_sections_baseline(root)
+        return self._extract_sections_experimental(root)
+
+    def process_root(self, root: Any, paper_id: str, shared: dict[str, Any] | None = None) -> ExtractedPaper:
+        """Process an already-parsed TEI tree.
+
+        Args:
+            root: TEI root element
+            paper_id: Paper identifier
+            shared: Output of extract_shared for this tree, when several
+                strategies process the same document
+
+        Returns:
+            Extracted paper
+        """
+        if shared is None:
+            shared = self.extract_shared(root)
+        abstract = shared["abstract"]
+        entities = shared["entities"]
+        metadata = shared["metadata"]
+
+        # Extract sections with improvements
+        sections, raw_sections = self.extract_sections(root)
+
+        # Calculate quality metrics
+        quality_metrics = self._calculate_quality_metrics(abstract, sections, entities, metadata)
+
+        # Update statistics
+        self._update_stats(abstract, sections, entities, quality_metrics)
+
+        return ExtractedPaper(
+            paper_id=paper_id,
+            title=shared["title"],
+            abstract=abstract,
+            sections=sections,
+            raw_sections=raw_sections,
+            entities=entities,
+            metadata=metadata,
+            quality_metrics=quality_metrics,
+            extraction_timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            post_processing_version=f"{self.strategy}_1.0",
+        )
+
     def _extract_title(self, root: Any) -> str:
         """Extract paper title."""
         title_elem = root.find(".//tei:titleStmt/tei:title", self.ns)
@@ -280,33 +428,16 @@ class GrobidPostProcessor:
 
     def _detect_section_type(self, header_lower: str) -> str | None:
         """Detect section type using case-insensitive patterns."""
-        for section_type, patterns in self.SECTION_PATTERNS.items():
-            for pattern in patterns:
-                if pattern in header_lower:
-                    return section_type
-        return None
+        return self.classifier.lookup(header_lower)[0]
 
     def _detect_section_type_advanced(
         self, header_lower: str, position: int, all_sections: list[dict[str, Any]]
     ) -> str | None:
         """Advanced section detection with context awareness."""
-        # First try standard patterns
-        section_type = self._detect_section_type(header_lower)
-        if section_type:
-            return section_type
-
-        # Try numbered sections (e.g., "1. Introduction", "2. Methods")
-        numbered_patterns = {
-            r"^\d+\.?\s*introduction": "introduction",
-            r"^\d+\.?\s*(method|approach|material)": "methods",
-            r"^\d+\.?\s*(result|experiment)": "results",
-            r"^\d+\.?\s*discussion": "discussion",
-            r"^\d+\.?\s*conclusion": "conclusion",
-        }
-
-        for pattern, section_type in numbered_patterns.items():
-            if re.match(pattern, header_lower):
-                return section_type
+        # First try standard patterns, then numbered sections (e.g., "1. Introduction", "2. Methods")
+        section_type, numbered_type = self.classifier.lookup(header_lower)
+        if section_type or numbered_type:
+            return section_type or numbered_type
 
         # Context-based detection
         if position == 0 and len(header_lower) > config.MAX_RETRIES_DEFAULT:
@@ -517,16 +648,27 @@ class GrobidPostProcessor:
             if paper:
                 results.append(paper)
 
-                # Save processed paper
-                output_file = output_dir / f"{paper.paper_id}_processed.json"
-                with open(output_file, "w") as f:
-                    json.dump(asdict(paper), f, indent=2)
+                self.save_paper(paper, output_dir)
 
         # Generate statistics report
         self._generate_report(output_dir, results)
 
+        self.classifier.save()
+        logger.info(
+            "Header classifier: %s cached lookups, %s classified (%s loaded from vocabulary)",
+            self.classifier.stats["hits"],
+            self.classifier.stats["misses"],
+            self.classifier.stats["loaded"],
+        )
+
         return self.stats
 
+    def save_paper(self, paper: ExtractedPaper, output_dir: Path) -> None:
+        """Write a processed paper as ``<paper_id>_processed.json``."""
+        output_file = output_dir / f"{paper.paper_id}_processed.json"
+        with open(output_file, "w") as f:
+            json.dump(asdict(paper), f, indent=2)
+
     def _generate_report(self, output_dir: Path, results: list[ExtractedPaper]) -> None:
         """Generate processing report."""
         report_lines = [
@@ -591,41 +733,107 @@ class GrobidPostProcessor:
         logger.info("Report saved to: %s", report_path)
 
 
-def compare_strategies(xml_dir: Path, output_dir: Path) -> None:
-    """Compare different post-processing strategies."""
-    strategies = ["baseline", "v5_optimized", "experimental"]
-    comparison_results = {}
-
-    for strategy in strategies:
-        logger.info("\n%s", "=" * 60)
-        logger.info("Testing strategy: %s", strategy)
-        logger.info("%s", "=" * 60)
+STRATEGIES = ["baseline", "v5_optimized", "experimental"]
+
+
+def compare_strategies(
+    xml_dir: Path,
+    output_dir: Path,
+    strategies: list[str] | None = None,
+    write_outputs: bool = False,
+    header_vocabulary: Path | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Compare post-processing strategies in a single pass over the corpus.
+
+    Each XML file is parsed once and its strategy-independent parts (title,
+    abstract, entities, metadata) are extracted once; every strategy then
+    runs its section extraction on the shared tree. Evaluating a strategy
+    therefore costs its section-extraction time, not another full parse.
+
+    Args:
+        xml_dir: Directory containing Grobid XML files
+        output_dir: Directory for the comparison report (and per-strategy
+            outputs when write_outputs is set)
+        strategies: Strategies to compare (default: all)
+        write_outputs: Also write per-strategy ``_processed.json`` files and reports
+        header_vocabulary: Optional persisted header vocabulary shared by all strategies
+
+    Returns:
+        Statistics per strategy (including ``section_time`` in seconds)
+    """
+    strategies = strategies or STRATEGIES
+    xml_files = list(xml_dir.glob("*.xml"))
+    logger.info("Comparing %s strategies on %s XML files", len(strategies), len(xml_files))
+
+    classifier = HeaderClassifier(GrobidPostProcessor.SECTION_PATTERNS, header_vocabulary)
+    processors = {strategy: GrobidPostProcessor(strategy, classifier=classifier) for strategy in strategies}
+    results: dict[str, list[ExtractedPaper]] = {strategy: [] for strategy in strategies}
+    quality_scores: dict[str, list[float]] = {strategy: [] for strategy in strategies}
+    section_time = dict.fromkeys(strategies, 0.0)
+    parse_time = 0.0
+    shared_processor = processors[strategies[0]]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if write_outputs:
+        for strategy in strategies:
+            (output_dir / strategy).mkdir(parents=True, exist_ok=True)
 
-        processor = GrobidPostProcessor(strategy=strategy)
-        strategy_output = output_dir / strategy
-        stats = processor.process_directory(xml_dir, strategy_output)
-        comparison_results[strategy] = stats
+    for xml_file in xml_files:
+        try:
+            start = time.perf_counter()
+            root = ElementTree.parse(xml_file).getroot()
+            shared = shared_processor.extract_shared(root)
+            parse_time += time.perf_counter() - start
+
+            for strategy, processor in processors.items():
+                start = time.perf_counter()
+                paper = processor.process_root(root, xml_file.stem, shared)
+                section_time[strategy] += time.perf_counter() - start
+
+                quality_scores[strategy].append(paper.quality_metrics["extraction_completeness"])
+                if write_outputs:
+                    processor.save_paper(paper, output_dir / strategy)
+                    results[strategy].append(paper)
+        except Exception as e:
+            logger.error("Error processing %s: %s", xml_file, e)
+
+    if write_outputs:
+        for strategy, processor in processors.items():
+            processor._generate_report(output_dir / strategy, results[strategy])
+    classifier.save()
+
+    comparison_results: dict[str, dict[str, Any]] = {}
+    for strategy, processor in processors.items():
+        scores = quality_scores[strategy]
+        comparison_results[strategy] = {
+            **processor.stats,
+            "avg_completeness": sum(scores) / len(scores) if scores else 0.0,
+            "high_quality": sum(1 for score in scores if score >= config.HIGH_QUALITY_SCORE_THRESHOLD),
+            "section_time": section_time[strategy],
+        }
 
     # Generate comparison report
     report_lines = [
         "# Post-Processing Strategy Comparison",
         f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}",
         "",
+        f"Papers: {len(xml_files)} | Shared parse + extraction: {parse_time:.1f}s",
+        "",
         "## Results by Strategy",
         "",
+        "| Metric | " + " | ".join(strategies) + " |",
+        "|--------|" + "|".join("-" * (len(strategy) + 2) for strategy in strategies) + "|",
     ]
 
-    # Create comparison table
-    report_lines.append("| Metric | Baseline | V5 Optimized | Experimental |")
-    report_lines.append("|--------|----------|--------------|--------------|")
-
     metrics_to_compare: list[tuple[str, str | Callable[[dict[str, Any]], int]]] = [
         ("Abstracts", "abstracts_extracted"),
         ("Introduction", lambda s: s["sections_found"].get("introduction", 0)),
         ("Methods", lambda s: s["sections_found"].get("methods", 0)),
         ("Results", lambda s: s["sections_found"].get("results", 0)),
         ("Discussion", lambda s: s["sections_found"].get("discussion", 0)),
+        ("Conclusion", lambda s: s["sections_found"].get("conclusion", 0)),
         ("Needs Retry", "papers_needing_retry"),
+        ("High quality (80+)", "high_quality"),
     ]
 
     for label, metric in metrics_to_compare:
@@ -639,6 +847,16 @@ def compare_strategies(xml_dir: Path, output_dir: Path) -> None:
             row += f" {value}/{total} ({pct:.1f}%) |"
         report_lines.append(row)
 
+    report_lines.append(
+        "| Avg completeness |"
+        + "".join(f" {comparison_results[s]['avg_completeness']:.1f}/100 |" for s in strategies)
+    )
+    report_lines.append(
+        "| Section time |" + "".join(f" {comparison_results[s]['section_time']:.1f}s |" for s in strategies)
+    )
+
+    print("\n".join(report_lines[3:]))
+
     comparison_report = output_dir / f"comparison_report_{time.strftime('%Y%m%d_%H%M%S')}.md"
     with open(comparison_report, "w") as f:
         f.write("\n".join(report_lines))
@@ -646,15 +864,18 @@ def compare_strategies(xml_dir: Path, output_dir: Path) -> None:
     logger.info("\nComparison report saved to: %s", comparison_report)
 
     # Show key improvements
-    baseline_results = comparison_results["baseline"]["sections_found"].get("results", 0)
-    optimized_results = comparison_results["v5_optimized"]["sections_found"].get("results", 0)
+    if "baseline" in comparison_results and "v5_optimized" in comparison_results:
+        baseline_results = comparison_results["baseline"]["sections_found"].get("results", 0)
+        optimized_results = comparison_results["v5_optimized"]["sections_found"].get("results", 0)
+
+        if baseline_results > 0:
+            improvement = (optimized_results - baseline_results) / baseline_results * 100
+            logger.info(
+                "\n🎯 Key Finding: Results section extraction improved by %.1f%% with v5 optimizations!",
+                improvement,
+            )
 
-    if baseline_results > 0:
-        improvement = (optimized_results - baseline_results) / baseline_results * 100
-        logger.info(
-            "\n🎯 Key Finding: Results section extraction improved by %.1f%% with v5 optimizations!",
-            improvement,
-        )
+    return comparison_results
 
 
 if __name__ == "__main__":
@@ -671,17 +892,33 @@ if __name__ == "__main__":
     parser.add_argument(
         "--strategy",
         default="v5_optimized",
-        choices=["baseline", "v5_optimized", "experimental"],
+        choices=STRATEGIES,
         help="Post-processing strategy to use",
     )
-    parser.add_argument("--compare", action="store_true", help="Compare all strategies")
+    parser.add_argument("--compare", action="store_true", help="Compare all strategies in one pass")
+    parser.add_argument(
+        "--write-outputs",
+        action="store_true",
+        help="With --compare, also write per-strategy processed JSON files and reports",
+    )
+    parser.add_argument(
+        "--header-vocabulary",
+        type=Path,
+        default=config.HEADER_VOCABULARY_FILE,
+        help="Persisted section-header classification cache",
+    )
 
     args = parser.parse_args()
 
     if args.compare:
-        compare_strategies(args.xml_dir, args.output_dir)
+        compare_strategies(
+            args.xml_dir,
+            args.output_dir,
+            write_outputs=args.write_outputs,
+            header_vocabulary=args.header_vocabulary,
+        )
     else:
-        processor = GrobidPostProcessor(strategy=args.strategy)
+        processor = GrobidPostProcessor(strategy=args.strategy, header_vocabulary=args.header_vocabulary)
         stats = processor.process_directory(args.xml_dir, args.output_dir)
 
         print("\n✅ Processing complete!")
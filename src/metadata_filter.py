@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Precomputed metadata bitmaps for filtered vector search.
+
+Filtering the top-k results of an unfiltered search loses every match
+ranked below k and forces over-fetching up to ``config.MAX_SEARCH_RESULTS``.
+Instead, the papers matching a filter are resolved to their FAISS IDs up
+front and handed to ``VectorIndex.search`` as an ID selector, so the search
+only ever scores allowed papers and stays exact however selective the filter.
+
+Attributes are precomputed per paper in index ID order:
+
+- study type (keys of ``config.STUDY_TYPE_MARKERS``) and full-text
+  availability: one packed bitmap per value
+- quality: one bitmap per grade threshold (``config.QUALITY_*``), plus the
+  raw scores for a ``quality_min`` between grades
+- year: a sorted array, so a year range is two binary searches
+
+The table is stored in ``config.FILTER_METADATA_FILE`` and must be rebuilt
+whenever the vector index changes (``python -m src.vector_index`` does so).
+
+Usage:
+    filters = MetadataFilter.load()
+    hits = filters.search(vector_index, query, k, SearchFilter(year_min=2020, study_types=("rct",)))
+"""
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.vector_index import VectorIndex
+
+STUDY_TYPES = tuple(config.STUDY_TYPE_MARKERS)
+# Grade thresholds with a precomputed "score >= threshold" bitmap
+QUALITY_GRADES = (
+    config.QUALITY_LOW,
+    config.QUALITY_MODERATE,
+    config.QUALITY_GOOD,
+    config.QUALITY_VERY_GOOD,
+    config.QUALITY_EXCELLENT,
+)
+UNKNOWN_YEAR = 0
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """Metadata constraints of a search; ``None`` and empty values do not filter."""
+
+    year_min: int | None = None
+    year_max: int | None = None
+    quality_min: int = config.DEFAULT_QUALITY_MIN
+    study_types: tuple[str, ...] = ()
+    full_text_only: bool = False
+
+    def __post_init__(self) -> None:
+        """Reject study types that have no bitmap."""
+        unknown = [study_type for study_type in self.study_types if study_type not in STUDY_TYPES]
+        if unknown:
+            raise ValueError(
+                f"Unknown study type(s) {', '.join(map(repr, unknown))}; valid: {', '.join(STUDY_TYPES)}"
+            )
+
+    @property
+    def active(self) -> bool:
+        """Whether the filter excludes anything."""
+        return self != SearchFilter(quality_min=0)
+
+    @property
+    def cache_key(self) -> str:
+        """Filter as part of a search cache key (quality is keyed separately)."""
+        if self == SearchFilter(quality_min=self.quality_min):
+            return ""
+        types = ",".join(sorted(self.study_types))
+        return f"{self.year_min}-{self.year_max}:{types}:{int(self.full_text_only)}"
+
+
+def paper_attributes(paper: dict[str, Any]) -> tuple[int, int, str, bool]:
+    """``(year, quality score, study type, has full text)`` of a KB paper."""
+    try:
+        year = int(str(paper.get("year") or "")[:4])
+    except ValueError:
+        year = UNKNOWN_YEAR
+    quality = int(paper.get("quality_score") or 0)
+    study_type = paper.get("study_type") or "study"
+    has_full_text = bool(paper.get("has_full_text", paper.get("sections")))
+    return year, quality, study_type if study_type in STUDY_TYPES else "study", has_full_text
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    return np.packbits(mask, bitorder="little")
+
+
+class MetadataFilter:
+    """Per-paper metadata of a vector index, as bitmaps and sorted arrays over its FAISS IDs."""
+
+    def __init__(
+        self,
+        faiss_ids: np.ndarray,
+        years: np.ndarray,
+        quality: np.ndarray,
+        bitmaps: dict[str, np.ndarray],
+        index_version: str = "",
+    ):
+        """Wrap precomputed columns; position ``i`` of each describes ``faiss_ids[i]``."""
+        self.faiss_ids = faiss_ids
+        self.years = years
+        self.quality = quality
+        self.bitmaps = bitmaps
+        self.index_version = index_version
+        self.year_order = np.argsort(years, kind="stable")
+        self.sorted_years = years[self.year_order]
+
+    @classmethod
+    def build(cls, papers: list[dict[str, Any]], vector_index: VectorIndex) -> "MetadataFilter":
+        """Precompute the metadata of the papers in ``vector_index``."""
+        indexed = [paper for paper in papers if str(paper["paper_id"]) in vector_index.ids]
+        attributes = [paper_attributes(paper) for paper in indexed]
+        faiss_ids = np.array([vector_index.ids[str(paper["paper_id"])] for paper in indexed], dtype=np.int64)
+        years = np.array([year for year, *_ in attributes], dtype=np.int16)
+        quality = np.array([score for _, score, *_ in attributes], dtype=np.uint8)
+        study_types = np.array([study_type for _, _, study_type, _ in attributes])
+        full_text = np.array([has_full_text for *_, has_full_text in attributes], dtype=bool)
+
+        bitmaps = {"full_text": _pack(full_text)}
+        for study_type in STUDY_TYPES:
+            bitmaps[f"study_type:{study_type}"] = _pack(study_types == study_type)
+        for grade in QUALITY_GRADES:
+            bitmaps[f"quality:{grade}"] = _pack(quality >= grade)
+        return cls(faiss_ids, years, quality, bitmaps, vector_index.version)
+
+    def __len__(self) -> int:
+        """Number of papers described."""
+        return len(self.faiss_ids)
+
+    def _bitmap(self, name: str) -> np.ndarray:
+        return np.unpackbits(self.bitmaps[name], count=len(self), bitorder="little").view(bool)
+
+    def mask(self, search_filter: SearchFilter) -> np.ndarray:
+        """Boolean mask over papers matching ``search_filter``."""
+        mask = np.ones(len(self), dtype=bool)
+        if search_filter.year_min is not None or search_filter.year_max is not None:
+            low = np.searchsorted(self.sorted_years, search_filter.year_min or UNKNOWN_YEAR + 1, "left")
+            high = np.searchsorted(
+                self.sorted_years, search_filter.year_max or np.iinfo(np.int16).max, "right"
+            )
+            in_range = np.zeros(len(self), dtype=bool)
+            in_range[self.year_order[low:high]] = True
+            mask &= in_range
+        if search_filter.quality_min > 0:
+            if search_filter.quality_min in QUALITY_GRADES:
+                mask &= self._bitmap(f"quality:{search_filter.quality_min}")
+            else:
+                mask &= self.quality >= search_filter.quality_min
+        if search_filter.study_types:
+            types = np.zeros(len(self), dtype=bool)
+            for study_type in search_filter.study_types:
+                types |= self._bitmap(f"study_type:{study_type}")
+            mask &= types
+        if search_filter.full_text_only:
+            mask &= self._bitmap("full_text")
+        return mask
+
+    def selector_ids(self, search_filter: SearchFilter) -> np.ndarray | None:
+        """FAISS IDs of the papers matching ``search_filter``, or None if it excludes nothing."""
+        if not search_filter.active:
+            return None
+        return np.asarray(self.faiss_ids[self.mask(search_filter)])
+
+    def prune(self, vector_index: VectorIndex) -> "MetadataFilter":
+        """Metadata of the papers still in ``vector_index`` after removals."""
+        keep = np.isin(self.faiss_ids, np.fromiter(vector_index.paper_ids, np.int64))
+        bitmaps = {name: _pack(self._bitmap(name)[keep]) for name in self.bitmaps}
+        return MetadataFilter(
+            self.faiss_ids[keep], self.years[keep], self.quality[keep], bitmaps, vector_index.version
+        )
+
+    def search(
+        self,
+        vector_index: VectorIndex,
+        queries: np.ndarray,
+        k: int = config.DEFAULT_K,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Top ``k`` papers per query among those matching ``search_filter``."""
+        if vector_index.version != self.index_version:
+            raise ValueError("Metadata filter is out of date; rebuild it with: python -m src.vector_index")
+        selector_ids = self.selector_ids(search_filter) if search_filter else None
+        return vector_index.search(queries, k, selector_ids)
+
+    def save(self, path: Path = config.FILTER_METADATA_FILE) -> None:
+        """Write the precomputed metadata."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = path.with_suffix(".tmp.npz")
+        arrays: dict[str, Any] = {f"bitmap/{name}": bitmap for name, bitmap in self.bitmaps.items()}
+        with open(temp_file, "wb") as f:
+            np.savez(
+                f,
+                index_version=np.array(self.index_version),
+                faiss_ids=self.faiss_ids,
+                years=self.years,
+                quality=self.quality,
+                **arrays,
+            )
+        temp_file.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = config.FILTER_METADATA_FILE) -> "MetadataFilter | None":
+        """Read saved metadata, or None if it was never built."""
+        if not Path(path).exists():
+            return None
+        data = np.load(path)
+        bitmaps = {
+            name.removeprefix("bitmap/"): data[name] for name in data.files if name.startswith("bitmap/")
+        }
+        return cls(data["faiss_ids"], data["years"], data["quality"], bitmaps, str(data["index_version"]))
+
+
+def main() -> None:
+    """Rebuild the metadata filter for the current vector index."""
+    from src.embedding_builder import load_papers
+
+    parser = argparse.ArgumentParser(description="Precompute metadata bitmaps for filtered search")
+    parser.add_argument("--papers-dir", required=True, help="Directory of paper JSON files")
+    args = parser.parse_args()
+
+    vector_index = VectorIndex.load()
+    if vector_index is None:
+        print("No vector index; build it first with: python -m src.vector_index --papers-dir DIR")
+        return
+    filters = MetadataFilter.build(load_papers(Path(args.papers_dir)), vector_index)
+    filters.save()
+    print(f"Precomputed metadata of {len(filters)} papers ({len(filters.bitmaps)} bitmaps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""Local CrossRef/OpenAlex metadata snapshot for offline DOI and title resolution.
+
+Imports a filtered JSONL dump (one work per line) into a compact SQLite
+index with DOI and normalized-title lookups. Enrichers consult the snapshot
+first and only call the network for misses, so re-resolving a whole library
+becomes a local batch job.
+
+Accepted line formats (auto-detected per line):
+- CrossRef work: ``{"DOI", "title": [...], "issued": {"date-parts"}, "author", "container-title"}``
+- OpenAlex work: ``{"doi": "https://doi.org/...", "title", "publication_year", "authorships", ...}``
+- Flat record: ``{"doi", "title", "year", "authors": [...], "venue"}``
+
+Usage:
+    python metadata_snapshot.py --input crossref_filtered.jsonl
+    python metadata_snapshot.py --input openalex.jsonl.gz --output kb_data/metadata_snapshot.sqlite --keep-raw
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import sqlite3
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from src.config import (
+    TITLE_MATCH_THRESHOLD,
+    METADATA_SNAPSHOT_FILE,
+    METADATA_SNAPSHOT_IMPORT_BATCH,
+)
+from src.pipeline_utils import clean_doi
+from src.title_index import TitleIndex, normalize_title
+
+# Set up module logger
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS works (
+    doi TEXT PRIMARY KEY,
+    title TEXT,
+    norm_title TEXT,
+    year INTEGER,
+    authors TEXT,
+    venue TEXT,
+    source TEXT,
+    raw BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_works_norm_title ON works (norm_title);
+"""
+
+
+def _first(value: Any) -> Any:
+    """Return the first element of a list value, or the value itself."""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def normalize_work(work: dict[str, Any]) -> dict[str, Any] | None:
+    """Convert a CrossRef, OpenAlex or flat record into a snapshot row.
+
+    Args:
+        work: One parsed JSONL line
+
+    Returns:
+        Row dict with doi/title/year/authors/venue/source, or None if the
+        record has no valid DOI
+    """
+    if "DOI" in work:
+        # CrossRef work
+        doi = clean_doi(work.get("DOI"))
+        title = _first(work.get("title"))
+        year = None
+        for date_field in ("published-print", "published-online", "issued"):
+            date_parts = (work.get(date_field) or {}).get("date-parts")
+            if date_parts and date_parts[0] and date_parts[0][0]:
+                year = date_parts[0][0]
+                break
+        authors = [
+            f"{a.get('given', '')} {a.get('family', '')}".strip() or a.get("name", "")
+            for a in work.get("author", [])
+        ]
+        venue = _first(work.get("container-title"))
+        source = "crossref"
+    elif "authorships" in work or "publication_year" in work or "openalex" in str(work.get("id", "")):
+        # OpenAlex work
+        doi = clean_doi(work.get("doi"))
+        title = work.get("title") or work.get("display_name")
+        year = work.get("publication_year")
+        authors = [(a.get("author") or {}).get("display_name", "") for a in work.get("authorships", []) or []]
+        location = work.get("primary_location") or {}
+        venue = (location.get("source") or {}).get("display_name")
+        source = "openalex"
+    else:
+        # Flat record
+        doi = clean_doi(work.get("doi"))
+        title = work.get("title")
+        year = work.get("year")
+        authors = [a.get("name", "") if isinstance(a, dict) else str(a) for a in work.get("authors", [])]
+        venue = work.get("venue") or work.get("journal")
+        source = work.get("source", "snapshot")
+
+    if not doi:
+        return None
+
+    try:
+        year = int(year) if year else None
+    except (TypeError, ValueError):
+        year = None
+
+    return {
+        "doi": doi.lower(),
+        "title": title,
+        "year": year,
+        "authors": [a for a in authors if a],
+        "venue": venue,
+        "source": source,
+    }
+
+
+def iter_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield parsed records from a JSONL (optionally gzipped) dump, skipping bad lines."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping malformed line %d in %s: %s", line_number, path.name, e)
+
+
+def import_snapshot(
+    jsonl_path: Path, db_path: Path = METADATA_SNAPSHOT_FILE, keep_raw: bool = False
+) -> dict[str, int]:
+    """Load a JSONL metadata dump into the on-disk snapshot index.
+
+    Re-importing the same DOI replaces the earlier row, so snapshots can be
+    refreshed incrementally.
+
+    Args:
+        jsonl_path: JSONL or JSONL.gz dump, one work per line
+        db_path: SQLite index to create or extend
+        keep_raw: Also store the compressed source record so enrichers can
+            re-derive their full field set without network I/O
+
+    Returns:
+        Import statistics (read, imported, skipped)
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    stats = {"read": 0, "imported": 0, "skipped": 0}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.executescript(_SCHEMA)
+            batch: list[tuple[Any, ...]] = []
+
+            for work in iter_jsonl(jsonl_path):
+                stats["read"] += 1
+                row = normalize_work(work)
+                if row is None:
+                    stats["skipped"] += 1
+                    continue
+
+                raw = zlib.compress(json.dumps(work).encode("utf-8")) if keep_raw else None
+                batch.append(
+                    (
+                        row["doi"],
+                        row["title"],
+                        normalize_title(row["title"]),
+                        row["year"],
+                        json.dumps(row["authors"]),
+                        row["venue"],
+                        row["source"],
+                        raw,
+                    )
+                )
+
+                if len(batch) >= METADATA_SNAPSHOT_IMPORT_BATCH:
+                    conn.executemany("INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                    stats["imported"] += len(batch)
+                    batch = []
+
+            if batch:
+                conn.executemany("INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                stats["imported"] += len(batch)
+    finally:
+        conn.close()
+
+    return stats
+
+
+class MetadataSnapshot:
+    """Read-only lookups against an imported metadata snapshot."""
+
+    def __init__(self, db_path: Path = METADATA_SNAPSHOT_FILE):
+        """Open a snapshot index.
+
+        Args:
+            db_path: SQLite index produced by import_snapshot
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+        self._title_index: TitleIndex | None = None
+        # Per lookup: a DOI miss that resolve() then finds by title is one doi_miss and one title_hit
+        self.stats: dict[str, int] = {
+            "doi_hits": 0,
+            "doi_misses": 0,
+            "title_hits": 0,
+            "title_misses": 0,
+            "title_ambiguous": 0,
+        }
+
+    @classmethod
+    def open_default(cls, db_path: Path | None = None) -> "MetadataSnapshot | None":
+        """Open the snapshot if it exists, otherwise return None (network-only mode)."""
+        path = db_path or METADATA_SNAPSHOT_FILE
+        if not path.exists():
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning("Could not open metadata snapshot %s: %s", path, e)
+            return None
+
+    def __enter__(self) -> "MetadataSnapshot":
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the connection on exit."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of works in the snapshot."""
+        return int(self.conn.execute("SELECT COUNT(*) FROM works").fetchone()[0])
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self.conn.close()
+
+    def _to_record(self, row: sqlite3.Row) -> dict[str, Any]:
+        """Convert a database row into a work record."""
+        record: dict[str, Any] = {
+            "doi": row["doi"],
+            "title": row["title"],
+            "year": row["year"],
+            "authors": json.loads(row["authors"]) if row["authors"] else [],
+            "venue": row["venue"],
+            "source": row["source"],
+        }
+        if row["raw"] is not None:
+            record["raw"] = json.loads(zlib.decompress(row["raw"]))
+        return record
+
+    def lookup_doi(self, doi: str | None) -> dict[str, Any] | None:
+        """Resolve a DOI locally.
+
+        Args:
+            doi: DOI in any form accepted by clean_doi
+
+        Returns:
+            Work record (with ``raw`` if imported with keep_raw) or None
+        """
+        cleaned = clean_doi(doi)
+        if not cleaned:
+            return None
+        row = self.conn.execute("SELECT * FROM works WHERE doi = ?", (cleaned.lower(),)).fetchone()
+        if row is None:
+            self.stats["doi_misses"] += 1
+            return None
+        self.stats["doi_hits"] += 1
+        return self._to_record(row)
+
+    def lookup_title(
+        self,
+        title: str | None,
+        year: int | str | None = None,
+        fuzzy: bool = False,
+        threshold: float = TITLE_MATCH_THRESHOLD,
+    ) -> dict[str, Any] | None:
+        """Resolve a title locally.
+
+        Exact normalized-title matches are found through the SQLite index; a
+        title shared by several works only resolves when the year leaves exactly
+        one. With ``fuzzy`` a MinHash/LSH title index over the snapshot is built
+        on first use and queried for near matches.
+
+        Args:
+            title: Title to resolve
+            year: Optional year; required to pick one of several exact matches
+            fuzzy: Fall back to fuzzy matching when no exact match exists
+            threshold: Minimum shingle similarity for fuzzy matches
+
+        Returns:
+            Best matching work record or None
+        """
+        norm_title = normalize_title(title)
+        if not norm_title:
+            return None
+
+        rows = self.conn.execute("SELECT * FROM works WHERE norm_title = ?", (norm_title,)).fetchall()
+        if len(rows) > 1 and year:
+            rows = [r for r in rows if r["year"] is not None and str(r["year"]) == str(year)]
+        if len(rows) == 1:
+            self.stats["title_hits"] += 1
+            return self._to_record(rows[0])
+        if rows:
+            # Several works share the title and the year does not single one out
+            self.stats["title_ambiguous"] += 1
+            self.stats["title_misses"] += 1
+            return None
+
+        if fuzzy:
+            match = self._get_title_index().best_match(title, threshold=threshold)
+            if match:
+                row = self.conn.execute("SELECT * FROM works WHERE doi = ?", (match[0],)).fetchone()
+                if row is not None:
+                    self.stats["title_hits"] += 1
+                    return self._to_record(row)
+
+        self.stats["title_misses"] += 1
+        return None
+
+    def _get_title_index(self) -> TitleIndex:
+        """Build the fuzzy title index lazily."""
+        if self._title_index is None:
+            self._title_index = TitleIndex()
+            for doi, title in self.conn.execute("SELECT doi, title FROM works WHERE title IS NOT NULL"):
+                self._title_index.add(doi, title)
+        return self._title_index
+
+    def resolve(self, paper: dict[str, Any], fuzzy: bool = False) -> dict[str, Any] | None:
+        """Resolve a paper record by DOI, then by title (and year).
+
+        Args:
+            paper: Paper dict with any of doi/title/year
+            fuzzy: Allow fuzzy title matches
+
+        Returns:
+            Work record or None
+        """
+        record = self.lookup_doi(paper.get("doi"))
+        if record is None and paper.get("title"):
+            record = self.lookup_title(paper["title"], paper.get("year"), fuzzy=fuzzy)
+        return record
+
+
+def main() -> None:
+    """Import a JSONL metadata dump into the snapshot index."""
+    parser = argparse.ArgumentParser(description="Build local CrossRef/OpenAlex metadata snapshot index")
+    parser.add_argument("--input", required=True, help="JSONL (or .jsonl.gz) dump, one work per line")
+    parser.add_argument("--output", default=str(METADATA_SNAPSHOT_FILE), help="SQLite index path")
+    parser.add_argument(
+        "--keep-raw", action="store_true", help="Store compressed source records for offline re-derivation"
+    )
+
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"Error: Input file {input_path} does not exist")
+        return
+
+    stats = import_snapshot(input_path, Path(args.output), keep_raw=args.keep_raw)
+
+    print("\n" + "=" * 60)
+    print("METADATA SNAPSHOT IMPORT COMPLETE")
+    print("=" * 60)
+    print(f"Records read: {stats['read']}")
+    print(f"Records imported: {stats['imported']}")
+    print(f"Skipped (no valid DOI): {stats['skipped']}")
+    print(f"Index: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,9 @@ from src.config import (
 )
 import statistics
 from src import config
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus
+from src.response_cache import ResponseCache
 
 
 def create_session(email: str | None = None) -> requests.Session:
@@ -243,9 +246,16 @@ def process_work(work: dict[str, Any]) -> dict[str, Any]:
 
 
 def enrich_batch(
-    session: requests.Session, dois: list[str], batch_size: int = 50
+    session: requests.Session,
+    dois: list[str],
+    batch_size: int = config.OPENALEX_BATCH_SIZE,
+    raw_works: dict[str, dict[str, Any]] | None = None,
 ) -> dict[str, dict[str, Any]]:
-    """Enrich multiple papers in a single API call."""
+    """Enrich multiple papers in a single API call.
+
+    If ``raw_works`` is given, the unprocessed work for each found DOI is
+    stored in it so fields can later be re-derived without the API.
+    """
     results: dict[str, dict[str, Any]] = {}
     base_url = "https://api.openalex.org"
 
@@ -285,6 +295,8 @@ def enrich_batch(
                 clean_doi_result = processed["doi"].lower()
                 original_doi = doi_map.get(clean_doi_result, clean_doi_result)
                 results[original_doi] = processed
+                if raw_works is not None:
+                    raw_works[original_doi] = work
 
     except Exception as e:
         print(f"Error in batch enrichment: {e}")
@@ -292,6 +304,17 @@ def enrich_batch(
     return results
 
 
+def apply_enrichment(paper: dict[str, Any], enrichment: dict[str, Any]) -> dict[str, Any]:
+    """Add OpenAlex fields to a paper with the openalex_ prefix and mark it enriched."""
+    for key, value in enrichment.items():
+        if value is not None:
+            paper[f"openalex_{key}"] = value
+
+    paper["openalex_enriched"] = True
+    paper["openalex_enriched_date"] = datetime.now(UTC).isoformat()
+    return paper
+
+
 def load_checkpoint(checkpoint_file: Path) -> dict[str, Any]:
     """Load checkpoint data if it exists."""
     if checkpoint_file.exists():
@@ -443,6 +466,9 @@ def main() -> None:
 
     # Create output directory
     output_path.mkdir(parents=True, exist_ok=True)
+    coverage = CoverageIndex.open(output_path, checkpoint_file)
+    status = PaperStatus.open("openalex", output_path, has_openalex_data)
+    response_cache = ResponseCache("openalex", output_path)
 
     # Reset checkpoint if requested
     if args.reset and checkpoint_file.exists():
@@ -472,6 +498,7 @@ def main() -> None:
     paper_files = list(input_path.glob("*.json"))
     if not paper_files:
         print("No papers found in input directory")
+        coverage.finish()
         return
 
     print(f"\nFound {len(paper_files)} total papers")
@@ -481,6 +508,7 @@ def main() -> None:
     papers_with_dois = []
     papers_by_doi = {}
     papers_without_doi = []
+    papers_to_rederive: dict[str, tuple[dict[str, Any], dict[str, Any]]] = {}
     skipped_already_enriched = 0
 
     for paper_file in paper_files:
@@ -489,30 +517,33 @@ def main() -> None:
 
         paper_id = paper_file.stem
 
-        # Skip if already processed
-        if paper_id in processed_papers:
+        # Skip if already processed or enriched (unless force mode); outdated versions override both
+        reason = "forced" if args.force else status.needs(paper_id)
+        if paper_id in processed_papers and reason not in ("stale", "rederive"):
             continue
 
         # Apply max papers limit if specified
         if args.max_papers and len(papers_to_process) >= args.max_papers:
             break
 
+        if reason is None:
+            skipped_already_enriched += 1
+            processed_papers.add(paper_id)
+            continue
+
         with open(paper_file) as f:
             paper = json.load(f)
 
-            # Skip if already enriched (unless force mode)
-            if not args.force and has_openalex_data(paper):
-                skipped_already_enriched += 1
-                processed_papers.add(paper_id)
-                continue
-
-            papers_to_process.append(paper_file)
-            doi = paper.get("doi")
-            if doi:
-                papers_with_dois.append((paper_id, doi))
-                papers_by_doi[doi] = paper
-            else:
-                papers_without_doi.append(paper_id)
+        papers_to_process.append(paper_file)
+        work = response_cache.get(paper_id) if reason == "rederive" else None
+        doi = paper.get("doi")
+        if work is not None:
+            papers_to_rederive[paper_id] = (paper, work)
+        elif doi:
+            papers_with_dois.append((paper_id, doi))
+            papers_by_doi[doi] = paper
+        else:
+            papers_without_doi.append(paper_id)
 
     print(f"Papers to process: {len(papers_to_process)}")
     if skipped_already_enriched > 0:
@@ -520,11 +551,14 @@ def main() -> None:
     print(f"Papers with DOIs: {len(papers_with_dois)}")
     if papers_without_doi:
         print(f"Papers without DOIs: {len(papers_without_doi)}")
+    if papers_to_rederive:
+        print(f"Re-derived from cached responses: {len(papers_to_rederive)}")
     if args.force:
         print("Force mode: Re-enriching all papers")
 
     if not papers_to_process:
         print("\nAll papers already processed!")
+        coverage.finish()
         analyze_enrichment_results(output_path)
         return
 
@@ -535,6 +569,15 @@ def main() -> None:
 
     start_time = time.time()
 
+    # Re-derive fields for papers whose cached work predates the current process_work
+    for paper_id, (paper, work) in papers_to_rederive.items():
+        apply_enrichment(paper, process_work(work))
+        with open(output_path / f"{paper_id}.json", "w") as f:
+            json.dump(paper, f, indent=2)
+        coverage.record(paper_id, paper)
+        status.record(paper_id, success=True, cached=True)
+        processed_papers.add(paper_id)
+
     # Process papers with DOIs in batches
     for i in range(last_batch * args.batch_size, len(papers_with_dois), args.batch_size):
         batch = papers_with_dois[i : i + args.batch_size]
@@ -545,24 +588,23 @@ def main() -> None:
         # Extract DOIs
         batch_dois = [doi for _, doi in batch]
 
-        # Enrich batch
-        batch_results = enrich_batch(session, batch_dois, args.batch_size)
+        # Enrich the checkpoint batch in API calls of OPENALEX_BATCH_SIZE DOIs
+        raw_works: dict[str, dict[str, Any]] = {}
+        batch_results: dict[str, dict[str, Any]] = {}
+        for start in range(0, len(batch_dois), config.OPENALEX_BATCH_SIZE):
+            call_dois = batch_dois[start : start + config.OPENALEX_BATCH_SIZE]
+            batch_results.update(enrich_batch(session, call_dois, raw_works=raw_works))
 
         # Save enriched papers
         for paper_id, doi in batch:
             original_paper = papers_by_doi[doi].copy()
 
+            cached = False
             if doi in batch_results:
                 enrichment = batch_results[doi]
-
-                # Add OpenAlex fields with prefix
-                for key, value in enrichment.items():
-                    if value is not None:
-                        original_paper[f"openalex_{key}"] = value
-
-                # Add enrichment marker
-                original_paper["openalex_enriched"] = True
-                original_paper["openalex_enriched_date"] = datetime.now(UTC).isoformat()
+                apply_enrichment(original_paper, enrichment)
+                if doi in raw_works:
+                    cached = response_cache.put(paper_id, raw_works[doi])
 
                 enriched_count += 1
                 print(f"  ✓ {paper_id}: enriched with {len(enrichment)} fields")
@@ -574,6 +616,8 @@ def main() -> None:
             output_file = output_path / f"{paper_id}.json"
             with open(output_file, "w") as f:
                 json.dump(original_paper, f, indent=2)
+            coverage.record(paper_id, original_paper)
+            status.record(paper_id, success=doi in batch_results, cached=cached)
 
             # Update checkpoint
             processed_papers.add(paper_id)
@@ -585,6 +629,8 @@ def main() -> None:
             "stats": {"enriched_count": enriched_count, "failed_count": failed_count},
         }
         save_checkpoint(checkpoint_file, checkpoint_data)
+        coverage.save()
+        status.save()
 
         # Rate limiting
         if batch_num < total_batches:
@@ -598,7 +644,11 @@ def main() -> None:
             paper = json.load(f)
         with open(output_file, "w") as f:
             json.dump(paper, f, indent=2)
+        coverage.record(paper_id, paper)
+        status.record(paper_id, success=False)
         processed_papers.add(paper_id)
+    coverage.save()
+    status.save()
 
     elapsed_time = time.time() - start_time
 
@@ -607,7 +657,7 @@ def main() -> None:
     total_with_dois = len([p for p in processed_papers if p not in papers_without_doi])
 
     # Generate report
-    report = {
+    report: dict[str, Any] = {
         "timestamp": datetime.now(UTC).isoformat(),
         "pipeline_stage": "openalex_enrichment",
         "statistics": {
@@ -660,6 +710,7 @@ def main() -> None:
     # Remove checkpoint file after successful completion
     if checkpoint_file.exists():
         checkpoint_file.unlink()
+    coverage.finish(report["statistics"])
 
     print("\n" + "=" * 80)
     print("ENRICHMENT COMPLETE")
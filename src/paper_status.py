@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Central per-paper stage status table shared by the enrichment stages.
+
+Every enrichment stage records, for each paper it processes, the fetch and
+derive versions it ran, when, whether the API returned data, and whether the
+raw response was cached. The table lives in
+the pipeline directory (``config.PAPER_STATUS_DIRNAME``, one file per stage so
+stages running side by side never overwrite each other's updates) and
+replaces the per-stage ``has_*_data`` checks that opened and parsed every
+existing output file just to look for a key prefix.
+
+Versions drive selective re-runs: bumping a stage's ``fetch_version`` re-queries
+its papers, while bumping ``derive_version`` (after changing how fields are
+extracted from a response) re-derives them from the cached raw responses with
+no network I/O, falling back to a re-fetch only where nothing was cached.
+
+Usage:
+    status = PaperStatus.open("s2", output_dir, has_data=enricher.has_s2_data)
+    if status.is_done(paper_id):
+        continue
+    ...
+    status.record(paper_id, success=True)
+    status.save()
+"""
+
+import json
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any
+
+from src import config
+from src.pipeline_utils import load_checkpoint, save_checkpoint_atomic
+
+STATUS_VERSION = "2"
+
+
+@dataclass(frozen=True)
+class StagePolicy:
+    """How a stage decides which papers still need it."""
+
+    fetch_version: str  # Bump when what a stage queries changes; papers are fetched again
+    derive_version: str  # Bump when field extraction changes; papers are re-derived from the cache
+    retry_failed: bool  # Re-query papers the API returned nothing for on the next run
+
+
+STAGE_POLICIES = {
+    # CrossRef and S2 mark every processed paper, found or not, so misses are not retried.
+    # Derive versions track CrossRefV5Enricher.extract_comprehensive_fields,
+    # openalex_enricher.process_work and arxiv_enricher.parse_arxiv_entry.
+    "crossref": StagePolicy("5", "1", retry_failed=False),
+    "s2": StagePolicy("1", "1", retry_failed=False),
+    # OpenAlex and PubMed only mark papers they found, so misses are retried
+    "openalex": StagePolicy("1", "1", retry_failed=True),
+    "pubmed": StagePolicy("1", "1", retry_failed=True),
+    "unpaywall": StagePolicy("1", "1", retry_failed=True),
+    "arxiv": StagePolicy("1", "1", retry_failed=False),
+}
+
+
+def status_dir(output_dir: Path) -> Path:
+    """Location of the status table for a stage writing to ``output_dir``."""
+    return Path(output_dir).parent / config.PAPER_STATUS_DIRNAME
+
+
+class PaperStatus:
+    """Per-paper status entries for one stage."""
+
+    def __init__(self, stage: str, path: Path):
+        """Create an empty status table for ``stage`` stored at ``path``."""
+        self.stage = stage
+        self.policy = STAGE_POLICIES[stage]
+        self.path = path
+        self.papers: dict[str, dict[str, Any]] = {}
+        self.loaded = False
+        self.dirty = False
+
+    @classmethod
+    def load(cls, stage: str, directory: Path) -> "PaperStatus":
+        """Read a stage's status file from a status directory (empty if missing)."""
+        status = cls(stage, Path(directory) / f"{stage}.json")
+        data = load_checkpoint(status.path)
+        if data.get("version") == STATUS_VERSION:
+            status.papers = data["papers"]
+            status.loaded = True
+        return status
+
+    @classmethod
+    def open(
+        cls,
+        stage: str,
+        output_dir: Path,
+        has_data: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> "PaperStatus":
+        """Load the status for a stage writing to ``output_dir``.
+
+        Entries for papers whose output file is gone are dropped so they are
+        processed again. When the stage has no current status file but its output
+        directory already holds papers from an earlier run, they are parsed
+        once and those passing ``has_data`` are recorded as successful.
+        """
+        status = cls.load(stage, status_dir(output_dir))
+        output_dir = Path(output_dir)
+        written = {
+            f.stem: f
+            for f in (output_dir.glob("*.json") if output_dir.exists() else [])
+            if "report" not in f.name and not f.name.startswith(".")
+        }
+        for paper_id in set(status.papers) - set(written):
+            del status.papers[paper_id]
+            status.dirty = True
+
+        if not status.loaded and has_data is not None:
+            for paper_id, json_file in written.items():
+                try:
+                    with open(json_file) as f:
+                        paper = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if has_data(paper):
+                    status.record(paper_id, success=True)
+        status.save()
+        return status
+
+    def save(self) -> bool:
+        """Persist the table if anything changed since the last save."""
+        if not self.dirty:
+            return True
+        saved = save_checkpoint_atomic(
+            self.path,
+            {"version": STATUS_VERSION, "stage": self.stage, "papers": self.papers},
+            indent=None,
+        )
+        self.dirty = not saved
+        return saved
+
+    def record(self, paper_id: str, success: bool, cached: bool = False) -> None:
+        """Record that the stage processed a paper; ``cached`` if its raw response was stored."""
+        self.papers[paper_id] = {
+            "fetch_version": self.policy.fetch_version,
+            "derive_version": self.policy.derive_version,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "success": success,
+            "cached": cached,
+        }
+        self.dirty = True
+
+    def needs(self, paper_id: str, retry_failed: bool | None = None) -> str | None:
+        """Why the stage still needs this paper, or None if it is done.
+
+        Reasons are "new", "stale" (fetch again), "failed" (retry a miss) and
+        "rederive" (re-extract fields from the cached raw response).
+        """
+        entry = self.papers.get(paper_id)
+        if entry is None:
+            return "new"
+        if entry["fetch_version"] != self.policy.fetch_version:
+            return "stale"
+        if not entry["success"]:
+            if retry_failed is None:
+                retry_failed = self.policy.retry_failed
+            return "failed" if retry_failed else None
+        if entry["derive_version"] != self.policy.derive_version:
+            return "rederive" if entry["cached"] else "stale"
+        return None
+
+    def is_done(self, paper_id: str) -> bool:
+        """Whether the stage can skip this paper."""
+        return self.needs(paper_id) is None
+
+    def pending(self, paper_ids: Iterable[str], retry_failed: bool | None = None) -> dict[str, str]:
+        """Map each paper the stage still needs to the reason it is needed."""
+        pending = {}
+        for paper_id in paper_ids:
+            reason = self.needs(paper_id, retry_failed)
+            if reason:
+                pending[paper_id] = reason
+        return pending
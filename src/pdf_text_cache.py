@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""PDF text extraction in worker processes with a sharded cache keyed by file hash.
+
+Each PDF's text is stored under the SHA-256 of its bytes in
+``config.PDF_CACHE_DIR``, sharded with ``get_shard_path``, so a KB rebuild
+never extracts an unchanged PDF again, even after it is moved or renamed,
+and adding a PDF writes one small file instead of rewriting a library-wide
+JSON cache. File hashes are memoized by path, size and modification time,
+so unchanged PDFs are not even re-read to be hashed.
+
+Extraction uses PyMuPDF and falls back to pdfplumber when PyMuPDF finds no
+text. It runs in a pool of worker processes, one per core by default. A PDF
+still extracting after ``config.PDF_TIMEOUT_SECONDS`` has its worker killed
+and replaced; timeouts and failures are cached too, so a broken PDF costs
+its timeout once rather than on every rebuild (``--retry-failed`` retries).
+
+Usage:
+    python -m src.pdf_text_cache --pdf-dir ~/Zotero/storage
+"""
+
+import argparse
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any
+
+from src import config
+from src.pipeline_utils import get_shard_path, load_checkpoint, save_checkpoint_atomic
+
+EXTRACTOR_VERSION = 1  # Bump when extraction changes so cached texts are extracted again
+HASH_CHUNK_BYTES = 1 << 20
+
+Extractor = Callable[[Path], dict[str, Any]]
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_text(pdf_path: Path) -> dict[str, Any]:
+    """Text and page count of a PDF, from PyMuPDF or else pdfplumber."""
+    import fitz
+
+    try:
+        with fitz.open(pdf_path) as document:
+            pages = [page.get_text() for page in document]
+        if "".join(pages).strip():
+            return {"text": "\n".join(pages), "pages": len(pages), "extractor": "pymupdf"}
+    except (RuntimeError, ValueError):
+        pass  # Damaged files PyMuPDF rejects are often still readable by pdfplumber
+
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        pages = [page.extract_text() or "" for page in pdf.pages]
+    return {"text": "\n".join(pages), "pages": len(pages), "extractor": "pdfplumber"}
+
+
+class PdfTextCache:
+    """Extracted PDF texts, one JSON file per PDF hash."""
+
+    def __init__(self, base_dir: Path = config.PDF_CACHE_DIR):
+        """Open the cache stored under ``base_dir``."""
+        self.base_dir = Path(base_dir)
+        self.hashes_file = self.base_dir / ".file_hashes.json"
+
+    def path(self, digest: str) -> Path:
+        """File holding the extraction of the PDF with this hash."""
+        return get_shard_path(self.base_dir, digest) / f"{digest}.json"
+
+    def get(self, digest: str) -> dict[str, Any] | None:
+        """Cached extraction of a PDF, or None if missing or from an older extractor."""
+        entry = load_checkpoint(self.path(digest))
+        return entry if entry.get("version") == EXTRACTOR_VERSION else None
+
+    def put(self, digest: str, entry: dict[str, Any]) -> dict[str, Any]:
+        """Store the extraction (text or error) of a PDF and return the stored entry."""
+        entry = {
+            **entry,
+            "sha256": digest,
+            "version": EXTRACTOR_VERSION,
+            "extracted": datetime.now(UTC).isoformat(),
+        }
+        save_checkpoint_atomic(self.path(digest), entry, indent=None)
+        return entry
+
+    def file_hashes(self, pdf_paths: list[Path]) -> list[str]:
+        """SHA-256 of each PDF, hashing only files whose size or modification time changed."""
+        memo = load_checkpoint(self.hashes_file)
+        signatures = [[path.stat().st_size, path.stat().st_mtime_ns] for path in pdf_paths]
+        digests: list[str] = []
+        stale = []
+        for position, (path, signature) in enumerate(zip(pdf_paths, signatures, strict=True)):
+            size, mtime, digest = memo.get(str(path), [None, None, ""])
+            if [size, mtime] != signature:
+                stale.append(position)
+            digests.append(digest)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                hashed = executor.map(file_sha256, [pdf_paths[position] for position in stale])
+                for position, digest in zip(stale, hashed, strict=True):
+                    digests[position] = digest
+                    memo[str(pdf_paths[position])] = [*signatures[position], digest]
+            save_checkpoint_atomic(self.hashes_file, memo, indent=None)
+        return digests
+
+
+def _worker_loop(conn: Connection, extract: Extractor) -> None:
+    while (pdf_path := conn.recv()) is not None:
+        try:
+            conn.send(extract(Path(pdf_path)))
+        except Exception as e:  # Any failure of a third-party parser is recorded, not fatal
+            conn.send({"error": f"{type(e).__name__}: {e}"})
+
+
+class _Worker:
+    """Extraction process handling one PDF at a time."""
+
+    def __init__(self, extract: Extractor):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_loop, args=(child_conn, extract), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task: tuple[Path, str] | None = None
+        self.started = 0.0
+
+    def submit(self, task: tuple[Path, str]) -> None:
+        self.task = task
+        self.started = time.monotonic()
+        self.conn.send(str(task[0]))
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        with contextlib.suppress(OSError):
+            self.conn.send(None)
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def extract_pdfs(
+    pdf_paths: list[Path],
+    cache: PdfTextCache | None = None,
+    workers: int = config.PDF_EXTRACTION_WORKERS,
+    timeout: float = config.PDF_TIMEOUT_SECONDS,
+    extract: Extractor = extract_text,
+    retry_failed: bool = False,
+) -> tuple[dict[Path, dict[str, Any]], dict[str, int]]:
+    """Text of each PDF, from the cache or extracted in worker processes.
+
+    Args:
+        pdf_paths: PDF files
+        cache: Text cache (default: ``config.PDF_CACHE_DIR``)
+        workers: Extraction processes (0: one per CPU core)
+        timeout: Seconds before a PDF's worker is killed
+        extract: Function from a PDF path to its ``text``/``pages``/``extractor``
+        retry_failed: Extract PDFs whose cached extraction failed or timed out again
+
+    Returns:
+        Tuple of (cache entry of each PDF, statistics). Entries of PDFs that
+        could not be extracted have an ``error`` instead of ``text``.
+    """
+    if cache is None:
+        cache = PdfTextCache()
+    pdf_paths = [Path(path) for path in pdf_paths]
+    digests = cache.file_hashes(pdf_paths)
+
+    results: dict[Path, dict[str, Any]] = {}
+    paths_by_digest: dict[str, list[Path]] = {}
+    for path, digest in zip(pdf_paths, digests, strict=True):
+        entry = cache.get(digest)
+        if entry is not None and not (retry_failed and "error" in entry):
+            results[path] = entry
+        else:
+            paths_by_digest.setdefault(digest, []).append(path)
+    stats = {"pdfs": len(pdf_paths), "cached": len(results), "extracted": 0, "failed": 0, "timed_out": 0}
+
+    def finish(task: tuple[Path, str], entry: dict[str, Any]) -> None:
+        stored = cache.put(task[1], entry)
+        for path in paths_by_digest[task[1]]:
+            results[path] = stored
+        stats["failed" if "error" in entry else "extracted"] += 1
+
+    todo = deque((paths[0], digest) for digest, paths in paths_by_digest.items())
+    pool = [_Worker(extract) for _ in range(min(workers or os.cpu_count() or 1, len(todo)))]
+    try:
+        while todo or any(worker.task for worker in pool):
+            for worker in pool:
+                if worker.task is None and todo:
+                    worker.submit(todo.popleft())
+            busy = [(worker, worker.task) for worker in pool if worker.task is not None]
+            next_deadline = min(worker.started for worker, _ in busy) + timeout
+            ready = wait([worker.conn for worker, _ in busy], max(next_deadline - time.monotonic(), 0))
+
+            for worker, task in busy:
+                if worker.conn in ready:
+                    try:
+                        entry = worker.conn.recv()
+                    except EOFError:  # The parser crashed the process
+                        entry = {"error": "Extraction process crashed"}
+                        worker.kill()
+                        pool[pool.index(worker)] = _Worker(extract)
+                    worker.task = None
+                    finish(task, entry)
+                elif time.monotonic() - worker.started >= timeout:
+                    worker.kill()
+                    pool[pool.index(worker)] = _Worker(extract)
+                    finish(task, {"error": f"Timed out after {timeout:g}s"})
+                    stats["timed_out"] += 1
+    finally:
+        for worker in pool:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+    return results, stats
+
+
+def main() -> None:
+    """Extract the text of every PDF in a directory, reusing cached extractions."""
+    parser = argparse.ArgumentParser(description="Extract PDF text into the hash-keyed cache")
+    parser.add_argument(
+        "--pdf-dir", default=str(config.DEFAULT_ZOTERO_PATH / "storage"), help="Directory searched for PDFs"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.PDF_EXTRACTION_WORKERS,
+        help="Extraction processes (0: all cores)",
+    )
+    parser.add_argument("--retry-failed", action="store_true", help="Retry PDFs that failed or timed out")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(Path(args.pdf_dir).expanduser().rglob("*.pdf"))
+    start = time.perf_counter()
+    _, stats = extract_pdfs(pdf_paths, workers=args.workers, retry_failed=args.retry_failed)
+    print(
+        f"{stats['pdfs']} PDFs: {stats['cached']} cached, {stats['extracted']} extracted, "
+        f"{stats['failed']} failed ({stats['timed_out']} timed out) in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,12 @@
 
 This enhanced version uses checkpoint-enabled scripts for all stages,
 allowing seamless resume after interruptions.
+
+Stages are scheduled from their data dependencies. By default every stage
+reads the previous stage's output; with ``--parallel`` the enrichers after
+CrossRef (which only need the DOI, PMID or arXiv ID present by then) read the
+CrossRef output directly and run concurrently against their separate API
+hosts, and their deltas are merged into ``10_final_output``.
 """
 
 from src import config
@@ -14,13 +20,72 @@ from datetime import datetime, UTC
 import argparse
 import time
 import json
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Any
 
+from src.stage_manifest import read_stage
+from src.stage_merge import merge_stage_deltas
+from src.work_planner import STAGE_SPECS, format_plan, plan_pipeline
+
+
+STAGE_ORDER = ["tei_extraction", "zotero", "crossref", "s2", "openalex", "unpaywall", "pubmed", "arxiv"]
+
+# Enrichers that only need identifiers present after CrossRef, each on its own API host
+PARALLEL_STAGES = ("s2", "openalex", "unpaywall", "pubmed", "arxiv")
+
+
+def stage_dependencies(parallel: bool) -> dict[str, tuple[str, ...]]:
+    """Stages each stage needs output from: a chain, or a fan-out after CrossRef."""
+    dependencies = {stage: tuple(STAGE_ORDER[i - 1 : i]) for i, stage in enumerate(STAGE_ORDER)}
+    if parallel:
+        dependencies.update(dict.fromkeys(PARALLEL_STAGES, ("crossref",)))
+    return dependencies
+
+
+def run_stage_graph(
+    stages: list[str], dependencies: dict[str, tuple[str, ...]], run_stage: Callable[[str], bool]
+) -> list[str]:
+    """Run ``stages`` as soon as the stages they depend on succeed.
+
+    Dependencies outside ``stages`` count as already done. Independent stages
+    run concurrently; after a failure no new stages start. Returns the stages
+    that failed.
+    """
+    done: set[str] = set()
+    failed: list[str] = []
+    waiting = list(stages)
+    running: dict[Future[bool], str] = {}
+    with ThreadPoolExecutor(max_workers=max(len(stages), 1)) as executor:
+        while waiting or running:
+            ready = [
+                stage
+                for stage in waiting
+                if not failed and all(dep in done or dep not in stages for dep in dependencies[stage])
+            ]
+            for stage in ready:
+                waiting.remove(stage)
+                running[executor.submit(run_stage, stage)] = stage
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                if future.result():
+                    done.add(stage)
+                else:
+                    failed.append(stage)
+    return failed
+
 
 def wait_for_stage_completion(
     output_dir: Path, expected_count: int | None = None, timeout: int = 300, stage_name: str = ""
 ) -> int:
-    """Wait for a stage to complete by monitoring file count stability."""
+    """Wait for a stage to complete.
+
+    Returns as soon as the stage's manifest is marked complete; for stages
+    without a manifest, waits for the paper count to stay stable.
+    """
     print(f"Waiting for {stage_name} to complete...")
 
     stable_count = 0
@@ -29,7 +94,11 @@ def wait_for_stage_completion(
 
     start_time = time.time()
     while time.time() - start_time < timeout:
-        current_count = len(list(output_dir.glob("*.json")))
+        manifest = read_stage(output_dir)
+        current_count = manifest.count
+        if manifest.complete:
+            print(f"✓ Stage complete with {current_count} files")
+            return current_count
 
         if current_count == stable_count:
             stable_iterations += 1
@@ -56,13 +125,10 @@ def run_command_sync(
     print(f"Command: {cmd}")
     print("=" * 60)
 
-    # Count input files if provided
+    # Count input papers from the input stage's manifest
     input_count = 0
     if input_dir and input_dir.exists():
-        # Exclude report and checkpoint files
-        input_count = len(
-            [f for f in input_dir.glob("*.json") if "report" not in f.name and not f.name.startswith(".")]
-        )
+        input_count = read_stage(input_dir).count
         print(f"Input files: {input_count}")
 
     # Convert string command to list for security
@@ -97,17 +163,18 @@ def run_command_sync(
 
 
 def verify_stage_completion(stage_dir: Path, min_files: int = 1) -> bool:
-    """Verify a stage has completed with expected output."""
+    """Verify a stage has completed with expected output.
+
+    A stage whose manifest is not marked complete was interrupted and is
+    reported as incomplete so it resumes from its checkpoint.
+    """
     if not stage_dir.exists():
         return False
 
-    json_files = [
-        f for f in stage_dir.glob("*.json") if "report" not in f.name and not f.name.startswith(".")
-    ]
-    xml_files = list(stage_dir.glob("*.xml"))
-
-    total_files = len(json_files) + len(xml_files)
-    return total_files >= min_files
+    manifest = read_stage(stage_dir)
+    if manifest.from_manifest and not manifest.complete:
+        return False
+    return manifest.count >= min_files
 
 
 def main() -> None:
@@ -121,19 +188,27 @@ def main() -> None:
     parser.add_argument(
         "--start-from",
         default="tei_extraction",
-        choices=["tei_extraction", "zotero", "crossref", "s2", "openalex", "unpaywall", "pubmed", "arxiv"],
+        choices=STAGE_ORDER,
         help="Start from specific stage",
     )
     parser.add_argument(
         "--stop-after",
         default=None,
-        choices=["tei_extraction", "zotero", "crossref", "s2", "openalex", "unpaywall", "pubmed", "arxiv"],
+        choices=STAGE_ORDER,
         help="Stop after specific stage",
     )
     parser.add_argument("--force", action="store_true", help="Force re-run even if stage appears complete")
     parser.add_argument(
         "--reset-checkpoints", action="store_true", help="Reset all checkpoints and start fresh"
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run the enrichers after CrossRef concurrently and merge their output",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the enrichment work plan and estimates, then exit"
+    )
 
     args = parser.parse_args()
 
@@ -169,6 +244,10 @@ def main() -> None:
     # Add reset flag to commands if requested
     reset_flag = " --reset" if args.reset_checkpoints else ""
 
+    def input_for(stage_dir: str) -> Path:
+        """Input directory of an enricher after CrossRef."""
+        return pipeline_dir / ("04_crossref_enrichment" if args.parallel else stage_dir)
+
     # Define pipeline stages with checkpoint-enabled scripts
     pipeline_stages: dict[str, dict[str, Any]] = {
         "tei_extraction": {
@@ -191,42 +270,41 @@ def main() -> None:
         },
         "s2": {
             "description": "Semantic Scholar enrichment (with checkpoint)",
-            "command": f"python semantic_scholar_enricher.py --input {pipeline_dir}/04_crossref_enrichment --output {pipeline_dir}/05_s2_enrichment",
-            "input_dir": pipeline_dir / "04_crossref_enrichment",
+            "command": f"python semantic_scholar_enricher.py --input {input_for('04_crossref_enrichment')} --output {pipeline_dir}/05_s2_enrichment",
+            "input_dir": input_for("04_crossref_enrichment"),
             "output_dir": pipeline_dir / "05_s2_enrichment",
         },
         "openalex": {
             "description": "OpenAlex enrichment (with checkpoint)",
-            "command": f"python openalex_enricher.py --input {pipeline_dir}/05_s2_enrichment --output {pipeline_dir}/06_openalex_enrichment --email eran-roseman@uiowa.edu{reset_flag}",
-            "input_dir": pipeline_dir / "05_s2_enrichment",
+            "command": f"python openalex_enricher.py --input {input_for('05_s2_enrichment')} --output {pipeline_dir}/06_openalex_enrichment --email eran-roseman@uiowa.edu{reset_flag}",
+            "input_dir": input_for("05_s2_enrichment"),
             "output_dir": pipeline_dir / "06_openalex_enrichment",
         },
         "unpaywall": {
             "description": "Unpaywall OA discovery (with checkpoint)",
-            "command": f"python unpaywall_enricher.py --input {pipeline_dir}/06_openalex_enrichment --output {pipeline_dir}/07_unpaywall_enrichment --email eran-roseman@uiowa.edu",
-            "input_dir": pipeline_dir / "06_openalex_enrichment",
+            "command": f"python unpaywall_enricher.py --input {input_for('06_openalex_enrichment')} --output {pipeline_dir}/07_unpaywall_enrichment --email eran-roseman@uiowa.edu",
+            "input_dir": input_for("06_openalex_enrichment"),
             "output_dir": pipeline_dir / "07_unpaywall_enrichment",
         },
         "pubmed": {
             "description": "PubMed enrichment (with checkpoint)",
-            "command": f"python pubmed_enricher.py --input {pipeline_dir}/07_unpaywall_enrichment --output {pipeline_dir}/08_pubmed_enrichment",
-            "input_dir": pipeline_dir / "07_unpaywall_enrichment",
+            "command": f"python pubmed_enricher.py --input {input_for('07_unpaywall_enrichment')} --output {pipeline_dir}/08_pubmed_enrichment",
+            "input_dir": input_for("07_unpaywall_enrichment"),
             "output_dir": pipeline_dir / "08_pubmed_enrichment",
         },
         "arxiv": {
             "description": "arXiv enrichment (with checkpoint)",
-            "command": f"python arxiv_enricher.py --input {pipeline_dir}/08_pubmed_enrichment --output {pipeline_dir}/09_arxiv_enrichment{reset_flag}",
-            "input_dir": pipeline_dir / "08_pubmed_enrichment",
+            "command": f"python arxiv_enricher.py --input {input_for('08_pubmed_enrichment')} --output {pipeline_dir}/09_arxiv_enrichment{reset_flag}",
+            "input_dir": input_for("08_pubmed_enrichment"),
             "output_dir": pipeline_dir / "09_arxiv_enrichment",
         },
     }
 
     # Determine which stages to run
-    stage_order = ["tei_extraction", "zotero", "crossref", "s2", "openalex", "unpaywall", "pubmed", "arxiv"]
-    start_idx = stage_order.index(args.start_from)
-    end_idx = stage_order.index(args.stop_after) + 1 if args.stop_after else len(stage_order)
+    start_idx = STAGE_ORDER.index(args.start_from)
+    end_idx = STAGE_ORDER.index(args.stop_after) + 1 if args.stop_after else len(STAGE_ORDER)
 
-    stages_to_run = stage_order[start_idx:end_idx]
+    stages_to_run = STAGE_ORDER[start_idx:end_idx]
 
     print(f"\nStages to run: {', '.join(stages_to_run)}")
     print("\nCheckpoint Status by Stage:")
@@ -234,59 +312,79 @@ def main() -> None:
 
     # Check for existing checkpoints
     for stage_name in stages_to_run:
-        stage_check_info = pipeline_stages[stage_name]
-        checkpoint_files = list(stage_check_info["output_dir"].glob(".*checkpoint*.json"))
-        if checkpoint_files:
+        if read_stage(pipeline_stages[stage_name]["output_dir"]).checkpoint:
             print(f"  {stage_name}: ✓ Checkpoint exists")
         else:
             print(f"  {stage_name}: ✗ No checkpoint")
 
+    # Plan enrichment work from the paper status table
+    planned_stages = [stage for stage in stages_to_run if stage in STAGE_SPECS]
+    plans = plan_pipeline(pipeline_dir, planned_stages, force=args.force) if planned_stages else []
+    outdated_stages = {plan.stage for plan in plans if plan.outdated}
+    if plans:
+        print("\nEnrichment Work Plan:")
+        print("-" * 60)
+        print(format_plan(plans))
+
+    if args.dry_run:
+        print("\nDry run - no stages executed")
+        return
+
     # Track file counts through pipeline
     file_counts: dict[str, int] = {}
 
-    # Run pipeline stages
-    for stage_name in stages_to_run:
+    def run_stage(stage_name: str) -> bool:
         stage_info: dict[str, Any] = pipeline_stages[stage_name]
 
         # Check if stage already completed (unless forcing)
-        if not args.force and verify_stage_completion(stage_info["output_dir"], min_files=100):
-            existing_count = len(
-                [
-                    f
-                    for f in stage_info["output_dir"].glob("*.json")
-                    if "report" not in f.name and not f.name.startswith(".")
-                ]
-            )
-            print(f"\n✓ {stage_info['description']} already has {existing_count} files")
+        # Stages with papers from an older stage version re-run for just those papers
+        if (
+            not args.force
+            and stage_name not in outdated_stages
+            and verify_stage_completion(stage_info["output_dir"], min_files=100)
+        ):
+            manifest = read_stage(stage_info["output_dir"])
+            print(f"\n✓ {stage_info['description']} already has {manifest.count} files")
 
             # Check for checkpoint
-            checkpoint_files = list(stage_info["output_dir"].glob(".*checkpoint*.json"))
-            if checkpoint_files:
+            if manifest.checkpoint:
                 print("  Checkpoint found - will resume from where it left off if re-run")
 
-            file_counts[stage_name] = existing_count
-            continue
+            file_counts[stage_name] = manifest.count
+            return True
 
-        # Run the stage synchronously
+        # Run the stage and wait for it to finish
         if not run_command_sync(
             stage_info["command"],
             stage_info["description"],
             stage_info["output_dir"],
             stage_info.get("input_dir"),
         ):
-            print(f"\nPipeline stopped at {stage_name}")
-            print("Note: You can resume from this point thanks to checkpoint support!")
-            sys.exit(1)
+            return False
 
         # Record output count
-        output_count = len(
-            [
-                f
-                for f in stage_info["output_dir"].glob("*.json")
-                if "report" not in f.name and not f.name.startswith(".")
-            ]
+        file_counts[stage_name] = read_stage(stage_info["output_dir"]).count
+        return True
+
+    # Run pipeline stages as their dependencies complete
+    failed_stages = run_stage_graph(stages_to_run, stage_dependencies(args.parallel), run_stage)
+    if failed_stages:
+        print(f"\nPipeline stopped at {', '.join(failed_stages)}")
+        print("Note: You can resume from this point thanks to checkpoint support!")
+        sys.exit(1)
+
+    # Merge the deltas of enrichers that ran side by side
+    merged_stages = [stage for stage in PARALLEL_STAGES if stage in stages_to_run]
+    if args.parallel and merged_stages:
+        print("\nMerging parallel enrichment output...")
+        merge_report = merge_stage_deltas(
+            pipeline_dir / "04_crossref_enrichment",
+            [pipeline_stages[stage]["output_dir"] for stage in merged_stages],
+            pipeline_dir / "10_final_output",
         )
-        file_counts[stage_name] = output_count
+        file_counts["merge"] = merge_report["papers"]
+        if merge_report["conflicts"]:
+            print(f"  Conflicting fields (earlier stage kept): {sum(merge_report['conflicts'].values())}")
 
     print("\n" + "=" * 60)
     print("PIPELINE COMPLETED SUCCESSFULLY!")
@@ -298,19 +396,18 @@ def main() -> None:
     print(f"{'Stage':<30} {'Files':<10} {'Status'}")
     print("-" * 60)
 
-    for stage_dir in sorted(pipeline_dir.glob("*/")):
-        json_count = len(
-            [f for f in stage_dir.glob("*.json") if "report" not in f.name and not f.name.startswith(".")]
-        )
-        xml_count = len(list(stage_dir.glob("*.xml")))
-        total_count = json_count + xml_count
+    manifests = {stage: read_stage(pipeline_dir / stage) for stage in stages}
+    for stage_dir in (pipeline_dir / stage for stage in stages):
+        manifest = manifests[stage_dir.name]
+        total_count = manifest.count
 
         if total_count > 0:
             status = "✓ Complete"
+            if manifest.from_manifest and not manifest.complete:
+                status = "… Incomplete"
 
             # Check for checkpoint
-            checkpoint_files = list(stage_dir.glob(".*checkpoint*.json"))
-            if checkpoint_files:
+            if manifest.checkpoint:
                 status += " (checkpoint saved)"
 
             # Check for significant file loss
@@ -321,14 +418,7 @@ def main() -> None:
                 }.get(stage_dir.name)
 
                 if prev_stage:
-                    prev_dir = pipeline_dir / prev_stage
-                    prev_count = len(
-                        [
-                            f
-                            for f in prev_dir.glob("*.json")
-                            if "report" not in f.name and not f.name.startswith(".")
-                        ]
-                    )
+                    prev_count = manifests[prev_stage].count
                     if prev_count > 0:
                         loss_rate = (prev_count - total_count) / prev_count
                         if loss_rate > config.VERY_LOW_THRESHOLD:  # >5% loss
@@ -350,6 +440,7 @@ def main() -> None:
         "file_counts": file_counts,
         "checkpoint_enabled": True,
         "checkpoints_reset": args.reset_checkpoints,
+        "parallel": args.parallel,
         "summary": {
             "initial_files": file_counts.get("tei_extraction", 0),
             "final_files": file_counts.get(stages_to_run[-1], 0),
@@ -169,7 +169,7 @@ def load_checkpoint(checkpoint_file: Path) -> dict[str, Any]:
     return {}
 
 
-def save_checkpoint_atomic(checkpoint_file: Path, data: dict[str, Any], indent: int = 2) -> bool:
+def save_checkpoint_atomic(checkpoint_file: Path, data: dict[str, Any], indent: int | None = 2) -> bool:
     """Save checkpoint atomically to prevent corruption.
 
     Uses temp file + rename for atomic write.
@@ -177,7 +177,7 @@ def save_checkpoint_atomic(checkpoint_file: Path, data: dict[str, Any], indent:
     Args:
         checkpoint_file: Path to checkpoint file
         data: Data to save
-        indent: JSON indentation (default 2)
+        indent: JSON indentation (default 2, None for compact output)
 
     Returns:
         True if saved successfully
@@ -10,6 +10,8 @@ Usage:
 """
 
 from src import config
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus
 import json
 import time
 from pathlib import Path
@@ -220,33 +222,33 @@ def main() -> None:
     papers_by_id: dict[str, tuple[str, Any]] = {}
     papers_without_id = []
     skipped_already_enriched = 0
+    status = PaperStatus.open("pubmed", output_path, has_pubmed_data)
 
     for paper_file in paper_files:
+        # Skip if already enriched (unless force mode); its output is already written
+        if not args.force and status.is_done(paper_file.stem):
+            skipped_already_enriched += 1
+            continue
+
         with open(paper_file) as f:
             paper = json.load(f)
 
-            # Skip if already enriched (unless force mode)
-            if not args.force and has_pubmed_data(paper):
-                skipped_already_enriched += 1
-                papers_by_id[paper_file.stem] = (paper_file.stem, paper)  # Keep for final save
-                continue
-
-            # Check for existing PMID or DOI
-            id_dict = {}
-            if paper.get("pmid"):
-                id_dict["pmid"] = paper["pmid"]
-            elif paper.get("pubmed_pmid"):  # From previous enrichment
-                id_dict["pmid"] = paper["pubmed_pmid"]
-            elif paper.get("doi"):
-                id_dict["doi"] = paper["doi"]
-
-            if id_dict:
-                key = id_dict.get("doi") or id_dict.get("pmid")
-                if key:
-                    identifiers.append(id_dict)
-                    papers_by_id[key] = (paper_file.stem, paper)
-            else:
-                papers_without_id.append((paper_file.stem, paper))
+        # Check for existing PMID or DOI
+        id_dict = {}
+        if paper.get("pmid"):
+            id_dict["pmid"] = paper["pmid"]
+        elif paper.get("pubmed_pmid"):  # From previous enrichment
+            id_dict["pmid"] = paper["pubmed_pmid"]
+        elif paper.get("doi"):
+            id_dict["doi"] = paper["doi"]
+
+        if id_dict:
+            key = id_dict.get("doi") or id_dict.get("pmid")
+            if key:
+                identifiers.append(id_dict)
+                papers_by_id[key] = (paper_file.stem, paper)
+        else:
+            papers_without_id.append((paper_file.stem, paper))
 
     print(f"Found {len(identifiers)} papers with DOIs or PMIDs")
     if skipped_already_enriched > 0:
@@ -260,6 +262,8 @@ def main() -> None:
         print("No papers with identifiers to process")
         return
 
+    coverage = CoverageIndex.open(output_path)
+
     # Process papers
     print("\nProcessing papers with PubMed API...")
     print("Note: PubMed primarily covers biomedical literature")
@@ -304,6 +308,8 @@ def main() -> None:
                 output_file = output_path / f"{paper_id}.json"
                 with open(output_file, "w") as f:
                     json.dump(original_paper, f, indent=2)
+                coverage.record(paper_id, original_paper)
+            coverage.save()
 
     # Save all papers
     print("\nSaving all papers...")
@@ -327,12 +333,18 @@ def main() -> None:
         output_file = output_path / f"{paper_id}.json"
         with open(output_file, "w") as f:
             json.dump(original_paper, f, indent=2)
+        coverage.record(paper_id, original_paper)
+        status.record(paper_id, success=key in all_results)
 
     # Also copy papers without identifiers
     for paper_id, paper in papers_without_id:
         output_file = output_path / f"{paper_id}.json"
         with open(output_file, "w") as f:
             json.dump(paper, f, indent=2)
+        coverage.record(paper_id, paper)
+        status.record(paper_id, success=False)
+    coverage.save()
+    status.save()
 
     elapsed_time = time.time() - start_time
 
@@ -364,6 +376,7 @@ def main() -> None:
     report_file = output_path / "pubmed_enrichment_report.json"
     with open(report_file, "w") as f:
         json.dump(report, f, indent=2)
+    coverage.finish(report["statistics"])
 
     print("\n" + "=" * 80)
     print("ENRICHMENT COMPLETE")
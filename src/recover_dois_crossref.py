@@ -7,16 +7,35 @@ import logging
 import time
 from typing import Any
 from habanero import Crossref
-from difflib import SequenceMatcher
+from src.title_index import title_similarity
+from src.metadata_snapshot import MetadataSnapshot
 
 # Set up module logger
 logger = logging.getLogger(__name__)
 
 
 def search_doi_by_title_and_authors(
-    title: str, authors: list[dict[str, Any]], year: str | None = None
+    title: str,
+    authors: list[dict[str, Any]],
+    year: str | None = None,
+    snapshot: MetadataSnapshot | None = None,
 ) -> tuple[str | None, dict[str, Any] | None]:
-    """Search CrossRef for a paper by title and authors."""
+    """Search for a paper's DOI by title and authors.
+
+    The local metadata snapshot is tried first; CrossRef search is only used
+    for titles the snapshot cannot resolve.
+    """
+    if snapshot is not None:
+        record = snapshot.lookup_title(
+            title,
+            year if year and year != "MISSING" else None,
+            fuzzy=True,
+            threshold=config.TITLE_MATCH_THRESHOLD,
+        )
+        if record:
+            print(f"  ✓ Found matching DOI in local snapshot: {record['doi']}")
+            return record["doi"], record.get("raw") or {"title": [record.get("title") or ""]}
+
     cr = Crossref()
 
     try:
@@ -57,7 +76,7 @@ def search_doi_by_title_and_authors(
                 item_title = item_titles[0]
 
                 # Calculate similarity
-                score = SequenceMatcher(None, title.lower(), item_title.lower()).ratio()
+                score = title_similarity(title, item_title)
 
                 # Check year match if available
                 if year and year != "MISSING":
@@ -84,7 +103,7 @@ def search_doi_by_title_and_authors(
                 print(f"      Score: {score:.2f}, DOI: {item.get('DOI', 'N/A')}")
 
             # Return DOI if good match found
-            if best_match and best_score >= config.HIGH_CONFIDENCE_THRESHOLD:
+            if best_match and best_score >= config.TITLE_MATCH_THRESHOLD:
                 doi = best_match.get("DOI")
                 print(f"  ✓ Found matching DOI: {doi} (score: {best_score:.2f})")
                 return doi, best_match
@@ -175,6 +194,7 @@ def main() -> None:
 
     recovered: list[dict[str, str]] = []
     failed: list[str] = []
+    snapshot = MetadataSnapshot.open_default()
 
     for i, paper in enumerate(papers_no_doi, 1):
         if not paper["title"] or paper["title"] == "MISSING":
@@ -198,7 +218,9 @@ def main() -> None:
             logger.debug("Error reading %s: %s", json_file, e)
 
         # Search for DOI
-        doi, match_data = search_doi_by_title_and_authors(paper["title"], authors, paper.get("year"))
+        doi, match_data = search_doi_by_title_and_authors(
+            paper["title"], authors, paper.get("year"), snapshot=snapshot
+        )
 
         if doi:
             recovered.append(
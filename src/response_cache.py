@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Raw API responses kept per paper so enrichment fields can be re-derived offline.
+
+Stages that extract fields from an API response (CrossRef, OpenAlex, arXiv)
+store the untouched response for each paper under
+``config.RESPONSE_CACHE_DIRNAME/<stage>/`` in the pipeline directory, sharded
+with ``get_shard_path``. When a stage's ``derive_version`` changes, its papers
+are rebuilt from these responses instead of calling the API again.
+
+Usage:
+    cache = ResponseCache("openalex", output_dir)
+    cache.put(paper_id, work)
+    work = cache.get(paper_id)
+"""
+
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any
+
+from src import config
+from src.pipeline_utils import get_shard_path, load_checkpoint, save_checkpoint_atomic
+
+
+class ResponseCache:
+    """Per-paper raw responses for one stage."""
+
+    def __init__(self, stage: str, output_dir: Path):
+        """Open the cache for a stage writing to ``output_dir``."""
+        self.stage = stage
+        self.base_dir = Path(output_dir).parent / config.RESPONSE_CACHE_DIRNAME / stage
+
+    def path(self, paper_id: str) -> Path:
+        """File holding a paper's cached response."""
+        return get_shard_path(self.base_dir, paper_id) / f"{paper_id}.json"
+
+    def put(self, paper_id: str, response: Any) -> bool:
+        """Store a paper's raw response (any JSON-serializable value)."""
+        return save_checkpoint_atomic(
+            self.path(paper_id),
+            {"stage": self.stage, "fetched": datetime.now(UTC).isoformat(), "response": response},
+            indent=None,
+        )
+
+    def get(self, paper_id: str) -> Any | None:
+        """Return a paper's cached response, or None if it was never stored."""
+        return load_checkpoint(self.path(paper_id)).get("response")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Two-level search cache: query embeddings and ranked results.
+
+Level 1 maps a normalized query (lowercase, punctuation and extra whitespace
+removed) to its embedding, so repeated and near-identical queries skip model
+inference; it belongs to one embedding model and backend (``model_key``) and
+is dropped when either changes. Level 2 maps (query vector, k, quality_min) to
+the ranked paper IDs and scores; it belongs to one version of the vector index
+and is dropped as soon as the index changes.
+
+Both levels are LRU: a hit moves an entry to the most-recent end, and the
+least recently used entry is evicted once a level is full. Entries older
+than ``config.SEARCH_CACHE_EXPIRY_DAYS`` are dropped on load. The cache is
+stored as one uncompressed ``.npz`` file (``config.SEARCH_CACHE_FILE``) of
+fixed-width arrays, in LRU order.
+
+Usage:
+    cache = SearchCache.load(index_version=vector_index.version)
+    vector = cache.embed(query, encoder)
+    hits = cache.results(vector, k, quality_min)
+    if hits is None:
+        hits = search(vector, k, quality_min)
+        cache.store(vector, k, quality_min, hits)
+    cache.save()
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from src import config
+from src.embedding_backend import model_key
+
+Hits = list[tuple[str, float]]
+
+_WORDS = re.compile(r"\w+")
+
+
+def normalize_query(query: str) -> str:
+    """Query text as cached: lowercase words separated by single spaces."""
+    return " ".join(_WORDS.findall(query.lower()))
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def result_key(vector: np.ndarray, k: int, quality_min: int, filters: str = "") -> str:
+    """Key of a ranked result: the query vector (at float16 precision), k and the filters."""
+    vector_bytes = np.asarray(vector, dtype=np.float16).tobytes()
+    suffix = f":{k}:{quality_min}" + (f":{filters}" if filters else "")
+    return _digest(vector_bytes + suffix.encode())
+
+
+class SearchCache:
+    """Query-embedding and ranked-result caches with LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path = config.SEARCH_CACHE_FILE,
+        index_version: str = "",
+        max_results: int = config.SEARCH_CACHE_MAX_SIZE,
+        max_embeddings: int = config.QUERY_EMBEDDING_CACHE_MAX_SIZE,
+        model: str | None = None,
+    ):
+        """Create an empty cache for results of index version ``index_version``.
+
+        ``model`` is the ``model_key`` of the encoder whose query embeddings are
+        cached (default: ``config.EMBEDDING_MODEL`` on ``config.EMBEDDING_BACKEND``).
+        """
+        self.path = Path(path)
+        self.index_version = index_version
+        self.model = model if model is not None else model_key(config.EMBEDDING_MODEL)
+        self.max_results = max_results
+        self.max_embeddings = max_embeddings
+        self.embeddings: OrderedDict[str, tuple[np.ndarray, float]] = OrderedDict()
+        self.ranked: OrderedDict[str, tuple[Hits, float]] = OrderedDict()
+        self.stats = {"embedding_hits": 0, "embedding_misses": 0, "result_hits": 0, "result_misses": 0}
+        self.dirty = False
+
+    @classmethod
+    def load(
+        cls,
+        path: Path = config.SEARCH_CACHE_FILE,
+        index_version: str = "",
+        max_results: int = config.SEARCH_CACHE_MAX_SIZE,
+        max_embeddings: int = config.QUERY_EMBEDDING_CACHE_MAX_SIZE,
+        model: str | None = None,
+    ) -> "SearchCache":
+        """Read the cache, dropping expired entries and those of another model or index version."""
+        cache = cls(path, index_version, max_results, max_embeddings, model)
+        try:
+            data = np.load(cache.path)
+        except (OSError, ValueError):
+            return cache
+        if "result_scores" not in data.files:
+            return cache
+
+        oldest = time.time() - config.SEARCH_CACHE_EXPIRY_DAYS * 86400
+        if "model" in data.files and str(data["model"]) == cache.model:
+            for key, vector, created in zip(
+                data["embed_keys"].tolist(), data["embed_vectors"], data["embed_times"].tolist(), strict=True
+            ):
+                if created >= oldest:
+                    cache.embeddings[key.decode()] = (vector, created)
+        else:
+            cache.dirty = True
+
+        if str(data["index_version"]) == index_version:
+            ends = np.cumsum(data["result_counts"]).tolist()
+            ids, scores = data["result_ids"].tolist(), data["result_scores"].tolist()
+            start = 0
+            for key, end, created in zip(
+                data["result_keys"].tolist(), ends, data["result_times"].tolist(), strict=True
+            ):
+                if created >= oldest:
+                    hits = [
+                        (paper_id.decode(), score)
+                        for paper_id, score in zip(ids[start:end], scores[start:end], strict=True)
+                    ]
+                    cache.ranked[key.decode()] = (hits, created)
+                start = end
+        else:
+            cache.dirty = True
+        cache._evict()
+        return cache
+
+    def _evict(self) -> None:
+        while len(self.embeddings) > self.max_embeddings:
+            self.embeddings.popitem(last=False)
+            self.dirty = True
+        while len(self.ranked) > self.max_results:
+            self.ranked.popitem(last=False)
+            self.dirty = True
+
+    def set_index_version(self, index_version: str) -> None:
+        """Switch to another index version, discarding every cached result."""
+        if index_version != self.index_version:
+            self.index_version = index_version
+            self.ranked.clear()
+            self.dirty = True
+
+    def embed(self, query: str, encoder: Callable[[list[str]], np.ndarray]) -> np.ndarray:
+        """Embedding of a query, encoded only if no near-identical query was cached."""
+        key = _digest(normalize_query(query).encode())
+        cached = self.embeddings.get(key)
+        if cached is not None:
+            self.embeddings.move_to_end(key)
+            self.stats["embedding_hits"] += 1
+            self.dirty = True
+            return cached[0]
+
+        self.stats["embedding_misses"] += 1
+        vector = np.asarray(encoder([query]), dtype=np.float32).reshape(-1)
+        self.embeddings[key] = (vector, time.time())
+        self.dirty = True
+        self._evict()
+        return vector
+
+    def results(
+        self, vector: np.ndarray, k: int, quality_min: int = config.DEFAULT_QUALITY_MIN, filters: str = ""
+    ) -> Hits | None:
+        """Cached ranked results for a query vector and filters (``SearchFilter.cache_key``), or None."""
+        key = result_key(vector, k, quality_min, filters)
+        cached = self.ranked.get(key)
+        if cached is None:
+            self.stats["result_misses"] += 1
+            return None
+        self.ranked.move_to_end(key)
+        self.stats["result_hits"] += 1
+        self.dirty = True
+        return cached[0]
+
+    def store(self, vector: np.ndarray, k: int, quality_min: int, hits: Hits, filters: str = "") -> None:
+        """Cache ranked results for a query vector and filters."""
+        self.ranked[result_key(vector, k, quality_min, filters)] = (list(hits), time.time())
+        self.dirty = True
+        self._evict()
+
+    def save(self) -> None:
+        """Write the cache, in LRU order, if anything changed."""
+        if not self.dirty:
+            return
+        embeddings = list(self.embeddings.items())
+        ranked = list(self.ranked.items())
+        all_hits = [hit for _, (hits, _) in ranked for hit in hits]
+        dimensions = len(embeddings[0][1][0]) if embeddings else config.EMBEDDING_DIMENSIONS
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_suffix(".tmp.npz")
+        with open(temp_file, "wb") as f:
+            np.savez(
+                f,
+                index_version=np.array(self.index_version),
+                model=np.array(self.model),
+                embed_keys=np.array([key for key, _ in embeddings], dtype="S32"),
+                embed_vectors=np.array([vector for _, (vector, _) in embeddings], dtype=np.float32).reshape(
+                    -1, dimensions
+                ),
+                embed_times=np.array([created for _, (_, created) in embeddings], dtype=np.float64),
+                result_keys=np.array([key for key, _ in ranked], dtype="S32"),
+                result_counts=np.array([len(hits) for _, (hits, _) in ranked], dtype=np.int32),
+                result_times=np.array([created for _, (_, created) in ranked], dtype=np.float64),
+                result_ids=np.array([paper_id for paper_id, _ in all_hits], dtype="S64"),
+                result_scores=np.array([score for _, score in all_hits], dtype=np.float64),
+            )
+        temp_file.replace(self.path)
+        self.dirty = False
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Section-level chunk index for retrieving passages instead of whole papers.
+
+Each paper's sections are aggregated by type with
+``section_headers.aggregate_sections`` (all "Study Design", "Statistical
+Analysis", ... sections become ``methods``), split into chunks of at most
+``config.SECTION_CHUNK_MAX_CHARS`` on paragraph boundaries, and embedded as
+separate vectors, so a long paper no longer has to fit in a single vector.
+
+Chunks reuse the paper pipeline's machinery: vectors are cached by content
+hash in their own ``EmbeddingMatrix`` and searched through a ``VectorIndex``.
+A memory-mapped metadata table (``config.SECTIONS_METADATA_FILE``) holds one
+fixed-width row per chunk with its paper, section type and FAISS ID, so a
+section-type filter is a vectorized column mask turned into an ID selector.
+
+Usage:
+    python -m src.section_index --papers-dir DIR/10_final_output
+"""
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.embedding_builder import Encoder, content_hash, embed_texts, load_papers
+from src.embedding_matrix import EmbeddingMatrix
+from src.section_headers import aggregate_sections
+from src.vector_index import VectorIndex, sync_index
+
+# Section types that are indexed; the code stored in the metadata table is the position
+SECTION_TYPES = ("abstract", "introduction", "methods", "results", "discussion", "conclusion", "other")
+METADATA_DTYPE = np.dtype([("faiss_id", "i8"), ("paper_id", "S64"), ("section_type", "u1"), ("chunk", "u2")])
+
+
+@dataclass(frozen=True)
+class SectionHit:
+    """A chunk returned by a section search."""
+
+    paper_id: str
+    section_type: str
+    chunk: int
+    score: float
+
+
+def chunk_id(paper_id: str, section_type: str, chunk: int) -> str:
+    """Identifier of a chunk in the embedding matrix and vector index."""
+    return f"{paper_id}:{section_type}:{chunk}"
+
+
+def split_chunks(text: str, max_chars: int = config.SECTION_CHUNK_MAX_CHARS) -> list[str]:
+    """Split text into chunks of whole paragraphs, cutting paragraphs longer than ``max_chars``."""
+    chunks: list[str] = []
+    current = ""
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        if paragraph:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def paper_sections(paper: dict[str, Any]) -> dict[str, str]:
+    """Aggregated section texts of a paper by section type.
+
+    Accepts post-processed papers (``sections`` already aggregated) and TEI
+    extractor output (a list of ``title``/``text`` sections).
+    """
+    sections = paper.get("sections") or {}
+    if isinstance(sections, list):
+        sections = aggregate_sections(
+            [{"header": s.get("title", ""), "content": s.get("text", "")} for s in sections]
+        )
+    if paper.get("abstract"):
+        sections = {"abstract": paper["abstract"], **sections}
+    return {section_type: text for section_type, text in sections.items() if section_type in SECTION_TYPES}
+
+
+def paper_chunks(paper: dict[str, Any]) -> list[tuple[str, str, int, str]]:
+    """``(paper_id, section_type, chunk, text)`` for every chunk of a paper worth indexing."""
+    paper_id = str(paper["paper_id"])
+    chunks = []
+    for section_type, text in paper_sections(paper).items():
+        if len(text.strip()) < config.SECTION_CHUNK_MIN_CHARS:
+            continue
+        for number, chunk_text in enumerate(split_chunks(text)):
+            chunks.append((paper_id, section_type, number, chunk_text))
+    return chunks
+
+
+class SectionIndex:
+    """Vector index over section chunks with a memory-mapped metadata table."""
+
+    def __init__(self, vector_index: VectorIndex | None, metadata: np.ndarray):
+        """Wrap a chunk vector index and its metadata table."""
+        self.vector_index = vector_index
+        self.metadata = metadata
+
+    @classmethod
+    def open(
+        cls,
+        index_file: Path = config.SECTIONS_INDEX_FILE,
+        ids_file: Path = config.SECTIONS_IDS_FILE,
+        metadata_file: Path = config.SECTIONS_METADATA_FILE,
+    ) -> "SectionIndex":
+        """Load the index and memory-map its metadata table (empty if not built)."""
+        metadata = np.zeros(0, dtype=METADATA_DTYPE)
+        if Path(metadata_file).exists():
+            metadata = np.load(metadata_file, mmap_mode="r")
+        return cls(VectorIndex.load(index_file, ids_file), metadata)
+
+    def __len__(self) -> int:
+        """Number of indexed chunks."""
+        return len(self.metadata)
+
+    def selector_ids(self, section_types: list[str]) -> np.ndarray:
+        """FAISS IDs of the chunks whose section type is in ``section_types``."""
+        codes = [SECTION_TYPES.index(section_type) for section_type in section_types]
+        mask = np.isin(self.metadata["section_type"], codes)
+        return np.asarray(self.metadata["faiss_id"][mask])
+
+    def search(
+        self, queries: np.ndarray, k: int = config.DEFAULT_K, section_types: list[str] | None = None
+    ) -> list[list[SectionHit]]:
+        """Top ``k`` chunks per query vector, optionally only from ``section_types``."""
+        if self.vector_index is None:
+            return [[] for _ in range(len(np.atleast_2d(queries)))]
+        selector_ids = self.selector_ids(section_types) if section_types else None
+        results = []
+        for hits in self.vector_index.search(queries, k, selector_ids):
+            section_hits = []
+            for hit_id, score in hits:
+                paper_id, section_type, number = hit_id.rsplit(":", 2)
+                section_hits.append(SectionHit(paper_id, section_type, int(number), score))
+            results.append(section_hits)
+        return results
+
+
+def build_section_index(
+    papers: list[dict[str, Any]],
+    encoder: Encoder | None = None,
+    model_name: str = config.EMBEDDING_MODEL,
+    index_file: Path = config.SECTIONS_INDEX_FILE,
+    ids_file: Path = config.SECTIONS_IDS_FILE,
+    metadata_file: Path = config.SECTIONS_METADATA_FILE,
+    matrix: EmbeddingMatrix | None = None,
+) -> dict[str, int]:
+    """Embed the chunks of ``papers`` that are new or changed and update the section index."""
+    if matrix is None:
+        matrix = EmbeddingMatrix.open(config.SECTION_EMBEDDING_DATA_FILE, config.SECTION_EMBEDDING_CACHE_FILE)
+    chunks = [chunk for paper in papers for chunk in paper_chunks(paper)]
+    chunk_ids = [chunk_id(paper_id, section_type, number) for paper_id, section_type, number, _ in chunks]
+    texts = [text for *_, text in chunks]
+
+    rows, embed_stats = embed_texts(chunk_ids, texts, encoder, model_name, matrix)
+    keys = [content_hash(text, model_name) for text in texts]
+    vector_index, index_stats = sync_index(
+        VectorIndex.load(index_file, ids_file), chunk_ids, keys, lambda positions: matrix.get(rows[positions])
+    )
+    vector_index.save(index_file, ids_file)
+
+    metadata = np.zeros(len(chunks), dtype=METADATA_DTYPE)
+    metadata["faiss_id"] = [vector_index.ids[cid] for cid in chunk_ids]
+    metadata["paper_id"] = [paper_id for paper_id, *_ in chunks]
+    metadata["section_type"] = [SECTION_TYPES.index(section_type) for _, section_type, _, _ in chunks]
+    metadata["chunk"] = [number for _, _, number, _ in chunks]
+    temp_file = Path(metadata_file).with_suffix(".tmp.npy")
+    np.save(temp_file, metadata)
+    temp_file.replace(metadata_file)
+
+    return {"chunks": len(chunks), "encoded": embed_stats["encoded"], **index_stats}
+
+
+def main() -> None:
+    """Build or update the section index for a directory of papers."""
+    parser = argparse.ArgumentParser(description="Build the section-level chunk index")
+    parser.add_argument("--papers-dir", required=True, help="Directory of paper JSON files")
+    args = parser.parse_args()
+
+    stats = build_section_index(load_papers(Path(args.papers_dir)))
+    print(
+        f"Indexed {stats['chunks']} section chunks: {stats['encoded']} encoded, "
+        f"{stats['added']} added, {stats['removed']} removed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,9 @@ import argparse
 import sys
 import os
 
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus
+
 # Add src directory to path to import config
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
@@ -296,6 +299,8 @@ class S2BatchEnricher:
 
         # Check for checkpoint file
         checkpoint_file = output_dir / ".s2_checkpoint.json"
+        coverage = CoverageIndex.open(output_dir, checkpoint_file)
+        status = PaperStatus.open("s2", output_dir, self.has_s2_data)
         processed_papers = set()
 
         if checkpoint_file.exists():
@@ -323,20 +328,20 @@ class S2BatchEnricher:
             if "checkpoint" in json_file.name or "report" in json_file.name:
                 continue
 
-            # Skip if already processed
-            if json_file.stem in processed_papers:
+            # Skip if already processed or enriched (unless force mode); outdated versions override both
+            reason = "forced" if self.force else status.needs(json_file.stem)
+            if json_file.stem in processed_papers and reason not in ("stale", "rederive"):
                 skipped_count += 1
                 continue
 
-            with open(json_file, encoding="utf-8") as f:
-                paper_data = json.load(f)
-
-            # Skip if already enriched (unless force mode)
-            if not self.force and self.has_s2_data(paper_data):
+            if reason is None:
                 skipped_already_enriched += 1
                 processed_papers.add(json_file.stem)
                 continue
 
+            with open(json_file, encoding="utf-8") as f:
+                paper_data = json.load(f)
+
             doi = paper_data.get("doi", "").strip()
             if doi:
                 # Clean DOI
@@ -417,6 +422,8 @@ class S2BatchEnricher:
                 output_file = output_dir / json_file.name
                 with open(output_file, "w", encoding="utf-8") as f:
                     json.dump(paper_data, f, indent=2)
+                coverage.record(json_file.stem, paper_data)
+                status.record(json_file.stem, success=doi in batch_results)
 
                 # Track processed paper
                 processed_papers.add(json_file.stem)
@@ -426,6 +433,8 @@ class S2BatchEnricher:
             if checkpoint_counter >= MIN_ABSTRACT_LENGTH:
                 with open(checkpoint_file, "w") as f:
                     json.dump({"processed_papers": list(processed_papers)}, f)
+                coverage.save()
+                status.save()
                 logger.info("Checkpoint saved: %d papers processed", len(processed_papers))
                 checkpoint_counter = 0
 
@@ -442,12 +451,16 @@ class S2BatchEnricher:
                 output_file = output_dir / json_file.name
                 with open(output_file, "w", encoding="utf-8") as f:
                     json.dump(paper_data, f, indent=2)
+                coverage.record(json_file.stem, paper_data)
+                status.record(json_file.stem, success=False)
 
                 processed_papers.add(json_file.stem)
 
         # Final checkpoint save
         with open(checkpoint_file, "w") as f:
             json.dump({"processed_papers": list(processed_papers)}, f)
+        coverage.finish(self.stats)
+        status.save()
 
         # Generate report
         self.generate_report(output_dir)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Small per-stage manifest the pipeline runner reads instead of globbing stage directories.
+
+Stages write ``config.STAGE_MANIFEST_FILENAME`` next to their coverage index
+every time they save it: paper count, a hash of the sorted paper IDs, whether
+the stage finished, whether its checkpoint file is present, and the stage's
+own statistics once it completes. Completion checks and the pipeline summary
+then read one small file per stage regardless of library size.
+
+Directories written by tools that do not keep a manifest (the GROBID TEI
+output, older runs) fall back to a single directory listing.
+
+Usage:
+    manifest = read_stage(stage_dir)
+    if manifest.complete and manifest.count >= min_papers:
+        ...
+"""
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any
+
+from src import config
+from src.pipeline_utils import load_checkpoint, save_checkpoint_atomic
+
+MANIFEST_VERSION = "1"
+
+
+def ids_hash(paper_ids: Iterable[str]) -> str:
+    """Order-independent SHA-256 of a stage's paper IDs."""
+    return hashlib.sha256("\n".join(sorted(paper_ids)).encode()).hexdigest()
+
+
+@dataclass
+class StageManifest:
+    """Summary of one stage directory's output."""
+
+    count: int = 0
+    ids_hash: str = ""
+    complete: bool = False
+    checkpoint: bool = False
+    updated: str = ""
+    stats: dict[str, Any] = field(default_factory=dict)
+    from_manifest: bool = False
+
+    @classmethod
+    def load(cls, stage_dir: Path) -> "StageManifest | None":
+        """Read a stage's manifest, or None if it is missing or from another version."""
+        data = load_checkpoint(Path(stage_dir) / config.STAGE_MANIFEST_FILENAME)
+        if data.pop("version", None) != MANIFEST_VERSION:
+            return None
+        return cls(**data, from_manifest=True)
+
+    @classmethod
+    def scan(cls, stage_dir: Path) -> "StageManifest":
+        """Build an unsaved manifest from one listing of a directory without one."""
+        manifest = cls()
+        if not Path(stage_dir).exists():
+            return manifest
+
+        paper_ids = []
+        for entry in Path(stage_dir).iterdir():
+            if entry.name.startswith("."):
+                manifest.checkpoint = manifest.checkpoint or (
+                    "checkpoint" in entry.name and entry.suffix == ".json"
+                )
+            elif entry.suffix == ".xml" or (entry.suffix == ".json" and "report" not in entry.name):
+                paper_ids.append(entry.stem)
+        manifest.count = len(paper_ids)
+        manifest.ids_hash = ids_hash(paper_ids)
+        return manifest
+
+    def save(self, stage_dir: Path) -> bool:
+        """Write the manifest into ``stage_dir``."""
+        data = asdict(self)
+        del data["from_manifest"]
+        data["version"] = MANIFEST_VERSION
+        data["updated"] = self.updated = datetime.now(UTC).isoformat()
+        return save_checkpoint_atomic(Path(stage_dir) / config.STAGE_MANIFEST_FILENAME, data)
+
+
+def write_manifest(
+    stage_dir: Path,
+    paper_ids: Iterable[str],
+    complete: bool = False,
+    checkpoint_file: Path | None = None,
+    stats: dict[str, Any] | None = None,
+) -> bool:
+    """Record a stage's current output; ``complete`` marks the stage as finished."""
+    paper_ids = list(paper_ids)
+    return StageManifest(
+        count=len(paper_ids),
+        ids_hash=ids_hash(paper_ids),
+        complete=complete,
+        checkpoint=checkpoint_file is not None and checkpoint_file.exists(),
+        stats=stats or {},
+    ).save(stage_dir)
+
+
+def read_stage(stage_dir: Path) -> StageManifest:
+    """Return a stage's manifest, listing the directory once if it has none."""
+    return StageManifest.load(stage_dir) or StageManifest.scan(stage_dir)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Merge the output of enrichment stages that ran side by side.
+
+When the pipeline runner runs S2, OpenAlex, Unpaywall, PubMed and arXiv
+concurrently, each stage enriches its own copy of the CrossRef output. This
+module takes, for every paper, the fields each stage added or changed
+relative to that shared input (its delta) and applies them on top of the
+CrossRef paper. Deltas are applied in pipeline order and the earliest stage
+wins when two stages set the same field differently, matching the
+fill-if-missing behaviour the stages have when run one after another.
+
+Usage:
+    python -m src.stage_merge --base DIR/04_crossref_enrichment \
+        --stages DIR/05_s2_enrichment DIR/06_openalex_enrichment --output DIR/10_final_output
+"""
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from src.coverage_index import CoverageIndex
+
+
+def load_paper(path: Path) -> dict[str, Any] | None:
+    """Read one paper file, or None if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            paper: dict[str, Any] = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return paper
+
+
+def paper_delta(base: dict[str, Any], enriched: dict[str, Any]) -> dict[str, Any]:
+    """Fields a stage added to or changed in ``base``."""
+    return {key: value for key, value in enriched.items() if key not in base or base[key] != value}
+
+
+def merge_paper(
+    base: dict[str, Any], deltas: list[tuple[str, dict[str, Any]]], conflicts: Counter[str]
+) -> dict[str, Any]:
+    """Apply stage deltas in order; a field set by an earlier stage is kept."""
+    merged = dict(base)
+    set_by: dict[str, str] = {}
+    for stage, delta in deltas:
+        for key, value in delta.items():
+            if key in set_by:
+                if merged[key] != value:
+                    conflicts[f"{set_by[key]}>{stage}:{key}"] += 1
+                continue
+            merged[key] = value
+            set_by[key] = stage
+    return merged
+
+
+def merge_stage_deltas(base_dir: Path, stage_dirs: list[Path], output_dir: Path) -> dict[str, Any]:
+    """Write every paper in ``base_dir`` with the deltas from ``stage_dirs`` to ``output_dir``."""
+    base_dir, output_dir = Path(base_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    coverage = CoverageIndex.open(output_dir)
+
+    stats: dict[str, Any] = {"papers": 0, "fields_added": Counter(), "conflicts": Counter()}
+    for base_file in sorted(base_dir.glob("*.json")):
+        if "report" in base_file.name or base_file.name.startswith("."):
+            continue
+        base = load_paper(base_file)
+        if base is None:
+            continue
+
+        deltas = []
+        for stage_dir in stage_dirs:
+            enriched = load_paper(Path(stage_dir) / base_file.name)
+            if enriched is not None:
+                delta = paper_delta(base, enriched)
+                deltas.append((Path(stage_dir).name, delta))
+                stats["fields_added"][Path(stage_dir).name] += len(delta)
+        merged = merge_paper(base, deltas, stats["conflicts"])
+
+        with open(output_dir / base_file.name, "w") as f:
+            json.dump(merged, f, indent=2)
+        coverage.record(base_file.stem, merged)
+        stats["papers"] += 1
+
+    report = {
+        "papers": stats["papers"],
+        "fields_added": dict(stats["fields_added"]),
+        "conflicts": dict(stats["conflicts"].most_common()),
+    }
+    coverage.finish(report)
+    return report
+
+
+def main() -> None:
+    """Merge enrichment stage outputs from the command line."""
+    parser = argparse.ArgumentParser(description="Merge enrichment stages that ran in parallel")
+    parser.add_argument("--base", required=True, help="Directory all stages read as input")
+    parser.add_argument("--stages", nargs="+", required=True, help="Stage output directories, in order")
+    parser.add_argument("--output", required=True, help="Directory for merged papers")
+    args = parser.parse_args()
+
+    report = merge_stage_deltas(Path(args.base), [Path(d) for d in args.stages], Path(args.output))
+    print(f"Merged {report['papers']} papers into {args.output}")
+    for stage, count in report["fields_added"].items():
+        print(f"  {stage}: {count} fields")
+    if report["conflicts"]:
+        print(f"  Conflicting fields (earlier stage kept): {sum(report['conflicts'].values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""Columnar per-stage paper table for single-pass pipeline analytics.
+
+The analysis scripts each globbed a stage directory and fully parsed every paper
+to compute overlapping coverage and failure statistics. StageTable reads a stage
+once and keeps only the fields those reports need as columns:
+
+- ``filled``: bool matrix of ``bool(paper.get(field))`` for FLAG_FIELDS
+- ``present``: bool matrix of ``field in paper`` for KEY_FIELDS
+- ``values``: raw values of VALUE_FIELDS (title, doi, year, ...)
+- numeric columns with lengths and counts (abstract, sections, references)
+
+With ``--persist`` the table is written beside the stage as
+``config.STAGE_TABLE_FILENAME``. Every later scan, including those of the
+read-only analysis scripts, reuses rows whose file size and mtime are
+unchanged and only parses new or modified papers, so auditing every stage of a
+finished pipeline costs one JSON read per table instead of one per paper. Scans
+never write into a stage directory unless asked to.
+
+Usage:
+    python -m src.stage_table --persist extraction_pipeline/02_json_extraction extraction_pipeline/04_crossref_enrichment
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src import config
+from src.pipeline_utils import load_checkpoint, save_checkpoint_atomic
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION = "1"
+
+# Fields whose truthiness reports check (critical, enrichment and S2 fields)
+FLAG_FIELDS = (
+    "title",
+    "doi",
+    "year",
+    "authors",
+    "abstract",
+    "sections",
+    "journal",
+    "publisher",
+    "keywords",
+    "references",
+    "cited_references",
+    "cited_by_count",
+    "issn",
+    "volume",
+    "issue",
+    "pages",
+    "funders",
+    "licenses",
+    "oa_status",
+    "topics",
+    "mesh_terms",
+    "arxiv_id",
+    "pmid",
+    "semantic_scholar_id",
+    "openalex_id",
+    "tldr",
+    "max_author_h_index",
+    "venue",
+    "publication_venue",
+    "reference_count",
+    "citation_titles",
+)
+
+# Fields whose mere presence as a key matters (enrichment markers)
+KEY_FIELDS = (
+    "openalex_id",
+    "crossref_enrichment",
+    "s2_enrichment",
+    "openalex_enrichment",
+    "unpaywall_enrichment",
+)
+
+# Fields kept verbatim for display and value-level checks
+VALUE_FIELDS = ("title", "doi", "year", "journal", "s2_citation_count", "num_references")
+
+COUNT_COLUMNS = (
+    "file_size",
+    "abstract_length",
+    "num_authors",
+    "num_sections",
+    "num_text_sections",
+    "section_text_chars",
+    "num_references",
+    "num_cited_references",
+)
+
+SECTION_TYPES_KEPT = 5
+
+_FLAG_INDEX = {field: i for i, field in enumerate(FLAG_FIELDS)}
+_KEY_INDEX = {field: i for i, field in enumerate(KEY_FIELDS)}
+
+
+def _stripped(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _pack(bits: list[bool]) -> int:
+    return sum(1 << i for i, bit in enumerate(bits) if bit)
+
+
+def _unpack(mask: int, width: int) -> list[bool]:
+    return [bool(mask >> i & 1) for i in range(width)]
+
+
+def _empty_row(paper_id: str) -> dict[str, Any]:
+    return {
+        "paper_id": paper_id,
+        "file_name": f"{paper_id}.json",
+        "parse_error": "",
+        "filled": [False] * len(FLAG_FIELDS),
+        "present": [False] * len(KEY_FIELDS),
+        "values": dict.fromkeys(VALUE_FIELDS),
+        "section_types": [],
+        "crossref_status": "",
+        **dict.fromkeys(COUNT_COLUMNS, 0),
+        "mtime_ns": 0,
+    }
+
+
+def paper_row(paper_id: str, paper: dict[str, Any]) -> dict[str, Any]:
+    """Extract the table columns from an in-memory paper."""
+    row = _empty_row(paper_id)
+    row["filled"] = [bool(paper.get(field)) for field in FLAG_FIELDS]
+    row["present"] = [field in paper for field in KEY_FIELDS]
+    row["values"] = {field: paper.get(field) for field in VALUE_FIELDS}
+
+    sections = paper.get("sections") or []
+    sections = sections if isinstance(sections, list) else []
+    section_dicts = [s for s in sections if isinstance(s, dict)]
+    authors = paper.get("authors")
+    references = paper.get("references")
+    cited_references = paper.get("cited_references")
+
+    row["abstract_length"] = len(_stripped(paper.get("abstract")))
+    row["num_authors"] = len(authors) if isinstance(authors, list) else 0
+    row["num_sections"] = len(sections)
+    row["num_text_sections"] = sum(1 for s in section_dicts if s.get("text"))
+    row["section_text_chars"] = sum(len(s.get("text") or "") for s in section_dicts)
+    row["num_references"] = len(references) if isinstance(references, list) else 0
+    row["num_cited_references"] = len(cited_references) if isinstance(cited_references, list) else 0
+    row["section_types"] = [
+        s.get("type", "unknown") for s in sections[:SECTION_TYPES_KEPT] if isinstance(s, dict)
+    ]
+
+    crossref = paper.get("crossref_enrichment")
+    if isinstance(crossref, dict):
+        row["crossref_status"] = crossref.get("status", "unknown")
+
+    return row
+
+
+def scan_paper(json_file: Path) -> dict[str, Any]:
+    """Parse one paper file into a table row.
+
+    Unreadable files produce a row with ``parse_error`` set and empty columns.
+    """
+    try:
+        with open(json_file, encoding="utf-8") as f:
+            paper = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        row = _empty_row(json_file.stem)
+        row["parse_error"] = f"JSON decode error: {e!s}"
+    else:
+        if isinstance(paper, dict):
+            row = paper_row(json_file.stem, paper)
+        else:
+            row = _empty_row(json_file.stem)
+            row["parse_error"] = f"Expected a JSON object, got {type(paper).__name__}"
+
+    stat = json_file.stat()
+    row["file_name"] = json_file.name
+    row["file_size"] = stat.st_size
+    row["mtime_ns"] = stat.st_mtime_ns
+    return row
+
+
+class StageTable:
+    """Columnar view over the paper JSON files of one pipeline stage."""
+
+    def __init__(self, directory: Path, rows: list[dict[str, Any]]):
+        """Build columns from row dicts produced by scan_paper."""
+        self.directory = Path(directory)
+        self.paper_ids: list[str] = [row["paper_id"] for row in rows]
+        self.file_names: list[str] = [row["file_name"] for row in rows]
+        self.parse_errors: list[str] = [row["parse_error"] for row in rows]
+        self.mtimes: list[int] = [row["mtime_ns"] for row in rows]
+        self.section_types: list[list[str]] = [row["section_types"] for row in rows]
+        self.crossref_status: list[str] = [row["crossref_status"] for row in rows]
+        self.values: dict[str, list[Any]] = {
+            field: [row["values"][field] for row in rows] for field in VALUE_FIELDS
+        }
+        self.counts: dict[str, np.ndarray] = {
+            name: np.array([row[name] for row in rows], dtype=np.int64) for name in COUNT_COLUMNS
+        }
+        self.filled = np.array([row["filled"] for row in rows], dtype=bool).reshape(
+            len(rows), len(FLAG_FIELDS)
+        )
+        self.present = np.array([row["present"] for row in rows], dtype=bool).reshape(
+            len(rows), len(KEY_FIELDS)
+        )
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.paper_ids)
+
+    # ------------------------------------------------------------------
+    # Building and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def scan(cls, directory: Path | str, persist: bool = False) -> "StageTable":
+        """Load the table for a stage directory, parsing only new or changed papers.
+
+        Args:
+            directory: Stage directory containing one JSON file per paper
+            persist: Write the refreshed table back beside the stage
+
+        Returns:
+            StageTable over every ``*.json`` file in the directory, sorted by name
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return cls(directory, [])
+
+        table_file = directory / config.STAGE_TABLE_FILENAME
+        cached = cls.load(table_file)
+        cached_rows = {} if cached is None else {name: i for i, name in enumerate(cached.file_names)}
+
+        rows = []
+        parsed = 0
+        for json_file in sorted(directory.glob("*.json")):
+            stat = json_file.stat()
+            i = cached_rows.get(json_file.name)
+            if (
+                cached is not None
+                and i is not None
+                and cached.mtimes[i] == stat.st_mtime_ns
+                and cached.counts["file_size"][i] == stat.st_size
+            ):
+                rows.append(cached.row(i))
+            else:
+                rows.append(scan_paper(json_file))
+                parsed += 1
+
+        table = cls(directory, rows)
+        stale = cached is None or parsed > 0 or len(cached_rows) != len(rows)
+        if persist and stale:
+            table.save(table_file)
+        logger.debug("Stage table %s: %d rows, %d parsed", directory, len(rows), parsed)
+        return table
+
+    @classmethod
+    def load(cls, table_file: Path) -> "StageTable | None":
+        """Read a persisted table, or None if missing or from another table version."""
+        data = load_checkpoint(table_file)
+        if data.get("version") != TABLE_VERSION:
+            return None
+
+        columns = data["columns"]
+        rows = []
+        for i in range(len(columns["paper_id"])):
+            row = {name: columns[name][i] for name in columns if name not in ("filled", "present", "values")}
+            row["filled"] = _unpack(columns["filled"][i], len(FLAG_FIELDS))
+            row["present"] = _unpack(columns["present"][i], len(KEY_FIELDS))
+            row["values"] = {field: columns["values"][field][i] for field in VALUE_FIELDS}
+            rows.append(row)
+        return cls(table_file.parent, rows)
+
+    def save(self, table_file: Path) -> bool:
+        """Persist the table as compact JSON with packed flag bitmasks."""
+        columns: dict[str, Any] = {
+            "paper_id": self.paper_ids,
+            "file_name": self.file_names,
+            "parse_error": self.parse_errors,
+            "mtime_ns": self.mtimes,
+            "section_types": self.section_types,
+            "crossref_status": self.crossref_status,
+            "values": self.values,
+            "filled": [_pack(bits) for bits in self.filled.tolist()],
+            "present": [_pack(bits) for bits in self.present.tolist()],
+        }
+        columns.update({name: values.tolist() for name, values in self.counts.items()})
+        return save_checkpoint_atomic(
+            table_file,
+            {"version": TABLE_VERSION, "fields": list(FLAG_FIELDS), "columns": columns},
+            indent=None,
+        )
+
+    def row(self, i: int) -> dict[str, Any]:
+        """Return row ``i`` in the scan_paper row format."""
+        row: dict[str, Any] = {
+            "paper_id": self.paper_ids[i],
+            "file_name": self.file_names[i],
+            "parse_error": self.parse_errors[i],
+            "mtime_ns": self.mtimes[i],
+            "section_types": self.section_types[i],
+            "crossref_status": self.crossref_status[i],
+            "filled": self.filled[i].tolist(),
+            "present": self.present[i].tolist(),
+            "values": {field: values[i] for field, values in self.values.items()},
+        }
+        row.update({name: int(values[i]) for name, values in self.counts.items()})
+        return row
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def take(self, selection: np.ndarray | list[int]) -> "StageTable":
+        """Return a new table restricted to a boolean mask or list of row indices."""
+        indices = np.flatnonzero(selection) if np.asarray(selection).dtype == bool else selection
+        return StageTable(self.directory, [self.row(int(i)) for i in indices])
+
+    def exclude_names(self, *keywords: str, ignore_case: bool = False, hidden: bool = False) -> "StageTable":
+        """Drop rows whose file name contains any keyword (reports, logs, checkpoints).
+
+        Args:
+            keywords: Substrings marking non-paper files
+            ignore_case: Compare against the lower-cased file name
+            hidden: Also drop dotfiles
+        """
+        keep = []
+        for i, name in enumerate(self.file_names):
+            candidate = name.lower() if ignore_case else name
+            if any(keyword in candidate for keyword in keywords):
+                continue
+            if hidden and name.startswith("."):
+                continue
+            keep.append(i)
+        return self.take(keep) if len(keep) != len(self) else self
+
+    def has(self, field: str) -> np.ndarray:
+        """Bool column: field is truthy."""
+        return self.filled[:, _FLAG_INDEX[field]]
+
+    def filled_columns(self, fields: tuple[str, ...] | list[str]) -> np.ndarray:
+        """Bool matrix (rows x fields) of field truthiness, in the given field order."""
+        return self.filled[:, [_FLAG_INDEX[field] for field in fields]]
+
+    def flags(self, i: int, fields: tuple[str, ...] | list[str]) -> list[bool]:
+        """Truthiness of the given fields for row ``i``."""
+        row = self.filled[i]
+        return [bool(row[_FLAG_INDEX[field]]) for field in fields]
+
+    def has_key(self, field: str) -> np.ndarray:
+        """Bool column: field is present, whatever its value."""
+        return self.present[:, _KEY_INDEX[field]]
+
+    def count(self, name: str) -> np.ndarray:
+        """Integer column such as ``section_text_chars`` or ``num_references``."""
+        return self.counts[name]
+
+    @property
+    def parsed(self) -> np.ndarray:
+        """Bool column: the file parsed as a JSON object."""
+        return np.array([not error for error in self.parse_errors], dtype=bool)
+
+    def coverage(self, field: str) -> tuple[float, int]:
+        """Return (percentage, count) of rows where field is truthy."""
+        if not len(self):
+            return 0.0, 0
+        count = int(self.has(field).sum())
+        return count / len(self) * 100, count
+
+    def ids(self, mask: np.ndarray | None = None) -> list[str]:
+        """Paper IDs of all rows, or of the rows selected by mask."""
+        if mask is None:
+            return list(self.paper_ids)
+        return [self.paper_ids[i] for i in np.flatnonzero(mask)]
+
+    def missing(self, fields: tuple[str, ...] | list[str]) -> list[list[str]]:
+        """Per-row list of fields (in the given order) that are not truthy."""
+        matrix = self.filled_columns(fields)
+        return [
+            [field for field, filled in zip(fields, row, strict=True) if not filled]
+            for row in matrix.tolist()
+        ]
+
+    def text(self, field: str, i: int) -> str:
+        """Stripped string value of a VALUE_FIELDS field, empty if absent or not a string."""
+        return _stripped(self.values[field][i])
+
+    def record(self, i: int) -> dict[str, Any]:
+        """Load the full paper JSON for row ``i`` (for detail views of single papers)."""
+        with open(self.directory / self.file_names[i], encoding="utf-8") as f:
+            paper: dict[str, Any] = json.load(f)
+        return paper
+
+    def field_coverage_report(self, fields: tuple[str, ...] = FLAG_FIELDS) -> list[str]:
+        """Return one formatted coverage line per field."""
+        lines = []
+        for field in fields:
+            pct, count = self.coverage(field)
+            lines.append(f"  {field:20s}: {count:5d}/{len(self)} ({pct:5.1f}%)")
+        return lines
+
+
+def main() -> None:
+    """Print field coverage for each stage directory from its stage table."""
+    parser = argparse.ArgumentParser(description="Single-pass field coverage audit of pipeline stages")
+    parser.add_argument("directories", nargs="+", help="Stage directories to audit")
+    parser.add_argument(
+        "--persist", action="store_true", help="Write each stage table beside its stage for later scans"
+    )
+    parser.add_argument(
+        "--fields",
+        nargs="+",
+        choices=FLAG_FIELDS,
+        default=list(FLAG_FIELDS),
+        help="Fields to report (default: all tracked)",
+    )
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        table = StageTable.scan(directory, persist=args.persist)
+        papers = table.exclude_names("report", hidden=True)
+        print(f"\n{'=' * 60}")
+        print(f"{directory}: {len(papers)} papers ({len(papers) - int(papers.parsed.sum())} unreadable)")
+        print(f"{'=' * 60}")
+        print("\n".join(papers.field_coverage_report(tuple(args.fields))))
+
+
+if __name__ == "__main__":
+    main()
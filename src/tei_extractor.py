@@ -5,6 +5,7 @@ This enhanced version adds checkpoint recovery to resume processing after interr
 """
 
 from src import config
+from src.coverage_index import CoverageIndex
 import json
 from defusedxml import ElementTree
 from pathlib import Path
@@ -80,8 +81,90 @@ class ComprehensiveTEIExtractor:
 
         return None
 
-    def parse_tei_xml(self, tei_file: Path) -> dict[str, Any]:
-        """Comprehensively parse TEI XML to extract ALL information."""
+    def extract_sections(self, root: Any) -> list[dict[str, str]]:
+        """Extract body sections (title + joined paragraph text) from a parsed TEI root."""
+        sections = []
+        body_elem = root.find(".//tei:body", self.ns)
+
+        if body_elem is not None:
+            for div in body_elem.findall(".//tei:div", self.ns):
+                section = {}
+
+                # Get title
+                head = div.find("tei:head", self.ns)
+                if head is not None and head.text:
+                    section["title"] = head.text.strip()
+
+                # Get full text (including nested paragraphs)
+                paragraphs = []
+                for p in div.findall(".//tei:p", self.ns):
+                    # Use itertext() to get all text including nested elements
+                    text = " ".join(p.itertext()).strip()
+                    if text:
+                        paragraphs.append(text)
+
+                if paragraphs:
+                    section["text"] = "\n\n".join(paragraphs)
+
+                if section:
+                    sections.append(section)
+
+        return sections
+
+    def extract_references(self, root: Any) -> list[dict[str, Any]]:
+        """Extract bibliography entries from a parsed TEI root."""
+        references = []
+        ref_elems = root.findall(".//tei:listBibl/tei:biblStruct", self.ns)
+
+        for ref_elem in ref_elems:
+            ref: dict[str, Any] = {}
+
+            # Title
+            title_elem = ref_elem.find(".//tei:title", self.ns)
+            if title_elem is not None and title_elem.text:
+                ref["title"] = title_elem.text.strip()
+
+            # Authors
+            ref_authors = []
+            for author in ref_elem.findall(".//tei:author", self.ns):
+                forename = author.find(".//tei:forename", self.ns)
+                surname = author.find(".//tei:surname", self.ns)
+                if surname is not None and surname.text:
+                    name = surname.text.strip()
+                    if forename is not None and forename.text:
+                        name = f"{forename.text.strip()} {name}"
+                    ref_authors.append(name)
+            if ref_authors:
+                ref["authors"] = ref_authors
+
+            # Year
+            date_elem = ref_elem.find(".//tei:date[@when]", self.ns)
+            if date_elem is not None:
+                year = self.extract_year_from_date(date_elem.get("when"))
+                if year:
+                    ref["year"] = year
+
+            # DOI
+            doi_elem = ref_elem.find(".//tei:idno[@type='DOI']", self.ns)
+            if doi_elem is not None and doi_elem.text:
+                ref["doi"] = doi_elem.text.strip()
+
+            if ref:
+                references.append(ref)
+
+        return references
+
+    def parse_tei_xml(self, tei_file: Path, header_only: bool = False) -> dict[str, Any]:
+        """Comprehensively parse TEI XML to extract ALL information.
+
+        Args:
+            tei_file: Path to the TEI XML file
+            header_only: Skip section bodies and reference dicts. The record keeps
+                ``tei_file`` so LazyTEIContent can materialize them later.
+
+        Returns:
+            Extracted paper record
+        """
         try:
             tree = ElementTree.parse(tei_file)
             root = tree.getroot()
@@ -248,85 +331,28 @@ class ComprehensiveTEIExtractor:
             if keywords:
                 data["keywords"] = keywords
 
-            # ============= 7. SECTIONS =============
-
-            sections = []
-            body_elem = root.find(".//tei:body", self.ns)
+            # ============= 7. SECTIONS / 8. REFERENCES =============
 
-            if body_elem is not None:
-                for div in body_elem.findall(".//tei:div", self.ns):
-                    section = {}
-
-                    # Get title
-                    head = div.find("tei:head", self.ns)
-                    if head is not None and head.text:
-                        section["title"] = head.text.strip()
-
-                    # Get full text (including nested paragraphs)
-                    paragraphs = []
-                    for p in div.findall(".//tei:p", self.ns):
-                        # Use itertext() to get all text including nested elements
-                        text = " ".join(p.itertext()).strip()
-                        if text:
-                            paragraphs.append(text)
-
-                    if paragraphs:
-                        section["text"] = "\n\n".join(paragraphs)
-
-                    if section:
-                        sections.append(section)
-
-            if sections:
-                data["sections"] = sections
-
-            # ============= 8. REFERENCES =============
-
-            references = []
-            ref_elems = root.findall(".//tei:listBibl/tei:biblStruct", self.ns)
-
-            for ref_elem in ref_elems:
-                ref = {}
-
-                # Title
-                title_elem = ref_elem.find(".//tei:title", self.ns)
-                if title_elem is not None and title_elem.text:
-                    ref["title"] = title_elem.text.strip()
-
-                # Authors
-                ref_authors = []
-                for author in ref_elem.findall(".//tei:author", self.ns):
-                    forename = author.find(".//tei:forename", self.ns)
-                    surname = author.find(".//tei:surname", self.ns)
-                    if surname is not None and surname.text:
-                        name = surname.text.strip()
-                        if forename is not None and forename.text:
-                            name = f"{forename.text.strip()} {name}"
-                        ref_authors.append(name)
-                if ref_authors:
-                    ref["authors"] = ref_authors
-
-                # Year
-                date_elem = ref_elem.find(".//tei:date[@when]", self.ns)
-                if date_elem is not None:
-                    year = self.extract_year_from_date(date_elem.get("when"))
-                    if year:
-                        ref["year"] = year
-
-                # DOI
-                doi_elem = ref_elem.find(".//tei:idno[@type='DOI']", self.ns)
-                if doi_elem is not None and doi_elem.text:
-                    ref["doi"] = doi_elem.text.strip()
-
-                if ref:
-                    references.append(ref)
+            if header_only:
+                # Keep a pointer to the TEI so LazyTEIContent can load the body on demand
+                data["tei_file"] = str(tei_file)
+                data["header_only"] = True
+                num_references = len(root.findall(".//tei:listBibl/tei:biblStruct", self.ns))
+                if num_references:
+                    data["num_references"] = num_references
+            else:
+                sections = self.extract_sections(root)
+                if sections:
+                    data["sections"] = sections
 
-            if references:
-                data["references"] = references
-                data["num_references"] = len(references)
+                references = self.extract_references(root)
+                if references:
+                    data["references"] = references
+                    data["num_references"] = len(references)
 
             # Track extracted fields
             for field in data:
-                if field != "paper_id":
+                if field not in ("paper_id", "tei_file", "header_only"):
                     self.stats["fields_extracted"][field] = self.stats["fields_extracted"].get(field, 0) + 1
 
             return data
@@ -338,8 +364,12 @@ class ComprehensiveTEIExtractor:
             logger.error("Unexpected error processing %s: %s", tei_file.name, e)
             return {"paper_id": tei_file.stem, "error": str(e)}
 
-    def process_directory(self, tei_dir: Path, output_dir: Path) -> None:
-        """Process all TEI XML files in a directory with checkpoint support."""
+    def process_directory(self, tei_dir: Path, output_dir: Path, header_only: bool = False) -> None:
+        """Process all TEI XML files in a directory with checkpoint support.
+
+        With ``header_only`` the JSON records carry metadata only; sections and
+        references are read back from the TEI by LazyTEIContent when needed.
+        """
         tei_files = list(tei_dir.glob("*.xml"))
         logger.info("Found %d TEI XML files", len(tei_files))
 
@@ -347,6 +377,7 @@ class ComprehensiveTEIExtractor:
 
         # Load checkpoint
         self.load_checkpoint(output_dir)
+        coverage = CoverageIndex.open(output_dir, self.checkpoint_file)
 
         # Filter out already processed files
         files_to_process = []
@@ -361,6 +392,7 @@ class ComprehensiveTEIExtractor:
 
         if not files_to_process:
             logger.info("All files already processed!")
+            coverage.finish()
             self.print_summary()
             return
 
@@ -374,7 +406,7 @@ class ComprehensiveTEIExtractor:
             self.stats["total"] += 1
 
             # Extract data
-            data = self.parse_tei_xml(tei_file)
+            data = self.parse_tei_xml(tei_file, header_only=header_only)
 
             if "parse_error" in data or "error" in data:
                 self.stats["failed"] += 1
@@ -386,6 +418,7 @@ class ComprehensiveTEIExtractor:
             output_file = output_dir / f"{tei_file.stem}.json"
             with open(output_file, "w") as f:
                 json.dump(data, f, indent=2)
+            coverage.record(tei_file.stem, data)
 
             # Track processed file
             self.processed_files.add(tei_file.stem)
@@ -394,11 +427,13 @@ class ComprehensiveTEIExtractor:
             # Save checkpoint periodically
             if checkpoint_counter >= config.TEI_CHECKPOINT_INTERVAL:
                 self.save_checkpoint()
+                coverage.save()
                 logger.info("Checkpoint saved: %d total files processed", len(self.processed_files))
                 checkpoint_counter = 0
 
         # Final checkpoint save
         self.save_checkpoint()
+        coverage.finish(self.stats)
 
         # Print summary
         self.print_summary()
@@ -420,12 +455,133 @@ class ComprehensiveTEIExtractor:
                 print(f"  {field}: {count} ({percentage:.1f}%)")
 
 
+class LazyTEIContent:
+    """On-demand access to full-text sections and references of a paper record.
+
+    Header-only records (see ``parse_tei_xml(header_only=True)``) carry just the
+    metadata enrichment stages need. Consumers that want the body wrap the
+    record and touch ``sections`` or ``references``; the TEI (or a stored full
+    JSON record) is parsed the first time either is accessed and cached after.
+
+    Resolution order:
+        1. Fields already present on the record (full extraction)
+        2. Full JSON record in ``json_dir`` named ``<paper_id>.json``
+        3. TEI file from the record's ``tei_file`` or ``tei_dir/<paper_id>.xml``
+    """
+
+    def __init__(
+        self,
+        paper: dict[str, Any],
+        tei_dir: Path | None = None,
+        json_dir: Path | None = None,
+        extractor: ComprehensiveTEIExtractor | None = None,
+    ) -> None:
+        """Wrap a paper record.
+
+        Args:
+            paper: Paper record (header-only or full)
+            tei_dir: Directory holding ``<paper_id>.xml`` TEI files
+            json_dir: Directory holding full JSON records to read from first
+            extractor: Extractor to reuse for parsing (one is created if omitted)
+        """
+        self.paper = paper
+        self.tei_dir = tei_dir
+        self.json_dir = json_dir
+        self.extractor = extractor or ComprehensiveTEIExtractor()
+        self._loaded: dict[str, Any] | None = None
+
+    @property
+    def paper_id(self) -> str:
+        """Return the wrapped paper's ID."""
+        return str(self.paper.get("paper_id", ""))
+
+    def _tei_path(self) -> Path | None:
+        """Locate the TEI file backing this record."""
+        if self.paper.get("tei_file"):
+            tei_file = Path(self.paper["tei_file"])
+            if tei_file.exists():
+                return tei_file
+        if self.tei_dir is not None:
+            tei_file = self.tei_dir / f"{self.paper_id}.xml"
+            if tei_file.exists():
+                return tei_file
+        return None
+
+    def _load(self) -> dict[str, Any]:
+        """Materialize sections and references once."""
+        if self._loaded is not None:
+            return self._loaded
+
+        loaded: dict[str, Any] = {}
+
+        if self.json_dir is not None:
+            json_file = self.json_dir / f"{self.paper_id}.json"
+            if json_file.exists():
+                try:
+                    with open(json_file) as f:
+                        stored = json.load(f)
+                    if not stored.get("header_only"):
+                        loaded = {key: stored[key] for key in ("sections", "references") if key in stored}
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning("Could not read stored record %s: %s", json_file, e)
+
+        if not loaded:
+            tei_file = self._tei_path()
+            if tei_file is not None:
+                try:
+                    root = ElementTree.parse(tei_file).getroot()
+                    loaded = {
+                        "sections": self.extractor.extract_sections(root),
+                        "references": self.extractor.extract_references(root),
+                    }
+                except ElementTree.ParseError as e:
+                    logger.error("XML parse error in %s: %s", tei_file.name, e)
+            else:
+                logger.debug("No full-text source found for %s", self.paper_id)
+
+        self._loaded = loaded
+        return loaded
+
+    @property
+    def sections(self) -> list[dict[str, str]]:
+        """Return full-text sections, loading them on first access."""
+        if "sections" in self.paper:
+            sections: list[dict[str, str]] = self.paper["sections"]
+            return sections
+        return list(self._load().get("sections", []))
+
+    @property
+    def references(self) -> list[dict[str, Any]]:
+        """Return reference dicts, loading them on first access."""
+        if "references" in self.paper:
+            references: list[dict[str, Any]] = self.paper["references"]
+            return references
+        return list(self._load().get("references", []))
+
+    def materialize(self) -> dict[str, Any]:
+        """Return a full record (header fields plus sections and references)."""
+        full = {k: v for k, v in self.paper.items() if k not in ("tei_file", "header_only")}
+        sections = self.sections
+        references = self.references
+        if sections:
+            full["sections"] = sections
+        if references:
+            full["references"] = references
+            full["num_references"] = len(references)
+        return full
+
+
 def main() -> None:
     """Run the main program."""
     parser = argparse.ArgumentParser(description="TEI XML to JSON extraction with checkpoint recovery")
     parser.add_argument("--input-dir", default="tei_xml", help="Directory containing TEI XML files")
     parser.add_argument("--output-dir", default="json_extracted", help="Output directory for JSON files")
     parser.add_argument("--reset", action="store_true", help="Reset checkpoint and start fresh")
+    parser.add_argument(
+        "--header-only",
+        action="store_true",
+        help="Extract metadata only; sections and references are loaded lazily from the TEI",
+    )
 
     args = parser.parse_args()
 
@@ -444,7 +600,7 @@ def main() -> None:
             logger.info("Checkpoint reset")
 
     extractor = ComprehensiveTEIExtractor()
-    extractor.process_directory(input_dir, output_dir)
+    extractor.process_directory(input_dir, output_dir, header_only=args.header_only)
 
 
 if __name__ == "__main__":
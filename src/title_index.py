@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Shared fuzzy title matching for recovery and enrichment stages.
+
+Titles are normalized (case, accents, punctuation), split into character
+shingles and compared by Jaccard similarity. TitleIndex adds MinHash
+signatures and LSH buckets so candidate lookup against a large library
+(Zotero, local metadata snapshot) is sub-linear; candidates are then
+verified with the exact shingle Jaccard so scores are identical whether a
+match came from the index or from a pairwise check.
+
+Used by:
+    - zotero_recovery.py (fuzzy fallback after DOI / title-prefix lookup)
+    - crossref_enricher.py (title search verification)
+    - core_enricher.py (title search verification)
+    - arxiv_enricher.py (best-match selection)
+    - recover_dois_crossref.py (candidate scoring)
+"""
+
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from src.config import (
+    TITLE_LSH_BANDS,
+    TITLE_MATCH_THRESHOLD,
+    TITLE_MINHASH_PERMUTATIONS,
+    TITLE_SHINGLE_SIZE,
+)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(title: str | None) -> str:
+    """Normalize a title for matching.
+
+    Lowercases, strips accents and collapses punctuation/whitespace to single
+    spaces.
+
+    Args:
+        title: Raw title
+
+    Returns:
+        Normalized title ("" for empty input)
+
+    Example:
+        >>> normalize_title("  Machine-Learning: A Review. ")
+        'machine learning a review'
+    """
+    if not title:
+        return ""
+    text = unicodedata.normalize("NFKD", str(title))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def title_shingles(title: str | None, size: int = TITLE_SHINGLE_SIZE) -> set[str]:
+    """Return the character shingles of a normalized title.
+
+    Args:
+        title: Raw title
+        size: Characters per shingle
+
+    Returns:
+        Set of shingles (titles shorter than ``size`` yield the whole string)
+    """
+    normalized = normalize_title(title)
+    if not normalized:
+        return set()
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+
+
+def title_similarity(title1: str | None, title2: str | None) -> float:
+    """Jaccard similarity of two titles' shingle sets (0.0-1.0).
+
+    Args:
+        title1: First title
+        title2: Second title
+
+    Returns:
+        Similarity score; 0.0 if either title is empty
+    """
+    shingles1 = title_shingles(title1)
+    shingles2 = title_shingles(title2)
+    return _jaccard(shingles1, shingles2)
+
+
+def titles_match(title1: str | None, title2: str | None, threshold: float = TITLE_MATCH_THRESHOLD) -> bool:
+    """Check whether two titles refer to the same paper."""
+    return title_similarity(title1, title2) >= threshold
+
+
+def _jaccard(set1: set[str], set2: set[str]) -> float:
+    """Jaccard index of two sets."""
+    if not set1 or not set2:
+        return 0.0
+    return len(set1 & set2) / len(set1 | set2)
+
+
+class TitleIndex:
+    """MinHash/LSH index over titles for sub-linear fuzzy lookup.
+
+    Example:
+        >>> index = TitleIndex()
+        >>> index.add("ABC123", "Digital health interventions for hypertension")
+        >>> index.best_match("Digital Health Interventions for Hypertension.")
+        ('ABC123', 1.0)
+    """
+
+    def __init__(
+        self,
+        num_perm: int = TITLE_MINHASH_PERMUTATIONS,
+        bands: int = TITLE_LSH_BANDS,
+        shingle_size: int = TITLE_SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (must divide ``num_perm``)
+            shingle_size: Characters per shingle
+            seed: Seed for the hash permutations (fixed for reproducible buckets)
+        """
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        # a < 2^31 and x < 2^32 keep a*x + b inside uint64 before the modulo
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: list[dict[bytes, list[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._shingles: dict[str, set[str]] = {}
+        self._titles: dict[str, str] = {}
+        self._payloads: dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed titles."""
+        return len(self._titles)
+
+    def __contains__(self, key: object) -> bool:
+        """Check whether a key is indexed."""
+        return key in self._titles
+
+    def signature(self, shingles: set[str]) -> np.ndarray:
+        """Compute the MinHash signature of a shingle set."""
+        if not shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        signature: np.ndarray = (permuted & _MAX_HASH).min(axis=1)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        """Split a signature into per-band bucket keys."""
+        return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key: str, title: str | None, payload: Any = None) -> bool:
+        """Index a title under ``key``.
+
+        Args:
+            key: Identifier returned by queries (paper_id, Zotero key, DOI...)
+            title: Title to index
+            payload: Optional object returned by ``get_payload``
+
+        Returns:
+            True if indexed, False if the title was empty or the key already present
+        """
+        shingles = title_shingles(title, self.shingle_size)
+        if not shingles or key in self._titles:
+            return False
+
+        for band, band_key in enumerate(self._band_keys(self.signature(shingles))):
+            self._buckets[band][band_key].append(key)
+
+        self._shingles[key] = shingles
+        self._titles[key] = str(title)
+        if payload is not None:
+            self._payloads[key] = payload
+        return True
+
+    def add_many(self, items: Iterable[tuple[str, str | None]]) -> int:
+        """Index ``(key, title)`` pairs and return how many were added."""
+        return sum(self.add(key, title) for key, title in items)
+
+    def get_title(self, key: str) -> str | None:
+        """Return the indexed title for a key."""
+        return self._titles.get(key)
+
+    def get_payload(self, key: str) -> Any:
+        """Return the payload stored with a key (None if none)."""
+        return self._payloads.get(key)
+
+    def candidates(self, title: str | None) -> set[str]:
+        """Return keys sharing at least one LSH bucket with ``title``."""
+        shingles = title_shingles(title, self.shingle_size)
+        if not shingles:
+            return set()
+        found: set[str] = set()
+        for band, band_key in enumerate(self._band_keys(self.signature(shingles))):
+            found.update(self._buckets[band].get(band_key, ()))
+        return found
+
+    def query(
+        self, title: str | None, threshold: float = TITLE_MATCH_THRESHOLD, limit: int | None = None
+    ) -> list[tuple[str, float]]:
+        """Find indexed titles similar to ``title``.
+
+        Args:
+            title: Title to look up
+            threshold: Minimum shingle Jaccard for a result
+            limit: Maximum results (all if None)
+
+        Returns:
+            ``(key, score)`` pairs sorted by descending score
+        """
+        shingles = title_shingles(title, self.shingle_size)
+        if not shingles:
+            return []
+
+        results = []
+        for key in self.candidates(title):
+            score = _jaccard(shingles, self._shingles[key])
+            if score >= threshold:
+                results.append((key, score))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit] if limit is not None else results
+
+    def best_match(
+        self, title: str | None, threshold: float = TITLE_MATCH_THRESHOLD
+    ) -> tuple[str, float] | None:
+        """Return the single best ``(key, score)`` match above ``threshold``."""
+        results = self.query(title, threshold=threshold, limit=1)
+        return results[0] if results else None
@@ -9,6 +9,8 @@ Usage:
 """
 
 from src import config
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus
 import json
 import time
 from pathlib import Path
@@ -142,6 +144,7 @@ def main() -> None:
     parser.add_argument("--test", action="store_true", help="Test mode - use small dataset")
     parser.add_argument("--no-parallel", action="store_true", help="Disable parallel processing")
     parser.add_argument("--analyze-only", action="store_true", help="Only analyze existing results")
+    parser.add_argument("--force", action="store_true", help="Force re-enrichment even if already processed")
 
     args = parser.parse_args()
 
@@ -204,8 +207,15 @@ def main() -> None:
     papers_with_dois = []
     papers_by_doi = {}
     papers_without_doi = []
+    skipped_already_enriched = 0
+    status = PaperStatus.open("unpaywall", output_path)
 
     for paper_file in paper_files:
+        # Skip if already enriched (unless force mode); its output is already written
+        if not args.force and status.is_done(paper_file.stem):
+            skipped_already_enriched += 1
+            continue
+
         with open(paper_file) as f:
             paper = json.load(f)
             doi = paper.get("doi")
@@ -216,6 +226,8 @@ def main() -> None:
                 papers_without_doi.append(paper_file.stem)
 
     print(f"Found {len(papers_with_dois)} papers with DOIs")
+    if skipped_already_enriched > 0:
+        print(f"Skipped (already enriched): {skipped_already_enriched}")
     if papers_without_doi:
         print(f"Skipping {len(papers_without_doi)} papers without DOIs")
 
@@ -223,6 +235,8 @@ def main() -> None:
         print("No papers with DOIs to process")
         return
 
+    coverage = CoverageIndex.open(output_path)
+
     # Process papers
     print("\nProcessing papers with Unpaywall API...")
     print("Note: Unpaywall requires individual API calls per DOI")
@@ -270,6 +284,8 @@ def main() -> None:
                 output_file = output_path / f"{paper_id}.json"
                 with open(output_file, "w") as f:
                     json.dump(original_paper, f, indent=2)
+                coverage.record(paper_id, original_paper)
+            coverage.save()
 
     # Save remaining papers
     print("\nSaving all enriched papers...")
@@ -292,6 +308,8 @@ def main() -> None:
         output_file = output_path / f"{paper_id}.json"
         with open(output_file, "w") as f:
             json.dump(original_paper, f, indent=2)
+        coverage.record(paper_id, original_paper)
+        status.record(paper_id, success=doi in all_results)
 
     # Also copy papers without DOIs
     for paper_id in papers_without_doi:
@@ -301,6 +319,10 @@ def main() -> None:
             paper = json.load(f)
         with open(output_file, "w") as f:
             json.dump(paper, f, indent=2)
+        coverage.record(paper_id, paper)
+        status.record(paper_id, success=False)
+    coverage.save()
+    status.save()
 
     elapsed_time = time.time() - start_time
 
@@ -330,6 +352,7 @@ def main() -> None:
     report_file = output_path / "unpaywall_enrichment_report.json"
     with open(report_file, "w") as f:
         json.dump(report, f, indent=2)
+    coverage.finish(report["statistics"])
 
     print("\n" + "=" * 80)
     print("ENRICHMENT COMPLETE")
@@ -5,6 +5,7 @@ Analyzes the complete pipeline from TEI extraction through S2 enrichment.
 """
 
 from src import config
+from src.stage_table import StageTable
 import json
 from pathlib import Path
 from datetime import datetime, UTC
@@ -125,44 +126,25 @@ def analyze_pipeline_results() -> None:
     print("6. FINAL PAPER ANALYSIS")
     print("-" * 40)
 
-    # Analyze final enriched papers
-    final_papers = list(s2_dir.glob("*.json"))
-
-    # Sample analysis of enriched data
-    citation_counts = []
-    has_abstract = 0
-    has_tldr = 0
-    has_authors_hindex = 0
-    has_venue = 0
-    has_references = 0
-    has_citations = 0
-
-    for paper_file in final_papers[:100]:  # Sample first 100 for quick analysis
-        with open(paper_file) as f:
-            paper = json.load(f)
-
-            if paper.get("s2_citation_count") is not None:
-                citation_counts.append(paper["s2_citation_count"])
-            if paper.get("abstract"):
-                has_abstract += 1
-            if paper.get("tldr"):
-                has_tldr += 1
-            if paper.get("max_author_h_index"):
-                has_authors_hindex += 1
-            if paper.get("venue") or paper.get("publication_venue"):
-                has_venue += 1
-            if paper.get("reference_count"):
-                has_references += 1
-            if paper.get("citation_titles"):
-                has_citations += 1
-
-    print("   Sample analysis (first 100 papers):")
-    print(f"      Papers with abstracts: {has_abstract}/100")
-    print(f"      Papers with TLDRs: {has_tldr}/100")
-    print(f"      Papers with author h-index: {has_authors_hindex}/100")
-    print(f"      Papers with venue info: {has_venue}/100")
-    print(f"      Papers with references: {has_references}/100")
-    print(f"      Papers with citation lists: {has_citations}/100")
+    # Analyze final enriched papers from the stage table (all papers, no sampling needed)
+    final_papers = StageTable.scan(s2_dir).exclude_names("report")
+    total = len(final_papers)
+
+    citation_counts = [count for count in final_papers.values["s2_citation_count"] if count is not None]
+    has_abstract = int(final_papers.has("abstract").sum())
+    has_tldr = int(final_papers.has("tldr").sum())
+    has_authors_hindex = int(final_papers.has("max_author_h_index").sum())
+    has_venue = int((final_papers.has("venue") | final_papers.has("publication_venue")).sum())
+    has_references = int(final_papers.has("reference_count").sum())
+    has_citations = int(final_papers.has("citation_titles").sum())
+
+    print(f"   Analysis of all {total} papers:")
+    print(f"      Papers with abstracts: {has_abstract}/{total}")
+    print(f"      Papers with TLDRs: {has_tldr}/{total}")
+    print(f"      Papers with author h-index: {has_authors_hindex}/{total}")
+    print(f"      Papers with venue info: {has_venue}/{total}")
+    print(f"      Papers with references: {has_references}/{total}")
+    print(f"      Papers with citation lists: {has_citations}/{total}")
 
     if citation_counts:
         print(f"\n   Citation statistics (n={len(citation_counts)}):")
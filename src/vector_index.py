@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""FAISS vector index over paper embeddings, sized to the corpus.
+
+The index type is picked from the number of vectors:
+
+- ``flat``: exact inner-product search, best below ``config.INDEX_FLAT_MAX_VECTORS``
+- ``hnsw``: graph search with near-exact recall while vectors fit in memory
+- ``ivf_flat``: inverted lists, scanning ``config.INDEX_IVF_NPROBE`` lists per query
+- ``ivf_pq``: inverted lists over product-quantized codes for very large corpora
+
+Papers are added with ``add_with_ids`` under int64 IDs assigned by the index,
+so a KB update only adds new or changed papers and removes papers dropped by
+``filter_non_articles`` or ``final_cleanup_no_title`` instead of rebuilding.
+HNSW cannot delete vectors, so its deletions are filtered out of results
+until they pass ``config.INDEX_TOMBSTONE_REBUILD_RATIO`` and the index is
+rebuilt. The ID -> paper mapping lives in ``config.INDEX_IDS_FILE``.
+
+Filtered searches pass the allowed IDs to FAISS as a bitmap selector, so
+results are filtered during the search rather than after it. Filters that
+keep at most ``config.INDEX_FILTER_EXACT_RATIO`` of the papers are searched
+exhaustively (all inverted lists, or exact scores over the selected HNSW
+vectors), since approximate search finds too few matches among them.
+
+Usage:
+    python -m src.vector_index --papers-dir DIR/10_final_output
+    python -m src.vector_index --remove-from kb_articles_only/excluded_non_articles.txt
+    python -m src.vector_index --benchmark
+"""
+
+import argparse
+import json
+import math
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import faiss
+import numpy as np
+
+from src import config
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+
+def choose_index_type(n_vectors: int) -> str:
+    """Index type for a corpus of ``n_vectors`` embeddings."""
+    if n_vectors < config.INDEX_FLAT_MAX_VECTORS:
+        return "flat"
+    if n_vectors < config.INDEX_HNSW_MAX_VECTORS:
+        return "hnsw"
+    if n_vectors < config.INDEX_IVF_FLAT_MAX_VECTORS:
+        return "ivf_flat"
+    return "ivf_pq"
+
+
+def ivf_list_count(n_vectors: int) -> int:
+    """Inverted lists for ``n_vectors``: about 4 * sqrt(n), with enough training points per list."""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // config.INDEX_IVF_MIN_POINTS_PER_LIST))
+
+
+def create_index(index_type: str, dimensions: int, n_vectors: int) -> Any:
+    """Empty inner-product index of a given type that accepts ``add_with_ids``."""
+    if index_type == "flat":
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dimensions))
+    if index_type == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dimensions, config.INDEX_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = config.INDEX_HNSW_EF_CONSTRUCTION
+        return faiss.IndexIDMap2(hnsw)
+
+    quantizer = faiss.IndexFlatIP(dimensions)
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(
+            quantizer, dimensions, ivf_list_count(n_vectors), faiss.METRIC_INNER_PRODUCT
+        )
+    if index_type == "ivf_pq":
+        return faiss.IndexIVFPQ(
+            quantizer,
+            dimensions,
+            ivf_list_count(n_vectors),
+            config.INDEX_PQ_SUBQUANTIZERS,
+            config.INDEX_PQ_BITS,
+            faiss.METRIC_INNER_PRODUCT,
+        )
+    raise ValueError(f"Unknown index type: {index_type}")
+
+
+class VectorIndex:
+    """FAISS index plus the mapping from its int64 IDs to papers."""
+
+    def __init__(self, index: Any, index_type: str):
+        """Wrap an index of ``index_type`` holding no papers yet."""
+        self.index = index
+        self.index_type = index_type
+        self.ids: dict[str, int] = {}  # paper_id -> FAISS ID of its current vector
+        self.keys: dict[str, str] = {}  # paper_id -> content hash of that vector
+        self.paper_ids: dict[int, str] = {}  # FAISS ID -> paper_id, live vectors only
+        self.deleted: set[int] = set()  # HNSW vectors removed from results but still in the graph
+        self.next_id = 0
+        self.build_id = uuid.uuid4().hex  # Distinguishes rebuilt indexes that reuse the same IDs
+        self._configure()
+
+    def _configure(self) -> None:
+        if self.index_type == "hnsw":
+            hnsw: Any = faiss.downcast_index(self.index.index)
+            hnsw.hnsw.efSearch = config.INDEX_HNSW_EF_SEARCH
+        elif self.index_type in ("ivf_flat", "ivf_pq"):
+            faiss.extract_index_ivf(self.index).nprobe = config.INDEX_IVF_NPROBE
+
+    @classmethod
+    def build(
+        cls,
+        paper_ids: list[str],
+        vectors: np.ndarray,
+        keys: list[str] | None = None,
+        index_type: str | None = None,
+    ) -> "VectorIndex":
+        """Build an index over ``vectors``, training it first if its type needs it."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        index_type = index_type or choose_index_type(len(vectors))
+        vector_index = cls(create_index(index_type, vectors.shape[1], len(vectors)), index_type)
+        if not vector_index.index.is_trained:
+            vector_index.index.train(vectors)
+        vector_index.add(paper_ids, vectors, keys)
+        return vector_index
+
+    def __len__(self) -> int:
+        """Number of papers that can be returned."""
+        return len(self.ids)
+
+    @property
+    def version(self) -> str:
+        """Changes whenever papers are added or removed, so cached results can be invalidated."""
+        return f"{self.build_id}:{self.next_id}:{len(self)}"
+
+    @property
+    def needs_rebuild(self) -> bool:
+        """Whether the corpus outgrew the index type or too many HNSW vectors are deleted."""
+        if choose_index_type(len(self)) != self.index_type:
+            return True
+        return len(self.deleted) > config.INDEX_TOMBSTONE_REBUILD_RATIO * max(len(self), 1)
+
+    def add(self, paper_ids: list[str], vectors: np.ndarray, keys: list[str] | None = None) -> None:
+        """Add papers, replacing the vectors of papers already in the index."""
+        self.remove([paper_id for paper_id in paper_ids if paper_id in self.ids])
+        new_ids = np.arange(self.next_id, self.next_id + len(paper_ids), dtype=np.int64)
+        self.next_id += len(paper_ids)
+        self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), new_ids)
+        for paper_id, faiss_id, key in zip(
+            paper_ids, new_ids.tolist(), keys or [""] * len(paper_ids), strict=True
+        ):
+            self.ids[paper_id] = faiss_id
+            self.keys[paper_id] = key
+            self.paper_ids[faiss_id] = paper_id
+
+    def remove(self, paper_ids: list[str]) -> int:
+        """Remove papers from the index and return how many were present."""
+        faiss_ids = [self.ids.pop(paper_id) for paper_id in paper_ids if paper_id in self.ids]
+        for faiss_id in faiss_ids:
+            self.keys.pop(self.paper_ids.pop(faiss_id), None)
+        if not faiss_ids:
+            return 0
+        if self.index_type == "hnsw":
+            self.deleted.update(faiss_ids)
+        else:
+            self.index.remove_ids(np.array(faiss_ids, dtype=np.int64))
+        return len(faiss_ids)
+
+    def search_parameters(self, selector: Any) -> Any:
+        """FAISS search parameters restricting results to ``selector``, keeping this index's settings.
+
+        HNSW keeps its own ``efSearch`` when given base parameters; IVF needs its own type.
+        """
+        if self.index_type in ("ivf_flat", "ivf_pq"):
+            params: Any = faiss.SearchParametersIVF()
+            params.nprobe = config.INDEX_IVF_NPROBE
+        else:
+            params = faiss.SearchParameters()
+        params.sel = selector
+        return params
+
+    def _search_exact(
+        self, queries: np.ndarray, selector_ids: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Exact top-``k`` scores and IDs among the vectors stored under ``selector_ids``."""
+        faiss_ids = selector_ids[np.fromiter((i in self.paper_ids for i in selector_ids.tolist()), bool)]
+        if len(faiss_ids) == 0:
+            return np.zeros((len(queries), 0), np.float32), np.zeros((len(queries), 0), np.int64)
+        scores = queries @ self.index.reconstruct_batch(faiss_ids).T
+        k = min(k, len(faiss_ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        return np.take_along_axis(scores, top, axis=1), faiss_ids[top]
+
+    def search(
+        self, queries: np.ndarray, k: int = config.DEFAULT_K, selector_ids: np.ndarray | None = None
+    ) -> list[list[tuple[str, float]]]:
+        """Top ``k`` ``(paper_id, score)`` pairs for each query vector.
+
+        With ``selector_ids`` only vectors with those FAISS IDs are considered.
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, self.index.d)
+        fetch = min(k + len(self.deleted), self.index.ntotal)
+        if selector_ids is not None:
+            selector_ids = np.unique(np.asarray(selector_ids, dtype=np.int64))
+            fetch = min(fetch, len(selector_ids))
+        if fetch == 0:
+            return [[] for _ in range(len(queries))]
+
+        if selector_ids is None:
+            scores, faiss_ids = self.index.search(queries, fetch)
+        else:
+            exhaustive = len(selector_ids) <= config.INDEX_FILTER_EXACT_RATIO * len(self)
+            if exhaustive and self.index_type in ("flat", "hnsw"):
+                scores, faiss_ids = self._search_exact(queries, selector_ids, k)
+            else:
+                bits = np.zeros(self.next_id, dtype=bool)
+                bits[selector_ids] = True
+                bitmap = np.packbits(bits, bitorder="little")
+                selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+                params = self.search_parameters(selector)
+                if exhaustive and self.index_type in ("ivf_flat", "ivf_pq"):
+                    params.nprobe = faiss.extract_index_ivf(self.index).nlist
+                scores, faiss_ids = self.index.search(queries, fetch, params=params)
+        results = []
+        for row_scores, row_ids in zip(scores, faiss_ids, strict=True):
+            hits = [
+                (self.paper_ids[faiss_id], float(score))
+                for score, faiss_id in zip(row_scores.tolist(), row_ids.tolist(), strict=True)
+                if faiss_id in self.paper_ids
+            ]
+            results.append(hits[:k])
+        return results
+
+    def save(self, index_file: Path = config.INDEX_FILE, ids_file: Path = config.INDEX_IDS_FILE) -> None:
+        """Write the FAISS index and its ID mapping."""
+        Path(index_file).parent.mkdir(parents=True, exist_ok=True)
+        faiss.write_index(self.index, str(index_file))
+        paper_ids = list(self.ids)
+        with open(ids_file, "wb") as f:
+            np.savez(
+                f,
+                index_type=np.array(self.index_type),
+                next_id=np.array(self.next_id, dtype=np.int64),
+                build_id=np.array(self.build_id),
+                paper_ids=np.array(paper_ids, dtype="S64"),
+                ids=np.array([self.ids[p] for p in paper_ids], dtype=np.int64),
+                keys=np.array([self.keys[p] for p in paper_ids], dtype="S64"),
+                deleted=np.array(sorted(self.deleted), dtype=np.int64),
+            )
+
+    @classmethod
+    def load(
+        cls, index_file: Path = config.INDEX_FILE, ids_file: Path = config.INDEX_IDS_FILE
+    ) -> "VectorIndex | None":
+        """Read a saved index, or None if either file is missing."""
+        if not Path(index_file).exists() or not Path(ids_file).exists():
+            return None
+        data = np.load(ids_file)
+        vector_index = cls(faiss.read_index(str(index_file)), str(data["index_type"]))
+        vector_index.next_id = int(data["next_id"])
+        vector_index.build_id = str(data["build_id"])
+        vector_index.deleted = set(data["deleted"].tolist())
+        for paper_id, faiss_id, key in zip(
+            data["paper_ids"].tolist(), data["ids"].tolist(), data["keys"].tolist(), strict=True
+        ):
+            vector_index.ids[paper_id.decode()] = faiss_id
+            vector_index.keys[paper_id.decode()] = key.decode()
+            vector_index.paper_ids[faiss_id] = paper_id.decode()
+        return vector_index
+
+
+def sync_index(
+    vector_index: VectorIndex | None,
+    paper_ids: list[str],
+    keys: list[str],
+    vectors_for: Callable[[list[int]], np.ndarray],
+) -> tuple[VectorIndex, dict[str, int]]:
+    """Bring an index up to date with the KB's papers and their content hashes.
+
+    Only papers that are new or whose content hash changed are added, and
+    papers no longer in the KB are removed. The index is rebuilt when there is
+    none yet or it no longer suits the corpus size.
+
+    Args:
+        vector_index: Existing index, or None
+        paper_ids: Every paper in the KB
+        keys: Content hash of each paper's embedding
+        vectors_for: Returns the vectors for positions in ``paper_ids``
+    """
+    current = set(paper_ids)
+    if vector_index is not None:
+        removed = vector_index.remove(
+            [paper_id for paper_id in list(vector_index.ids) if paper_id not in current]
+        )
+        changed = [i for i, paper_id in enumerate(paper_ids) if vector_index.keys.get(paper_id) != keys[i]]
+        if not vector_index.needs_rebuild and choose_index_type(len(paper_ids)) == vector_index.index_type:
+            if changed:
+                vector_index.add(
+                    [paper_ids[i] for i in changed], vectors_for(changed), [keys[i] for i in changed]
+                )
+            return vector_index, {"added": len(changed), "removed": removed, "rebuilt": 0}
+
+    vector_index = VectorIndex.build(paper_ids, vectors_for(list(range(len(paper_ids)))), keys)
+    return vector_index, {"added": len(paper_ids), "removed": 0, "rebuilt": 1}
+
+
+def read_exclusions(path: Path) -> list[str]:
+    """Paper IDs from an ``excluded_non_articles.txt`` list or a ``pdf_quality_report.json``."""
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as f:
+            return [paper["paper_id"] for paper in json.load(f).get("excluded_papers", [])]
+    lines = (line.strip() for line in path.read_text().splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def benchmark(
+    vectors: np.ndarray,
+    k: int = config.DEFAULT_K,
+    index_types: tuple[str, ...] = INDEX_TYPES,
+    n_queries: int = config.INDEX_BENCHMARK_QUERIES,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Measure build time, query latency and recall@k of each index type against exact search.
+
+    Queries are embeddings sampled from the corpus itself.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)]
+    paper_ids = [str(i) for i in range(len(vectors))]
+    exact = [
+        {paper_id for paper_id, _ in hits}
+        for hits in VectorIndex.build(paper_ids, vectors, index_type="flat").search(queries, k)
+    ]
+
+    results: list[dict[str, Any]] = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        try:
+            vector_index = VectorIndex.build(paper_ids, vectors, index_type=index_type)
+        except RuntimeError as e:  # e.g. too few vectors to train product quantizers
+            results.append({"index_type": index_type, "error": str(e).splitlines()[0]})
+            continue
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = vector_index.search(queries, k)
+        latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+        recall = np.mean(
+            [
+                len(truth & {p for p, _ in hits}) / max(len(truth), 1)
+                for truth, hits in zip(exact, found, strict=True)
+            ]
+        )
+        results.append(
+            {
+                "index_type": index_type,
+                "build_seconds": build_seconds,
+                "latency_ms": latency_ms,
+                f"recall@{k}": float(recall),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    """Update, prune or benchmark the KB vector index."""
+    from src.embedding_builder import build_embeddings, content_hash, embedding_text, load_papers
+    from src.embedding_matrix import EmbeddingMatrix
+    from src.metadata_filter import MetadataFilter
+
+    parser = argparse.ArgumentParser(description="Maintain the FAISS index of paper embeddings")
+    parser.add_argument("--papers-dir", help="Sync the index with the papers in this directory")
+    parser.add_argument("--remove-from", help="Remove papers listed in an exclusion list or quality report")
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Compare index types on the stored embeddings"
+    )
+    parser.add_argument("--k", type=int, default=config.DEFAULT_K, help="Results per query for --benchmark")
+    args = parser.parse_args()
+
+    vector_index = VectorIndex.load()
+    if args.papers_dir:
+        papers = load_papers(Path(args.papers_dir))
+        matrix = EmbeddingMatrix.open()
+        rows, _ = build_embeddings(papers, matrix=matrix)
+        keys = [content_hash(embedding_text(paper), config.EMBEDDING_MODEL) for paper in papers]
+        vector_index, stats = sync_index(
+            vector_index,
+            [paper["paper_id"] for paper in papers],
+            keys,
+            lambda positions: matrix.get(rows[positions]),
+        )
+        vector_index.save()
+        MetadataFilter.build(papers, vector_index).save()
+        print(
+            f"Index ({vector_index.index_type}) has {len(vector_index)} papers: "
+            f"{stats['added']} added, {stats['removed']} removed"
+        )
+
+    if args.remove_from:
+        if vector_index is None:
+            print("No index to remove papers from")
+        else:
+            removed = vector_index.remove(read_exclusions(Path(args.remove_from)))
+            vector_index.save()
+            filters = MetadataFilter.load()
+            if filters is not None:
+                filters.prune(vector_index).save()
+            print(f"Removed {removed} papers; index has {len(vector_index)} papers")
+
+    if args.benchmark:
+        matrix = EmbeddingMatrix.open()
+        paper_ids = sorted({paper_id.decode() for paper_id in matrix.records["paper_id"].tolist()})
+        vectors = matrix.get([row for paper_id in paper_ids if (row := matrix.row_of(paper_id)) is not None])
+        print(f"{'Index':<10} {'Build (s)':>10} {'Latency (ms)':>13} {f'Recall@{args.k}':>10}")
+        for result in benchmark(vectors, k=args.k):
+            if "error" in result:
+                print(f"{result['index_type']:<10} skipped: {result['error']}")
+            else:
+                print(
+                    f"{result['index_type']:<10} {result['build_seconds']:>10.2f} "
+                    f"{result['latency_ms']:>13.3f} {result[f'recall@{args.k}']:>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
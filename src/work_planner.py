@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Plan the exact set of papers each enrichment stage still needs.
+
+Reads the central per-paper status table and each stage's coverage index,
+so nothing is parsed: for every stage the plan lists the papers that are new,
+fetched by an older stage version, failed and due for retry, or only need
+their fields re-derived from cached responses, and estimates API calls and
+time from the papers that carry the identifiers the stage looks up
+(re-derived papers cost no calls).
+
+Usage:
+    python -m src.work_planner --pipeline-dir extraction_pipeline_checkpoint_20250101
+    python -m src.work_planner --pipeline-dir DIR --stages s2 openalex --show-ids
+"""
+
+import argparse
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src import config
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """Where an enrichment stage reads and writes, and what its API calls cost."""
+
+    input_dir: str
+    output_dir: str
+    papers_per_call: int
+    seconds_per_call: float
+    lookup_fields: tuple[str, ...]  # Papers with any of these fields cost API calls
+
+
+STAGE_SPECS = {
+    "crossref": StageSpec("03_zotero_recovery", "04_crossref_enrichment", 1, 0.1, ("doi", "title")),
+    "s2": StageSpec(
+        "04_crossref_enrichment",
+        "05_s2_enrichment",
+        config.SEMANTIC_SCHOLAR_BATCH_SIZE,
+        1 / config.API_RATE_LIMIT_RPS,
+        ("doi",),
+    ),
+    "openalex": StageSpec(
+        "05_s2_enrichment", "06_openalex_enrichment", config.OPENALEX_BATCH_SIZE, 1.0, ("doi",)
+    ),
+    "unpaywall": StageSpec("06_openalex_enrichment", "07_unpaywall_enrichment", 1, 0.15, ("doi",)),
+    "pubmed": StageSpec(
+        "07_unpaywall_enrichment",
+        "08_pubmed_enrichment",
+        config.MEDIUM_API_CHECKPOINT_INTERVAL // 2,
+        1.0,
+        ("pmid", "doi"),
+    ),
+    "arxiv": StageSpec(
+        "08_pubmed_enrichment",
+        "09_arxiv_enrichment",
+        1,
+        config.DEFAULT_DELAY_SECONDS,
+        ("arxiv_id", "title"),
+    ),
+}
+
+
+@dataclass
+class StagePlan:
+    """Work list and cost estimate for one stage."""
+
+    stage: str
+    total: int
+    pending: dict[str, str] = field(default_factory=dict)  # paper_id -> PaperStatus.needs() reason
+    lookups: int = 0
+    api_calls: int = 0
+    estimated_seconds: float = 0.0
+
+    @property
+    def reasons(self) -> Counter[str]:
+        """Number of pending papers per reason."""
+        return Counter(self.pending.values())
+
+    @property
+    def outdated(self) -> bool:
+        """Whether papers already processed need re-running after a stage version change."""
+        return any(reason in ("stale", "rederive") for reason in self.pending.values())
+
+
+def plan_stage(
+    stage: str,
+    pipeline_dir: Path,
+    papers: CoverageIndex,
+    force: bool = False,
+    retry_failed: bool | None = None,
+) -> StagePlan:
+    """Plan one stage for the papers in ``papers`` (the coverage index of its input)."""
+    spec = STAGE_SPECS[stage]
+    paper_ids = papers.ids(papers.live)
+    plan = StagePlan(stage, total=len(paper_ids))
+
+    if force:
+        plan.pending = dict.fromkeys(paper_ids, "forced")
+    else:
+        output = CoverageIndex.for_stage(pipeline_dir / spec.output_dir)
+        written = set(output.ids(output.live))
+        status = PaperStatus.load(stage, pipeline_dir / config.PAPER_STATUS_DIRNAME)
+        for paper_id in paper_ids:
+            reason = status.needs(paper_id, retry_failed) if paper_id in written else "new"
+            if reason:
+                plan.pending[paper_id] = reason
+
+    lookup_mask = 0
+    for lookup_field in spec.lookup_fields:
+        lookup_mask |= papers.mask(lookup_field)
+    plan.lookups = sum(
+        1 for paper_id in papers.ids(lookup_mask) if plan.pending.get(paper_id, "rederive") != "rederive"
+    )
+    plan.api_calls = math.ceil(plan.lookups / spec.papers_per_call)
+    plan.estimated_seconds = plan.api_calls * spec.seconds_per_call
+    return plan
+
+
+def plan_pipeline(
+    pipeline_dir: Path,
+    stages: list[str] | None = None,
+    force: bool = False,
+    retry_failed: bool | None = None,
+) -> list[StagePlan]:
+    """Plan each stage in pipeline order before anything runs.
+
+    Stages whose input has not been produced yet are planned against the
+    nearest earlier stage directory that has papers, since every paper flows
+    through each enrichment stage.
+    """
+    pipeline_dir = Path(pipeline_dir)
+    papers = CoverageIndex.for_stage(pipeline_dir / STAGE_SPECS["crossref"].input_dir)
+    plans = []
+    for stage, spec in STAGE_SPECS.items():
+        stage_input = pipeline_dir / spec.input_dir
+        if stage_input.exists():
+            input_index = CoverageIndex.for_stage(stage_input)
+            if len(input_index):
+                papers = input_index
+        if stages is None or stage in stages:
+            plans.append(plan_stage(stage, pipeline_dir, papers, force, retry_failed))
+    return plans
+
+
+def format_plan(plans: list[StagePlan]) -> str:
+    """Render plans as a table with a total estimate."""
+    lines = [
+        f"{'Stage':<12} {'Papers':>7} {'Pending':>8} {'New':>6} {'Stale':>6} {'Failed':>7} "
+        f"{'Rederive':>9} {'API calls':>10} {'Est. time':>10}",
+        "-" * 84,
+    ]
+    for plan in plans:
+        reasons = plan.reasons
+        lines.append(
+            f"{plan.stage:<12} {plan.total:>7} {len(plan.pending):>8} {reasons['new']:>6} "
+            f"{reasons['stale']:>6} {reasons['failed']:>7} {reasons['rederive']:>9} {plan.api_calls:>10} "
+            f"{plan.estimated_seconds / 60:>8.1f} m"
+        )
+    total_calls = sum(plan.api_calls for plan in plans)
+    total_minutes = sum(plan.estimated_seconds for plan in plans) / 60
+    lines += ["-" * 84, f"Total: {total_calls} API calls, about {total_minutes:.1f} minutes"]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Print the work plan for a pipeline directory."""
+    parser = argparse.ArgumentParser(description="Plan enrichment work and estimate API calls")
+    parser.add_argument("--pipeline-dir", required=True, help="Pipeline directory")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGE_SPECS), help="Stages to plan")
+    parser.add_argument("--force", action="store_true", help="Plan as if re-running every paper")
+    parser.add_argument("--no-retry-failed", action="store_true", help="Do not count failed papers")
+    parser.add_argument("--show-ids", action="store_true", help="List pending paper IDs per stage")
+    args = parser.parse_args()
+
+    plans = plan_pipeline(
+        Path(args.pipeline_dir),
+        args.stages,
+        force=args.force,
+        retry_failed=False if args.no_retry_failed else None,
+    )
+    print(format_plan(plans))
+    if args.show_ids:
+        for plan in plans:
+            print(f"\n{plan.stage} ({len(plan.pending)}):")
+            for paper_id, reason in sorted(plan.pending.items()):
+                print(f"  {paper_id}  {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ import re
 from collections import defaultdict
 from typing import Any
 import argparse
+from src.coverage_index import CoverageIndex
+from src.title_index import TitleIndex
 
 # Set up module logger
 logger = logging.getLogger(__name__)
@@ -123,6 +125,17 @@ def build_zotero_index(
     return by_key, by_doi, by_title
 
 
+def build_zotero_title_index(zotero_items: list[dict[str, Any]]) -> TitleIndex:
+    """Build a fuzzy title index over Zotero items, keyed by Zotero item key."""
+    title_index = TitleIndex()
+    for item in zotero_items:
+        key = item.get("key", "")
+        title = item.get("data", {}).get("title", "")
+        if key and title:
+            title_index.add(key, title, payload=item)
+    return title_index
+
+
 def extract_year(date_str: str) -> str | None:
     """Extract year from date string.
 
@@ -155,7 +168,11 @@ def format_authors(creators: list[dict[str, Any]]) -> list[dict[str, str]]:
 
 
 def find_zotero_match(
-    paper_data: dict[str, Any], by_key: dict[str, Any], by_doi: dict[str, Any], by_title: dict[str, Any]
+    paper_data: dict[str, Any],
+    by_key: dict[str, Any],
+    by_doi: dict[str, Any],
+    by_title: dict[str, Any],
+    title_index: TitleIndex | None = None,
 ) -> dict[str, Any] | None:
     """Find matching Zotero item for a paper.
 
@@ -168,13 +185,19 @@ def find_zotero_match(
         if paper_doi in by_doi:
             return by_doi[paper_doi]  # type: ignore[no-any-return]
 
-    # Try by title (fuzzy match)
+    # Try by title prefix (exact)
     paper_title = paper_data.get("title", "").lower().strip()
     if paper_title:
         title_key = paper_title[:50]
         if title_key in by_title:
             return by_title[title_key]  # type: ignore[no-any-return]
 
+    # Fall back to fuzzy title match (MinHash/LSH candidates)
+    if paper_title and title_index is not None:
+        match = title_index.best_match(paper_title, threshold=config.TITLE_MATCH_THRESHOLD)
+        if match:
+            return title_index.get_payload(match[0])  # type: ignore[no-any-return]
+
     return None
 
 
@@ -248,12 +271,16 @@ def recover_all_metadata(
 
     print("\nBuilding Zotero lookup indices...")
     by_key, by_doi, by_title = build_zotero_index(zotero_items)
-    print(f"Indexed: {len(by_key)} keys, {len(by_doi)} DOIs, {len(by_title)} titles")
+    title_index = build_zotero_title_index(zotero_items)
+    print(
+        f"Indexed: {len(by_key)} keys, {len(by_doi)} DOIs, {len(by_title)} titles, {len(title_index)} fuzzy titles"
+    )
 
     # Statistics
     stats: dict[str, int] = defaultdict(int)
     recovery_details = []
     checkpoint_counter = 0
+    coverage = CoverageIndex.open(output_path, checkpoint_file)
 
     # Process each paper
     print(f"\nProcessing {len(json_files)} papers...")
@@ -282,12 +309,13 @@ def recover_all_metadata(
             output_file = output_path / json_file.name
             with open(output_file, "w", encoding="utf-8") as file_handle:
                 json.dump(paper_data, file_handle, indent=2)
+            coverage.record(paper_id, paper_data)
             continue
 
         stats["missing_metadata"] += 1
 
         # Try to find matching Zotero item
-        zotero_item = find_zotero_match(paper_data, by_key, by_doi, by_title)
+        zotero_item = find_zotero_match(paper_data, by_key, by_doi, by_title, title_index)
 
         if zotero_item:
             stats["matched"] += 1
@@ -364,6 +392,7 @@ def recover_all_metadata(
         output_file = output_path / json_file.name
         with open(output_file, "w", encoding="utf-8") as file_handle:
             json.dump(paper_data, file_handle, indent=2)
+        coverage.record(paper_id, paper_data)
 
         # Track processed file
         processed_files.add(json_file.stem)
@@ -378,6 +407,7 @@ def recover_all_metadata(
             }
             with open(checkpoint_file, "w", encoding="utf-8") as file_handle:
                 json.dump(checkpoint_data, file_handle)
+            coverage.save()
             checkpoint_counter = 0
 
     # Final checkpoint save
@@ -388,6 +418,7 @@ def recover_all_metadata(
     }
     with open(checkpoint_file, "w", encoding="utf-8") as file_handle:
         json.dump(checkpoint_data, file_handle)
+    coverage.finish(dict(stats))
 
     # Print final statistics
     print("\n" + "=" * 80)
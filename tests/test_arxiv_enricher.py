@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Test that outdated arXiv papers are redone despite a full checkpoint."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import arxiv_enricher
+from src.paper_status import PaperStatus, STAGE_POLICIES, StagePolicy
+from src.response_cache import ResponseCache
+
+ENTRY = """<entry xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <id>http://arxiv.org/abs/2101.00001v2</id>
+  <title>Cached Trial</title>
+  <summary>Abstract</summary>
+  <arxiv:primary_category term="cs.LG"/>
+</entry>"""
+
+
+def test_version_bump_overrides_full_checkpoint(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        output_dir = Path(tmpdir) / "output"
+        input_dir.mkdir()
+        output_dir.mkdir()
+        # AAA was checked before; without a title it is re-checked offline
+        (input_dir / "AAA.json").write_text(json.dumps({"title": "", "arxiv_checked": True}))
+        (input_dir / "BBB.json").write_text(json.dumps({"title": "Cached Trial"}))
+        for paper_file in input_dir.iterdir():
+            (output_dir / paper_file.name).write_text(paper_file.read_text())
+
+        status = PaperStatus.open("arxiv", output_dir)
+        status.record("AAA", success=True)
+        status.record("BBB", success=True, cached=True)
+        status.save()
+        assert ResponseCache("arxiv", output_dir).put("BBB", ENTRY)
+        checkpoint = {"processed_papers": ["AAA", "BBB"], "all_results": {}, "stats": {}}
+        (output_dir / ".arxiv_checkpoint.json").write_text(json.dumps(checkpoint))
+
+        original = STAGE_POLICIES["arxiv"]
+        STAGE_POLICIES["arxiv"] = StagePolicy(original.fetch_version, "next", original.retry_failed)
+        try:
+            assert PaperStatus.open("arxiv", output_dir).pending(["AAA", "BBB"]) == {
+                "AAA": "stale",
+                "BBB": "rederive",
+            }
+            argv = ["arxiv_enricher", "--input", str(input_dir), "--output", str(output_dir)]
+            monkeypatch.setattr(sys, "argv", argv)
+            arxiv_enricher.main()
+
+            assert PaperStatus.open("arxiv", output_dir).pending(["AAA", "BBB"]) == {}
+        finally:
+            STAGE_POLICIES["arxiv"] = original
+
+        rederived = json.loads((output_dir / "BBB.json").read_text())
+        assert rederived["arxiv_categories"] == ["cs.LG"]
+        rechecked = json.loads((output_dir / "AAA.json").read_text())
+        assert rechecked["arxiv_check_failed_no_title"]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test CrossRef title resolution through the local metadata snapshot."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.metadata_snapshot import MetadataSnapshot, import_snapshot
+
+pytest.importorskip("habanero", reason="habanero is not installed")
+
+from src.crossref_enricher import CrossRefV5Enricher
+
+WORKS = [
+    {"DOI": "10.1/editorial", "title": ["Editorial"], "issued": {"date-parts": [[2020]]}},
+    {
+        "DOI": "10.1/trial",
+        "title": ["Digital health interventions for hypertension control"],
+        "issued": {"date-parts": [[2021]]},
+    },
+]
+
+
+class NoResults:
+    """Stands in for the CrossRef client: every search comes back empty."""
+
+    def __init__(self):
+        self.queries = []
+
+    def works(self, **kwargs):
+        self.queries.append(kwargs)
+        return {}
+
+
+def test_short_titles_are_not_resolved_from_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dump = Path(tmpdir) / "dump.jsonl"
+        dump.write_text("".join(json.dumps(work) + "\n" for work in WORKS))
+        db_path = Path(tmpdir) / "snapshot.sqlite"
+        import_snapshot(dump, db_path, keep_raw=True)
+
+        with MetadataSnapshot(db_path) as snapshot:
+            enricher = CrossRefV5Enricher(snapshot=snapshot)
+            enricher.cr = NoResults()
+
+            assert enricher.search_by_title("Editorial", "2020") is None
+            assert snapshot.stats["title_hits"] + snapshot.stats["title_misses"] == 0
+
+            record = enricher.search_by_title("Digital health interventions for hypertension control")
+            assert record["DOI"] == "10.1/trial"
+            assert len(enricher.cr.queries) == 1  # Only the short title went to the API
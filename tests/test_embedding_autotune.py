@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests for the embedding batch size and thread autotuner."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config, embedding_autotune
+from src.embedding_autotune import (
+    TuneResult,
+    autotune,
+    estimate_seconds,
+    load_tuning,
+    save_tuning,
+    sort_by_length,
+    thread_candidates,
+)
+from src.embedding_backend import model_key
+
+
+def test_sort_by_length_orders_shortest_first_and_is_stable():
+    texts = ["a b c", "a", "a b", "b"]
+    order = sort_by_length(texts)
+    assert order.tolist() == [1, 3, 2, 0]
+
+
+def test_thread_candidates_include_core_count():
+    assert thread_candidates(6) == [1, 2, 4, 6]
+    assert thread_candidates(1) == [1]
+
+
+def test_autotune_prefers_configuration_with_least_overhead(monkeypatch):
+    thread_calls = []
+    clock = [0.0]
+    monkeypatch.setattr(embedding_autotune, "time", SimpleNamespace(perf_counter=lambda: clock[0]))
+
+    def encode(texts, batch_size):
+        # Fixed cost per batch: larger batches are faster, more threads are not
+        clock[0] += 0.001 * -(-len(texts) // batch_size) * (1 if thread_calls[-1] == 1 else 2)
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+    result = autotune(
+        [f"paper {i}" for i in range(64)],
+        encode,
+        set_thread_count=thread_calls.append,
+        batch_sizes=(4, 32),
+        thread_counts=[1, 2],
+        sample_size=64,
+    )
+    assert (result.batch_size, result.threads) == (32, 1)
+    assert len(result.measurements) == 4
+    assert result.papers_per_second == max(m[2] for m in result.measurements)
+
+
+def test_tuning_is_persisted_per_model_and_drives_estimates():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tuning_file = Path(temp_dir) / "tuning.json"
+        assert load_tuning("model-a", tuning_file) is None
+        assert estimate_seconds(10, "model-a", tuning_file=tuning_file) == 10 * config.TIME_PER_PAPER_CPU_MAX
+
+        save_tuning(TuneResult(128, 4, 50.0), "model-a", tuning_file)
+        tuning = load_tuning("model-a", tuning_file)
+        assert tuning is not None
+        assert (tuning["batch_size"], tuning["threads"]) == (128, 4)
+        assert load_tuning("model-b", tuning_file) is None
+        assert estimate_seconds(100, "model-a", "torch", tuning_file) == 2.0
+
+        # Tunings are stored under model_key, so a backend's estimate uses its own measurement
+        save_tuning(TuneResult(64, 2, 200.0), model_key("model-a", "onnx-int8"), tuning_file)
+        assert estimate_seconds(100, "model-a", "onnx-int8", tuning_file) == 0.5
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Tests for the ONNX / int8 embedding backends and their accuracy check."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.embedding_backend import accuracy_check, load_model, model_key, passes, save_report
+from src.embedding_builder import content_hash
+from src.pipeline_utils import load_checkpoint
+
+TEXTS = [f"paper about topic {n}" for n in range(40)]
+
+
+def reference(texts):
+    rng = np.random.default_rng(7)
+    basis = rng.normal(size=(len(TEXTS), 16)).astype(np.float32)
+    return np.array([basis[TEXTS.index(text)] for text in texts])
+
+
+def test_backend_is_part_of_the_content_hash():
+    assert model_key("model", "torch") == "model"
+    assert content_hash("text", "model", "torch") != content_hash("text", "model", "onnx-int8")
+    assert content_hash("text", "model", "onnx") == content_hash("text", "model", "onnx")
+
+
+def test_accuracy_check_separates_faithful_and_lossy_encoders():
+    def quantized(texts):
+        vectors = reference(texts)
+        return vectors + np.random.default_rng(0).normal(scale=0.01, size=vectors.shape)
+
+    def broken(texts):
+        return np.random.default_rng(1).normal(size=reference(texts).shape)
+
+    report = accuracy_check(reference, quantized, TEXTS[:8], TEXTS, k=5)
+    assert report["mean_cosine"] > 0.99
+    assert report["recall_at_k"] >= 0.9
+    assert passes(report)
+
+    report = accuracy_check(reference, broken, TEXTS[:8], TEXTS, k=5)
+    assert not passes(report)
+
+
+def test_save_report_records_whether_the_export_passed():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_file = Path(temp_dir) / "backend.json"
+        report = {"mean_cosine": 0.995, "min_cosine": 0.99, "recall_at_k": 0.95, "speedup": 2.5}
+        save_report("model", "onnx-int8", report, report_file)
+        assert load_checkpoint(report_file)["model"]["onnx-int8"]["passed"] is True
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        load_model("model", "tensorrt")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Test incremental embeddings and the memory-mapped embedding matrix."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config
+from src.embedding_builder import build_embeddings, count_uncached, embedding_text
+from src.embedding_matrix import EmbeddingMatrix
+
+PAPERS = [
+    {"paper_id": "AAA", "title": "Trial A", "abstract": "Exercise and sleep"},
+    {"paper_id": "BBB", "title": "Trial B", "abstract": "Diet and mood"},
+]
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return np.array([np.full(config.EMBEDDING_DIMENSIONS, len(t), dtype=np.float32) for t in texts])
+
+
+def test_only_new_or_changed_papers_are_encoded():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = (Path(tmpdir) / ".embedding_data.bin", Path(tmpdir) / ".embedding_rows.bin")
+
+        encoder = CountingEncoder()
+        _, stats = build_embeddings(PAPERS, encoder, matrix=EmbeddingMatrix.open(*files))
+        assert stats == {"papers": 2, "reused": 0, "encoded": 2}
+
+        encoder = CountingEncoder()
+        papers = [*PAPERS, {"paper_id": "CCC", "title": "Trial C", "abstract": "New"}]
+        papers[1] = {**papers[1], "abstract": "Diet, mood and anxiety"}
+        assert count_uncached([embedding_text(p) for p in papers], matrix=EmbeddingMatrix.open(*files)) == 2
+        rows, stats = build_embeddings(papers, encoder, matrix=EmbeddingMatrix.open(*files))
+        assert stats == {"papers": 3, "reused": 1, "encoded": 2}
+        assert encoder.texts == ["Trial B Diet, mood and anxiety", "Trial C New"]
+        assert rows.tolist() == [0, 2, 3]  # BBB's old row 1 is superseded, not rewritten
+
+        matrix = EmbeddingMatrix.open(*files)
+        assert matrix.vectors.dtype == np.float16
+        assert matrix.row_of("BBB") == 2
+        assert matrix.get([matrix.row_of("CCC")])[0][0] == len("Trial C New")
+
+        # Reverting BBB copies its old vector instead of encoding it again
+        rows, stats = build_embeddings([*PAPERS, papers[2]], CountingEncoder(), matrix=matrix)
+        assert stats["encoded"] == 0
+        assert matrix.row_of("BBB") == rows[1]
+
+        _, stats = build_embeddings(papers, CountingEncoder(), model_name="other", matrix=matrix)
+        assert stats["encoded"] == 3
+        assert len(EmbeddingMatrix.open(*files)) == 3  # Compacted once most rows were superseded
+
+
+def test_open_drops_half_written_rows_and_other_dtypes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = (Path(tmpdir) / "data.bin", Path(tmpdir) / "rows.bin")
+        matrix = EmbeddingMatrix.open(*files, dimensions=4)
+        matrix.append(["AAA", "BBB"], ["k1", "k2"], np.ones((2, 4)))
+        with open(files[0], "ab") as f:
+            f.write(b"\0" * 5)  # Interrupted append
+
+        reopened = EmbeddingMatrix.open(*files, dimensions=4)
+        assert len(reopened) == 2
+        assert reopened.row_for_key("k2") == 1
+        assert len(EmbeddingMatrix.open(*files, dimensions=4, dtype="float32")) == 0
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Tests for the length-bucketed multi-process embedding pipeline."""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.embedding_pipeline import length_buckets, physical_cores, run_buckets
+
+
+def test_length_buckets_group_similar_lengths():
+    texts = ["a b c d", "a", "a b c", "a b", "a b c d e"]
+    buckets = length_buckets(texts, 2)
+    assert [bucket.tolist() for bucket in buckets] == [[1, 3], [2, 0], [4]]
+
+
+def test_run_buckets_covers_every_text_and_tokenizes_off_the_main_thread():
+    texts = [" ".join(["w"] * n) for n in range(1, 50)]
+    tokenizer_threads = set()
+
+    def tokenize(batch):
+        tokenizer_threads.add(threading.current_thread().name)
+        return [len(text.split()) for text in batch]
+
+    def encode_features(lengths):
+        return np.array([[length, 0.0] for length in lengths], dtype=np.float32)
+
+    vectors = np.zeros((len(texts), 2), dtype=np.float32)
+    seen = []
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        for positions, bucket_vectors in run_buckets(
+            texts, length_buckets(texts, 8), tokenize, encode_features, executor, max_in_flight=2
+        ):
+            vectors[positions] = bucket_vectors
+            seen.extend(positions.tolist())
+
+    assert sorted(seen) == list(range(len(texts)))
+    assert vectors[:, 0].tolist() == list(range(1, 50))
+    assert tokenizer_threads == {"embedding-tokenizer"}
+
+
+def test_run_buckets_stops_tokenizing_when_abandoned():
+    texts = [str(n) for n in range(100)]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        buckets = run_buckets(
+            texts, length_buckets(texts, 1), list, lambda _: np.zeros((1, 1)), executor, max_in_flight=1
+        )
+        next(buckets)
+        buckets.close()
+    assert not any(thread.name == "embedding-tokenizer" for thread in threading.enumerate())
+
+
+def test_run_buckets_reraises_tokenizer_errors():
+    texts = [str(n) for n in range(10)]
+
+    def tokenize(batch):
+        if batch == ["3"]:
+            raise ValueError("bad text")
+        return batch
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        buckets = run_buckets(
+            texts, length_buckets(texts, 1), tokenize, lambda _: np.zeros((1, 1)), executor, max_in_flight=1
+        )
+        with pytest.raises(ValueError, match="bad text"):
+            list(buckets)
+    assert not any(thread.name == "embedding-tokenizer" for thread in threading.enumerate())
+
+
+def test_physical_cores_is_positive():
+    assert physical_cores() >= 1
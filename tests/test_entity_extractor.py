@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Test the single-scan entity extraction against results of the former per-call extractors.
+
+Expected values were produced by the previous implementation, which re-joined
+the text and ran each regex or substring check separately, so they pin its
+quirks too (substring dictionary terms, "Excel Excel", drug-suffix words).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v5_design"))
+
+from defusedxml import ElementTree
+
+from entity_extractor import ScannedText, extract_all_grobid_entities, extract_time_periods
+
+NS = {"tei": "http://www.tei-c.org/ns/1.0"}
+
+
+def tei(text):
+    return (
+        '<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body><div><head>Methods</head>'
+        f"<p>{text}</p></div></body></text></TEI>"
+    )
+
+
+OVERLAPPING = (
+    "This experimental study was a retrospective cohort and a case-control analysis. "
+    "Patients with cardiovascular disease and heart disease were included. "
+    "Data availability: code is on GitHub and Zenodo; data are available from OSF."
+)
+MIXED_CASE = (
+    "We used MIMIC-III and the uk biobank. Reporting follows CONSORT and Prisma. "
+    "Ethics Committee approval was obtained. Supplementary Appendix 1. Geography and cocoa intake."
+)
+REPEATED = (
+    "A randomised trial (NCT01234567, NCT01234567, ISRCTN12345678) enrolled 120 patients; "
+    "n = 120. p &lt; 0.05 and p = 0.001 and p = 0.05. OR = 1.5, OR: 1.5, HR = 0.8. 95% CI and 95% CI. "
+    "SPSS version 25 then SPSS 26. R 4.1.2 was used. Rversion 3. Python and Excel. "
+    "From January 2019 to March 2020 and June 2021, a 2 year follow-up. "
+    "Drugs: Pembrolizumab, metformin, Metformin, metformins, aspirin. In April we saw it. "
+    "Code at https://github.com/org/repo and github.com/org/repo."
+)
+
+
+def test_overlapping_keywords():
+    entities = extract_all_grobid_entities(tei(OVERLAPPING))
+
+    # Dictionary order decides the study type, not text order
+    assert entities["methodology"]["study_type"] == "cohort"
+    assert entities["clinical"]["diseases"] == ["heart disease", "cardiovascular disease"]
+    assert entities["software_data"]["data_availability"] == {
+        "has_statement": True,
+        "is_available": True,
+        "repository": "github",
+    }
+    assert entities["software_data"]["code_urls"] == []
+
+    # A longer keyword also reports the shorter keywords it starts with
+    scan = ScannedText(OVERLAPPING)
+    assert scan.has_keyword("experimental study")
+    assert scan.has_keyword("experiment")
+    assert scan.has_keyword("retrospective cohort")
+    assert not scan.has_keyword("cohort study")
+    assert [m.entity_type for m in scan.matches if m.label == "github"] == ["repository"]
+
+
+def test_case_and_word_boundaries():
+    entities = extract_all_grobid_entities(tei(MIXED_CASE))
+
+    # Dictionary terms are case-insensitive substrings, so "Geography" and "cocoa" count
+    assert entities["software_data"]["datasets"] == ["MIMIC-III", "UK Biobank", "GEO", "COCO"]
+    assert entities["methodology"]["study_type"] is None
+    assert entities["quality_indicators"] == {
+        "funding_sources": [],
+        "has_ethics_approval": True,
+        "has_coi_statement": False,
+        "is_registered": False,
+        "reporting_guidelines": ["CONSORT", "PRISMA"],
+        "has_supplementary": True,
+    }
+    assert entities["structure"]["sections"] == ["Methods"]
+
+
+def test_repeated_entities():
+    entities = extract_all_grobid_entities(tei(REPEATED))
+
+    methodology = entities["methodology"]
+    assert methodology["sample_sizes"] == [120]
+    assert methodology["study_type"] == "rct"
+    assert sorted(methodology["trial_ids"]) == ["ISRCTN12345678", "NCT01234567"]
+    assert methodology["time_periods"] == {"duration": "2", "date_range": "January 2019 - June 2021"}
+
+    statistics = entities["statistics"]
+    assert statistics["p_values"] == [0.001, 0.05]
+    assert statistics["confidence_intervals"] == ["95%"]
+    assert statistics["effect_sizes"] == {"odds_ratios": [1.5, 1.5], "hazard_ratios": [0.8]}
+
+    # First mention decides the version; "R" needs a word boundary and a version
+    software = entities["software_data"]
+    assert software["software"] == ["SPSS", "R 4.1.2", "Python", "Excel Excel"]
+    assert software["code_urls"] == ["github.com/org/repo"]
+
+    clinical = entities["clinical"]
+    assert sorted(clinical["trial_ids"]) == ["ISRCTN12345678", "NCT01234567"]
+    assert sorted(clinical["drugs"]) == ["April", "Metformin", "Pembrolizumab", "aspirin", "metformin"]
+    assert entities["quality_indicators"]["is_registered"]
+    assert entities["structure"]["urls"] == ["https://github.com/org/repo"]
+
+    root = ElementTree.fromstring(tei(REPEATED))
+    assert extract_time_periods(root, NS) == methodology["time_periods"]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test Grobid post-processing header classification and strategy comparison."""
+
+import shutil
+import tempfile
+from pathlib import Path
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.grobid_post_processor import STRATEGIES, GrobidPostProcessor, HeaderClassifier, compare_strategies
+
+TEI_DIR = Path(__file__).parent.parent / "extraction_pipeline" / "01_tei_xml"
+
+
+def test_classifier_memoizes_and_persists_vocabulary():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        vocabulary = Path(tmpdir) / "headers.json"
+        classifier = HeaderClassifier(GrobidPostProcessor.SECTION_PATTERNS, vocabulary)
+
+        assert classifier.lookup("2. methods") == ("methods", "methods")
+        assert classifier.lookup("1. introduction") == ("introduction", "introduction")
+        assert classifier.lookup("acknowledgements") == (None, None)
+        assert classifier.lookup("2. methods") == ("methods", "methods")
+        assert classifier.stats == {"hits": 1, "misses": 3, "loaded": 0}
+        assert classifier.save()
+        assert not classifier.save()
+
+        warm = HeaderClassifier(GrobidPostProcessor.SECTION_PATTERNS, vocabulary)
+        assert warm.stats["loaded"] == 3
+        assert warm.lookup("acknowledgements") == (None, None)
+        assert warm.stats["misses"] == 0
+
+        changed = HeaderClassifier({"methods": ["method"]}, vocabulary)
+        assert changed.stats["loaded"] == 0
+
+
+def test_classifier_lru_eviction():
+    classifier = HeaderClassifier(GrobidPostProcessor.SECTION_PATTERNS, maxsize=2)
+    for header in ["results", "discussion", "results", "summary"]:
+        classifier.lookup(header)
+
+    classifier.lookup("results")
+    assert classifier.stats["hits"] == 2
+    classifier.lookup("discussion")
+    assert classifier.stats["misses"] == 4
+
+
+def test_detect_section_type_advanced_uses_context():
+    processor = GrobidPostProcessor(strategy="experimental")
+    sections = [{}, {}, {}]
+
+    assert processor._detect_section_type_advanced("3 experiments", 1, sections) == "results"
+    assert processor._detect_section_type_advanced("where we started from", 0, sections) == "introduction"
+    assert processor._detect_section_type_advanced("summary and future", 2, sections) == "conclusion"
+    assert processor._detect_section_type_advanced("ethics", 1, sections) is None
+
+
+def test_compare_strategies_matches_separate_runs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        xml_dir = Path(tmpdir) / "xml"
+        xml_dir.mkdir()
+        for xml_file in sorted(TEI_DIR.glob("*.xml"))[:3]:
+            shutil.copy(xml_file, xml_dir)
+
+        comparison = compare_strategies(xml_dir, Path(tmpdir) / "out", write_outputs=True)
+
+        assert set(comparison) == set(STRATEGIES)
+        for strategy in STRATEGIES:
+            processor = GrobidPostProcessor(strategy)
+            for xml_file in sorted(xml_dir.glob("*.xml")):
+                paper = processor.process_xml(xml_file)
+                written = Path(tmpdir) / "out" / strategy / f"{xml_file.stem}_processed.json"
+                assert written.exists()
+                assert paper is not None
+
+            assert comparison[strategy]["sections_found"] == processor.stats["sections_found"]
+            assert comparison[strategy]["papers_needing_retry"] == processor.stats["papers_needing_retry"]
+        assert list((Path(tmpdir) / "out").glob("comparison_report_*.md"))
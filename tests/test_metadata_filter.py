@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Test metadata bitmaps and filtered vector search."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+metadata_filter = pytest.importorskip("src.metadata_filter", reason="faiss is not installed")
+MetadataFilter = metadata_filter.MetadataFilter
+SearchFilter = metadata_filter.SearchFilter
+VectorIndex = metadata_filter.VectorIndex
+
+STUDY_TYPES = ["rct", "cohort", "systematic_review", None]
+
+
+def make_papers(n):
+    return [
+        {
+            "paper_id": f"P{i:03d}",
+            "year": str(2000 + i % 25),
+            "quality_score": i % 100,
+            "study_type": STUDY_TYPES[i % 4],
+            "has_full_text": i % 3 == 0,
+        }
+        for i in range(n)
+    ]
+
+
+def test_mask_combines_bitmaps_and_year_ranges():
+    papers = make_papers(200)
+    vectors = np.random.default_rng(0).standard_normal((200, 8)).astype(np.float32)
+    index = VectorIndex.build([paper["paper_id"] for paper in papers], vectors, index_type="flat")
+    filters = MetadataFilter.build([*papers, {"paper_id": "NOT_INDEXED"}], index)
+    assert len(filters) == 200
+
+    search_filter = SearchFilter(year_min=2010, year_max=2015, quality_min=60, study_types=("rct", "study"))
+    expected = {
+        paper["paper_id"]
+        for paper in papers
+        if 2010 <= int(paper["year"]) <= 2015
+        and paper["quality_score"] >= 60
+        and paper["study_type"] in ("rct", None)
+    }
+    assert {index.paper_ids[i] for i in filters.selector_ids(search_filter).tolist()} == expected
+    assert filters.mask(SearchFilter(quality_min=61)).sum() == sum(p["quality_score"] >= 61 for p in papers)
+    assert filters.mask(SearchFilter(full_text_only=True)).sum() == 67
+    assert filters.selector_ids(SearchFilter()) is None
+
+    hits = filters.search(index, vectors[:3], k=5, search_filter=search_filter)
+    assert all(paper_id in expected for row in hits for paper_id, _ in row)
+    assert SearchFilter(quality_min=60).cache_key == ""
+    assert search_filter.cache_key != SearchFilter(year_min=2010, quality_min=60).cache_key
+
+
+def test_saved_filters_survive_reload_and_pruning():
+    papers = make_papers(50)
+    vectors = np.random.default_rng(1).standard_normal((50, 8)).astype(np.float32)
+    index = VectorIndex.build([paper["paper_id"] for paper in papers], vectors, index_type="flat")
+    search_filter = SearchFilter(study_types=("cohort",), full_text_only=True)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / ".filter_metadata.npz"
+        MetadataFilter.build(papers, index).save(path)
+        filters = MetadataFilter.load(path)
+        selected = sorted(index.paper_ids[i] for i in filters.selector_ids(search_filter).tolist())
+        assert selected == ["P009", "P021", "P033", "P045"]
+
+        index.remove(["P021"])
+        with pytest.raises(ValueError, match="out of date"):
+            filters.search(index, vectors[0], search_filter=search_filter)
+        filters = filters.prune(index)
+        hits = filters.search(index, vectors[0], k=10, search_filter=search_filter)[0]
+        assert sorted(paper_id for paper_id, _ in hits) == ["P009", "P033", "P045"]
+
+
+def test_unknown_study_type_is_rejected():
+    with pytest.raises(ValueError, match=r"'RCT'.*valid: systematic_review, meta_analysis, rct"):
+        SearchFilter(study_types=("RCT",))
+    assert SearchFilter(study_types=("rct", "cohort")).active
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test local metadata snapshot import and offline DOI/title resolution."""
+
+import gzip
+import json
+import tempfile
+from pathlib import Path
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.metadata_snapshot import MetadataSnapshot, import_snapshot, normalize_work
+
+CROSSREF_WORK = {
+    "DOI": "10.1234/Example.001",
+    "title": ["Digital health interventions for hypertension control"],
+    "issued": {"date-parts": [[2021, 5, 3]]},
+    "author": [{"given": "Jane", "family": "Doe"}],
+    "container-title": ["Journal of Medical Internet Research"],
+}
+OPENALEX_WORK = {
+    "id": "https://openalex.org/W123",
+    "doi": "https://doi.org/10.5555/oa.42",
+    "title": "Machine learning for sepsis prediction",
+    "publication_year": 2019,
+    "authorships": [{"author": {"display_name": "John Smith"}}],
+    "primary_location": {"source": {"display_name": "Critical Care"}},
+}
+FLAT_WORK = {"doi": "10.9999/flat.7", "title": "A flat record", "year": "2015", "authors": ["A. Author"]}
+
+
+def write_dump(path, works, extra_lines=()):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        for work in works:
+            f.write(json.dumps(work) + "\n")
+        for line in extra_lines:
+            f.write(line + "\n")
+
+
+def test_normalize_work_formats():
+    crossref = normalize_work(CROSSREF_WORK)
+    assert crossref["doi"] == "10.1234/example.001"
+    assert crossref["year"] == 2021
+    assert crossref["authors"] == ["Jane Doe"]
+    assert crossref["venue"] == "Journal of Medical Internet Research"
+    assert crossref["source"] == "crossref"
+
+    openalex = normalize_work(OPENALEX_WORK)
+    assert openalex["doi"] == "10.5555/oa.42"
+    assert openalex["venue"] == "Critical Care"
+    assert openalex["source"] == "openalex"
+
+    flat = normalize_work(FLAT_WORK)
+    assert flat["year"] == 2015
+
+    assert normalize_work({"title": "No DOI"}) is None
+
+
+def test_import_and_lookup():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dump = Path(tmpdir) / "dump.jsonl.gz"
+        db_path = Path(tmpdir) / "snapshot.sqlite"
+        write_dump(dump, [CROSSREF_WORK, OPENALEX_WORK, FLAT_WORK, {"title": "no doi"}], ["{not json"])
+
+        stats = import_snapshot(dump, db_path, keep_raw=True)
+        assert stats == {"read": 4, "imported": 3, "skipped": 1}
+
+        with MetadataSnapshot(db_path) as snapshot:
+            assert len(snapshot) == 3
+
+            record = snapshot.lookup_doi("https://doi.org/10.1234/EXAMPLE.001")
+            assert record["title"] == "Digital health interventions for hypertension control"
+            assert record["raw"]["DOI"] == "10.1234/Example.001"
+
+            record = snapshot.lookup_title("Machine Learning for Sepsis Prediction.")
+            assert record["doi"] == "10.5555/oa.42"
+
+            assert snapshot.lookup_title("Machine learning approaches for sepsis prediction") is None
+            record = snapshot.lookup_title("Machine learning for the sepsis prediction", fuzzy=True)
+            assert record["doi"] == "10.5555/oa.42"
+
+            assert snapshot.resolve({"title": "A flat record"})["year"] == 2015
+            assert snapshot.lookup_doi("10.0000/missing") is None
+            assert snapshot.resolve({"doi": "10.0000/missing", "title": "A flat record"})["year"] == 2015
+            assert snapshot.stats == {
+                "doi_hits": 1,
+                "doi_misses": 2,
+                "title_hits": 4,
+                "title_misses": 1,
+                "title_ambiguous": 0,
+            }
+
+
+def test_shared_title_needs_year_to_resolve():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dump = Path(tmpdir) / "dump.jsonl"
+        db_path = Path(tmpdir) / "snapshot.sqlite"
+        editorials = [
+            {"doi": "10.1/ed.1", "title": "Editorial", "year": "2019"},
+            {"doi": "10.1/ed.2", "title": "Editorial", "year": "2020"},
+            {"doi": "10.1/ed.3", "title": "Editorial", "year": "2020"},
+        ]
+        write_dump(dump, editorials)
+        import_snapshot(dump, db_path)
+
+        with MetadataSnapshot(db_path) as snapshot:
+            assert snapshot.lookup_title("Editorial") is None
+            assert snapshot.lookup_title("Editorial", year=2020) is None
+            assert snapshot.lookup_title("Editorial", year=2021) is None
+            assert snapshot.lookup_title("Editorial", year=2019)["doi"] == "10.1/ed.1"
+            assert snapshot.stats["title_ambiguous"] == 2
+            assert (snapshot.stats["title_hits"], snapshot.stats["title_misses"]) == (1, 3)
+
+
+def test_reimport_replaces_rows_and_missing_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dump = Path(tmpdir) / "dump.jsonl"
+        db_path = Path(tmpdir) / "snapshot.sqlite"
+        write_dump(dump, [FLAT_WORK])
+        import_snapshot(dump, db_path)
+        write_dump(dump, [{**FLAT_WORK, "title": "A corrected title"}])
+        import_snapshot(dump, db_path)
+
+        with MetadataSnapshot(db_path) as snapshot:
+            assert len(snapshot) == 1
+            assert snapshot.lookup_doi(FLAT_WORK["doi"])["title"] == "A corrected title"
+
+        assert MetadataSnapshot.open_default(Path(tmpdir) / "missing.sqlite") is None
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Tests for the hash-keyed PDF text cache and its worker pool."""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.pdf_text_cache import PdfTextCache, extract_pdfs, file_sha256
+
+
+def fake_extract(pdf_path):
+    text = pdf_path.read_text()
+    if text == "hang":
+        time.sleep(60)
+    if text == "crash":
+        os._exit(1)
+    if text == "broken":
+        raise ValueError("not a PDF")
+    return {"text": text.upper(), "pages": 1, "extractor": "fake"}
+
+
+def write_pdfs(directory, contents):
+    paths = []
+    for name, content in contents.items():
+        path = Path(directory) / f"{name}.pdf"
+        path.write_text(content)
+        paths.append(path)
+    return paths
+
+
+def test_unchanged_pdfs_are_never_extracted_twice():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = PdfTextCache(Path(temp_dir) / "cache")
+        paths = write_pdfs(temp_dir, {"a": "alpha", "b": "beta", "b_copy": "beta"})
+
+        results, stats = extract_pdfs(paths, cache, workers=2, extract=fake_extract)
+        assert stats == {"pdfs": 3, "cached": 0, "extracted": 2, "failed": 0, "timed_out": 0}
+        assert results[paths[0]]["text"] == "ALPHA"
+        assert results[paths[2]]["text"] == "BETA"  # Identical files are extracted once
+
+        digest = file_sha256(paths[0])
+        assert cache.path(digest).parent.name == digest[:2].upper()
+
+        paths[1].write_text("beta, revised")
+        results, stats = extract_pdfs(paths, cache, workers=2, extract=fake_extract)
+        assert (stats["cached"], stats["extracted"]) == (2, 1)
+        assert results[paths[1]]["text"] == "BETA, REVISED"
+
+
+def test_hanging_and_crashing_extractions_are_killed_and_cached_as_failures():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = PdfTextCache(Path(temp_dir) / "cache")
+        paths = write_pdfs(
+            temp_dir, {"hang": "hang", "crash": "crash", "broken": "broken", "ok": "fine", "ok2": "fine too"}
+        )
+
+        start = time.monotonic()
+        results, stats = extract_pdfs(paths, cache, workers=2, timeout=1, extract=fake_extract)
+        assert time.monotonic() - start < 30
+        assert stats["extracted"] == 2
+        assert (stats["failed"], stats["timed_out"]) == (3, 1)
+        assert results[paths[0]]["error"].startswith("Timed out")
+        assert "crashed" in results[paths[1]]["error"]
+        assert "not a PDF" in results[paths[2]]["error"]
+        assert results[paths[4]]["text"] == "FINE TOO"
+
+        _, stats = extract_pdfs(paths, cache, workers=2, timeout=1, extract=fake_extract)
+        assert stats["cached"] == 5
+        _, stats = extract_pdfs(paths[2:], cache, workers=1, extract=fake_extract, retry_failed=True)
+        assert (stats["cached"], stats["failed"]) == (2, 1)
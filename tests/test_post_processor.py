@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test memoized section classification and batch post-processing."""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v5_design"))
+
+from post_processor import (
+    PIPELINE_STEPS,
+    aggregate_sections,
+    classify_section_header,
+    complete_post_processing_pipeline,
+    normalize_section_header,
+    process_papers_parallel,
+)
+
+
+def test_normalize_and_classify_headers():
+    assert normalize_section_header("2. METHODS:") == "methods"
+    assert normalize_section_header("3.2 Results") == "results"
+    assert normalize_section_header("") == ""
+
+    assert classify_section_header("Materials and Methods") == "methods"
+    assert classify_section_header("3.2 Results") == "results"
+    assert classify_section_header("Acknowledgements") == "other"
+
+
+def test_aggregate_sections_merges_by_type():
+    sections = aggregate_sections(
+        [
+            {"header": "Methods", "content": "Design."},
+            {"header": "Statistical Analysis", "content": "Models."},
+            {"header": "Funding", "content": "Grant."},
+            {"header": "Results", "content": "   "},
+        ]
+    )
+    assert sections == {"methods": "Design.\n\nModels.", "other": "Grant."}
+
+
+def test_process_papers_parallel_matches_sequential():
+    outputs = [
+        {"xml": "", "title": f"Study {i}", "abstract": "An abstract" if i % 2 else ""} for i in range(12)
+    ]
+    expected = [complete_post_processing_pipeline(output) for output in outputs]
+
+    results, report = process_papers_parallel(outputs, workers=2, batch_size=5)
+
+    assert results == expected
+    assert report["papers"] == 12
+    assert report["batches"] == 3
+    assert set(report["step_timings"]) == set(PIPELINE_STEPS)
+    assert report["header_memo"]["hits"] + report["header_memo"]["misses"] > 0
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test vectorized batch and incremental quality scoring against per-paper scoring."""
+
+import copy
+import tempfile
+from pathlib import Path
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v5_design"))
+
+from quality_scorer import QualityScorer, load_paper_table, save_paper_table
+
+PAPERS = [
+    {
+        "paper_id": "RCT1",
+        "title": "A Randomized Controlled Trial of Digital Health Intervention",
+        "abstract": "We conducted a randomized controlled trial with 500 participants...",
+        "year": 2023,
+        "venue": "Nature Medicine",
+        "citation_count": 25,
+        "methods": "Statistical analysis using ANOVA and regression...",
+        "results": "Significant improvement (p<0.001) with 95% CI...",
+        "entities": {
+            "study_types": ["randomized controlled trial"],
+            "sample_sizes": ["n=500"],
+            "p_values": ["p<0.001", "p=0.03"],
+            "confidence_intervals": ["95% CI: 1.2-3.4"],
+            "software": ["R", "Python"],
+            "code_availability": ["GitHub repository available"],
+        },
+    },
+    {
+        "paper_id": "COH2",
+        "title": "Outcomes in a national cohort",
+        "abstract": "A retrospective cohort study; code on github.",
+        "year": "2012",
+        "journal": "IEEE Journal of Biomedical and Health Informatics",
+        "citation_count": 400,
+        "doi": "10.1234/x",
+    },
+    {"paper_id": "BARE3", "title": "Editorial", "year": "unknown", "venue": "unknown"},
+    {
+        "paper_id": "SMALL4",
+        "title": "Case report",
+        "year": 1995,
+        "venue": "Local Medical Bulletin",
+        "entities": {"sample_sizes": ["few", "n=12"], "study_types": ["case report", "opinion"]},
+        "references": [{"title": "ref"}],
+    },
+]
+
+
+def assert_matches_scalar(scorer, papers, result):
+    for i, paper in enumerate(papers):
+        expected = scorer.calculate_score(paper)
+        assert result["total_score"][i] == pytest.approx(expected["total_score"])
+        assert result["grade"][i] == expected["grade"]
+        for component, score in expected["components"].items():
+            assert result["components"][component][i] == pytest.approx(score)
+
+
+def test_score_batch_matches_calculate_score():
+    scorer = QualityScorer()
+    table = scorer.build_table(PAPERS)
+    result = scorer.score_batch(table)
+
+    assert list(result["paper_id"]) == ["RCT1", "COH2", "BARE3", "SMALL4"]
+    assert_matches_scalar(scorer, PAPERS, result)
+
+
+def test_weight_change_rescores_without_rebuilding():
+    scorer = QualityScorer()
+    table = scorer.build_table(PAPERS)
+
+    scorer.weights["venue_quality"] = 30
+    scorer.study_type_scores["case report"] = 8
+    assert_matches_scalar(scorer, PAPERS, scorer.score_batch(table))
+
+    scorer.study_type_scores["umbrella review"] = 10
+    with pytest.raises(ValueError, match="rebuild"):
+        scorer.score_batch(table)
+
+
+def test_table_round_trip():
+    scorer = QualityScorer()
+    table = scorer.build_table(PAPERS)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "tables" / "papers.npz"
+        save_paper_table(table, path)
+        loaded = load_paper_table(path)
+
+    assert set(loaded) == set(table)
+    np.testing.assert_array_equal(
+        scorer.score_batch(loaded)["total_score"], scorer.score_batch(table)["total_score"]
+    )
+
+
+def test_score_incremental_reuses_unchanged_components():
+    scorer = QualityScorer()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_file = Path(tmpdir) / "score_cache.json"
+        results, stats = scorer.score_incremental(PAPERS, cache_file)
+        assert stats == {"papers": 4, "reused": 0, "rescored": 4, "components_recomputed": 32}
+        for paper in PAPERS:
+            expected = scorer.calculate_score(paper)
+            assert results[paper["paper_id"]]["total_score"] == expected["total_score"]
+            assert results[paper["paper_id"]]["components"] == expected["components"]
+
+        _, stats = scorer.score_incremental(PAPERS, cache_file)
+        assert stats["reused"] == 4
+        assert stats["components_recomputed"] == 0
+
+        papers = copy.deepcopy(PAPERS)
+        papers[1]["citation_count"] = 2000
+        results, stats = scorer.score_incremental(papers, cache_file)
+        assert stats["rescored"] == 1
+        assert stats["components_recomputed"] == 1
+        assert results["COH2"] == scorer.calculate_score(papers[1])
+
+        scorer.weights["venue_quality"] = 30
+        results, stats = scorer.score_incremental(papers, cache_file)
+        assert stats["components_recomputed"] == 4
+        assert results["RCT1"]["total_score"] == scorer.calculate_score(papers[0])["total_score"]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Test the two-level query embedding and result cache."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.search_cache import SearchCache
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        return np.array([[len(texts[0]), 1.0, 0.5]], dtype=np.float32)
+
+
+def test_near_identical_queries_reuse_embeddings_and_results():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / ".search_cache.npz"
+        cache = SearchCache.load(path, index_version="v1")
+        encoder = CountingEncoder()
+
+        vector = cache.embed("Exercise and sleep quality", encoder)
+        assert np.array_equal(cache.embed("  exercise AND sleep-quality? ", encoder), vector)
+        assert encoder.calls == 1
+
+        assert cache.results(vector, 10) is None
+        cache.store(vector, 10, 0, [("AAA", 0.9), ("BBB", 0.5)])
+        cache.save()
+
+        reloaded = SearchCache.load(path, index_version="v1")
+        vector = reloaded.embed("exercise and sleep quality", encoder)
+        assert reloaded.results(vector, 10) == [("AAA", 0.9), ("BBB", 0.5)]
+        assert reloaded.stats["result_hits"] == 1
+        assert reloaded.results(vector, 5) is None  # k is part of the key
+        assert reloaded.results(vector, 10, quality_min=70) is None
+
+        changed_index = SearchCache.load(path, index_version="v2")
+        assert changed_index.results(vector, 10) is None
+        assert len(changed_index.embeddings) == 1  # Embeddings survive index changes
+
+        changed_model = SearchCache.load(path, index_version="v1", model="other-model#onnx-int8")
+        assert len(changed_model.embeddings) == 0  # Vectors of another model are not reused
+        changed_model.embed("exercise and sleep quality", encoder)
+        assert encoder.calls == 2
+
+
+def test_lru_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / ".search_cache.npz"
+        cache = SearchCache(path, max_results=2)
+        vectors = [np.full(3, i, dtype=np.float32) for i in range(3)]
+        cache.store(vectors[0], 10, 0, [("A", 1.0)])
+        cache.store(vectors[1], 10, 0, [("B", 1.0)])
+        assert cache.results(vectors[0], 10) is not None  # A is now most recent
+        cache.store(vectors[2], 10, 0, [("C", 1.0)])
+        cache.save()
+
+        reloaded = SearchCache.load(path, max_results=2)
+        assert reloaded.results(vectors[1], 10) is None
+        assert next(iter(reloaded.ranked.values()))[0] == [("A", 1.0)]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test section chunking and section-filtered chunk search."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config
+from src.embedding_matrix import EmbeddingMatrix
+
+section_index = pytest.importorskip("src.section_index", reason="faiss is not installed")
+
+METHODS = "We enrolled 120 adults in a randomized trial of exercise. " * 5
+RESULTS = "Sleep quality improved significantly in the exercise group. " * 5
+
+
+class KeywordEncoder:
+    """Vectors whose first dimensions count topic words, so search is predictable."""
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), config.EMBEDDING_DIMENSIONS), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vectors[i, 0] = text.count("enrolled")
+            vectors[i, 1] = text.count("improved")
+            vectors[i, 2] = 1
+        return vectors
+
+
+def test_split_chunks_keeps_paragraphs_within_limit():
+    text = "\n\n".join(["a" * 900, "b" * 900, "c" * 2500])
+    chunks = section_index.split_chunks(text, max_chars=2000)
+    assert chunks[0] == "a" * 900 + "\n\n" + "b" * 900
+    assert [len(chunk) for chunk in chunks[1:]] == [2000, 500]
+
+
+def test_search_filters_by_section_type():
+    papers = [
+        {
+            "paper_id": "AAA",
+            "abstract": "Short",
+            "sections": [
+                {"title": "2. Study Design", "text": METHODS},
+                {"title": "Results", "text": RESULTS},
+            ],
+        },
+        {"paper_id": "BBB", "sections": {"results": RESULTS, "methods": METHODS}},
+    ]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        files = {
+            "index_file": tmp / "sections.faiss",
+            "ids_file": tmp / "ids.npz",
+            "metadata_file": tmp / "metadata.npy",
+        }
+        matrix = EmbeddingMatrix.open(tmp / "data.bin", tmp / "rows.bin")
+        stats = section_index.build_section_index(papers, KeywordEncoder(), matrix=matrix, **files)
+        assert stats["chunks"] == 4  # The short abstract is skipped
+        assert stats["encoded"] == 4
+
+        index = section_index.SectionIndex.open(**files)
+        query = KeywordEncoder()(["enrolled"])
+        hits = index.search(query, k=4, section_types=["results"])[0]
+        assert {hit.section_type for hit in hits} == {"results"}
+        assert {hit.paper_id for hit in hits} == {"AAA", "BBB"}
+        assert index.search(query, k=1)[0][0].section_type == "methods"
+
+        papers[1]["sections"]["results"] = RESULTS + " More."
+        stats = section_index.build_section_index(papers[1:], KeywordEncoder(), matrix=matrix, **files)
+        assert (stats["encoded"], stats["added"], stats["removed"]) == (1, 1, 2)
+        assert len(section_index.SectionIndex.open(**files)) == 2
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Test that outdated Semantic Scholar papers are refetched despite a full checkpoint."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.paper_status import PaperStatus, STAGE_POLICIES, StagePolicy
+from src.semantic_scholar_enricher import S2BatchEnricher
+
+PAPERS = {"AAA": {"title": "Trial A", "doi": "10.1/a"}, "BBB": {"title": "Trial B", "doi": "10.1/b"}}
+
+
+def test_fetch_version_bump_overrides_full_checkpoint():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        output_dir = Path(tmpdir) / "output"
+        input_dir.mkdir()
+        for paper_id, paper in PAPERS.items():
+            (input_dir / f"{paper_id}.json").write_text(json.dumps(paper))
+
+        fetched = []
+
+        def fetch_batch(dois, id_type="doi"):
+            fetched.extend(dois)
+            return {doi: {"paperId": f"s2-{doi}", "citationCount": 3} for doi in dois}
+
+        enricher = S2BatchEnricher()
+        enricher.fetch_batch = fetch_batch
+        enricher.process_directory(input_dir, output_dir)
+        assert sorted(fetched) == ["10.1/a", "10.1/b"]
+        checkpoint = json.loads((output_dir / ".s2_checkpoint.json").read_text())
+        assert sorted(checkpoint["processed_papers"]) == ["AAA", "BBB"]
+
+        fetched.clear()
+        S2BatchEnricher().process_directory(input_dir, output_dir)
+        assert fetched == []
+
+        original = STAGE_POLICIES["s2"]
+        STAGE_POLICIES["s2"] = StagePolicy("next", original.derive_version, original.retry_failed)
+        try:
+            enricher = S2BatchEnricher()
+            enricher.fetch_batch = fetch_batch
+            enricher.process_directory(input_dir, output_dir)
+            assert sorted(fetched) == ["10.1/a", "10.1/b"]
+            assert PaperStatus.open("s2", output_dir).pending(PAPERS) == {}
+        finally:
+            STAGE_POLICIES["s2"] = original
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test merging parallel enrichment output and dependency-ordered stage runs."""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.pipeline_runner import run_stage_graph, stage_dependencies
+from src.stage_manifest import read_stage
+from src.stage_merge import merge_stage_deltas
+
+
+def write_paper(directory, paper_id, paper):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{paper_id}.json").write_text(json.dumps(paper))
+
+
+def test_merge_applies_stage_deltas_with_earlier_stage_winning():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pipeline = Path(tmpdir)
+        base = {"title": "Trial", "doi": "10.1/a"}
+        write_paper(pipeline / "04_crossref_enrichment", "AAA", base)
+        write_paper(pipeline / "05_s2_enrichment", "AAA", {**base, "s2_citations": 3, "abstract": "S2"})
+        write_paper(
+            pipeline / "06_openalex_enrichment", "AAA", {**base, "openalex_id": "W1", "abstract": "OA"}
+        )
+
+        report = merge_stage_deltas(
+            pipeline / "04_crossref_enrichment",
+            [pipeline / "05_s2_enrichment", pipeline / "06_openalex_enrichment", pipeline / "07_missing"],
+            pipeline / "10_final_output",
+        )
+
+        merged = json.loads((pipeline / "10_final_output" / "AAA.json").read_text())
+        assert merged == {**base, "s2_citations": 3, "abstract": "S2", "openalex_id": "W1"}
+        assert report["conflicts"] == {"05_s2_enrichment>06_openalex_enrichment:abstract": 1}
+        assert read_stage(pipeline / "10_final_output").complete
+
+
+def test_stage_graph_runs_enrichers_after_crossref_concurrently():
+    stages = ["crossref", "s2", "openalex", "unpaywall", "pubmed", "arxiv"]
+    started = threading.Barrier(5, timeout=5)
+    order = []
+
+    def run_stage(stage):
+        order.append(stage)
+        if stage != "crossref":
+            started.wait()  # Only returns once all five enrichers are running
+        return stage != "pubmed"
+
+    failed = run_stage_graph(stages, stage_dependencies(parallel=True), run_stage)
+    assert order[0] == "crossref"
+    assert failed == ["pubmed"]
+
+    order.clear()
+    failed = run_stage_graph(
+        stages, stage_dependencies(parallel=False), lambda stage: order.append(stage) or stage != "openalex"
+    )
+    assert order == ["crossref", "s2", "openalex"]
+    assert failed == ["openalex"]
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Test the stage table, coverage index and stage manifest used by the pipeline scripts."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config
+from src.coverage_index import CoverageIndex
+from src.filter_non_articles import NonArticleFilter
+from src.pipeline_runner import verify_stage_completion
+from src.stage_manifest import ids_hash, read_stage
+from src.stage_table import StageTable
+
+PAPERS = {
+    "AAA": {
+        "title": " A trial ",
+        "doi": "10.1234/a",
+        "year": 2020,
+        "abstract": "An abstract",
+        "sections": [{"type": "methods", "text": "abc"}, {"type": "results", "text": ""}],
+        "references": [{}, {}],
+        "crossref_enrichment": {"status": "enriched"},
+    },
+    "BBB": {"title": "", "doi": None, "openalex_id": None, "cited_references": [{}]},
+}
+
+
+def write_stage(directory):
+    for paper_id, paper in PAPERS.items():
+        (directory / f"{paper_id}.json").write_text(json.dumps(paper))
+    (directory / "crossref_report.json").write_text(json.dumps({"total": 2}))
+    (directory / "CCC.json").write_text("{broken")
+
+
+def test_scan_builds_columns():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stage = Path(tmpdir)
+        write_stage(stage)
+
+        table = StageTable.scan(stage)
+        assert table.paper_ids == ["AAA", "BBB", "CCC", "crossref_report"]
+        assert not (stage / config.STAGE_TABLE_FILENAME).exists()  # Read-only unless persist=True
+
+        papers = table.exclude_names("report")
+        assert papers.ids() == ["AAA", "BBB", "CCC"]
+        assert papers.parsed.tolist() == [True, True, False]
+        assert papers.parse_errors[2].startswith("JSON decode error")
+        assert papers.coverage("title") == (1 / 3 * 100, 1)
+        assert papers.ids(papers.has_key("openalex_id")) == ["BBB"]
+        assert papers.text("title", 0) == "A trial"
+        assert papers.count("section_text_chars").tolist() == [3, 0, 0]
+        assert papers.count("num_text_sections").tolist() == [1, 0, 0]
+        assert papers.count("num_cited_references").tolist() == [0, 1, 0]
+        assert papers.crossref_status[0] == "enriched"
+        assert papers.missing(["title", "doi", "abstract"])[1] == ["title", "doi", "abstract"]
+        assert papers.record(0)["year"] == 2020
+
+
+def test_persisted_table_is_reused_and_refreshed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stage = Path(tmpdir)
+        write_stage(stage)
+        first = StageTable.scan(stage, persist=True)
+        assert (stage / config.STAGE_TABLE_FILENAME).exists()
+
+        loaded = StageTable.load(stage / config.STAGE_TABLE_FILENAME)
+        assert loaded is not None
+        assert loaded.paper_ids == first.paper_ids
+        assert (loaded.filled == first.filled).all()
+        assert loaded.values == first.values
+
+        (stage / "BBB.json").write_text(json.dumps({"title": "Recovered"}))
+        os.utime(stage / "BBB.json", ns=(0, 0))
+        (stage / "CCC.json").unlink()
+        refreshed = StageTable.scan(stage, persist=True)
+        assert refreshed.paper_ids == ["AAA", "BBB", "crossref_report"]
+        assert refreshed.text("title", 1) == "Recovered"
+        assert refreshed.has("title").tolist() == [True, True, False]
+
+
+def test_non_article_filter_skips_unreadable_papers(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stage = Path(tmpdir) / "stage"
+        stage.mkdir()
+        write_stage(stage)
+        monkeypatch.chdir(tmpdir)
+
+        article_filter = NonArticleFilter(str(stage))
+        article_filter.process_all()
+
+        assert sorted(path.name for path in article_filter.output_dir.glob("???.json")) == [
+            "AAA.json",
+            "BBB.json",
+        ]
+        assert [paper["paper_id"] for paper in article_filter.excluded["unreadable"]] == ["CCC"]
+        assert article_filter.stats["unreadable"] == 1
+        assert not (stage / config.STAGE_TABLE_FILENAME).exists()
+
+
+def test_coverage_index_tracks_writes_and_reconciles():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stage = Path(tmpdir)
+        write_stage(stage)
+
+        index = CoverageIndex.open(stage)
+        assert len(index) == 2
+        assert index.count("title", "doi") == 1
+        assert index.ids(index.mask(missing=("title",))) == ["BBB"]
+        assert index.count("key:crossref_enrichment", "valid_doi", "valid_year") == 1
+        assert index.count("key:openalex_id") == 1
+
+        index.record("BBB", {"title": "Recovered", "doi": "10.1/x", "abstract": "short"})
+        index.record("DDD", {"title": "New"})
+        index.remove("AAA")
+        assert index.save()
+        assert sorted(index.ids(index.live)) == ["BBB", "DDD"]
+
+        loaded = CoverageIndex.for_stage(stage)
+        assert len(loaded) == 2
+        assert loaded.ids(loaded.mask("short_abstract")) == ["BBB"]
+        assert loaded.count("key:openalex_id") == 0
+
+        reconciled = CoverageIndex.open(stage)
+        assert sorted(reconciled.ids(reconciled.live)) == ["AAA", "BBB"]
+        assert reconciled.count("title") == 2
+
+
+def test_coverage_index_round_trips_across_byte_boundaries():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index = CoverageIndex(Path(tmpdir) / config.COVERAGE_INDEX_FILENAME)
+        for i in range(20):
+            index.record_fields(f"P{i:02d}", ["title"] if i % 3 else ["title", "doi"])
+        index.remove("P09")
+        assert index.count("title") == 19
+        assert index.ids(index.mask("doi")) == ["P00", "P03", "P06", "P12", "P15", "P18"]
+        assert index.save()
+
+        loaded = CoverageIndex.load(Path(tmpdir))
+        assert loaded is not None
+        assert (loaded.live, loaded.bits) == (index.live, index.bits)
+        loaded.record_fields("P20", ["doi"])
+        assert loaded.ids(loaded.mask("doi", missing=("title",))) == ["P20"]
+        assert len(loaded) == 20
+
+
+def test_stage_manifest_tracks_completion():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stage = Path(tmpdir)
+        write_stage(stage)
+        (stage / ".crossref_v5_checkpoint.json").write_text("{}")
+
+        scanned = read_stage(stage)
+        assert not scanned.from_manifest
+        assert (scanned.count, scanned.checkpoint) == (3, True)
+        assert verify_stage_completion(stage, min_files=3)
+
+        index = CoverageIndex.open(stage, stage / ".crossref_v5_checkpoint.json")
+        assert not read_stage(stage).from_manifest  # Reconciling keeps the listing fallback
+        assert verify_stage_completion(stage, min_files=3)
+
+        index.record("AAA", PAPERS["AAA"])
+        assert index.save()
+        in_progress = read_stage(stage)
+        assert in_progress.from_manifest
+        assert (in_progress.count, in_progress.complete, in_progress.checkpoint) == (2, False, True)
+        assert not verify_stage_completion(stage)
+
+        (stage / ".crossref_v5_checkpoint.json").unlink()
+        assert index.finish({"enriched": 1})
+        finished = read_stage(stage)
+        assert (finished.complete, finished.checkpoint, finished.stats) == (True, False, {"enriched": 1})
+        assert finished.ids_hash == ids_hash(["BBB", "AAA"])
+        assert verify_stage_completion(stage, min_files=2)
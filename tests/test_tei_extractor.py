@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test header-only TEI extraction and lazy section/reference loading."""
+
+import json
+import tempfile
+from pathlib import Path
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.coverage_index import CoverageIndex
+from src.stage_manifest import read_stage
+from src.tei_extractor import ComprehensiveTEIExtractor, LazyTEIContent
+
+TEI_DIR = Path(__file__).parent.parent / "extraction_pipeline" / "01_tei_xml"
+SAMPLE_TEI = TEI_DIR / "22FYFR7M.xml"
+
+
+def test_header_only_skips_body():
+    """Header-only records keep metadata but not sections or references."""
+    extractor = ComprehensiveTEIExtractor()
+    full = extractor.parse_tei_xml(SAMPLE_TEI)
+    header = extractor.parse_tei_xml(SAMPLE_TEI, header_only=True)
+
+    assert "sections" in full
+    assert "sections" not in header
+    assert "references" not in header
+    assert header["title"] == full["title"]
+    assert header.get("num_references") == full.get("num_references")
+    assert header["tei_file"] == str(SAMPLE_TEI)
+
+
+def test_lazy_content_matches_full_extraction():
+    """Lazy loading from the TEI reproduces the full extraction."""
+    extractor = ComprehensiveTEIExtractor()
+    full = extractor.parse_tei_xml(SAMPLE_TEI)
+    header = extractor.parse_tei_xml(SAMPLE_TEI, header_only=True)
+
+    lazy = LazyTEIContent(header, extractor=extractor)
+    assert lazy.sections == full["sections"]
+    assert lazy.references == full["references"]
+    assert lazy.materialize() == full
+
+
+def test_lazy_content_resolves_from_tei_dir_and_store():
+    """Records without a tei_file fall back to tei_dir, and json_dir is preferred."""
+    extractor = ComprehensiveTEIExtractor()
+    header = extractor.parse_tei_xml(SAMPLE_TEI, header_only=True)
+    del header["tei_file"]
+
+    assert LazyTEIContent(header).sections == []
+    assert LazyTEIContent(header, tei_dir=TEI_DIR).sections
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stored = {"paper_id": header["paper_id"], "sections": [{"title": "Stored", "text": "x"}]}
+        with open(Path(tmpdir) / f"{header['paper_id']}.json", "w") as f:
+            json.dump(stored, f)
+
+        lazy = LazyTEIContent(header, tei_dir=TEI_DIR, json_dir=Path(tmpdir))
+        assert lazy.sections == [{"title": "Stored", "text": "x"}]
+
+
+def test_rerun_with_nothing_left_marks_stage_complete():
+    """A run interrupted before finishing is completed by a rerun with no files left."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tei_dir = Path(tmpdir) / "tei"
+        tei_dir.mkdir()
+        (tei_dir / SAMPLE_TEI.name).write_bytes(SAMPLE_TEI.read_bytes())
+        output_dir = Path(tmpdir) / "json"
+
+        ComprehensiveTEIExtractor().process_directory(tei_dir, output_dir, header_only=True)
+        coverage = CoverageIndex.open(output_dir)
+        coverage.record("EXTRA", {"title": "Interrupted"})
+        coverage.save()
+        assert not read_stage(output_dir).complete
+
+        ComprehensiveTEIExtractor().process_directory(tei_dir, output_dir, header_only=True)
+        assert read_stage(output_dir).complete
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Test shared fuzzy title matching and the MinHash/LSH title index."""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.title_index import TitleIndex, normalize_title, title_similarity, titles_match
+
+
+def test_normalize_title():
+    assert normalize_title("  Machine-Learning: A Review. ") == "machine learning a review"
+    assert normalize_title("Évaluation de santé") == "evaluation de sante"
+    assert normalize_title(None) == ""
+    assert normalize_title("") == ""
+
+
+def test_title_similarity():
+    title = "Enhancing the implementation of mHealth interventions in resource-limited settings"
+    assert title_similarity(title, title.upper() + ".") == 1.0
+    assert title_similarity(title, "Deep learning for protein folding") < 0.2
+    assert title_similarity(title, None) == 0.0
+    assert titles_match(title, title.replace("Enhancing", "Enhancing:"))
+
+
+def test_index_query_finds_near_duplicates():
+    index = TitleIndex()
+    titles = {
+        "A": "Digital health interventions for hypertension control in primary care",
+        "B": "Machine learning approaches to sepsis prediction in intensive care units",
+        "C": "A scoping review of mobile health apps for diabetes self-management",
+    }
+    for key, title in titles.items():
+        assert index.add(key, title, payload={"key": key})
+
+    assert len(index) == 3
+    assert not index.add("A", "duplicate key")
+    assert not index.add("D", "")
+
+    match = index.best_match("Digital Health Interventions for Hypertension Control in Primary Care.")
+    assert match == ("A", 1.0)
+    assert index.get_payload("A") == {"key": "A"}
+
+    results = index.query("Machine learning approaches for sepsis prediction in intensive care units")
+    assert results
+    assert results[0][0] == "B"
+
+    assert index.best_match("Quantum chromodynamics on the lattice") is None
+
+
+def test_index_agrees_with_pairwise_scores():
+    index = TitleIndex()
+    corpus = [f"Randomized trial of intervention {i} for chronic disease outcome {i * 7}" for i in range(200)]
+    index.add_many((str(i), title) for i, title in enumerate(corpus))
+
+    query = corpus[42]
+    expected = sorted(
+        ((str(i), title_similarity(query, t)) for i, t in enumerate(corpus)),
+        key=lambda item: (-item[1], item[0]),
+    )
+    expected = [item for item in expected if item[1] >= 0.8]
+
+    assert index.query(query, threshold=0.8) == expected
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Test index selection, incremental updates, deletion and the recall benchmark."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config
+
+vector_index = pytest.importorskip("src.vector_index", reason="faiss is not installed")
+VectorIndex = vector_index.VectorIndex
+
+DIMENSIONS = 16
+
+
+def random_vectors(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, DIMENSIONS)).astype(np.float32)
+
+
+def test_index_type_follows_corpus_size():
+    assert vector_index.choose_index_type(2_200) == "flat"
+    assert vector_index.choose_index_type(config.INDEX_FLAT_MAX_VECTORS) == "hnsw"
+    assert vector_index.choose_index_type(config.INDEX_HNSW_MAX_VECTORS) == "ivf_flat"
+    assert vector_index.choose_index_type(config.INDEX_IVF_FLAT_MAX_VECTORS) == "ivf_pq"
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat"])
+def test_add_remove_and_reload(index_type):
+    vectors = random_vectors(200)
+    paper_ids = [f"P{i:03d}" for i in range(200)]
+    index = VectorIndex.build(paper_ids, vectors, index_type=index_type)
+
+    assert index.search(vectors[5], k=1)[0][0][0] == "P005"
+    version = index.version
+    assert index.remove(["P005", "MISSING"]) == 1
+    assert index.version != version
+    assert "P005" not in {paper_id for paper_id, _ in index.search(vectors[5], k=10)[0]}
+
+    index.add(["P006"], -vectors[6:7])  # Replaces P006's vector
+    assert len(index) == 199
+    assert index.search(-vectors[6], k=1)[0][0][0] == "P006"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = (Path(tmpdir) / "index.faiss", Path(tmpdir) / ".index_ids.npz")
+        index.save(*files)
+        reloaded = VectorIndex.load(*files)
+        assert reloaded.index_type == index_type
+        assert reloaded.version == index.version
+        assert reloaded.search(-vectors[6], k=1)[0][0][0] == "P006"
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat"])
+@pytest.mark.parametrize("share", [0.02, 0.3])
+def test_filtered_search_is_exact(index_type, share):
+    vectors = random_vectors(1000, seed=1)
+    index = VectorIndex.build([f"P{i:04d}" for i in range(1000)], vectors, index_type=index_type)
+    index.remove(["P0000"])
+    selected = np.random.default_rng(2).choice(1000, int(1000 * share), replace=False)
+    queries = random_vectors(5, seed=3)
+
+    for query, hits in zip(queries, index.search(queries, k=10, selector_ids=selected), strict=True):
+        live = selected[selected != 0]
+        expected = live[np.argsort(-(vectors[live] @ query))[:10]]
+        found = [int(paper_id[1:]) for paper_id, _ in hits]
+        if index_type == "flat" or share <= config.INDEX_FILTER_EXACT_RATIO:
+            assert found == expected.tolist()
+        else:
+            assert set(found) <= set(live.tolist())
+
+
+def test_sync_adds_only_changed_papers_and_benchmark_reports_recall():
+    vectors = random_vectors(50)
+    paper_ids = [f"P{i:02d}" for i in range(50)]
+    keys = [f"k{i}" for i in range(50)]
+    requested = []
+
+    def vectors_for(positions):
+        requested.append(len(positions))
+        return vectors[positions]
+
+    index, stats = vector_index.sync_index(None, paper_ids, keys, vectors_for)
+    assert stats["rebuilt"] == 1
+
+    keys[3] = "changed"
+    index, stats = vector_index.sync_index(index, paper_ids[:-1], keys[:-1], vectors_for)
+    assert stats == {"added": 1, "removed": 1, "rebuilt": 0}
+    assert requested == [50, 1]
+
+    results = vector_index.benchmark(random_vectors(500), k=5, index_types=("flat", "hnsw"), n_queries=20)
+    assert results[0]["recall@5"] == 1.0
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Test the per-paper status table and the cross-stage work planner."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config
+from src.coverage_index import CoverageIndex
+from src.paper_status import PaperStatus, STAGE_POLICIES, StagePolicy
+from src.pipeline_runner import verify_stage_completion
+from src.response_cache import ResponseCache
+from src.stage_manifest import read_stage
+from src.work_planner import plan_pipeline
+
+PAPERS = {
+    "AAA": {"title": "Trial A", "doi": "10.1/a"},
+    "BBB": {"title": "Trial B", "doi": "10.1/b"},
+    "CCC": {"title": "Trial C"},
+}
+
+
+def write_papers(directory, papers):
+    directory.mkdir(parents=True, exist_ok=True)
+    for paper_id, paper in papers.items():
+        (directory / f"{paper_id}.json").write_text(json.dumps(paper))
+
+
+def test_status_seeds_from_existing_output_and_drops_missing_papers():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = Path(tmpdir) / "05_s2_enrichment"
+        write_papers(output, {"AAA": {"s2_enriched": True}, "BBB": {"title": "x"}})
+
+        status = PaperStatus.open("s2", output, has_data=lambda paper: bool(paper.get("s2_enriched")))
+        assert status.is_done("AAA")
+        assert status.needs("BBB") == "new"
+
+        status.record("BBB", success=False)
+        assert status.save()
+        assert status.is_done("BBB")  # S2 does not retry misses
+        assert status.needs("BBB", retry_failed=True) == "failed"
+
+        (output / "AAA.json").unlink()
+        reopened = PaperStatus.open("s2", output)
+        assert reopened.needs("AAA") == "new"
+        assert reopened.is_done("BBB")
+
+
+def test_plan_pipeline_counts_pending_papers_and_api_calls():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pipeline = Path(tmpdir)
+        write_papers(pipeline / "03_zotero_recovery", PAPERS)
+        write_papers(pipeline / "04_crossref_enrichment", PAPERS)
+
+        status = PaperStatus.open("crossref", pipeline / "04_crossref_enrichment")
+        status.record("AAA", success=True)
+        status.record("BBB", success=False)
+        status.record("CCC", success=True)
+        status.papers["CCC"]["fetch_version"] = "old"
+        status.save()
+
+        plans = {plan.stage: plan for plan in plan_pipeline(pipeline)}
+
+        crossref = plans["crossref"]
+        assert crossref.pending == {"CCC": "stale"}
+        assert crossref.api_calls == 1
+
+        unpaywall = plans["unpaywall"]
+        assert unpaywall.total == 3
+        assert unpaywall.reasons["new"] == 3
+        assert (unpaywall.lookups, unpaywall.api_calls) == (2, 2)
+        assert plans["s2"].api_calls == 1
+        assert plans["s2"].estimated_seconds == 1 / config.API_RATE_LIMIT_RPS
+
+        forced = plan_pipeline(pipeline, ["crossref"], force=True)
+        assert len(forced[0].pending) == 3
+
+
+def test_derive_version_bump_rederives_cached_papers_only():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pipeline = Path(tmpdir)
+        write_papers(pipeline / "05_s2_enrichment", PAPERS)
+        output = pipeline / "06_openalex_enrichment"
+        write_papers(output, PAPERS)
+
+        cache = ResponseCache("openalex", output)
+        assert cache.get("AAA") is None
+        assert cache.put("AAA", {"id": "W1"})
+        assert cache.get("AAA") == {"id": "W1"}
+
+        status = PaperStatus.open("openalex", output)
+        status.record("AAA", success=True, cached=True)
+        status.record("BBB", success=True)
+        status.record("CCC", success=False)
+        status.save()
+
+        original = STAGE_POLICIES["openalex"]
+        STAGE_POLICIES["openalex"] = StagePolicy(original.fetch_version, "next", original.retry_failed)
+        try:
+            reopened = PaperStatus.open("openalex", output)
+            assert reopened.pending(PAPERS, retry_failed=False) == {"AAA": "rederive", "BBB": "stale"}
+
+            (plan,) = plan_pipeline(pipeline, ["openalex"], retry_failed=False)
+            assert plan.outdated
+            assert plan.lookups == 1  # Only BBB is fetched again
+        finally:
+            STAGE_POLICIES["openalex"] = original
+
+
+def test_planning_keeps_stage_completion_state():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pipeline = Path(tmpdir)
+        legacy = pipeline / "03_zotero_recovery"
+        write_papers(legacy, PAPERS)
+        finished = pipeline / "04_crossref_enrichment"
+        write_papers(finished, {"AAA": PAPERS["AAA"]})
+        CoverageIndex.open(finished).finish({"enriched": 1})
+        (finished / config.COVERAGE_INDEX_FILENAME).unlink()
+        write_papers(finished, PAPERS)
+
+        assert verify_stage_completion(legacy, min_files=3)
+        plan_pipeline(pipeline)
+
+        assert read_stage(legacy).from_manifest is False
+        assert verify_stage_completion(legacy, min_files=3)
+        manifest = read_stage(finished)
+        assert manifest.complete
+        assert (manifest.count, manifest.stats) == (3, {"enriched": 1})
@@ -3,13 +3,22 @@
 
 Extract 50+ entity types from Grobid TEI XML output.
 Based on maximum extraction parameters defined in grobid_config.py.
+
+The document text is joined once per paper and scanned once into
+ScannedText: typed regex patterns (p-values, CIs, ORs/HRs, trial IDs,
+software, URLs, drugs...) are precompiled at import, and dictionary terms
+(study types, diseases, datasets, reporting guidelines...) run as a single
+keyword-trie pass. Extractors read typed matches with offsets from the scan.
 """
 
 from src import config
 
 
 import re
+from collections import defaultdict
+from dataclasses import dataclass
 from defusedxml import ElementTree
+from xml.etree import ElementTree as ET
 from typing import Any
 
 
@@ -31,25 +40,28 @@ def extract_all_grobid_entities(xml_content: str) -> dict[str, Any]:
 
     entities = {}
 
+    # Join and scan the full text once for all text-based extractors
+    scan = ScannedText.from_root(root)
+
     # Core Metadata
     entities["metadata"] = extract_metadata(root, ns)
 
     # Research Entities
-    entities["methodology"] = extract_methodology(root, ns)
-    entities["statistics"] = extract_statistics(root, ns)
-    entities["software_data"] = extract_software_and_data(root, ns)
-    entities["clinical"] = extract_clinical_entities(root, ns)
+    entities["methodology"] = extract_methodology(root, ns, scan)
+    entities["statistics"] = extract_statistics(root, ns, scan)
+    entities["software_data"] = extract_software_and_data(root, ns, scan)
+    entities["clinical"] = extract_clinical_entities(root, ns, scan)
 
     # Document Structure
-    entities["structure"] = extract_document_structure(root, ns)
+    entities["structure"] = extract_document_structure(root, ns, scan)
 
     # Quality Indicators
-    entities["quality_indicators"] = extract_quality_indicators(root, ns)
+    entities["quality_indicators"] = extract_quality_indicators(root, ns, scan)
 
     return entities
 
 
-def extract_metadata(root: ElementTree.Element, ns: dict) -> dict:
+def extract_metadata(root: ET.Element, ns: dict) -> dict:
     """Extract core metadata from paper."""
     metadata = {}
 
@@ -118,345 +130,453 @@ def extract_metadata(root: ElementTree.Element, ns: dict) -> dict:
     return metadata
 
 
-def extract_methodology(root: ElementTree.Element, ns: dict) -> dict:
+@dataclass
+class EntityMatch:
+    """Typed entity match with character offsets into the scanned text."""
+
+    entity_type: str  # e.g. "p_value", "trial_id", "software", "disease"
+    label: str  # Pattern or keyword label within the type (e.g. "SPSS", "NCT")
+    start: int
+    end: int
+    text: str  # Full matched text
+    value: str  # Captured value (the full text for patterns without a group)
+
+
+# Regex entity patterns: (entity type, label, pattern, ignore case).
+# Each pattern has at most one capture group, whose text becomes the match value.
+_ENTITY_PATTERNS: list[tuple[str, str, str, bool]] = [
+    # Sample sizes
+    ("sample_size", "n", r"n\s*=\s*(\d+)", True),
+    ("sample_size", "count", r"(\d+)\s+(?:participants?|patients?|subjects?)", True),
+    ("sample_size", "sample size of", r"sample size of (\d+)", True),
+    ("sample_size", "enrolled", r"enrolled (\d+)", True),
+    ("sample_size", "recruited", r"recruited (\d+)", True),
+    # Statistics
+    ("p_value", "p", r"p\s*[<=]\s*(0\.\d+)", True),
+    ("p_value", "p-value", r"p-value[s]?\s*[<=]\s*(0\.\d+)", True),
+    ("ci_level", "CI", r"(95%|99%)\s*CI", True),
+    ("ci_level", "confidence interval", r"(90%)\s*confidence interval", True),
+    ("odds_ratio", "OR", r"OR\s*[=:]\s*(\d+\.?\d*)", True),
+    ("hazard_ratio", "HR", r"HR\s*[=:]\s*(\d+\.?\d*)", True),
+    # Software
+    ("software", "SPSS", r"SPSS\s*(?:v|version)?\s*([\d\.]+)?", True),
+    ("software", "R", r"\bR\s+(?:version\s*)?([\d\.]+)", True),
+    ("software", "Python", r"Python\s*([\d\.]+)?", True),
+    ("software", "MATLAB", r"MATLAB\s*(?:R\d{4}[ab]?)?", True),
+    ("software", "SAS", r"SAS\s*(?:v|version)?\s*([\d\.]+)?", True),
+    ("software", "Stata", r"Stata\s*(?:v|version)?\s*([\d\.]+)?", True),
+    ("software", "GraphPad Prism", r"GraphPad\s+Prism\s*([\d\.]+)?", True),
+    ("software", "Excel", r"(?:Microsoft\s+)?Excel", True),
+    ("software", "JASP", r"JASP\s*([\d\.]+)?", True),
+    ("software", "Mplus", r"Mplus\s*([\d\.]+)?", True),
+    # Code repositories
+    ("code_url", "github", r"github\.com/[\w\-]+/[\w\-]+", True),
+    ("code_url", "gitlab", r"gitlab\.com/[\w\-]+/[\w\-]+", True),
+    ("code_url", "bitbucket", r"bitbucket\.org/[\w\-]+/[\w\-]+", True),
+    ("code_url", "zenodo", r"doi\.org/10\.\d+/zenodo\.\d+", True),
+    ("url", "url", r'https?://[^\s<>"{}|\\^`\[\]]+', False),
+    # Clinical trial registrations
+    ("trial_id", "NCT", r"NCT\d{8}", False),
+    ("trial_id", "ISRCTN", r"ISRCTN\d{8}", False),
+    ("trial_id", "EudraCT", r"\d{4}-\d{6}-\d{2}", False),
+    # Study periods
+    ("duration", "years", r"(\d+)\s*(?:year|yr)s?\s+(?:study|trial|follow-up)", True),
+    ("duration", "months", r"(\d+)\s*months?\s+(?:study|trial|follow-up)", True),
+    ("duration", "weeks", r"(\d+)\s*weeks?\s+(?:study|trial|follow-up)", True),
+    (
+        "date",
+        "month_year",
+        r"(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}",
+        False,
+    ),
+    # Drugs (simplified): words ending in a common drug suffix, checked once per
+    # word by lookbehinds instead of backtracking through every suffix
+    (
+        "drug",
+        "suffix",
+        r"\b\w++(?:(?<=\wmab)|(?<=\wib)|(?<=\wvir)|(?<=\wtide)|(?<=\wpril)|(?<=\wsartan)|(?<=\wstatin)"
+        r"|(?<=\wzole)|(?<=\wcycline))",
+        True,
+    ),
+    ("drug", "name", r"\b(?:aspirin|insulin|metformin|warfarin|heparin)\b", True),
+]
+
+# Dictionary terms, matched case-insensitively as substrings
+_STUDY_TYPE_TERMS = {
+    "rct": [
+        "randomized controlled trial",
+        "randomised controlled trial",
+        "rct",
+        "randomized trial",
+        "randomised trial",
+    ],
+    "cohort": ["cohort study", "prospective cohort", "retrospective cohort"],
+    "case_control": ["case-control", "case control"],
+    "cross_sectional": ["cross-sectional", "cross sectional"],
+    "systematic_review": ["systematic review", "meta-analysis", "meta analysis"],
+    "case_report": ["case report", "case study"],
+    "observational": ["observational study"],
+    "experimental": ["experimental study", "experiment"],
+    "qualitative": ["qualitative study", "qualitative research"],
+}
+
+# Disease mentions (simplified - real implementation would use NER)
+_DISEASE_TERMS = [
+    "diabetes",
+    "cancer",
+    "covid-19",
+    "coronavirus",
+    "hypertension",
+    "depression",
+    "anxiety",
+    "alzheimer",
+    "parkinson",
+    "stroke",
+    "heart disease",
+    "cardiovascular disease",
+    "obesity",
+]
+
+_DATASET_NAMES = [
+    "MIMIC-III",
+    "MIMIC-IV",
+    "eICU",
+    "UK Biobank",
+    "NHANES",
+    "PhysioNet",
+    "TCGA",
+    "GEO",
+    "dbGaP",
+    "ClinicalTrials.gov",
+    "OpenNeuro",
+    "ImageNet",
+    "COCO",
+    "MNIST",
+]
+
+_DATA_STATEMENT_TERMS = ["data availability", "data sharing"]
+_DATA_ACCESS_TERMS = ["available", "request"]
+_REPOSITORY_TERMS = ["github", "zenodo", "figshare", "dryad", "osf"]
+
+_ETHICS_TERMS = [
+    "ethics approval",
+    "ethical approval",
+    "irb approval",
+    "institutional review board",
+    "ethics committee",
+]
+_COI_TERMS = ["conflict of interest", "competing interest", "declaration of interest", "disclosure"]
+_REPORTING_GUIDELINES = {
+    "CONSORT": "consort",
+    "STROBE": "strobe",
+    "PRISMA": "prisma",
+    "STARD": "stard",
+    "ARRIVE": "arrive",
+}
+_SUPPLEMENTARY_TERMS = [
+    "supplementary",
+    "supplemental",
+    "appendix",
+    "additional file",
+    "supporting information",
+]
+
+
+def _build_keyword_types() -> dict[str, list[str]]:
+    """Map each dictionary term to the entity types it is reported under."""
+    keyword_types: dict[str, list[str]] = defaultdict(list)
+    for entity_type, terms in [
+        ("study_type", [term for group in _STUDY_TYPE_TERMS.values() for term in group]),
+        ("disease", _DISEASE_TERMS),
+        ("dataset", [name.lower() for name in _DATASET_NAMES]),
+        ("data_statement", _DATA_STATEMENT_TERMS),
+        ("data_access", _DATA_ACCESS_TERMS),
+        ("repository", _REPOSITORY_TERMS),
+        ("ethics", _ETHICS_TERMS),
+        ("coi", _COI_TERMS),
+        ("reporting_guideline", list(_REPORTING_GUIDELINES.values())),
+        ("supplementary", _SUPPLEMENTARY_TERMS),
+    ]:
+        for term in terms:
+            if entity_type not in keyword_types[term]:
+                keyword_types[term].append(entity_type)
+    return dict(keyword_types)
+
+
+def _compile_keyword_trie(keywords: list[str]) -> re.Pattern[str]:
+    """Compile keywords into a prefix-trie regex that matches the longest keyword at each position.
+
+    A regex alternation factored by common prefixes behaves like an
+    Aho-Corasick automaton for our purposes: each text position is tested
+    against the trie once instead of against every keyword.
+    """
+    trie: dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional suffix: prefer the longer keyword, fall back to this one
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile("(?=(" + build(trie) + "))")
+
+
+_SOFTWARE_NAMES = [label for entity_type, label, _, _ in _ENTITY_PATTERNS if entity_type == "software"]
+_COMPILED_PATTERNS = [
+    (entity_type, label, re.compile(pattern, re.IGNORECASE if ignore_case else 0))
+    for entity_type, label, pattern, ignore_case in _ENTITY_PATTERNS
+]
+_KEYWORD_TYPES = _build_keyword_types()
+_KEYWORD_REGEX = _compile_keyword_trie(list(_KEYWORD_TYPES))
+# Shorter keywords that also match wherever a longer keyword matched
+_KEYWORD_PREFIXES = {
+    keyword: [other for other in _KEYWORD_TYPES if other != keyword and keyword.startswith(other)]
+    for keyword in _KEYWORD_TYPES
+}
+
+
+class ScannedText:
+    """Document text joined once and scanned once for all entity types.
+
+    Typed regex patterns are precompiled at import and each run once over the
+    shared text; dictionary terms run as a single keyword-trie pass over the
+    lowercased text. Extraction functions read their results from here
+    instead of re-joining ``root.itertext()``, re-lowering the text and
+    re-running ``re.findall`` per call.
+    """
+
+    def __init__(self, text: str):
+        """Scan text for all entity types.
+
+        Args:
+            text: Full document text
+        """
+        self.text = text
+        self.text_lower = text.lower()
+        self.matches: list[EntityMatch] = []
+        self._by_type: dict[str, list[EntityMatch]] = defaultdict(list)
+        self._by_label: dict[tuple[str, str], list[EntityMatch]] = defaultdict(list)
+
+        for entity_type, label, pattern in _COMPILED_PATTERNS:
+            for match in pattern.finditer(text):
+                value = (match.group(1) or "") if pattern.groups else match.group(0)
+                self.matches.append(
+                    EntityMatch(entity_type, label, match.start(), match.end(), match.group(0), value)
+                )
+
+        # Keyword offsets refer to text_lower (identical to text for ASCII)
+        for match in _KEYWORD_REGEX.finditer(self.text_lower):
+            longest = match.group(1)
+            start = match.start(1)
+            for keyword in [longest, *_KEYWORD_PREFIXES[longest]]:
+                for entity_type in _KEYWORD_TYPES[keyword]:
+                    self.matches.append(
+                        EntityMatch(entity_type, keyword, start, start + len(keyword), keyword, keyword)
+                    )
+
+        self.matches.sort(key=lambda m: (m.start, m.end))
+        for match in self.matches:
+            self._by_type[match.entity_type].append(match)
+            self._by_label[(match.entity_type, match.label)].append(match)
+
+    @classmethod
+    def from_root(cls, root: ET.Element) -> "ScannedText":
+        """Join and scan the full text of a TEI document."""
+        return cls(" ".join(root.itertext()))
+
+    def of_type(self, entity_type: str, label: str | None = None) -> list[EntityMatch]:
+        """Return matches of a type (optionally one label), in text order."""
+        if label is None:
+            return self._by_type.get(entity_type, [])
+        return self._by_label.get((entity_type, label), [])
+
+    def has_keyword(self, keyword: str) -> bool:
+        """Check whether a dictionary term occurs anywhere in the text (case-insensitive)."""
+        return any(self._by_label.get((entity_type, keyword)) for entity_type in _KEYWORD_TYPES[keyword])
+
+
+def _get_scan(root: ET.Element, scan: ScannedText | None) -> ScannedText:
+    """Reuse a shared scan or build one for standalone calls."""
+    return scan if scan is not None else ScannedText.from_root(root)
+
+
+def extract_methodology(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract methodology-related entities."""
-    methodology = {}
+    scan = _get_scan(root, scan)
+    methodology: dict[str, Any] = {}
 
     # Sample sizes
-    methodology["sample_sizes"] = extract_sample_sizes(root, ns)
+    methodology["sample_sizes"] = extract_sample_sizes(root, ns, scan)
 
     # Study type detection
-    methodology["study_type"] = detect_study_type(root, ns)
+    methodology["study_type"] = detect_study_type(root, ns, scan)
 
     # Clinical trial IDs
-    methodology["trial_ids"] = extract_trial_ids(root, ns)
+    methodology["trial_ids"] = extract_trial_ids(root, ns, scan)
 
     # Time periods
-    methodology["time_periods"] = extract_time_periods(root, ns)
+    methodology["time_periods"] = extract_time_periods(root, ns, scan)
 
     return methodology
 
 
-def extract_sample_sizes(root: ElementTree.Element, ns: dict) -> list[int]:
+def extract_sample_sizes(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> list[int]:
     """Extract all sample sizes from paper."""
     sizes = []
 
-    patterns = [
-        r"n\s*=\s*(\d+)",
-        r"N\s*=\s*(\d+)",
-        r"(\d+)\s+participants?",
-        r"(\d+)\s+patients?",
-        r"(\d+)\s+subjects?",
-        r"sample size of (\d+)",
-        r"enrolled (\d+)",
-        r"recruited (\d+)",
-    ]
-
-    # Get all text content
-    text = " ".join(root.itertext())
-
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                size = int(match)
-                if (
-                    config.MIN_SAMPLE_SIZE_THRESHOLD <= size <= config.MAX_SAMPLE_SIZE_THRESHOLD
-                ):  # Reasonable range
-                    sizes.append(size)
-            except ValueError:
-                continue
+    for match in _get_scan(root, scan).of_type("sample_size"):
+        size = int(match.value)
+        if config.MIN_SAMPLE_SIZE_THRESHOLD <= size <= config.MAX_SAMPLE_SIZE_THRESHOLD:  # Reasonable range
+            sizes.append(size)
 
     # Return unique sizes, sorted descending
     return sorted(set(sizes), reverse=True)
 
 
-def detect_study_type(root: ElementTree.Element, ns: dict) -> str | None:
+def detect_study_type(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> str | None:
     """Detect the type of study."""
-    text_lower = " ".join(root.itertext()).lower()
-
-    study_types = {
-        "rct": [
-            "randomized controlled trial",
-            "randomised controlled trial",
-            "rct",
-            "randomized trial",
-            "randomised trial",
-        ],
-        "cohort": ["cohort study", "prospective cohort", "retrospective cohort"],
-        "case_control": ["case-control", "case control"],
-        "cross_sectional": ["cross-sectional", "cross sectional"],
-        "systematic_review": ["systematic review", "meta-analysis", "meta analysis"],
-        "case_report": ["case report", "case study"],
-        "observational": ["observational study"],
-        "experimental": ["experimental study", "experiment"],
-        "qualitative": ["qualitative study", "qualitative research"],
-    }
-
-    for study_type, patterns in study_types.items():
-        for pattern in patterns:
-            if pattern in text_lower:
+    scan = _get_scan(root, scan)
+
+    for study_type, terms in _STUDY_TYPE_TERMS.items():
+        for term in terms:
+            if scan.has_keyword(term):
                 return study_type
 
     return None
 
 
-def extract_statistics(root: ElementTree.Element, ns: dict) -> dict:
+def extract_statistics(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract statistical values from paper."""
-    statistics = {}
-
-    text = " ".join(root.itertext())
+    scan = _get_scan(root, scan)
+    statistics: dict[str, Any] = {}
 
     # P-values
-    p_values = []
-    p_patterns = [r"p\s*[<=]\s*(0\.\d+)", r"P\s*[<=]\s*(0\.\d+)", r"p-value[s]?\s*[<=]\s*(0\.\d+)"]
-
-    for pattern in p_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                p_val = float(match)
-                if 0 <= p_val <= 1:
-                    p_values.append(p_val)
-            except ValueError:
-                continue
-
-    statistics["p_values"] = sorted(set(p_values))
+    p_values = [float(m.value) for m in scan.of_type("p_value")]
+    statistics["p_values"] = sorted({p for p in p_values if 0 <= p <= 1})
 
     # Confidence intervals
-    ci_patterns = [r"(95%)\s*CI", r"(99%)\s*CI", r"(90%)\s*confidence interval"]
-
-    ci_levels = []
-    for pattern in ci_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        ci_levels.extend(matches)
-
-    statistics["confidence_intervals"] = list(set(ci_levels))
+    statistics["confidence_intervals"] = list({m.value for m in scan.of_type("ci_level")})
 
     # Effect sizes (odds ratios, hazard ratios, etc.)
     effect_sizes = {}
 
     # Odds ratios
-    or_pattern = r"OR\s*[=:]\s*(\d+\.?\d*)"
-    or_matches = re.findall(or_pattern, text, re.IGNORECASE)
+    or_matches = scan.of_type("odds_ratio")
     if or_matches:
-        effect_sizes["odds_ratios"] = [float(x) for x in or_matches]
+        effect_sizes["odds_ratios"] = [float(m.value) for m in or_matches]
 
     # Hazard ratios
-    hr_pattern = r"HR\s*[=:]\s*(\d+\.?\d*)"
-    hr_matches = re.findall(hr_pattern, text, re.IGNORECASE)
+    hr_matches = scan.of_type("hazard_ratio")
     if hr_matches:
-        effect_sizes["hazard_ratios"] = [float(x) for x in hr_matches]
+        effect_sizes["hazard_ratios"] = [float(m.value) for m in hr_matches]
 
     statistics["effect_sizes"] = effect_sizes
 
     return statistics
 
 
-def extract_software_and_data(root: ElementTree.Element, ns: dict) -> dict:
+def extract_software_and_data(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract software tools and datasets mentioned."""
-    result = {}
-
-    text = " ".join(root.itertext())
-
-    # Software detection
-    software_patterns = {
-        "SPSS": r"SPSS\s*(?:v|version)?\s*([\d\.]+)?",
-        "R": r"\bR\s+(?:version\s*)?([\d\.]+)",
-        "Python": r"Python\s*([\d\.]+)?",
-        "MATLAB": r"MATLAB\s*(?:R\d{4}[ab]?)?",
-        "SAS": r"SAS\s*(?:v|version)?\s*([\d\.]+)?",
-        "Stata": r"Stata\s*(?:v|version)?\s*([\d\.]+)?",
-        "GraphPad Prism": r"GraphPad\s+Prism\s*([\d\.]+)?",
-        "Excel": r"(?:Microsoft\s+)?Excel",
-        "JASP": r"JASP\s*([\d\.]+)?",
-        "Mplus": r"Mplus\s*([\d\.]+)?",
-    }
+    scan = _get_scan(root, scan)
+    result: dict[str, Any] = {}
 
+    # Software detection (first mention determines the reported version)
     software_found = []
-    for name, pattern in software_patterns.items():
-        if re.search(pattern, text, re.IGNORECASE):
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches and matches[0]:
-                software_found.append(f"{name} {matches[0]}")
-            else:
-                software_found.append(name)
+    for name in _SOFTWARE_NAMES:
+        matches = scan.of_type("software", name)
+        if not matches:
+            continue
+        if matches[0].value:
+            software_found.append(f"{name} {matches[0].value}")
+        else:
+            software_found.append(name)
 
     result["software"] = software_found
 
     # Dataset detection
-    dataset_patterns = [
-        "MIMIC-III",
-        "MIMIC-IV",
-        "eICU",
-        "UK Biobank",
-        "NHANES",
-        "PhysioNet",
-        "TCGA",
-        "GEO",
-        "dbGaP",
-        "ClinicalTrials.gov",
-        "OpenNeuro",
-        "ImageNet",
-        "COCO",
-        "MNIST",
-    ]
-
-    datasets_found = []
-    for dataset in dataset_patterns:
-        if dataset.lower() in text.lower():
-            datasets_found.append(dataset)
-
-    result["datasets"] = datasets_found
+    result["datasets"] = [name for name in _DATASET_NAMES if scan.has_keyword(name.lower())]
 
     # Data availability
-    data_availability = {"has_statement": False, "is_available": False, "repository": None}
+    data_availability: dict[str, Any] = {"has_statement": False, "is_available": False, "repository": None}
 
-    if "data availability" in text.lower() or "data sharing" in text.lower():
+    if any(scan.has_keyword(term) for term in _DATA_STATEMENT_TERMS):
         data_availability["has_statement"] = True
 
-        if "available" in text.lower() and "request" not in text.lower():
+        if scan.has_keyword("available") and not scan.has_keyword("request"):
             data_availability["is_available"] = True
 
         # Check for repository mentions
-        repos = ["github", "zenodo", "figshare", "dryad", "osf"]
-        for repo in repos:
-            if repo in text.lower():
+        for repo in _REPOSITORY_TERMS:
+            if scan.has_keyword(repo):
                 data_availability["repository"] = repo
                 break
 
     result["data_availability"] = data_availability
 
     # Code availability
-    code_patterns = [
-        r"github\.com/[\w\-]+/[\w\-]+",
-        r"gitlab\.com/[\w\-]+/[\w\-]+",
-        r"bitbucket\.org/[\w\-]+/[\w\-]+",
-        r"doi\.org/10\.\d+/zenodo\.\d+",
-    ]
-
-    code_urls = []
-    for pattern in code_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        code_urls.extend(matches)
-
-    result["code_urls"] = list(set(code_urls))
+    result["code_urls"] = list({m.text for m in scan.of_type("code_url")})
 
     return result
 
 
-def extract_clinical_entities(root: ElementTree.Element, ns: dict) -> dict:
+def extract_clinical_entities(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract clinical and medical entities."""
-    clinical = {}
-
-    text = " ".join(root.itertext())
+    scan = _get_scan(root, scan)
+    clinical: dict[str, Any] = {}
 
     # Clinical trial IDs
-    clinical["trial_ids"] = extract_trial_ids(root, ns)
-
-    # Disease mentions (simplified - real implementation would use NER)
-    common_diseases = [
-        "diabetes",
-        "cancer",
-        "covid-19",
-        "coronavirus",
-        "hypertension",
-        "depression",
-        "anxiety",
-        "alzheimer",
-        "parkinson",
-        "stroke",
-        "heart disease",
-        "cardiovascular disease",
-        "obesity",
-    ]
+    clinical["trial_ids"] = extract_trial_ids(root, ns, scan)
 
-    diseases_found = []
-    for disease in common_diseases:
-        if disease.lower() in text.lower():
-            diseases_found.append(disease)
-
-    clinical["diseases"] = diseases_found
+    # Disease mentions
+    clinical["diseases"] = [disease for disease in _DISEASE_TERMS if scan.has_keyword(disease)]
 
     # Drug mentions (simplified)
-    clinical["drugs"] = extract_drug_mentions(text)
+    clinical["drugs"] = extract_drug_mentions(scan)
 
     return clinical
 
 
-def extract_trial_ids(root: ElementTree.Element, ns: dict) -> list[str]:
-    """Extract clinical trial identifiers."""
-    text = " ".join(root.itertext())
-
-    trial_ids = []
-
-    # NCT numbers
-    nct_pattern = r"NCT\d{8}"
-    nct_matches = re.findall(nct_pattern, text)
-    trial_ids.extend(nct_matches)
-
-    # ISRCTN numbers
-    isrctn_pattern = r"ISRCTN\d{8}"
-    isrctn_matches = re.findall(isrctn_pattern, text)
-    trial_ids.extend(isrctn_matches)
-
-    # EudraCT numbers
-    eudract_pattern = r"\d{4}-\d{6}-\d{2}"
-    eudract_matches = re.findall(eudract_pattern, text)
-    trial_ids.extend(eudract_matches)
+def extract_trial_ids(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> list[str]:
+    """Extract clinical trial identifiers (NCT, ISRCTN, EudraCT)."""
+    return list({m.text for m in _get_scan(root, scan).of_type("trial_id")})
 
-    return list(set(trial_ids))
 
-
-def extract_drug_mentions(text: str) -> list[str]:
+def extract_drug_mentions(text: str | ScannedText) -> list[str]:
     """Extract drug/medication mentions (simplified)."""
-    # Common drug suffixes
-    drug_patterns = [
-        r"\b\w+(?:mab|ib|vir|tide|pril|sartan|statin|zole|cycline)\b",
-        r"\b(?:aspirin|insulin|metformin|warfarin|heparin)\b",
-    ]
-
-    drugs = []
-    for pattern in drug_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        drugs.extend(matches)
+    scan = text if isinstance(text, ScannedText) else ScannedText(text)
+    return list({m.text for m in scan.of_type("drug")})
 
-    return list(set(drugs))
 
-
-def extract_time_periods(root: ElementTree.Element, ns: dict) -> dict:
+def extract_time_periods(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract study time periods and durations."""
-    text = " ".join(root.itertext())
-
+    scan = _get_scan(root, scan)
     periods = {}
 
-    # Study duration
-    duration_patterns = [
-        r"(\d+)\s*(?:year|yr)s?\s+(?:study|trial|follow-up)",
-        r"(\d+)\s*months?\s+(?:study|trial|follow-up)",
-        r"(\d+)\s*weeks?\s+(?:study|trial|follow-up)",
-    ]
-
-    for pattern in duration_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
+    # Study duration (years, then months, then weeks)
+    for unit in ("years", "months", "weeks"):
+        matches = scan.of_type("duration", unit)
         if matches:
-            periods["duration"] = matches[0]
+            periods["duration"] = matches[0].value
             break
 
     # Date ranges
-    date_pattern = (
-        r"(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}"
-    )
-    date_matches = re.findall(date_pattern, text)
+    date_matches = scan.of_type("date")
     if len(date_matches) >= config.MIN_DATE_MATCHES:
-        periods["date_range"] = f"{date_matches[0]} - {date_matches[-1]}"
+        periods["date_range"] = f"{date_matches[0].text} - {date_matches[-1].text}"
 
     return periods
 
 
-def extract_document_structure(root: ElementTree.Element, ns: dict) -> dict:
+def extract_document_structure(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract document structure information."""
-    structure = {}
+    structure: dict[str, Any] = {}
 
     # Figures
     figures = root.findall(".//tei:figure", ns)
@@ -491,18 +611,16 @@ def extract_document_structure(root: ElementTree.Element, ns: dict) -> dict:
     structure["sections"] = section_names
 
     # URLs
-    urls = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+', " ".join(root.itertext()))
-    structure["urls"] = list(set(urls))[:20]  # First 20 unique URLs
+    urls = {m.text for m in _get_scan(root, scan).of_type("url")}
+    structure["urls"] = list(urls)[:20]  # First 20 unique URLs
 
     return structure
 
 
-def extract_quality_indicators(root: ElementTree.Element, ns: dict) -> dict:
+def extract_quality_indicators(root: ET.Element, ns: dict, scan: ScannedText | None = None) -> dict:
     """Extract indicators of paper quality and completeness."""
-    indicators = {}
-
-    text = " ".join(root.itertext())
-    text_lower = text.lower()
+    scan = _get_scan(root, scan)
+    indicators: dict[str, Any] = {}
 
     # Funding information (if consolidateFunders='1' was used)
     funding = []
@@ -513,40 +631,20 @@ def extract_quality_indicators(root: ElementTree.Element, ns: dict) -> dict:
     indicators["funding_sources"] = funding
 
     # Ethics approval
-    indicators["has_ethics_approval"] = any(
-        term in text_lower
-        for term in [
-            "ethics approval",
-            "ethical approval",
-            "irb approval",
-            "institutional review board",
-            "ethics committee",
-        ]
-    )
+    indicators["has_ethics_approval"] = any(scan.has_keyword(term) for term in _ETHICS_TERMS)
 
     # Conflict of interest
-    indicators["has_coi_statement"] = any(
-        term in text_lower
-        for term in ["conflict of interest", "competing interest", "declaration of interest", "disclosure"]
-    )
+    indicators["has_coi_statement"] = any(scan.has_keyword(term) for term in _COI_TERMS)
 
     # Registration (for clinical trials)
-    indicators["is_registered"] = bool(extract_trial_ids(root, ns))
+    indicators["is_registered"] = bool(extract_trial_ids(root, ns, scan))
 
     # Reporting guidelines
-    guidelines = {
-        "CONSORT": "consort" in text_lower,
-        "STROBE": "strobe" in text_lower,
-        "PRISMA": "prisma" in text_lower,
-        "STARD": "stard" in text_lower,
-        "ARRIVE": "arrive" in text_lower,
-    }
-    indicators["reporting_guidelines"] = [g for g, found in guidelines.items() if found]
+    indicators["reporting_guidelines"] = [
+        guideline for guideline, term in _REPORTING_GUIDELINES.items() if scan.has_keyword(term)
+    ]
 
     # Supplementary materials
-    indicators["has_supplementary"] = any(
-        term in text_lower
-        for term in ["supplementary", "supplemental", "appendix", "additional file", "supporting information"]
-    )
+    indicators["has_supplementary"] = any(scan.has_keyword(term) for term in _SUPPLEMENTARY_TERMS)
 
     return indicators
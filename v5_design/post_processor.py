@@ -3,33 +3,78 @@
 
 Critical fixes based on empirical analysis of 1,000+ papers.
 These 5 fixes provide dramatic improvements to extraction quality.
+
+process_papers_parallel runs the pipeline over many papers in batches across
+a process pool. Header normalization and classification (fixes #1 and #2)
+live in src/section_headers.py and are memoized, so each distinct header is
+classified once per worker rather than once per paper.
 """
 
 from src import config
+from src.section_headers import (
+    aggregate_sections,
+    classify_section_header,
+    normalize_section_header,
+)
 
 
 import re
-from collections import defaultdict
-
-
-def complete_post_processing_pipeline(grobid_output: dict) -> dict:
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+# Pipeline steps reported in per-step timings
+PIPELINE_STEPS = (
+    "extract_sections",
+    "normalize_headers",
+    "aggregate_sections",
+    "hidden_results",
+    "rejection_check",
+    "abstract_recovery",
+    "metrics",
+)
+
+
+class _StepTimer:
+    """Accumulate elapsed time per pipeline step into a shared timings dict."""
+
+    def __init__(self, timings: dict[str, float] | None):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def lap(self, step: str) -> None:
+        """Charge the time since the previous lap to ``step``."""
+        if self.timings is None:
+            return
+        now = time.perf_counter()
+        self.timings[step] = self.timings.get(step, 0.0) + now - self.last
+        self.last = now
+
+
+def complete_post_processing_pipeline(grobid_output: dict, timings: dict[str, float] | None = None) -> dict:
     """Complete pipeline with ALL optimizations from 1,000 paper analysis.
 
     Args:
         grobid_output: Raw output from Grobid containing XML and metadata
+        timings: Optional dict that accumulates seconds spent per pipeline step
 
     Returns:
         dict: Processed paper with all fixes applied
     """
+    timer = _StepTimer(timings)
+
     # Step 1: Extract raw sections from Grobid XML
     raw_sections = extract_raw_sections(grobid_output.get("xml", ""))
+    timer.lap("extract_sections")
 
     # Step 2: Apply case-insensitive normalization (Critical Fix #1)
     for section in raw_sections:
         section["header"] = normalize_section_header(section["header"])
+    timer.lap("normalize_headers")
 
     # Step 3: Aggregate sections (Critical Fix #2)
     sections = aggregate_sections(raw_sections)
+    timer.lap("aggregate_sections")
 
     # Step 4: Find hidden results (Critical Fix #3)
     hidden_results = find_hidden_results(sections)
@@ -38,6 +83,7 @@ def complete_post_processing_pipeline(grobid_output: dict) -> dict:
             sections["results"] += "\n\n" + hidden_results
         else:
             sections["results"] = hidden_results
+    timer.lap("hidden_results")
 
     # Step 5: Check if paper should be rejected (Critical Fix #4)
     should_reject, reason = should_reject_paper(
@@ -46,6 +92,7 @@ def complete_post_processing_pipeline(grobid_output: dict) -> dict:
         sections,
         sum(len(s) for s in sections.values()),
     )
+    timer.lap("rejection_check")
 
     if should_reject:
         return {"status": "rejected", "reason": reason, "should_add_to_kb": False}
@@ -59,9 +106,11 @@ def complete_post_processing_pipeline(grobid_output: dict) -> dict:
             or extract_abstract_from_title_section(sections, grobid_output.get("title"))
             or synthesize_abstract_from_sections(sections)
         )
+    timer.lap("abstract_recovery")
 
     # Step 7: Calculate extraction metrics
     metrics = calculate_extraction_metrics(abstract, sections)
+    timer.lap("metrics")
 
     return {
         "status": "success",
@@ -72,171 +121,8 @@ def complete_post_processing_pipeline(grobid_output: dict) -> dict:
     }
 
 
-# =============================================================================
-# Critical Fix #1: Case-Insensitive Section Matching (HIGHEST IMPACT)
-# Impact: Results coverage improves from 41% → 85-90% (+44-49%!)
-# =============================================================================
-
-
-def normalize_section_header(header: str) -> str:
-    """Critical fix that recovers 1,531 missed sections.
-
-    Real-world impact from our analysis:
-    - 427 papers had "Results"
-    - 80 papers had "RESULTS"
-    - 4 papers had "results"
-    ALL would be correctly identified with this fix
-    """
-    if not header:
-        return ""
-
-    # Normalize case: "RESULTS" != "Results" != "results" → all map to "results"
-    header = header.lower().strip()
-
-    # Remove numbering
-    header = re.sub(r"^[0-9IVX]+\.?\s*", "", header)  # "2. Methods" → "methods"
-    header = re.sub(r"^\d+\.\d+\.?\s*", "", header)  # "3.2 Results" → "results"
-
-    # Remove special chars
-    header = re.sub(r"[:\-\u2013\u2014()]", " ", header)  # "Methods:" → "methods"
-
-    # Normalize whitespace
-    header = " ".join(header.split())
-
-    return header.strip()
-
-
-# =============================================================================
-# Critical Fix #2: Content Aggregation (ESSENTIAL)
-# Impact: 87% of papers have content to aggregate
-# =============================================================================
-
-
-def aggregate_sections(raw_sections: list[dict]) -> dict[str, str]:
-    """Aggregate all content for each section type.
-
-    Example: A paper might have:
-    - "Methods"
-    - "Study Design"
-    - "Data Collection"
-    - "Statistical Analysis"
-
-    All should be aggregated into 'methods'
-    """
-    # Comprehensive patterns based on 1,000 paper analysis
-    section_patterns = {
-        "introduction": [
-            "intro",
-            "background",
-            "overview",
-            "motivation",
-            "objectives",
-            "aims",
-            "purpose",
-            "rationale",
-            "significance",
-            "problem statement",
-        ],
-        "methods": [
-            "method",
-            "methodology",
-            "materials",
-            "procedure",
-            "study design",
-            "participants",
-            "data collection",
-            "measures",
-            "statistical analysis",
-            "protocol",
-            "experimental design",
-            "sample",
-            "intervention",
-            "study population",
-            "patient population",
-            "participant recruitment",
-            "enrollment",
-            "subjects",
-            "inclusion criteria",
-            "exclusion criteria",
-            "eligibility",
-            "data sources",
-            "measurements",
-            "assessment",
-            "procedures",
-            "interventions",
-            "statistical methods",
-            "sample size calculation",
-            "power analysis",
-        ],
-        "results": [
-            "result",
-            "finding",
-            "outcome",
-            "analysis",
-            "baseline characteristics",
-            "primary outcome",
-            "secondary outcome",
-            "efficacy",
-            "effectiveness",
-            "patient characteristics",
-            "demographic",
-            "clinical characteristics",
-            "safety",
-            "adverse events",
-            "side effects",
-        ],
-        "discussion": [
-            "discuss",
-            "interpretation",
-            "implication",
-            "limitation",
-            "strength",
-            "weakness",
-            "clinical significance",
-            "comparison",
-            "clinical implication",
-            "future direction",
-            "study limitation",
-        ],
-        "conclusion": [
-            "conclu",
-            "summary",
-            "future",
-            "recommendation",
-            "take-home",
-            "final thoughts",
-            "contribution",
-            "key findings",
-            "clinical recommendation",
-        ],
-    }
-
-    aggregated = defaultdict(list)
-
-    for section in raw_sections:
-        header = section.get("header", "")
-        content = section.get("content", "").strip()
-
-        if not content:
-            continue
-
-        # Normalize header for matching
-        header_normalized = normalize_section_header(header)
-
-        # Check which section type this belongs to
-        matched = False
-        for section_type, patterns in section_patterns.items():
-            if any(pattern in header_normalized for pattern in patterns):
-                aggregated[section_type].append(content)
-                matched = True
-                break
-
-        # If no match, keep as "other"
-        if not matched and content:
-            aggregated["other"].append(content)
-
-    # Merge aggregated content
-    return {section_type: "\n\n".join(contents) for section_type, contents in aggregated.items()}
+# Critical Fixes #1 (case-insensitive section matching) and #2 (content
+# aggregation) are in src/section_headers.py, shared with src/section_index.py
 
 
 # =============================================================================
@@ -570,3 +456,72 @@ def calculate_extraction_quality(abstract: str, sections: dict[str, str]) -> flo
         score += 0.05
 
     return min(score, 1.0)
+
+
+# =============================================================================
+# Batch Processing
+# =============================================================================
+
+
+def _process_batch(batch: list[dict]) -> tuple[list[dict], dict[str, float], dict[str, int]]:
+    """Run the pipeline over one batch (worker entry point).
+
+    Returns:
+        Tuple of (results, per-step timings, header memo hits/misses for this batch)
+    """
+    before = classify_section_header.cache_info()
+    timings = dict.fromkeys(PIPELINE_STEPS, 0.0)
+    results = [complete_post_processing_pipeline(grobid_output, timings) for grobid_output in batch]
+    after = classify_section_header.cache_info()
+    memo = {"hits": after.hits - before.hits, "misses": after.misses - before.misses}
+    return results, timings, memo
+
+
+def process_papers_parallel(
+    grobid_outputs: list[dict],
+    workers: int = config.SECTION_EXTRACTION_N_WORKERS,
+    batch_size: int = config.POST_PROCESSING_BATCH_SIZE,
+) -> tuple[list[dict], dict[str, Any]]:
+    """Post-process many papers in batches across a process pool.
+
+    Args:
+        grobid_outputs: Raw Grobid outputs, as for complete_post_processing_pipeline
+        workers: Worker processes (1 runs in-process)
+        batch_size: Papers per worker task
+
+    Returns:
+        Tuple of (results in input order, report with per-step timings,
+        header memo hits/misses and wall time)
+    """
+    start = time.perf_counter()
+    batches = [grobid_outputs[i : i + batch_size] for i in range(0, len(grobid_outputs), batch_size)]
+
+    results: list[dict] = []
+    timings = dict.fromkeys(PIPELINE_STEPS, 0.0)
+    memo = {"hits": 0, "misses": 0}
+
+    def collect(batch_output: tuple[list[dict], dict[str, float], dict[str, int]]) -> None:
+        batch_results, batch_timings, batch_memo = batch_output
+        results.extend(batch_results)
+        for step, seconds in batch_timings.items():
+            timings[step] += seconds
+        for key, count in batch_memo.items():
+            memo[key] += count
+
+    if workers <= 1 or len(batches) <= 1:
+        for batch in batches:
+            collect(_process_batch(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch_output in executor.map(_process_batch, batches):
+                collect(batch_output)
+
+    report = {
+        "papers": len(results),
+        "batches": len(batches),
+        "workers": workers if len(batches) > 1 else 1,
+        "wall_time": time.perf_counter() - start,
+        "step_timings": timings,
+        "header_memo": memo,
+    }
+    return results, report